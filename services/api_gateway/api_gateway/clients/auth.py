@@ -1,11 +1,13 @@
 from __future__ import annotations
 
+import time
 from typing import Any, Dict, Optional
 
 import httpx
 from fastapi import HTTPException, status
 
 from api_gateway.core.context import AuthenticatedUser
+from api_gateway.core.metrics import AUTH_INTROSPECTION_DURATION, status_class
 
 
 class AuthClient:
@@ -32,6 +34,7 @@ class AuthClient:
                 tenant_id="demo",
                 roles=["admin"],
             )
+        start = time.perf_counter()
         try:
             response = await self.http_client.post(
                 self.introspection_url,
@@ -40,9 +43,12 @@ class AuthClient:
             )
             response.raise_for_status()
         except httpx.HTTPStatusError as exc:
+            AUTH_INTROSPECTION_DURATION.labels(status_class(exc.response.status_code)).observe(time.perf_counter() - start)
             raise HTTPException(status_code=exc.response.status_code, detail="invalid token") from exc
         except Exception as exc:  # pragma: no cover
+            AUTH_INTROSPECTION_DURATION.labels("error").observe(time.perf_counter() - start)
             raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"auth provider unavailable: {exc}") from exc
+        AUTH_INTROSPECTION_DURATION.labels("2xx").observe(time.perf_counter() - start)
         payload: Dict[str, Any] = response.json()
         if not payload.get("active", True):
             raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="token inactive")
@@ -1,12 +1,26 @@
 from __future__ import annotations
 
+import time
 from typing import Any, Dict, Optional
 from urllib.parse import urljoin
 
 import httpx
 from fastapi import HTTPException
 
+from api_gateway.core.admission import AdaptiveConcurrencyLimiter
+from api_gateway.core.balancer import EndpointPool
 from api_gateway.core.context import get_request_context
+from api_gateway.core.metrics import DOWNSTREAM_IN_FLIGHT, observe_downstream, status_class
+
+try:  # optional, see the `msgpack` extra
+    import msgpack
+except ImportError:  # pragma: no cover - depends on environment
+    msgpack = None
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+# downstreams (see DownstreamClient.target) that answered 415 to msgpack; they are spoken to in JSON from then on
+_msgpack_unsupported: set[str] = set()
 
 
 class DownstreamClient:
@@ -16,11 +30,27 @@ class DownstreamClient:
         base_url: Optional[str],
         service_name: str,
         mock_mode: bool = False,
+        limiter: Optional[AdaptiveConcurrencyLimiter] = None,
+        wire_format: str = "json",
+        endpoints: Optional[EndpointPool] = None,
+        affinity: bool = False,
     ) -> None:
         self.http_client = http_client
         self.base_url = base_url.rstrip("/") + "/" if base_url else None
         self.service_name = service_name
         self.mock_mode = mock_mode
+        self.limiter = limiter
+        self.wire_format = wire_format
+        # replicas balanced per call; when set, base_url is not used
+        self.endpoints = endpoints
+        # pin each tenant to one replica (consistent hashing) instead of balancing by load
+        self.affinity = affinity
+
+    @property
+    def target(self) -> Optional[str]:
+        """Identity of the downstream for per-service capability caches."""
+
+        return self.service_name if self.endpoints is not None else self.base_url
 
     def _require_base_url(self) -> str:
         if not self.base_url:
@@ -56,26 +86,91 @@ class DownstreamClient:
             raise HTTPException(status_code=exc.response.status_code, detail=detail) from exc
         return response
 
+    async def _send(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        if self.endpoints is None:
+            # a missing endpoint is a configuration error, not downstream congestion
+            self._require_base_url()
+        if self.limiter is None:
+            return await self._send_balanced(method, path, **kwargs)
+        async with self.limiter.slot():
+            start = time.perf_counter()
+            try:
+                response = await self._send_balanced(method, path, **kwargs)
+            except Exception:
+                self.limiter.on_sample(time.perf_counter() - start, ok=False)
+                raise
+            self.limiter.on_sample(time.perf_counter() - start, ok=response.status_code < 500)
+            return response
+
+    async def _send_balanced(self, method: str, path: str, **kwargs: Any) -> httpx.Response:
+        if self.endpoints is None:
+            return await self._send_unlimited(method, self._build_url(path), **kwargs)
+        endpoint = self.endpoints.pick(get_request_context().tenant_id if self.affinity else None)
+        with self.endpoints.track(endpoint) as outcome:
+            response = await self._send_unlimited(method, urljoin(endpoint.url, path.lstrip("/")), **kwargs)
+            outcome.ok = response.status_code < 500
+        return response
+
+    async def _send_unlimited(self, method: str, url: str, **kwargs: Any) -> httpx.Response:
+        in_flight = DOWNSTREAM_IN_FLIGHT.labels(self.service_name)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            response = await self.http_client.request(method, url, **kwargs)
+        except httpx.TimeoutException:
+            observe_downstream(self.service_name, method, "timeout", time.perf_counter() - start)
+            raise
+        except Exception:
+            observe_downstream(self.service_name, method, "transport_error", time.perf_counter() - start)
+            raise
+        finally:
+            in_flight.dec()
+        observe_downstream(self.service_name, method, status_class(response.status_code), time.perf_counter() - start)
+        return response
+
     async def post_json(
         self, path: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None
     ) -> httpx.Response:
-        url = self._build_url(path)
-        response = await self.http_client.post(url, json=payload, headers=self._build_headers(headers))
+        response = await self._send("POST", path, json=payload, headers=self._build_headers(headers))
         return self._handle_response(response)
 
+    async def post_message(
+        self, path: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """POST using the negotiated wire format and return the decoded response body.
+
+        With ``wire_format="msgpack"`` the body is sent as msgpack and msgpack
+        responses are accepted; a ``415`` downgrades this downstream to JSON.
+        """
+
+        if self.wire_format != "msgpack" or msgpack is None or self.target in _msgpack_unsupported:
+            return (await self.post_json(path, payload, headers)).json()
+        extra = {"Content-Type": MSGPACK_CONTENT_TYPE, "Accept": f"{MSGPACK_CONTENT_TYPE}, application/json"}
+        if headers:
+            extra.update(headers)
+        response = await self._send(
+            "POST", path, content=msgpack.packb(payload, use_bin_type=True), headers=self._build_headers(extra)
+        )
+        if response.status_code == 415:
+            _msgpack_unsupported.add(self.target)
+            return (await self.post_json(path, payload, headers)).json()
+        response = self._handle_response(response)
+        if response.headers.get("content-type", "").startswith(MSGPACK_CONTENT_TYPE):
+            return msgpack.unpackb(response.content, raw=False)
+        return response.json()
+
     async def get(
         self, path: str, params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None
     ) -> httpx.Response:
-        url = self._build_url(path)
-        response = await self.http_client.get(url, params=params, headers=self._build_headers(headers))
+        response = await self._send("GET", path, params=params, headers=self._build_headers(headers))
         return self._handle_response(response)
 
     async def post_multipart(
         self, path: str, data: Dict[str, Any], files: Dict[str, Any], headers: Optional[Dict[str, str]] = None
     ) -> httpx.Response:
-        url = self._build_url(path)
-        response = await self.http_client.post(
-            url,
+        response = await self._send(
+            "POST",
+            path,
             data=data,
             files=files,
             headers=self._build_headers(headers),
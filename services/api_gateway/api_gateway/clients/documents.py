@@ -1,11 +1,15 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from fastapi import HTTPException, status
 
 from api_gateway.clients.base import DownstreamClient
 
+# document services that answered 404/405 to the batch endpoint; they get per-document GETs from then on
+_batch_unsupported: set[str] = set()
+
 
 class DocumentClient(DownstreamClient):
     async def list_documents(self, params: Dict[str, Any]) -> list[dict[str, Any]]:
@@ -19,6 +23,19 @@ class DocumentClient(DownstreamClient):
             raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"documents list error: {exc}") from exc
         return response.json()
 
+    async def list_documents_page(self, params: Dict[str, Any]) -> Tuple[List[dict[str, Any]], Optional[str]]:
+        """One page of the listing and the ``cursor`` of the next page (``None`` on the last one)."""
+
+        if self.mock_mode:
+            return [], None
+        try:
+            response = await self.get("/internal/documents/list", params=params)
+        except HTTPException:
+            raise
+        except Exception as exc:  # pragma: no cover
+            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"documents list error: {exc}") from exc
+        return response.json(), response.headers.get("X-Next-Cursor") or None
+
     async def get_document(self, doc_id: str) -> dict[str, Any]:
         if self.mock_mode:
             return {"doc_id": doc_id, "status": "unknown"}
@@ -29,3 +46,44 @@ class DocumentClient(DownstreamClient):
         except Exception as exc:  # pragma: no cover
             raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"document fetch error: {exc}") from exc
         return response.json()
+
+    async def batch_get(self, doc_ids: List[str], concurrency: int = 8) -> Dict[str, Union[dict[str, Any], HTTPException]]:
+        """Fetch distinct ``doc_ids`` in one call; each value is the document or the error for that id.
+
+        Uses ``POST /internal/documents/batchGet`` where the document service has
+        it, otherwise at most ``concurrency`` single-document GETs at a time.
+        """
+
+        if self.mock_mode:
+            return {doc_id: {"doc_id": doc_id, "status": "unknown"} for doc_id in doc_ids}
+        if self.target not in _batch_unsupported:
+            try:
+                response = await self.post_json("/internal/documents/batchGet", {"doc_ids": doc_ids})
+            except HTTPException as exc:
+                if exc.status_code not in (404, 405):
+                    raise
+                _batch_unsupported.add(self.target)
+            except Exception as exc:  # pragma: no cover
+                raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"document batch error: {exc}") from exc
+            else:
+                found = {doc["doc_id"]: doc for doc in response.json().get("documents", [])}
+                return {
+                    doc_id: found.get(doc_id) or HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="document not found")
+                    for doc_id in doc_ids
+                }
+
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(doc_id: str) -> dict[str, Any]:
+            async with semaphore:
+                return await self.get_document(doc_id)
+
+        results = await asyncio.gather(*(fetch(doc_id) for doc_id in doc_ids), return_exceptions=True)
+        outcome: Dict[str, Union[dict[str, Any], HTTPException]] = {}
+        for doc_id, result in zip(doc_ids, results):
+            if isinstance(result, BaseException) and not isinstance(result, HTTPException):
+                if not isinstance(result, Exception):
+                    raise result
+                result = HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"document fetch error: {result}")
+            outcome[doc_id] = result
+        return outcome
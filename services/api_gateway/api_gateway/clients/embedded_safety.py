@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from fastapi import HTTPException, status
+
+from api_gateway.core.context import get_request_context
+
+
+class EmbeddedSafetyClient:
+    """Run the safety evaluator in-process instead of calling the safety service.
+
+    Requires the ``safety-service`` package (``pip install .[embedded-safety]``).
+    Policy configuration is read exactly as the standalone service reads it
+    (``SAFETY_SERVICE_*`` environment variables / ``.env``), so verdicts are identical.
+    """
+
+    service_name = "safety"
+
+    def __init__(self) -> None:
+        try:
+            from safety_service import schemas
+            from safety_service.config import get_settings
+            from safety_service.core import evaluator
+        except ImportError as exc:  # pragma: no cover - depends on deployment
+            raise RuntimeError(
+                "safety_mode=embedded requires the safety-service package to be installed"
+            ) from exc
+        self._evaluator = evaluator
+        self._schemas = schemas
+        self._settings = get_settings()
+
+    def build_request(self, payload: Dict[str, Any]):
+        schemas = self._schemas
+        context = payload.get("context") or {}
+        return schemas.InputCheckRequest(
+            user=schemas.SafetyUser(user_id=str(payload.get("user_id")), tenant_id=str(payload.get("tenant_id"))),
+            query=payload["query"],
+            channel=context.get("channel"),
+            context=schemas.SafetyContext(
+                conversation_id=context.get("conversation_id"),
+                ui_session_id=context.get("ui_session_id"),
+            ),
+            meta=schemas.SafetyMeta(trace_id=get_request_context().trace_id),
+        )
+
+    async def check_input(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            response = await self._evaluator.evaluate_input_async(self.build_request(payload), self._settings)
+        except Exception as exc:  # pragma: no cover - evaluator guard
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"safety check failed: {exc}") from exc
+        return response.model_dump(exclude_none=True)
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from fastapi import HTTPException, status
 
 from api_gateway.clients.base import DownstreamClient
+from api_gateway.core.fair_queue import WeightedFairScheduler
 
 
 class OrchestratorClient(DownstreamClient):
+    def __init__(self, *args: Any, scheduler: Optional[WeightedFairScheduler] = None, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.scheduler = scheduler
+
     async def query(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         if self.mock_mode:
             return {
@@ -15,6 +20,12 @@ class OrchestratorClient(DownstreamClient):
                 "sources": [],
                 "meta": {"latency_ms": 1, "trace_id": payload.get("trace_id"), "safety": {"input": "allowed"}},
             }
+        if self.scheduler is None:
+            return await self._query(payload)
+        async with self.scheduler.slot(str(payload.get("tenant_id") or "unknown")):
+            return await self._query(payload)
+
+    async def _query(self, payload: Dict[str, Any]) -> Dict[str, Any]:
         try:
             response = await self.post_json("/internal/ai/query", payload)
         except HTTPException:
@@ -12,9 +12,8 @@ class SafetyClient(DownstreamClient):
         if self.mock_mode:
             return {"status": "allowed", "reason": "mock"}
         try:
-            response = await self.post_json("/internal/safety/input-check", payload)
+            return await self.post_message("/internal/safety/input-check", payload)
         except HTTPException:
             raise
         except Exception as exc:  # pragma: no cover - network guard
             raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"safety check failed: {exc}") from exc
-        return response.json()
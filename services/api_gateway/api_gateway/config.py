@@ -1,5 +1,5 @@
 from functools import lru_cache
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from pydantic import AnyHttpUrl, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -14,6 +14,10 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8080
     log_level: str = "info"
+    log_format: str = "console"  # console / json
+    log_queue_size: int = 10000
+    log_level_sample_rates: Dict[str, float] = Field(default_factory=dict)
+    log_route_sample_rates: Dict[str, float] = Field(default_factory=dict)
     allowed_origins: List[str] = Field(default_factory=lambda: ["*"])
 
     safety_base_url: Optional[AnyHttpUrl] = None
@@ -22,11 +26,121 @@ class Settings(BaseSettings):
     documents_base_url: Optional[AnyHttpUrl] = None
     auth_introspection_url: Optional[AnyHttpUrl] = None
 
+    # several replicas of a downstream, balanced in-process; when set, they replace its *_base_url
+    safety_endpoints: List[AnyHttpUrl] = Field(default_factory=list)
+    orchestrator_endpoints: List[AnyHttpUrl] = Field(default_factory=list)
+    ingestion_endpoints: List[AnyHttpUrl] = Field(default_factory=list)
+    documents_endpoints: List[AnyHttpUrl] = Field(default_factory=list)
+    # JSON object of service name -> URL list; overrides the lists above and is re-read when it changes
+    endpoints_file: Optional[str] = None
+    endpoints_reload_interval_seconds: float = 5.0
+    load_balancing_strategy: str = "p2c"  # p2c / least_outstanding
+    # pin each tenant to one orchestrator replica (consistent hashing) for cache locality
+    orchestrator_tenant_affinity: bool = True
+    # consecutive failures (transport errors, 5xx) before an endpoint is ejected
+    endpoint_max_failures: int = 3
+    endpoint_ejection_seconds: float = 10.0
+    endpoint_max_ejection_seconds: float = 300.0
+    endpoint_max_ejected_percent: float = 50.0
+
     auth_audience: Optional[str] = None
     auth_timeout_seconds: float = 5.0
     http_timeout_seconds: float = 10.0
     rate_limit_per_minute: int = 120
     mock_mode: bool = False
+    safety_mode: str = "remote"  # remote / embedded
+    safety_wire_format: str = "json"  # json / msgpack
+    safety_uds_path: Optional[str] = None
+
+    admission_enabled: bool = True
+    admission_max_concurrency: int = 512
+    admission_retry_after_seconds: int = 1
+    admission_default_priority: str = "normal"
+    # max time a request may wait for an ingress slot, per priority class
+    admission_queue_timeout_ms: Dict[str, float] = Field(
+        default_factory=lambda: {"high": 1000.0, "normal": 500.0, "low": 200.0}
+    )
+    # longest matching path prefix wins; "critical" bypasses admission entirely, so
+    # long-lived streams like the document events must stay critical or each pins a slot
+    admission_route_priorities: Dict[str, str] = Field(
+        default_factory=lambda: {
+            "/api/v1/health": "critical",
+            "/metrics": "critical",
+            "/api/v1/auth": "high",
+            "/api/v1/documents": "high",
+            "/api/v1/documents/events": "critical",
+            "/api/v1/documents/upload": "low",
+            "/api/v1/assistant": "low",
+        }
+    )
+    admission_tenant_priorities: Dict[str, str] = Field(default_factory=dict)
+
+    # cheap limits checked before token introspection; off by default because behind an
+    # ingress every client shares the peer address unless PRE_AUTH_FORWARDED_HOPS is set
+    pre_auth_enabled: bool = False
+    pre_auth_ip_per_minute: int = 600
+    pre_auth_token_per_minute: int = 300
+    # failed introspections per client address before it is refused outright
+    pre_auth_ip_failures_per_minute: int = 30
+    pre_auth_failed_token_ttl_seconds: float = 60.0
+    pre_auth_max_keys: int = 100000
+    # X-Forwarded-For entries appended by trusted proxies; 0 uses the peer address
+    pre_auth_forwarded_hops: int = 0
+    pre_auth_exempt_prefixes: List[str] = Field(default_factory=lambda: ["/api/v1/health", "/metrics"])
+
+    downstream_adaptive_limits: bool = True
+    downstream_initial_limit: int = 20
+    downstream_min_limit: int = 2
+    downstream_max_limit: int = 200
+    downstream_latency_tolerance: float = 2.0
+    downstream_queue_timeout_ms: float = 200.0
+
+    fair_queue_enabled: bool = True
+    # used when adaptive limits are off; otherwise the orchestrator's adaptive limit applies
+    fair_queue_concurrency: int = 64
+    fair_queue_tenant_weights: Dict[str, float] = Field(default_factory=dict)
+    fair_queue_default_weight: float = 1.0
+    fair_queue_max_depth_per_tenant: int = 100
+    fair_queue_timeout_ms: float = 5000.0
+
+    # POST /api/v1/documents:batchGet
+    documents_batch_max_ids: int = 100
+    # concurrent GETs when the document service has no batch endpoint
+    documents_batch_concurrency: int = 8
+    # rate-limit cost is one hit per this many distinct ids
+    documents_batch_ids_per_rate_hit: int = 10
+
+    # GET /api/v1/documents/events (SSE)
+    document_events_poll_interval_seconds: float = 2.0
+    document_events_heartbeat_seconds: float = 15.0
+    document_events_queue_size: int = 100
+    document_events_max_streams_per_tenant: int = 1000
+    # the poller follows X-Next-Cursor; a listing longer than this is never treated as complete
+    document_events_page_size: int = 500
+    document_events_max_pages: int = 100
+
+    # Idempotency-Key support for uploads and assistant queries
+    idempotency_backend: str = "local"  # local / redis
+    idempotency_redis_url: Optional[str] = None
+    idempotency_ttl_seconds: float = 24 * 3600.0
+    # how long a claim survives a crashed attempt before the key can run again
+    idempotency_in_flight_ttl_seconds: float = 300.0
+    idempotency_wait_timeout_seconds: float = 30.0
+    idempotency_max_entries: int = 10000
+
+    # follow-up turns of AssistantContext.conversation_id
+    conversation_cache_enabled: bool = True
+    conversation_backend: str = "local"  # local / redis
+    conversation_redis_url: Optional[str] = None
+    conversation_ttl_seconds: float = 1800.0
+    conversation_max_per_tenant: int = 1000
+    conversation_max_turns: int = 6
+    conversation_max_sources: int = 20
+    conversation_summary_max_chars: int = 2000
+
+    metrics_enabled: bool = True
+    metrics_tenant_labels: bool = False
+    metrics_max_tenants: int = 100
 
 
 @lru_cache
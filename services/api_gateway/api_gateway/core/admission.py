@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Mapping, Optional, Tuple
+
+from fastapi import HTTPException, status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api_gateway.core.metrics import ADMISSION_REJECTIONS, DOWNSTREAM_CONCURRENCY_LIMIT, DOWNSTREAM_SHED
+from api_gateway.core.middleware import bearer_token
+
+PRIORITY_CLASSES: Dict[str, int] = {"critical": 0, "high": 1, "normal": 2, "low": 3}
+
+
+class PriorityLimiter:
+    """Concurrency slots handed out by priority, then arrival order.
+
+    Waiters give up after their own deadline, so shedding is decided by time spent
+    queueing rather than queue length. Single event-loop use only.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    async def acquire(self, priority: int = 0, max_wait: Optional[float] = None) -> bool:
+        if self.in_flight < self.capacity:
+            # drops expired waiters; anything still queued afterwards is served first
+            self.wake()
+            if self.in_flight < self.capacity:
+                self.in_flight += 1
+                return True
+        if max_wait is not None and max_wait <= 0:
+            return False
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        timer = loop.call_later(max_wait, _expire, fut) if max_wait is not None else None
+        try:
+            granted = await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled() and fut.result():
+                self.release()
+            raise
+        finally:
+            if timer is not None:
+                timer.cancel()
+        return granted
+
+    def release(self) -> None:
+        self.in_flight -= 1
+        self.wake()
+
+    def wake(self) -> None:
+        while self._waiters and self.in_flight < self.capacity:
+            _, _, fut = heapq.heappop(self._waiters)
+            if fut.done():
+                continue
+            self.in_flight += 1
+            fut.set_result(True)
+
+
+def _expire(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(False)
+
+
+def overloaded_exception(detail_code: str, retry_after: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail={"code": detail_code, "retry_after": retry_after},
+        headers={"Retry-After": str(retry_after)},
+    )
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD concurrency limit for one downstream, driven by observed latency.
+
+    The limit grows by roughly one per round trip while latency stays within
+    ``tolerance`` times the recent minimum, and is cut multiplicatively (at most
+    once per round trip) on errors, timeouts or latency inflation.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        initial_limit: int = 20,
+        min_limit: int = 2,
+        max_limit: int = 200,
+        tolerance: float = 2.0,
+        backoff: float = 0.9,
+        queue_timeout: float = 0.2,
+        retry_after: int = 1,
+        min_rtt_window: float = 30.0,
+        latency_floor: float = 0.005,
+    ) -> None:
+        self.service_name = service_name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.backoff = backoff
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.min_rtt_window = min_rtt_window
+        self.latency_floor = latency_floor
+        self._limit = float(initial_limit)
+        self._slots = PriorityLimiter(initial_limit)
+        self._min_rtt: Optional[float] = None
+        self._min_rtt_since = time.monotonic()
+        self._last_decrease = 0.0
+        self._gauge = DOWNSTREAM_CONCURRENCY_LIMIT.labels(service_name)
+        self._gauge.set(initial_limit)
+
+    @property
+    def limit(self) -> int:
+        return self._slots.capacity
+
+    @property
+    def in_flight(self) -> int:
+        return self._slots.in_flight
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator["AdaptiveConcurrencyLimiter"]:
+        if not await self._slots.acquire(max_wait=self.queue_timeout):
+            DOWNSTREAM_SHED.labels(self.service_name).inc()
+            raise overloaded_exception(f"{self.service_name}_overloaded", self.retry_after)
+        try:
+            yield self
+        finally:
+            self._slots.release()
+
+    def on_sample(self, latency: float, ok: bool) -> None:
+        now = time.monotonic()
+        if self._min_rtt is None or now - self._min_rtt_since > self.min_rtt_window:
+            self._min_rtt = latency
+            self._min_rtt_since = now
+        elif latency < self._min_rtt:
+            self._min_rtt = latency
+
+        inflated = latency > max(self._min_rtt * self.tolerance, self._min_rtt + self.latency_floor)
+        if not ok or inflated:
+            if now - self._last_decrease >= max(self._min_rtt, self.latency_floor):
+                self._limit = max(float(self.min_limit), self._limit * self.backoff)
+                self._last_decrease = now
+                self._apply()
+        elif self._slots.in_flight >= self._slots.capacity * 0.5:
+            # only probe upwards while the current limit is actually being used
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / self._limit)
+            self._apply()
+
+    def _apply(self) -> None:
+        capacity = int(self._limit)
+        if capacity != self._slots.capacity:
+            self._slots.capacity = capacity
+            self._gauge.set(capacity)
+            self._slots.wake()
+
+
+class VerifiedTenantCache:
+    """Bearer-token digest -> tenant id, filled only after successful introspection.
+
+    Admission runs before auth, so the tenant it uses for priority must not come
+    from anything the client can simply claim (such as ``X-Tenant-ID``). A token
+    only maps to its tenant once the auth service has vouched for it; the first
+    request with a new token is classified by route. Tokens are kept as digests.
+    """
+
+    def __init__(self, maxsize: int = 10000) -> None:
+        self.maxsize = maxsize
+        self._tenants: "OrderedDict[bytes, str]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+    def remember(self, token: str, tenant_id: str) -> None:
+        key = self._key(token)
+        self._tenants[key] = tenant_id
+        self._tenants.move_to_end(key)
+        while len(self._tenants) > self.maxsize:
+            self._tenants.popitem(last=False)
+
+    def lookup(self, token: str) -> Optional[str]:
+        return self._tenants.get(self._key(token))
+
+    def clear(self) -> None:
+        self._tenants.clear()
+
+
+verified_tenants = VerifiedTenantCache()
+
+
+class AdmissionControlMiddleware:
+    """Bound concurrent ingress requests and shed by queueing time with a fast 503.
+
+    Each request gets a priority class from its tenant, as verified earlier for
+    the same bearer token (see :class:`VerifiedTenantCache`), or else from the
+    longest matching route prefix. ``critical`` requests bypass admission; the
+    others queue for at most their class's timeout before being rejected. A
+    ``critical`` route stays critical for every tenant: long-lived streams such
+    as the document events must never hold a slot for their whole lifetime.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_concurrency: int = 512,
+        queue_timeouts_ms: Optional[Mapping[str, float]] = None,
+        route_priorities: Optional[Mapping[str, str]] = None,
+        tenant_priorities: Optional[Mapping[str, str]] = None,
+        default_priority: str = "normal",
+        retry_after: int = 1,
+        tenant_cache: Optional[VerifiedTenantCache] = None,
+    ) -> None:
+        self.app = app
+        self.tenant_cache = tenant_cache if tenant_cache is not None else verified_tenants
+        self.limiter = PriorityLimiter(max_concurrency)
+        self.queue_timeouts = {name: ms / 1000.0 for name, ms in (queue_timeouts_ms or {}).items()}
+        self.route_priorities = sorted((route_priorities or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.tenant_priorities = dict(tenant_priorities or {})
+        self.default_priority = default_priority
+        self.retry_after = retry_after
+        for name in [*self.queue_timeouts, *dict(self.route_priorities).values(), *self.tenant_priorities.values(), default_priority]:
+            if name not in PRIORITY_CLASSES:
+                raise ValueError(f"unknown priority class '{name}'")
+
+    def classify(self, scope: Scope) -> str:
+        path = scope["path"]
+        route_class = next((priority for prefix, priority in self.route_priorities if path.startswith(prefix)), None)
+        if route_class == "critical":
+            return route_class
+        if self.tenant_priorities:
+            token = bearer_token(scope)
+            tenant_id = self.tenant_cache.lookup(token) if token else None
+            tenant_class = self.tenant_priorities.get(tenant_id) if tenant_id else None
+            if tenant_class:
+                return tenant_class
+        return route_class or self.default_priority
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        priority = self.classify(scope)
+        if priority == "critical":
+            await self.app(scope, receive, send)
+            return
+        if not await self.limiter.acquire(PRIORITY_CLASSES[priority], self.queue_timeouts.get(priority, 0.0)):
+            ADMISSION_REJECTIONS.labels(priority).inc()
+            await self._reject(send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.limiter.release()
+
+    async def _reject(self, send: Send) -> None:
+        body = json.dumps({"detail": {"code": "overloaded", "retry_after": self.retry_after}}).encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status.HTTP_503_SERVICE_UNAVAILABLE,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"retry-after", str(self.retry_after).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import os
+import random
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from api_gateway.core.metrics import DOWNSTREAM_ENDPOINT_EJECTIONS, DOWNSTREAM_ENDPOINTS_AVAILABLE
+from api_gateway.logging import get_logger
+
+logger = get_logger(__name__)
+
+STRATEGIES = ("p2c", "least_outstanding")
+# points per endpoint on the hash ring; more points, more even shares
+RING_POINTS = 100
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+def normalize_url(url: str) -> str:
+    return url.rstrip("/") + "/"
+
+
+class Endpoint:
+    def __init__(self, url: str) -> None:
+        self.url = normalize_url(url)
+        self.outstanding = 0
+        self.failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until <= now
+
+
+class EndpointPool:
+    """Replicas of one downstream service, chosen per call.
+
+    * ``p2c`` samples two available endpoints and takes the one with fewer
+      requests outstanding from this process; ``least_outstanding`` scans them
+      all. Both steer traffic away from a slow replica, since its requests stay
+      outstanding longer.
+    * With an affinity key (the tenant, for the orchestrator) the endpoint comes
+      from a consistent-hash ring instead, so a tenant keeps hitting the replica
+      whose caches hold its data. Adding or removing a replica moves only that
+      replica's share of tenants. An endpoint more than ``load_factor`` times
+      busier than the average is passed over for the next one on the ring, so a
+      hot tenant cannot pile onto one replica (bounded-load hashing).
+    * Passive ejection: ``max_failures`` consecutive transport errors or 5xx
+      answers take an endpoint out for ``ejection_seconds``, doubled on every
+      repeated ejection up to ``max_ejection_seconds``. At most
+      ``max_ejected_ratio`` of the endpoints are ejected at once. If every
+      endpoint is out, all of them are used again rather than failing locally.
+
+    Single event-loop use only.
+    """
+
+    def __init__(
+        self,
+        service_name: str,
+        urls: Sequence[str],
+        strategy: str = "p2c",
+        max_failures: int = 3,
+        ejection_seconds: float = 10.0,
+        max_ejection_seconds: float = 300.0,
+        max_ejected_ratio: float = 0.5,
+        load_factor: float = 1.25,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown load balancing strategy '{strategy}'")
+        self.service_name = service_name
+        self.strategy = strategy
+        self.max_failures = max_failures
+        self.ejection_seconds = ejection_seconds
+        self.max_ejection_seconds = max_ejection_seconds
+        self.max_ejected_ratio = max_ejected_ratio
+        self.load_factor = load_factor
+        self._rng = rng or random.Random()
+        self._gauge = DOWNSTREAM_ENDPOINTS_AVAILABLE.labels(service_name)
+        self.endpoints: List[Endpoint] = []
+        self._ring: List[Tuple[int, int]] = []
+        self._ring_keys: List[int] = []
+        self._available_count = 0
+        self.update(urls)
+
+    @property
+    def urls(self) -> List[str]:
+        return [endpoint.url for endpoint in self.endpoints]
+
+    def update(self, urls: Sequence[str]) -> None:
+        """Replace the endpoint list; endpoints that stay keep their counters and ejection."""
+
+        if not urls:
+            raise ValueError(f"{self.service_name}: endpoint list is empty")
+        current = {endpoint.url: endpoint for endpoint in self.endpoints}
+        self.endpoints = [current.get(normalize_url(url)) or Endpoint(url) for url in dict.fromkeys(urls)]
+        ring = sorted(
+            (_hash(f"{endpoint.url}#{point}"), index)
+            for index, endpoint in enumerate(self.endpoints)
+            for point in range(RING_POINTS)
+        )
+        self._ring = ring
+        self._ring_keys = [point for point, _ in ring]
+        self._set_available(len(self._available(time.monotonic())))
+
+    def _set_available(self, count: int) -> None:
+        self._available_count = count
+        self._gauge.set(count)
+
+    def _available(self, now: float) -> List[Endpoint]:
+        return [endpoint for endpoint in self.endpoints if endpoint.available(now)]
+
+    def pick(self, affinity_key: Optional[str] = None) -> Endpoint:
+        available = self._available(time.monotonic())
+        if len(available) != self._available_count:
+            self._set_available(len(available))
+        candidates = available or self.endpoints
+        if len(candidates) == 1:
+            return candidates[0]
+        if affinity_key:
+            return self._by_hash(affinity_key, candidates)
+        if self.strategy == "least_outstanding":
+            least = min(endpoint.outstanding for endpoint in candidates)
+            return self._rng.choice([endpoint for endpoint in candidates if endpoint.outstanding == least])
+        first, second = self._rng.sample(candidates, 2)
+        return second if second.outstanding < first.outstanding else first
+
+    def _by_hash(self, key: str, candidates: List[Endpoint]) -> Endpoint:
+        allowed = {id(endpoint) for endpoint in candidates}
+        average = sum(endpoint.outstanding for endpoint in candidates) / len(candidates)
+        bound = self.load_factor * average + 1
+        start = bisect.bisect(self._ring_keys, _hash(key))
+        fallback: Optional[Endpoint] = None
+        for offset in range(len(self._ring)):
+            endpoint = self.endpoints[self._ring[(start + offset) % len(self._ring)][1]]
+            if id(endpoint) not in allowed:
+                continue
+            if endpoint.outstanding < bound:
+                return endpoint
+            fallback = fallback or endpoint
+        return fallback or candidates[0]
+
+    @contextmanager
+    def track(self, endpoint: Endpoint) -> Iterator["CallOutcome"]:
+        """Count ``endpoint`` as busy for the duration; the caller marks the outcome.
+
+        Errors count as failures. A cancelled call (the client went away) is
+        not held against the endpoint.
+        """
+
+        outcome = CallOutcome()
+        endpoint.outstanding += 1
+        try:
+            yield outcome
+        except Exception:
+            outcome.ok = False
+            raise
+        finally:
+            endpoint.outstanding -= 1
+            if outcome.ok is not None:
+                self._record(endpoint, outcome.ok)
+
+    def _record(self, endpoint: Endpoint, ok: bool) -> None:
+        if ok:
+            endpoint.failures = 0
+            if endpoint.ejections and time.monotonic() - endpoint.ejected_until > self.max_ejection_seconds:
+                # healthy for a while: the next ejection starts short again
+                endpoint.ejections = 0
+            return
+        endpoint.failures += 1
+        if endpoint.failures < self.max_failures:
+            return
+        now = time.monotonic()
+        ejected = len(self.endpoints) - len(self._available(now))
+        if not endpoint.available(now) or ejected + 1 > self.max_ejected_ratio * len(self.endpoints):
+            return
+        endpoint.ejections += 1
+        endpoint.failures = 0
+        duration = min(self.max_ejection_seconds, self.ejection_seconds * 2 ** (endpoint.ejections - 1))
+        endpoint.ejected_until = now + duration
+        DOWNSTREAM_ENDPOINT_EJECTIONS.labels(self.service_name).inc()
+        self._set_available(len(self._available(now)))
+        logger.warning("downstream_endpoint_ejected", service=self.service_name, endpoint=endpoint.url, seconds=duration)
+
+
+class CallOutcome:
+    def __init__(self) -> None:
+        self.ok: Optional[bool] = None
+
+
+class EndpointsFile:
+    """JSON map of service name to endpoint URLs, re-read when it changes.
+
+    The file is stat'ed at most once per ``interval`` seconds. When it cannot
+    be read or parsed, the last good content stays in use.
+    """
+
+    def __init__(self, path: str, interval: float = 5.0) -> None:
+        self.path = path
+        self.interval = interval
+        self._checked = float("-inf")
+        self._mtime: Optional[float] = None
+        self._endpoints: Dict[str, List[str]] = {}
+
+    def get(self, service_name: str) -> Optional[List[str]]:
+        now = time.monotonic()
+        if now - self._checked >= self.interval:
+            self._checked = now
+            self._reload()
+        return self._endpoints.get(service_name) or None
+
+    def _reload(self) -> None:
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if mtime == self._mtime:
+                return
+            with open(self.path, encoding="utf-8") as handle:
+                content = json.load(handle)
+            if not isinstance(content, dict):
+                raise ValueError("expected an object of service name -> URL list")
+            self._endpoints = {str(name): [str(url) for url in urls] for name, urls in content.items()}
+            self._mtime = mtime
+        except (OSError, ValueError) as exc:
+            logger.warning("downstream_endpoints_file_unreadable", path=self.path, error=str(exc))
+            return
+        logger.info("downstream_endpoints_loaded", path=self.path, services=sorted(self._endpoints))
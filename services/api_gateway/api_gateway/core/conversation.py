@@ -0,0 +1,239 @@
+from __future__ import annotations
+
+import json
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from api_gateway.core.metrics import CONVERSATION_CACHE_LOOKUPS
+from api_gateway.logging import get_logger
+
+try:  # optional, see the `redis` extra
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - depends on environment
+    aioredis = None
+
+logger = get_logger(__name__)
+
+SOURCE_KEYS = ("doc_id", "section_id", "page_start", "page_end")
+
+
+@dataclass
+class ConversationState:
+    """What follow-up turns of one conversation can reuse.
+
+    ``turns`` keeps the latest exchanges verbatim. Older ones are folded into
+    ``summary`` one line each, so the history sent downstream stays bounded
+    and is never rebuilt from the full transcript. ``sources`` and
+    ``chunk_ids`` collect what retrieval returned for earlier turns, newest
+    first.
+    """
+
+    turn: int = 0
+    turns: List[Dict[str, Any]] = field(default_factory=list)
+    summary: str = ""
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    chunk_ids: List[str] = field(default_factory=list)
+
+    def dumps(self) -> str:
+        return json.dumps(asdict(self), separators=(",", ":"), ensure_ascii=False)
+
+    @classmethod
+    def loads(cls, raw: str | bytes) -> "ConversationState":
+        return cls(**json.loads(raw))
+
+    def downstream(self) -> Dict[str, Any]:
+        return {
+            "turn": self.turn + 1,
+            "summary": self.summary,
+            "recent_turns": [{"query": turn["query"], "answer": turn["answer"]} for turn in self.turns],
+            "retrieved_sources": self.sources,
+            "retrieved_chunk_ids": self.chunk_ids,
+        }
+
+
+def _first_sentence(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    for mark in (". ", "? ", "! "):
+        end = text.find(mark)
+        if 0 < end < limit:
+            return text[: end + 1]
+    return text if len(text) <= limit else text[: limit - 1] + "…"
+
+
+def record_turn(
+    state: ConversationState,
+    query: str,
+    answer: str,
+    sources: List[Dict[str, Any]],
+    chunk_ids: List[str],
+    max_turns: int,
+    max_sources: int,
+    summary_max_chars: int,
+) -> ConversationState:
+    state.turn += 1
+    refs = [{key: source.get(key) for key in SOURCE_KEYS if source.get(key) is not None} for source in sources]
+    state.turns.append({"query": query, "answer": answer, "sources": refs})
+    while len(state.turns) > max_turns:
+        oldest = state.turns.pop(0)
+        line = f"Q: {_first_sentence(oldest['query'], 160)} A: {_first_sentence(oldest['answer'], 240)}"
+        state.summary = f"{state.summary}\n{line}".strip()
+        if len(state.summary) > summary_max_chars:
+            # drop whole lines from the front; the latest context matters most
+            cut = state.summary.find("\n", len(state.summary) - summary_max_chars)
+            state.summary = state.summary[cut + 1 :] if cut >= 0 else state.summary[-summary_max_chars:]
+    merged: List[Dict[str, Any]] = []
+    seen = set()
+    for ref in refs + state.sources:
+        key = (ref.get("doc_id"), ref.get("section_id"))
+        if key not in seen:
+            seen.add(key)
+            merged.append(ref)
+    state.sources = merged[:max_sources]
+    state.chunk_ids = list(dict.fromkeys(chunk_ids + state.chunk_ids))[: max_sources * 4]
+    return state
+
+
+class ConversationBackend:
+    """Storage for conversation state, bounded per tenant."""
+
+    async def get(self, tenant_id: str, key: str) -> Optional[ConversationState]:
+        raise NotImplementedError
+
+    async def put(self, tenant_id: str, key: str, state: ConversationState) -> None:
+        raise NotImplementedError
+
+    async def delete(self, tenant_id: str, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalConversationBackend(ConversationBackend):
+    """In-process LRU per tenant with an idle TTL; one tenant cannot evict another's conversations."""
+
+    def __init__(self, ttl: float = 1800.0, max_per_tenant: int = 1000, max_tenants: int = 10000) -> None:
+        self.ttl = ttl
+        self.max_per_tenant = max_per_tenant
+        self.max_tenants = max_tenants
+        self._tenants: "OrderedDict[str, OrderedDict[str, Tuple[float, ConversationState]]]" = OrderedDict()
+
+    async def get(self, tenant_id: str, key: str) -> Optional[ConversationState]:
+        entries = self._tenants.get(tenant_id)
+        entry = entries.get(key) if entries is not None else None
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del entries[key]
+            return None
+        return entry[1]
+
+    async def put(self, tenant_id: str, key: str, state: ConversationState) -> None:
+        entries = self._tenants.get(tenant_id)
+        if entries is None:
+            entries = self._tenants[tenant_id] = OrderedDict()
+        self._tenants.move_to_end(tenant_id)
+        entries[key] = (time.monotonic() + self.ttl, state)
+        entries.move_to_end(key)
+        while len(entries) > self.max_per_tenant:
+            entries.popitem(last=False)
+        while len(self._tenants) > self.max_tenants:
+            self._tenants.popitem(last=False)
+
+    async def delete(self, tenant_id: str, key: str) -> None:
+        entries = self._tenants.get(tenant_id)
+        if entries is not None:
+            entries.pop(key, None)
+
+
+class RedisConversationBackend(ConversationBackend):
+    """Shared backend, so a follow-up landing on another gateway replica finds the conversation.
+
+    State lives in one key per conversation with the idle TTL. A sorted set per
+    tenant orders its conversations by last use, and the oldest beyond
+    ``max_per_tenant`` are deleted on write.
+    """
+
+    def __init__(self, url: str, ttl: float = 1800.0, max_per_tenant: int = 1000, prefix: str = "gw:conv:") -> None:
+        if aioredis is None:  # pragma: no cover - depends on environment
+            raise RuntimeError("conversation_backend=redis requires the `redis` extra")
+        self._redis = aioredis.from_url(url)
+        self.ttl = ttl
+        self.max_per_tenant = max_per_tenant
+        self.prefix = prefix
+
+    def _key(self, tenant_id: str, key: str) -> str:
+        return f"{self.prefix}{tenant_id}:{key}"
+
+    async def get(self, tenant_id: str, key: str) -> Optional[ConversationState]:
+        raw = await self._redis.get(self._key(tenant_id, key))
+        return ConversationState.loads(raw) if raw is not None else None
+
+    async def put(self, tenant_id: str, key: str, state: ConversationState) -> None:
+        index = f"{self.prefix}{tenant_id}"
+        async with self._redis.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(tenant_id, key), state.dumps(), px=int(self.ttl * 1000))
+            pipe.zadd(index, {key: time.time()})
+            pipe.expire(index, int(self.ttl) + 1)
+            pipe.zrange(index, 0, -self.max_per_tenant - 1)
+            pipe.zremrangebyrank(index, 0, -self.max_per_tenant - 1)
+            *_, evicted, _ = await pipe.execute()
+        if evicted:
+            await self._redis.delete(*(self._key(tenant_id, name.decode()) for name in evicted))
+
+    async def delete(self, tenant_id: str, key: str) -> None:
+        await self._redis.delete(self._key(tenant_id, key))
+        await self._redis.zrem(f"{self.prefix}{tenant_id}", key)
+
+
+class ConversationCache:
+    """Conversation state for follow-up turns, keyed by tenant, user and ``conversation_id``.
+
+    The orchestrator is stateless by design, so the gateway keeps the state
+    and ships it with every query. A backend failure only costs the reuse:
+    it is logged and the turn is handled as a first one.
+    """
+
+    def __init__(
+        self,
+        backend: ConversationBackend,
+        max_turns: int = 6,
+        max_sources: int = 20,
+        summary_max_chars: int = 2000,
+    ) -> None:
+        self.backend = backend
+        self.max_turns = max_turns
+        self.max_sources = max_sources
+        self.summary_max_chars = summary_max_chars
+
+    @staticmethod
+    def _key(user_id: str, conversation_id: str) -> str:
+        # scoped to the user: a guessed conversation id must not expose someone else's history
+        return f"{user_id}:{conversation_id}"
+
+    async def load(self, tenant_id: str, user_id: str, conversation_id: str) -> ConversationState:
+        try:
+            state = await self.backend.get(tenant_id, self._key(user_id, conversation_id))
+        except Exception as exc:
+            logger.warning("conversation_cache_unavailable", operation="get", error=str(exc))
+            CONVERSATION_CACHE_LOOKUPS.labels("error").inc()
+            return ConversationState()
+        CONVERSATION_CACHE_LOOKUPS.labels("hit" if state is not None else "miss").inc()
+        return state if state is not None else ConversationState()
+
+    async def record(
+        self,
+        tenant_id: str,
+        user_id: str,
+        conversation_id: str,
+        state: ConversationState,
+        query: str,
+        answer: str,
+        sources: List[Dict[str, Any]],
+        chunk_ids: List[str],
+    ) -> ConversationState:
+        record_turn(state, query, answer, sources, chunk_ids, self.max_turns, self.max_sources, self.summary_max_chars)
+        try:
+            await self.backend.put(tenant_id, self._key(user_id, conversation_id), state)
+        except Exception as exc:
+            logger.warning("conversation_cache_unavailable", operation="put", error=str(exc))
+        return state
@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import json
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from fastapi import HTTPException, status
+
+from api_gateway.core.context import build_request_context, set_request_context
+from api_gateway.core.metrics import DOCUMENT_EVENT_POLLS, DOCUMENT_EVENT_SUBSCRIBERS
+from api_gateway.logging import get_logger
+
+logger = get_logger(__name__)
+
+# one page of the listing and the cursor of the next page, as DocumentClient.list_documents_page
+ListDocumentsPage = Callable[[Dict[str, Any]], Awaitable[Tuple[List[Dict[str, Any]], Optional[str]]]]
+
+_RESYNC = object()
+
+
+@dataclass(eq=False)
+class Subscription:
+    tenant_id: str
+    queue: "asyncio.Queue[Any]"
+    dropped: int = 0
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """Never blocks the poller: a slow client loses queued events and gets a fresh snapshot instead."""
+
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += self.queue.qsize()
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_RESYNC)
+
+
+@dataclass(eq=False)
+class _TenantFeed:
+    tenant_id: str
+    list_page: ListDocumentsPage
+    subscribers: Set[Subscription] = field(default_factory=set)
+    statuses: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    task: Optional[asyncio.Task] = None
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+
+
+class DocumentEventHub:
+    """One shared poller per tenant, fanned out to every open event stream of that tenant.
+
+    The poller lists the tenant's documents every ``poll_interval`` seconds,
+    following ``X-Next-Cursor`` page by page, diffs ``status`` per ``doc_id`` and
+    pushes only the changes. It starts with the first subscriber and stops with
+    the last, so N dashboards cost one listing per interval instead of N.
+
+    A document is reported ``deleted`` only when a complete listing no longer
+    has it. A listing cut short by ``max_pages`` still reports the changes it
+    saw, but says nothing about the documents it did not reach.
+    """
+
+    def __init__(
+        self,
+        poll_interval: float = 2.0,
+        queue_size: int = 100,
+        max_subscribers_per_tenant: int = 1000,
+        page_size: int = 500,
+        max_pages: int = 100,
+    ) -> None:
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+        self.max_subscribers_per_tenant = max_subscribers_per_tenant
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self._feeds: Dict[str, _TenantFeed] = {}
+
+    def subscribe(self, tenant_id: str, list_page: ListDocumentsPage) -> Subscription:
+        feed = self._feeds.get(tenant_id)
+        if feed is None:
+            feed = self._feeds[tenant_id] = _TenantFeed(tenant_id, list_page)
+            # a fresh context: the task must not inherit the first subscriber's user, roles and trace id
+            feed.task = contextvars.Context().run(
+                asyncio.create_task, self._poll(feed), name=f"document-events:{tenant_id}"
+            )
+        if len(feed.subscribers) >= self.max_subscribers_per_tenant:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={"code": "too_many_event_streams", "retry_after": 5},
+                headers={"Retry-After": "5"},
+            )
+        subscription = Subscription(tenant_id, asyncio.Queue(maxsize=self.queue_size))
+        feed.subscribers.add(subscription)
+        DOCUMENT_EVENT_SUBSCRIBERS.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        feed = self._feeds.get(subscription.tenant_id)
+        if feed is None or subscription not in feed.subscribers:
+            return
+        feed.subscribers.discard(subscription)
+        DOCUMENT_EVENT_SUBSCRIBERS.dec()
+        if not feed.subscribers:
+            del self._feeds[subscription.tenant_id]
+            if feed.task is not None:
+                feed.task.cancel()
+
+    async def snapshot(self, subscription: Subscription, timeout: float = 10.0) -> List[Dict[str, Any]]:
+        """Current documents of the tenant once the feed has polled successfully (empty on timeout)."""
+
+        feed = self._feeds.get(subscription.tenant_id)
+        if feed is None:
+            return []
+        try:
+            await asyncio.wait_for(feed.ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        return list(feed.statuses.values())
+
+    async def next_event(self, subscription: Subscription, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next change, ``{"resync": True}`` after an overflow, or ``None`` on timeout (send a heartbeat)."""
+
+        try:
+            event = await asyncio.wait_for(subscription.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        return {"resync": True} if event is _RESYNC else event
+
+    async def _poll(self, feed: _TenantFeed) -> None:
+        while True:
+            # each poll is its own tenant-scoped call with no user behind it
+            set_request_context(build_request_context(user=None, tenant_id=feed.tenant_id))
+            try:
+                documents, complete = await self._list_all(feed)
+                DOCUMENT_EVENT_POLLS.labels("ok" if complete else "truncated").inc()
+                self._publish(feed, documents, complete)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # keep the feed alive across upstream hiccups
+                DOCUMENT_EVENT_POLLS.labels("error").inc()
+                logger.warning("document_events_poll_failed", tenant_id=feed.tenant_id, error=str(exc))
+            await asyncio.sleep(self.poll_interval)
+
+    async def _list_all(self, feed: _TenantFeed) -> Tuple[List[Dict[str, Any]], bool]:
+        """Every page of the tenant's listing, and whether the last page was reached."""
+
+        params: Dict[str, Any] = {"tenant_id": feed.tenant_id, "limit": self.page_size}
+        documents: List[Dict[str, Any]] = []
+        for _ in range(self.max_pages):
+            page, cursor = await feed.list_page(params)
+            documents.extend(page)
+            if cursor is None:
+                return documents, True
+            params = {**params, "cursor": cursor}
+        return documents, False
+
+    def _publish(self, feed: _TenantFeed, documents: List[Dict[str, Any]], complete: bool = True) -> None:
+        current = {doc["doc_id"]: doc for doc in documents if doc.get("doc_id")}
+        first = not feed.ready.is_set()
+        changes: List[Dict[str, Any]] = []
+        if not first:
+            for doc_id, doc in current.items():
+                previous = feed.statuses.get(doc_id)
+                if previous is None or previous.get("status") != doc.get("status"):
+                    changes.append(doc)
+            if complete:
+                for doc_id in feed.statuses.keys() - current.keys():
+                    changes.append({"doc_id": doc_id, "status": "deleted"})
+        feed.statuses = current if complete else {**feed.statuses, **current}
+        feed.ready.set()
+        for change in changes:
+            for subscription in feed.subscribers:
+                subscription.push(change)
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n".encode()
+
+
+SSE_HEARTBEAT = b": ping\n\n"
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Dict, List, Mapping, Optional
+
+from fastapi import HTTPException, status
+
+from api_gateway.core.admission import overloaded_exception
+from api_gateway.core.metrics import FAIR_QUEUE_DEPTH, FAIR_QUEUE_REJECTIONS, FAIR_QUEUE_WAIT
+
+
+@dataclass(order=True)
+class _Ticket:
+    finish: float
+    seq: int
+    start: float = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class WeightedFairScheduler:
+    """Start-time fair queueing of concurrency slots across tenants.
+
+    Each queued call gets a virtual finish tag ``max(V, last_finish[tenant]) + 1 / weight``
+    and slots go to the smallest tag, so while capacity is saturated a tenant
+    receives slots in proportion to its weight no matter how many requests it has
+    queued. When there is spare capacity calls pass straight through.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        weights: Optional[Mapping[str, float]] = None,
+        default_weight: float = 1.0,
+        max_queue_depth: int = 100,
+        queue_timeout: float = 5.0,
+        retry_after: int = 1,
+        capacity_fn: Optional[Callable[[], int]] = None,
+    ) -> None:
+        self._capacity = capacity
+        self._capacity_fn = capacity_fn
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self.max_queue_depth = max_queue_depth
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.in_flight = 0
+        self._virtual_time = 0.0
+        self._last_finish: Dict[str, float] = {}
+        self._depth: Dict[str, int] = {}
+        self._heap: List[_Ticket] = []
+        self._seq = itertools.count()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity_fn() if self._capacity_fn is not None else self._capacity
+
+    def queue_depth(self, tenant_id: str) -> int:
+        return self._depth.get(tenant_id, 0)
+
+    @asynccontextmanager
+    async def slot(self, tenant_id: str) -> AsyncIterator[None]:
+        start = time.perf_counter()
+        await self._acquire(tenant_id)
+        FAIR_QUEUE_WAIT.observe(time.perf_counter() - start)
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self._wake()
+
+    async def _acquire(self, tenant_id: str) -> None:
+        if self.in_flight < self.capacity:
+            self._wake()
+            if self.in_flight < self.capacity:
+                self.in_flight += 1
+                return
+        depth = self._depth.get(tenant_id, 0)
+        if depth >= self.max_queue_depth:
+            FAIR_QUEUE_REJECTIONS.labels("tenant_queue_full").inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail={"code": "tenant_queue_full", "retry_after": self.retry_after},
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        weight = self.weights.get(tenant_id, self.default_weight)
+        start_tag = max(self._virtual_time, self._last_finish.get(tenant_id, 0.0))
+        finish_tag = start_tag + 1.0 / weight
+        self._last_finish[tenant_id] = finish_tag
+        loop = asyncio.get_running_loop()
+        ticket = _Ticket(finish_tag, next(self._seq), start_tag, loop.create_future())
+        heapq.heappush(self._heap, ticket)
+        self._depth[tenant_id] = depth + 1
+        FAIR_QUEUE_DEPTH.inc()
+        timer = loop.call_later(self.queue_timeout, _expire, ticket.future)
+        try:
+            granted = await ticket.future
+        except asyncio.CancelledError:
+            if ticket.future.done() and not ticket.future.cancelled() and ticket.future.result():
+                self.in_flight -= 1
+                self._wake()
+            raise
+        finally:
+            timer.cancel()
+            FAIR_QUEUE_DEPTH.dec()
+            self._depth[tenant_id] -= 1
+            if not self._depth[tenant_id]:
+                del self._depth[tenant_id]
+                if self._last_finish.get(tenant_id, 0.0) <= self._virtual_time:
+                    self._last_finish.pop(tenant_id, None)
+        if not granted:
+            FAIR_QUEUE_REJECTIONS.labels("queue_timeout").inc()
+            raise overloaded_exception("orchestrator_queue_timeout", self.retry_after)
+
+    def _wake(self) -> None:
+        capacity = self.capacity
+        while self._heap and self.in_flight < capacity:
+            ticket = heapq.heappop(self._heap)
+            if ticket.future.done():
+                continue
+            self._virtual_time = max(self._virtual_time, ticket.start)
+            self.in_flight += 1
+            ticket.future.set_result(True)
+
+
+def _expire(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(False)
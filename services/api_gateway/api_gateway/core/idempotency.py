@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from fastapi import HTTPException, status
+
+from api_gateway.core.metrics import IDEMPOTENCY_OUTCOMES
+
+try:  # optional, see the `redis` extra
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - depends on environment
+    aioredis = None
+
+MAX_KEY_LENGTH = 255
+
+
+@dataclass
+class StoredResult:
+    fingerprint: str
+    body: Optional[Dict[str, Any]] = None  # None while the first attempt is still running
+
+    def dumps(self) -> str:
+        return json.dumps({"fingerprint": self.fingerprint, "body": self.body}, separators=(",", ":"))
+
+    @classmethod
+    def loads(cls, raw: str | bytes) -> "StoredResult":
+        data = json.loads(raw)
+        return cls(data["fingerprint"], data.get("body"))
+
+
+class IdempotencyBackend:
+    """Storage for idempotency records; ``claim`` must be atomic across gateway replicas."""
+
+    async def claim(self, key: str, fingerprint: str, ttl: float) -> bool:
+        raise NotImplementedError
+
+    async def get(self, key: str) -> Optional[StoredResult]:
+        raise NotImplementedError
+
+    async def complete(self, key: str, result: StoredResult, ttl: float) -> None:
+        raise NotImplementedError
+
+    async def release(self, key: str) -> None:
+        raise NotImplementedError
+
+
+class LocalIdempotencyBackend(IdempotencyBackend):
+    """Bounded in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int = 10000) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, StoredResult]]" = OrderedDict()
+
+    def _live(self, key: str) -> Optional[StoredResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del self._entries[key]
+            return None
+        return entry[1]
+
+    def _set(self, key: str, result: StoredResult, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def claim(self, key: str, fingerprint: str, ttl: float) -> bool:
+        if self._live(key) is not None:
+            return False
+        self._set(key, StoredResult(fingerprint), ttl)
+        return True
+
+    async def get(self, key: str) -> Optional[StoredResult]:
+        return self._live(key)
+
+    async def complete(self, key: str, result: StoredResult, ttl: float) -> None:
+        self._set(key, result, ttl)
+
+    async def release(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+
+class RedisIdempotencyBackend(IdempotencyBackend):
+    """Shared backend so retries landing on another gateway replica are deduplicated too."""
+
+    def __init__(self, url: str, prefix: str = "gw:idem:") -> None:
+        if aioredis is None:  # pragma: no cover - depends on environment
+            raise RuntimeError("idempotency_backend=redis requires the `redis` extra")
+        self._redis = aioredis.from_url(url)
+        self.prefix = prefix
+
+    async def claim(self, key: str, fingerprint: str, ttl: float) -> bool:
+        return bool(await self._redis.set(self.prefix + key, StoredResult(fingerprint).dumps(), px=int(ttl * 1000), nx=True))
+
+    async def get(self, key: str) -> Optional[StoredResult]:
+        raw = await self._redis.get(self.prefix + key)
+        return StoredResult.loads(raw) if raw is not None else None
+
+    async def complete(self, key: str, result: StoredResult, ttl: float) -> None:
+        await self._redis.set(self.prefix + key, result.dumps(), px=int(ttl * 1000))
+
+    async def release(self, key: str) -> None:
+        await self._redis.delete(self.prefix + key)
+
+
+def fingerprint(*parts: Any) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part if isinstance(part, bytes) else json.dumps(part, sort_keys=True, default=str).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IdempotencyStore:
+    """Run an expensive operation at most once per (tenant, operation, Idempotency-Key).
+
+    Retries that arrive while the first attempt is running on this replica await
+    the same future; retries after completion get the stored body. If another
+    replica holds the claim, the store polls the shared backend for the result
+    until ``wait_timeout`` and then answers 409. Failed attempts are not stored,
+    so a later retry runs again.
+    """
+
+    def __init__(
+        self,
+        backend: IdempotencyBackend,
+        ttl: float = 24 * 3600.0,
+        in_flight_ttl: float = 120.0,
+        wait_timeout: float = 30.0,
+        poll_interval: float = 0.1,
+    ) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self.in_flight_ttl = in_flight_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+        self._in_flight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+    async def run(
+        self,
+        key: str,
+        request_fingerprint: str,
+        produce: Callable[[], Awaitable[Dict[str, Any]]],
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Return ``(body, replayed)``."""
+
+        while True:
+            local = self._in_flight.get(key)
+            if local is None:
+                break
+            self._check_fingerprint(local[0], request_fingerprint)
+            IDEMPOTENCY_OUTCOMES.labels("attached").inc()
+            try:
+                return await asyncio.shield(local[1]), True
+            except asyncio.CancelledError:
+                if not local[1].cancelled():
+                    raise
+                # the first caller went away before finishing; take over the key
+
+        if not await self.backend.claim(key, request_fingerprint, self.in_flight_ttl):
+            return await self._await_existing(key, request_fingerprint), True
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = (request_fingerprint, future)
+        try:
+            body = await produce()
+        except asyncio.CancelledError:
+            await self.backend.release(key)
+            future.cancel()
+            raise
+        except Exception as exc:
+            await self.backend.release(key)
+            future.set_exception(exc)
+            future.exception()  # mark retrieved; attached waiters re-raise it themselves
+            raise
+        else:
+            await self.backend.complete(key, StoredResult(request_fingerprint, body), self.ttl)
+            future.set_result(body)
+            IDEMPOTENCY_OUTCOMES.labels("executed").inc()
+            return body, False
+        finally:
+            self._in_flight.pop(key, None)
+
+    async def _await_existing(self, key: str, request_fingerprint: str) -> Dict[str, Any]:
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            stored = await self.backend.get(key)
+            if stored is not None:
+                self._check_fingerprint(stored.fingerprint, request_fingerprint)
+                if stored.body is not None:
+                    IDEMPOTENCY_OUTCOMES.labels("replayed").inc()
+                    return stored.body
+            if time.monotonic() >= deadline or stored is None:
+                IDEMPOTENCY_OUTCOMES.labels("in_progress").inc()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail={"code": "idempotency_key_in_progress", "retry_after": 1},
+                    headers={"Retry-After": "1"},
+                )
+            await asyncio.sleep(self.poll_interval)
+
+    @staticmethod
+    def _check_fingerprint(stored: str, current: str) -> None:
+        if stored != current:
+            IDEMPOTENCY_OUTCOMES.labels("mismatch").inc()
+            raise HTTPException(
+                status_code=422,
+                detail={"code": "idempotency_key_reused", "reason": "key was used with a different request"},
+            )
+
+
+def scoped_key(tenant_id: str, operation: str, idempotency_key: str) -> str:
+    if not idempotency_key or len(idempotency_key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "invalid_idempotency_key", "reason": f"1..{MAX_KEY_LENGTH} characters expected"},
+        )
+    return f"{tenant_id}:{operation}:{idempotency_key}"
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import time
+from typing import Optional, Set
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Dedicated registry so importing the app twice (tests, reloaders) never trips
+# duplicate-timeseries errors in the global default registry.
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+UNMATCHED_ROUTE = "__unmatched__"
+OTHER_TENANT = "__other__"
+
+HTTP_REQUEST_DURATION = Histogram(
+    "gateway_http_request_duration_seconds",
+    "Latency of inbound HTTP requests by route template, method and status code.",
+    ("route", "method", "status"),
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "gateway_http_requests_in_flight",
+    "Inbound HTTP requests currently being processed.",
+    registry=REGISTRY,
+)
+HTTP_TENANT_REQUESTS = Counter(
+    "gateway_http_tenant_requests_total",
+    "Inbound HTTP requests by tenant (only recorded when tenant labels are enabled).",
+    ("tenant", "route", "status"),
+    registry=REGISTRY,
+)
+DOWNSTREAM_REQUEST_DURATION = Histogram(
+    "gateway_downstream_request_duration_seconds",
+    "Latency of calls to downstream services by service, method and outcome.",
+    ("service", "method", "outcome"),
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+DOWNSTREAM_ERRORS = Counter(
+    "gateway_downstream_errors_total",
+    "Failed downstream calls by service and error kind.",
+    ("service", "kind"),
+    registry=REGISTRY,
+)
+DOWNSTREAM_IN_FLIGHT = Gauge(
+    "gateway_downstream_requests_in_flight",
+    "Downstream calls currently awaiting a response.",
+    ("service",),
+    registry=REGISTRY,
+)
+RATE_LIMIT_REJECTIONS = Counter(
+    "gateway_rate_limit_rejections_total",
+    "Requests rejected by the rate limiter, by key scope.",
+    ("scope",),
+    registry=REGISTRY,
+)
+DOWNSTREAM_CONCURRENCY_LIMIT = Gauge(
+    "gateway_downstream_concurrency_limit",
+    "Current adaptive concurrency limit per downstream service.",
+    ("service",),
+    registry=REGISTRY,
+)
+DOWNSTREAM_SHED = Counter(
+    "gateway_downstream_shed_total",
+    "Calls rejected because the downstream concurrency limit stayed saturated.",
+    ("service",),
+    registry=REGISTRY,
+)
+DOWNSTREAM_ENDPOINTS_AVAILABLE = Gauge(
+    "gateway_downstream_endpoints_available",
+    "Endpoints of a downstream service not currently ejected.",
+    ("service",),
+    registry=REGISTRY,
+)
+DOWNSTREAM_ENDPOINT_EJECTIONS = Counter(
+    "gateway_downstream_endpoint_ejections_total",
+    "Endpoints ejected from load balancing after consecutive failures.",
+    ("service",),
+    registry=REGISTRY,
+)
+ADMISSION_REJECTIONS = Counter(
+    "gateway_admission_rejections_total",
+    "Inbound requests shed by admission control, by priority class.",
+    ("priority",),
+    registry=REGISTRY,
+)
+PRE_AUTH_REJECTIONS = Counter(
+    "gateway_pre_auth_rejections_total",
+    "Requests rejected before token introspection, by reason.",
+    ("reason",),
+    registry=REGISTRY,
+)
+FAIR_QUEUE_WAIT = Histogram(
+    "gateway_fair_queue_wait_seconds",
+    "Time orchestrator calls spent waiting in the per-tenant fair queue.",
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+FAIR_QUEUE_DEPTH = Gauge(
+    "gateway_fair_queue_depth",
+    "Orchestrator calls currently waiting in the fair queue.",
+    registry=REGISTRY,
+)
+FAIR_QUEUE_REJECTIONS = Counter(
+    "gateway_fair_queue_rejections_total",
+    "Orchestrator calls rejected by the fair queue, by reason.",
+    ("reason",),
+    registry=REGISTRY,
+)
+IDEMPOTENCY_OUTCOMES = Counter(
+    "gateway_idempotency_outcomes_total",
+    "Requests carrying an Idempotency-Key, by outcome (executed/attached/replayed/in_progress/mismatch).",
+    ("outcome",),
+    registry=REGISTRY,
+)
+CONVERSATION_CACHE_LOOKUPS = Counter(
+    "gateway_conversation_cache_lookups_total",
+    "Assistant queries carrying a conversation_id, by state lookup result (hit/miss/error).",
+    ("result",),
+    registry=REGISTRY,
+)
+DOCUMENT_EVENT_SUBSCRIBERS = Gauge(
+    "gateway_document_event_subscribers",
+    "Open /api/v1/documents/events streams.",
+    registry=REGISTRY,
+)
+DOCUMENT_EVENT_POLLS = Counter(
+    "gateway_document_event_polls_total",
+    "Upstream document list polls made by the shared event feeds, by result.",
+    ("result",),
+    registry=REGISTRY,
+)
+AUTH_INTROSPECTION_DURATION = Histogram(
+    "gateway_auth_introspection_duration_seconds",
+    "Latency of token introspection calls by outcome.",
+    ("outcome",),
+    buckets=LATENCY_BUCKETS,
+    registry=REGISTRY,
+)
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
+
+
+def rate_limit_scope(key: str) -> str:
+    """Reduce a rate-limiter key such as ``assistant:<tenant>:<user>`` to its bounded prefix."""
+
+    return key.split(":", 1)[0]
+
+
+def observe_downstream(service: str, method: str, outcome: str, elapsed: float) -> None:
+    DOWNSTREAM_REQUEST_DURATION.labels(service, method, outcome).observe(elapsed)
+    if outcome != "2xx":
+        DOWNSTREAM_ERRORS.labels(service, outcome).inc()
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+class TenantLabeler:
+    """Bound the set of tenant label values; tenants past the cap collapse into one bucket."""
+
+    def __init__(self, max_tenants: int) -> None:
+        self.max_tenants = max_tenants
+        self._seen: Set[str] = set()
+
+    def label(self, tenant_id: Optional[str]) -> str:
+        if not tenant_id:
+            return OTHER_TENANT
+        if tenant_id in self._seen:
+            return tenant_id
+        if len(self._seen) >= self.max_tenants:
+            return OTHER_TENANT
+        self._seen.add(tenant_id)
+        return tenant_id
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request latency, status and in-flight counts.
+
+    Routes are labeled by their template (``/api/v1/documents/{doc_id}``) so label
+    cardinality stays bounded regardless of traffic.
+    """
+
+    def __init__(self, app: ASGIApp, tenant_labels: bool = False, max_tenants: int = 100) -> None:
+        self.app = app
+        self.tenant_labeler = TenantLabeler(max_tenants) if tenant_labels else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            route = scope.get("route")
+            route_label = getattr(route, "path", None) or UNMATCHED_ROUTE
+            status_label = str(status_code)
+            HTTP_REQUEST_DURATION.labels(route_label, scope["method"], status_label).observe(elapsed)
+            if self.tenant_labeler is not None:
+                state = scope.get("state") or {}
+                tenant = self.tenant_labeler.label(state.get("tenant_id"))
+                HTTP_TENANT_REQUESTS.labels(tenant, route_label, status_label).inc()
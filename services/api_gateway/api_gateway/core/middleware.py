@@ -1,9 +1,11 @@
 from __future__ import annotations
 
-from typing import Callable
+from typing import Callable, Optional
 
+import structlog
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import Scope
 
 from api_gateway.core.context import (
     build_request_context,
@@ -12,6 +14,18 @@ from api_gateway.core.context import (
 )
 
 
+def bearer_token(scope: Scope) -> Optional[str]:
+    """The bearer token of an ASGI request, for middleware that runs before authentication."""
+
+    for name, value in scope["headers"]:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return None
+            return token.strip() or None
+    return None
+
+
 class RequestContextMiddleware(BaseHTTPMiddleware):
     """Populate per-request tracing context and propagate headers."""
 
@@ -23,9 +37,11 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
         request.state.trace_id = context.trace_id
         if tenant_id:
             request.state.tenant_id = tenant_id
+        log_tokens = structlog.contextvars.bind_contextvars(trace_id=context.trace_id, route=request.url.path)
         try:
             response = await call_next(request)
         finally:
+            structlog.contextvars.reset_contextvars(**log_tokens)
             reset_request_context(token)
         response.headers["X-Request-ID"] = context.trace_id
         if tenant_id:
@@ -0,0 +1,221 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+from fastapi import status
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from api_gateway.core.metrics import PRE_AUTH_REJECTIONS
+from api_gateway.core.middleware import bearer_token
+
+
+def token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+class KeyedTokenBuckets:
+    """Token bucket per key, refilled continuously at ``per_minute``.
+
+    Keys live in a bounded LRU, so memory stays fixed however many addresses
+    or tokens an attacker rotates through; an evicted key starts full again.
+    Single event-loop use only.
+    """
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None, maxsize: int = 100000) -> None:
+        self.rate = per_minute / 60.0
+        self.burst = float(burst if burst is not None else per_minute)
+        self.maxsize = maxsize
+        self._buckets: "OrderedDict[object, List[float]]" = OrderedDict()
+
+    def _bucket(self, key: object, now: float) -> List[float]:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [self.burst, now]
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+        return bucket
+
+    def take(self, key: object, cost: float = 1.0, now: Optional[float] = None) -> float:
+        """Charge ``cost`` to ``key``; returns 0 when allowed, else seconds until it would be."""
+
+        bucket = self._bucket(key, time.monotonic() if now is None else now)
+        if bucket[0] < cost:
+            return (cost - bucket[0]) / self.rate if self.rate > 0 else math.inf
+        bucket[0] -= cost
+        return 0.0
+
+    def exhausted(self, key: object, now: Optional[float] = None) -> float:
+        """Seconds until ``key`` has a token again, without charging it."""
+
+        if key not in self._buckets:
+            return 0.0
+        bucket = self._bucket(key, time.monotonic() if now is None else now)
+        if bucket[0] >= 1.0:
+            return 0.0
+        return (1.0 - bucket[0]) / self.rate if self.rate > 0 else math.inf
+
+    def clear(self) -> None:
+        self._buckets.clear()
+
+
+class FailedTokenCache:
+    """Digests of tokens that introspection recently rejected, each kept for ``ttl`` seconds."""
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 100000) -> None:
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._expiry: "OrderedDict[bytes, float]" = OrderedDict()
+
+    def remember(self, token: str) -> None:
+        key = token_digest(token)
+        self._expiry[key] = time.monotonic() + self.ttl
+        self._expiry.move_to_end(key)
+        while len(self._expiry) > self.maxsize:
+            self._expiry.popitem(last=False)
+
+    def failed(self, token: str) -> bool:
+        key = token_digest(token)
+        expiry = self._expiry.get(key)
+        if expiry is None:
+            return False
+        if expiry <= time.monotonic():
+            del self._expiry[key]
+            return False
+        return True
+
+    def clear(self) -> None:
+        self._expiry.clear()
+
+
+class PreAuthGuard:
+    """Per-IP and per-token budgets, checked before a token is introspected.
+
+    ``ip_per_minute`` bounds requests from one client address and
+    ``token_per_minute`` requests carrying one bearer token. Every token that
+    fails introspection is remembered for ``failed_token_ttl`` seconds and
+    charged to its address's ``ip_failures_per_minute`` budget. Once that budget
+    is spent, the address gets ``429`` before any further introspection, so
+    floods of rotating bad tokens cannot turn into auth-service load.
+    """
+
+    def __init__(
+        self,
+        ip_per_minute: float = 600,
+        token_per_minute: float = 300,
+        ip_failures_per_minute: float = 30,
+        failed_token_ttl: float = 60.0,
+        maxsize: int = 100000,
+    ) -> None:
+        self.ips = KeyedTokenBuckets(ip_per_minute, maxsize=maxsize)
+        self.tokens = KeyedTokenBuckets(token_per_minute, maxsize=maxsize)
+        self.failures = KeyedTokenBuckets(ip_failures_per_minute, maxsize=maxsize)
+        self.failed_tokens = FailedTokenCache(failed_token_ttl, maxsize=maxsize)
+
+    def check(self, client_ip: Optional[str], token: Optional[str]) -> Optional[Tuple[int, str, float]]:
+        """``None`` to let the request through, else ``(status, reason, retry_after)``."""
+
+        if client_ip is not None:
+            retry_after = self.failures.exhausted(client_ip)
+            if retry_after:
+                return status.HTTP_429_TOO_MANY_REQUESTS, "ip_failures", retry_after
+            retry_after = self.ips.take(client_ip)
+            if retry_after:
+                return status.HTTP_429_TOO_MANY_REQUESTS, "ip", retry_after
+        if token is None:
+            return None
+        if self.failed_tokens.failed(token):
+            # answered as introspection would have, and still charged to the address
+            if client_ip is not None:
+                self.failures.take(client_ip)
+            return status.HTTP_401_UNAUTHORIZED, "failed_token", 0.0
+        retry_after = self.tokens.take(token_digest(token))
+        if retry_after:
+            return status.HTTP_429_TOO_MANY_REQUESTS, "token", retry_after
+        return None
+
+    def record_failure(self, token: str, client_ip: Optional[str]) -> None:
+        self.failed_tokens.remember(token)
+        if client_ip is not None:
+            self.failures.take(client_ip)
+
+    def clear(self) -> None:
+        for store in (self.ips, self.tokens, self.failures, self.failed_tokens):
+            store.clear()
+
+
+def client_ip(scope: Scope, forwarded_hops: int = 0) -> Optional[str]:
+    """The peer address, or the ``forwarded_hops``-th ``X-Forwarded-For`` entry from the right.
+
+    Only entries appended by trusted proxies are believed; anything further
+    left is client-controlled.
+    """
+
+    if forwarded_hops > 0:
+        for name, value in scope["headers"]:
+            if name == b"x-forwarded-for":
+                hops = [hop.strip() for hop in value.decode("latin-1").split(",") if hop.strip()]
+                if len(hops) >= forwarded_hops:
+                    return hops[-forwarded_hops]
+                break
+    client = scope.get("client")
+    return client[0] if client else None
+
+
+class PreAuthLimitMiddleware:
+    """Reject abusive traffic by address and token before authentication runs.
+
+    See :class:`PreAuthGuard`. The client address is stored in the request
+    state as ``client_ip`` so that ``get_current_user`` charges failed
+    introspections to the same key. Paths under ``exempt_prefixes`` (health,
+    metrics) are never limited.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        guard: PreAuthGuard,
+        forwarded_hops: int = 0,
+        exempt_prefixes: Sequence[str] = (),
+    ) -> None:
+        self.app = app
+        self.guard = guard
+        self.forwarded_hops = forwarded_hops
+        self.exempt_prefixes = tuple(exempt_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.exempt_prefixes):
+            await self.app(scope, receive, send)
+            return
+        ip = client_ip(scope, self.forwarded_hops)
+        scope.setdefault("state", {})["client_ip"] = ip
+        rejection = self.guard.check(ip, bearer_token(scope))
+        if rejection is None:
+            await self.app(scope, receive, send)
+            return
+        status_code, reason, retry_after = rejection
+        PRE_AUTH_REJECTIONS.labels(reason).inc()
+        await _reject(send, status_code, retry_after)
+
+
+async def _reject(send: Send, status_code: int, retry_after: float) -> None:
+    headers = [(b"content-type", b"application/json")]
+    if status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+        seconds = max(1, math.ceil(min(retry_after, 3600)))
+        detail: object = {"code": "rate_limit_exceeded", "retry_after": seconds}
+        headers.append((b"retry-after", str(seconds).encode()))
+    else:
+        detail = "invalid token"
+        headers.append((b"www-authenticate", b"Bearer"))
+    body = json.dumps({"detail": detail}).encode()
+    headers.append((b"content-length", str(len(body)).encode()))
+    await send({"type": "http.response.start", "status": status_code, "headers": headers})
+    await send({"type": "http.response.body", "body": body})
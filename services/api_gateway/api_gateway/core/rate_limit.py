@@ -5,6 +5,8 @@ from typing import Deque, Dict
 
 from fastapi import HTTPException, status
 
+from api_gateway.core.metrics import RATE_LIMIT_REJECTIONS, rate_limit_scope
+
 
 class RateLimiter:
     def __init__(self, limit_per_minute: int) -> None:
@@ -12,17 +14,21 @@ class RateLimiter:
         self._hits: Dict[str, Deque[float]] = defaultdict(deque)
         self._lock = asyncio.Lock()
 
-    async def check(self, key: str) -> None:
+    async def check(self, key: str, cost: int = 1) -> None:
+        """Count ``cost`` hits against ``key``; a cost above the limit is charged as the whole limit."""
+
+        cost = max(1, min(cost, self.limit))
         async with self._lock:
             now = time.time()
             window_start = now - 60
             bucket = self._hits[key]
             while bucket and bucket[0] < window_start:
                 bucket.popleft()
-            if len(bucket) >= self.limit:
-                retry_after = max(1, int(bucket[0] + 60 - now))
+            if len(bucket) + cost > self.limit:
+                retry_after = max(1, int(bucket[len(bucket) + cost - self.limit - 1] + 60 - now))
+                RATE_LIMIT_REJECTIONS.labels(rate_limit_scope(key)).inc()
                 raise HTTPException(
                     status_code=status.HTTP_429_TOO_MANY_REQUESTS,
                     detail={"code": "rate_limit_exceeded", "retry_after": retry_after},
                 )
-            bucket.append(now)
+            bucket.extend([now] * cost)
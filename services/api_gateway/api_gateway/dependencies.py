@@ -1,15 +1,34 @@
 from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Union
 
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from api_gateway.clients.auth import AuthClient
 from api_gateway.clients.documents import DocumentClient
+from api_gateway.clients.embedded_safety import EmbeddedSafetyClient
 from api_gateway.clients.ingestion import IngestionClient
 from api_gateway.clients.orchestrator import OrchestratorClient
 from api_gateway.clients.safety import SafetyClient
 from api_gateway.config import Settings, get_settings
+from api_gateway.core.admission import AdaptiveConcurrencyLimiter, verified_tenants
+from api_gateway.core.balancer import EndpointPool, EndpointsFile, normalize_url
 from api_gateway.core.context import AuthenticatedUser, bind_user_to_context
+from api_gateway.core.conversation import (
+    ConversationBackend,
+    ConversationCache,
+    LocalConversationBackend,
+    RedisConversationBackend,
+)
+from api_gateway.core.document_events import DocumentEventHub
+from api_gateway.core.fair_queue import WeightedFairScheduler
+from api_gateway.core.idempotency import (
+    IdempotencyBackend,
+    IdempotencyStore,
+    LocalIdempotencyBackend,
+    RedisIdempotencyBackend,
+)
+from api_gateway.core.pre_auth import PreAuthGuard
 from api_gateway.core.rate_limit import RateLimiter
 
 bearer_scheme = HTTPBearer(auto_error=False)
@@ -43,24 +62,177 @@ async def get_bearer_token(credentials: HTTPAuthorizationCredentials | None = De
     return credentials.credentials
 
 
+@lru_cache(maxsize=None)
+def _get_pre_auth_guard(
+    ip_per_minute: int,
+    token_per_minute: int,
+    ip_failures_per_minute: int,
+    failed_token_ttl: float,
+    maxsize: int,
+) -> PreAuthGuard:
+    return PreAuthGuard(
+        ip_per_minute=ip_per_minute,
+        token_per_minute=token_per_minute,
+        ip_failures_per_minute=ip_failures_per_minute,
+        failed_token_ttl=failed_token_ttl,
+        maxsize=maxsize,
+    )
+
+
+def get_pre_auth_guard(settings: Settings) -> Optional[PreAuthGuard]:
+    if not settings.pre_auth_enabled:
+        return None
+    return _get_pre_auth_guard(
+        settings.pre_auth_ip_per_minute,
+        settings.pre_auth_token_per_minute,
+        settings.pre_auth_ip_failures_per_minute,
+        settings.pre_auth_failed_token_ttl_seconds,
+        settings.pre_auth_max_keys,
+    )
+
+
 async def get_current_user(
     request: Request,
     token: str = Depends(get_bearer_token),
     auth_client: AuthClient = Depends(get_auth_client),
+    settings: Settings = Depends(get_settings),
 ) -> AuthenticatedUser:
-    user = await auth_client.introspect(token)
+    try:
+        user = await auth_client.introspect(token)
+    except HTTPException as exc:
+        guard = get_pre_auth_guard(settings)
+        # only a rejected token is remembered, not an auth-service outage
+        if guard is not None and exc.status_code in (status.HTTP_400_BAD_REQUEST, status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN):
+            guard.record_failure(token, getattr(request.state, "client_ip", None))
+        raise
+    verified_tenants.remember(token, user.tenant_id)
     bind_user_to_context(user)
     request.state.tenant_id = user.tenant_id
     return user
 
 
+@lru_cache(maxsize=None)
+def _get_downstream_limiter(
+    service_name: str,
+    initial_limit: int,
+    min_limit: int,
+    max_limit: int,
+    tolerance: float,
+    queue_timeout_ms: float,
+    retry_after: int,
+) -> AdaptiveConcurrencyLimiter:
+    return AdaptiveConcurrencyLimiter(
+        service_name,
+        initial_limit=initial_limit,
+        min_limit=min_limit,
+        max_limit=max_limit,
+        tolerance=tolerance,
+        queue_timeout=queue_timeout_ms / 1000.0,
+        retry_after=retry_after,
+    )
+
+
+def get_downstream_limiter(service_name: str, settings: Settings) -> Optional[AdaptiveConcurrencyLimiter]:
+    if not settings.downstream_adaptive_limits:
+        return None
+    return _get_downstream_limiter(
+        service_name,
+        settings.downstream_initial_limit,
+        settings.downstream_min_limit,
+        settings.downstream_max_limit,
+        settings.downstream_latency_tolerance,
+        settings.downstream_queue_timeout_ms,
+        settings.admission_retry_after_seconds,
+    )
+
+
+_endpoint_pools: Dict[str, EndpointPool] = {}
+_endpoints_file: Optional[EndpointsFile] = None
+
+
+def get_endpoint_pool(service_name: str, configured: Sequence[Any], settings: Settings) -> Optional[EndpointPool]:
+    """The shared pool of ``service_name``'s replicas, or ``None`` to use its single base URL.
+
+    ``ENDPOINTS_FILE`` takes precedence over the configured list, and a change
+    to it is applied to the existing pool, which keeps the state of endpoints
+    that remain.
+    """
+
+    global _endpoints_file
+    urls = [str(url) for url in configured]
+    if settings.endpoints_file:
+        if _endpoints_file is None or _endpoints_file.path != settings.endpoints_file:
+            _endpoints_file = EndpointsFile(settings.endpoints_file, settings.endpoints_reload_interval_seconds)
+        urls = _endpoints_file.get(service_name) or urls
+    if not urls:
+        return None
+    pool = _endpoint_pools.get(service_name)
+    if pool is None:
+        pool = _endpoint_pools[service_name] = EndpointPool(
+            service_name,
+            urls,
+            strategy=settings.load_balancing_strategy,
+            max_failures=settings.endpoint_max_failures,
+            ejection_seconds=settings.endpoint_ejection_seconds,
+            max_ejection_seconds=settings.endpoint_max_ejection_seconds,
+            max_ejected_ratio=settings.endpoint_max_ejected_percent / 100.0,
+        )
+    elif pool.urls != [normalize_url(url) for url in dict.fromkeys(urls)]:
+        pool.update(urls)
+    return pool
+
+
+@lru_cache(maxsize=1)
+def get_embedded_safety_client() -> EmbeddedSafetyClient:
+    return EmbeddedSafetyClient()
+
+
 def get_safety_client(
     request: Request,
     settings: Settings = Depends(get_settings),
-) -> SafetyClient:
-    http_client = get_http_client(request)
+) -> Union[SafetyClient, EmbeddedSafetyClient]:
+    if settings.safety_mode == "embedded":
+        return get_embedded_safety_client()
     base_url = str(settings.safety_base_url) if settings.safety_base_url else None
-    return SafetyClient(http_client, base_url, service_name="safety", mock_mode=settings.mock_mode)
+    http_client = getattr(request.app.state, "safety_http_client", None)
+    endpoints = None
+    if http_client is None:
+        http_client = get_http_client(request)
+        endpoints = get_endpoint_pool("safety", settings.safety_endpoints, settings)
+    elif base_url is None:
+        # over a Unix socket the host part of the URL is not used for routing
+        base_url = "http://safety"
+    return SafetyClient(
+        http_client,
+        base_url,
+        service_name="safety",
+        mock_mode=settings.mock_mode,
+        limiter=get_downstream_limiter("safety", settings),
+        wire_format=settings.safety_wire_format,
+        endpoints=endpoints,
+    )
+
+
+_orchestrator_scheduler: Optional[WeightedFairScheduler] = None
+
+
+def get_orchestrator_scheduler(settings: Settings) -> Optional[WeightedFairScheduler]:
+    global _orchestrator_scheduler
+    if not settings.fair_queue_enabled:
+        return None
+    if _orchestrator_scheduler is None:
+        limiter = get_downstream_limiter("orchestrator", settings)
+        _orchestrator_scheduler = WeightedFairScheduler(
+            capacity=settings.fair_queue_concurrency,
+            weights=settings.fair_queue_tenant_weights,
+            default_weight=settings.fair_queue_default_weight,
+            max_queue_depth=settings.fair_queue_max_depth_per_tenant,
+            queue_timeout=settings.fair_queue_timeout_ms / 1000.0,
+            retry_after=settings.admission_retry_after_seconds,
+            # keep the queue here, where it is fair, instead of in the limiter's FIFO
+            capacity_fn=(lambda: limiter.limit) if limiter is not None else None,
+        )
+    return _orchestrator_scheduler
 
 
 def get_orchestrator_client(
@@ -69,7 +241,16 @@ def get_orchestrator_client(
 ) -> OrchestratorClient:
     http_client = get_http_client(request)
     base_url = str(settings.orchestrator_base_url) if settings.orchestrator_base_url else None
-    return OrchestratorClient(http_client, base_url, service_name="orchestrator", mock_mode=settings.mock_mode)
+    return OrchestratorClient(
+        http_client,
+        base_url,
+        service_name="orchestrator",
+        mock_mode=settings.mock_mode,
+        limiter=get_downstream_limiter("orchestrator", settings),
+        scheduler=get_orchestrator_scheduler(settings),
+        endpoints=get_endpoint_pool("orchestrator", settings.orchestrator_endpoints, settings),
+        affinity=settings.orchestrator_tenant_affinity,
+    )
 
 
 def get_ingestion_client(
@@ -78,7 +259,14 @@ def get_ingestion_client(
 ) -> IngestionClient:
     http_client = get_http_client(request)
     base_url = str(settings.ingestion_base_url) if settings.ingestion_base_url else None
-    return IngestionClient(http_client, base_url, service_name="ingestion", mock_mode=settings.mock_mode)
+    return IngestionClient(
+        http_client,
+        base_url,
+        service_name="ingestion",
+        mock_mode=settings.mock_mode,
+        limiter=get_downstream_limiter("ingestion", settings),
+        endpoints=get_endpoint_pool("ingestion", settings.ingestion_endpoints, settings),
+    )
 
 
 def get_document_client(
@@ -87,7 +275,83 @@ def get_document_client(
 ) -> DocumentClient:
     http_client = get_http_client(request)
     base_url = str(settings.documents_base_url) if settings.documents_base_url else None
-    return DocumentClient(http_client, base_url, service_name="documents", mock_mode=settings.mock_mode)
+    return DocumentClient(
+        http_client,
+        base_url,
+        service_name="documents",
+        mock_mode=settings.mock_mode,
+        limiter=get_downstream_limiter("documents", settings),
+        endpoints=get_endpoint_pool("documents", settings.documents_endpoints, settings),
+    )
+
+
+_document_event_hub: Optional[DocumentEventHub] = None
+
+
+def get_document_event_hub(settings: Settings = Depends(get_settings)) -> DocumentEventHub:
+    global _document_event_hub
+    if _document_event_hub is None:
+        _document_event_hub = DocumentEventHub(
+            poll_interval=settings.document_events_poll_interval_seconds,
+            queue_size=settings.document_events_queue_size,
+            max_subscribers_per_tenant=settings.document_events_max_streams_per_tenant,
+            page_size=settings.document_events_page_size,
+            max_pages=settings.document_events_max_pages,
+        )
+    return _document_event_hub
+
+
+_idempotency_store: Optional[IdempotencyStore] = None
+
+
+def get_idempotency_store(settings: Settings = Depends(get_settings)) -> IdempotencyStore:
+    global _idempotency_store
+    if _idempotency_store is None:
+        backend: IdempotencyBackend
+        if settings.idempotency_backend == "redis":
+            if not settings.idempotency_redis_url:
+                raise RuntimeError("idempotency_backend=redis requires idempotency_redis_url")
+            backend = RedisIdempotencyBackend(settings.idempotency_redis_url)
+        else:
+            backend = LocalIdempotencyBackend(settings.idempotency_max_entries)
+        _idempotency_store = IdempotencyStore(
+            backend,
+            ttl=settings.idempotency_ttl_seconds,
+            in_flight_ttl=settings.idempotency_in_flight_ttl_seconds,
+            wait_timeout=settings.idempotency_wait_timeout_seconds,
+        )
+    return _idempotency_store
+
+
+_conversation_cache: Optional[ConversationCache] = None
+
+
+def get_conversation_cache(settings: Settings = Depends(get_settings)) -> Optional[ConversationCache]:
+    global _conversation_cache
+    if not settings.conversation_cache_enabled:
+        return None
+    if _conversation_cache is None:
+        backend: ConversationBackend
+        if settings.conversation_backend == "redis":
+            if not settings.conversation_redis_url:
+                raise RuntimeError("conversation_backend=redis requires conversation_redis_url")
+            backend = RedisConversationBackend(
+                settings.conversation_redis_url,
+                ttl=settings.conversation_ttl_seconds,
+                max_per_tenant=settings.conversation_max_per_tenant,
+            )
+        else:
+            backend = LocalConversationBackend(
+                ttl=settings.conversation_ttl_seconds,
+                max_per_tenant=settings.conversation_max_per_tenant,
+            )
+        _conversation_cache = ConversationCache(
+            backend,
+            max_turns=settings.conversation_max_turns,
+            max_sources=settings.conversation_max_sources,
+            summary_max_chars=settings.conversation_summary_max_chars,
+        )
+    return _conversation_cache
 
 
 @lru_cache(maxsize=1)
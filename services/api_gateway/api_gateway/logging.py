@@ -1,28 +1,283 @@
+import atexit
+import json
 import logging
-from typing import Any, Dict
+import queue
+import random
+import sys
+import threading
+import zlib
+from collections import deque
+from typing import Any, Deque, Dict, Mapping, Optional, TextIO, Tuple
 
 import structlog
 
+try:  # optional fast path, see the `fast-json` extra
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
 
-def configure_logging(level: str = "INFO") -> None:
-    """Configure stdlib + structlog logging."""
+_STOP = object()
+# uvicorn installs its own synchronous handlers on these and disables propagation
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+_UNSAMPLED_LEVELS = frozenset({"warning", "error", "critical", "exception"})
 
+
+def _dumps(event_dict: Dict[str, Any]) -> str:
+    if orjson is not None:
+        return orjson.dumps(event_dict, default=str).decode()
+    return json.dumps(event_dict, default=str, ensure_ascii=False, separators=(",", ":"))
+
+
+class QueueLogWriter:
+    """Hand rendered lines to a background thread so request handlers never block on stdout.
+
+    When the queue is full records are dropped; the writer emits a single
+    ``log_records_dropped`` line with the drop count and the affected trace ids
+    once it catches up.
+    """
+
+    def __init__(self, stream: TextIO, maxsize: int = 10000, batch_size: int = 512, max_dropped_trace_ids: int = 64) -> None:
+        self.stream = stream
+        self.batch_size = batch_size
+        self.dropped = 0
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=maxsize)
+        self._pending_drops = 0
+        self._dropped_trace_ids: Deque[str] = deque(maxlen=max_dropped_trace_ids)
+        self._drop_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, line: str, trace_id: Optional[str] = None) -> None:
+        try:
+            self._queue.put_nowait(line)
+        except queue.Full:
+            with self._drop_lock:
+                self.dropped += 1
+                self._pending_drops += 1
+                if trace_id and (not self._dropped_trace_ids or self._dropped_trace_ids[-1] != trace_id):
+                    self._dropped_trace_ids.append(trace_id)
+
+    def _drain_drop_summary(self) -> Optional[str]:
+        with self._drop_lock:
+            if not self._pending_drops:
+                return None
+            summary = {
+                "event": "log_records_dropped",
+                "level": "warning",
+                "count": self._pending_drops,
+                "trace_ids": sorted(set(self._dropped_trace_ids)),
+            }
+            self._pending_drops = 0
+            self._dropped_trace_ids.clear()
+        return _dumps(summary)
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            stop = item is _STOP
+            batch = [] if stop else [item]
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            summary = self._drain_drop_summary()
+            if summary:
+                batch.append(summary)
+            if batch:
+                try:
+                    self.stream.write("\n".join(batch) + "\n")
+                    self.stream.flush()
+                except Exception:  # pragma: no cover - never let logging kill the writer
+                    pass
+            if stop:
+                return
+
+    def close(self, timeout: float = 2.0) -> None:
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:  # pragma: no cover
+            return
+        self._thread.join(timeout)
+
+
+class QueueLogger:
+    def __init__(self, writer: QueueLogWriter) -> None:
+        self._writer = writer
+
+    def msg(self, line: str, trace_id: Optional[str] = None) -> None:
+        self._writer.write(line, trace_id)
+
+    debug = info = warning = warn = error = critical = exception = fatal = log = msg
+
+
+class QueueLoggerFactory:
+    def __init__(self, writer: QueueLogWriter) -> None:
+        self._logger = QueueLogger(writer)
+
+    def __call__(self, *args: Any) -> QueueLogger:
+        return self._logger
+
+
+def render_json(_: Any, __: str, event_dict: Dict[str, Any]) -> Tuple[Tuple[str], Dict[str, Any]]:
+    """Final processor: render to one JSON line and pass trace_id along for drop accounting."""
+
+    return (_dumps(event_dict),), {"trace_id": event_dict.get("trace_id")}
+
+
+class LogSampler:
+    """Drop a fraction of events per level and per route prefix.
+
+    Sampling is keyed on ``trace_id`` when present so a trace is either fully
+    logged or fully dropped; events outside a trace are sampled at random. Route rates never apply to warnings and errors;
+    those are only sampled when a level rate is configured for them explicitly.
+    """
+
+    def __init__(self, level_rates: Optional[Mapping[str, float]] = None, route_rates: Optional[Mapping[str, float]] = None) -> None:
+        self.level_rates = {k.lower(): v for k, v in (level_rates or {}).items()}
+        # longest prefix wins
+        self.route_rates = sorted((route_rates or {}).items(), key=lambda item: len(item[0]), reverse=True)
+
+    def _rate(self, event_dict: Dict[str, Any]) -> float:
+        level = event_dict.get("level", "")
+        rate = self.level_rates.get(level, 1.0)
+        route = event_dict.get("route")
+        if route and self.route_rates and level not in _UNSAMPLED_LEVELS:
+            for prefix, route_rate in self.route_rates:
+                if route.startswith(prefix):
+                    rate = min(rate, route_rate)
+                    break
+        return rate
+
+    def __call__(self, _: Any, __: str, event_dict: Dict[str, Any]) -> Dict[str, Any]:
+        rate = self._rate(event_dict)
+        if rate >= 1.0:
+            return event_dict
+        trace_id = event_dict.get("trace_id")
+        # hashing the event name instead would keep or drop every event of that name
+        sample = (zlib.crc32(str(trace_id).encode()) & 0xFFFF) / 0x10000 if trace_id else random.random()
+        if sample >= rate:
+            raise structlog.DropEvent
+        return event_dict
+
+
+class StdlibQueueHandler(logging.Handler):
+    """Route stdlib records (uvicorn, third-party libraries) through the same background writer.
+
+    Records get the bound structlog context and pass the same sampler as structlog
+    events. uvicorn access lines are split into fields so ``route`` sampling
+    applies to them.
+    """
+
+    def __init__(self, writer: QueueLogWriter, sampler: Optional[LogSampler] = None) -> None:
+        super().__init__()
+        self.writer = writer
+        self.sampler = sampler
+
+    def _event(self, record: logging.LogRecord) -> Dict[str, Any]:
+        event: Dict[str, Any] = dict(structlog.contextvars.get_contextvars())
+        event.update(event=record.getMessage(), level=record.levelname.lower(), logger=record.name)
+        if record.name == "uvicorn.access" and isinstance(record.args, tuple) and len(record.args) == 5:
+            client, method, path, http_version, status_code = record.args
+            event.update(
+                event="http_request",
+                client=client,
+                method=method,
+                route=str(path).split("?", 1)[0],
+                http_version=http_version,
+                status_code=status_code,
+            )
+        if record.exc_info:
+            event["exception"] = logging.Formatter().formatException(record.exc_info)
+        return event
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            event = self._event(record)
+            if self.sampler is not None:
+                try:
+                    event = self.sampler(None, "", event)
+                except structlog.DropEvent:
+                    return
+            self.writer.write(_dumps(event), event.get("trace_id"))
+        except Exception:  # pragma: no cover
+            self.handleError(record)
+
+
+_writer: Optional[QueueLogWriter] = None
+
+
+def configure_logging(
+    level: str = "INFO",
+    fmt: str = "console",
+    queue_size: int = 10000,
+    level_sample_rates: Optional[Mapping[str, float]] = None,
+    route_sample_rates: Optional[Mapping[str, float]] = None,
+    stream: Optional[TextIO] = None,
+) -> None:
+    """Configure stdlib + structlog logging.
+
+    ``fmt="console"`` keeps the synchronous developer renderer; ``fmt="json"`` renders
+    compact JSON and writes through a bounded background queue.
+    """
+
+    global _writer
+    log_level = getattr(logging, level.upper(), logging.INFO)
     timestamper = structlog.processors.TimeStamper(fmt="iso")
 
-    structlog.configure(
-        processors=[
+    if _writer is not None:
+        _writer.close()
+        _writer = None
+
+    sampler = LogSampler(level_sample_rates, route_sample_rates)
+    if fmt == "json":
+        _writer = QueueLogWriter(stream or sys.stdout, maxsize=queue_size)
+        atexit.register(_writer.close)
+        processors = [
+            structlog.contextvars.merge_contextvars,
+            structlog.processors.add_log_level,
+            sampler,
+            timestamper,
+            structlog.processors.format_exc_info,
+            render_json,
+        ]
+        logger_factory: Any = QueueLoggerFactory(_writer)
+    else:
+        processors = [
             structlog.contextvars.merge_contextvars,
             timestamper,
             structlog.processors.add_log_level,
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
             structlog.dev.ConsoleRenderer(colors=False),
-        ],
-        wrapper_class=structlog.make_filtering_bound_logger(getattr(logging, level.upper(), logging.INFO)),
-        logger_factory=structlog.PrintLoggerFactory(),
+        ]
+        logger_factory = structlog.PrintLoggerFactory()
+
+    structlog.configure(
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(log_level),
+        logger_factory=logger_factory,
     )
 
-    logging.basicConfig(level=getattr(logging, level.upper(), logging.INFO))
+    if _writer is not None:
+        logging.basicConfig(level=log_level, handlers=[StdlibQueueHandler(_writer, sampler)], force=True)
+        # configure_logging runs at app import, after uvicorn set up its loggers
+        for name in UVICORN_LOGGERS:
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+    else:
+        logging.basicConfig(level=log_level)
+
+
+def get_log_writer() -> Optional[QueueLogWriter]:
+    return _writer
 
 
 def get_logger(name: str) -> structlog.stdlib.BoundLogger:
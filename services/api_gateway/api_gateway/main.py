@@ -1,36 +1,91 @@
-from contextlib import asynccontextmanager
+from contextlib import AsyncExitStack, asynccontextmanager
 
 import httpx
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from api_gateway.config import get_settings
+from api_gateway.config import Settings, get_settings
+from api_gateway.core.admission import AdmissionControlMiddleware
+from api_gateway.dependencies import get_embedded_safety_client, get_pre_auth_guard
+from api_gateway.core.metrics import MetricsMiddleware
 from api_gateway.core.middleware import RequestContextMiddleware
+from api_gateway.core.pre_auth import PreAuthLimitMiddleware
 from api_gateway.logging import configure_logging
-from api_gateway.routers import assistant, auth, documents, health
+from api_gateway.routers import assistant, auth, documents, health, metrics
 
 settings = get_settings()
-configure_logging(settings.log_level)
+configure_logging(
+    settings.log_level,
+    fmt=settings.log_format,
+    queue_size=settings.log_queue_size,
+    level_sample_rates=settings.log_level_sample_rates,
+    route_sample_rates=settings.log_route_sample_rates,
+)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    async with httpx.AsyncClient(timeout=settings.http_timeout_seconds) as client:
-        app.state.http_client = client
+    if settings.safety_mode == "embedded":
+        # fail at startup, not on the first query, if safety-service is missing
+        get_embedded_safety_client()
+    async with AsyncExitStack() as stack:
+        app.state.http_client = await stack.enter_async_context(httpx.AsyncClient(timeout=settings.http_timeout_seconds))
+        if settings.safety_uds_path:
+            transport = httpx.AsyncHTTPTransport(uds=settings.safety_uds_path)
+            app.state.safety_http_client = await stack.enter_async_context(
+                httpx.AsyncClient(transport=transport, timeout=settings.http_timeout_seconds)
+            )
         yield
 
 
+def install_middleware(app: FastAPI, settings: Settings) -> None:
+    """Add the middleware stack; the last one added runs outermost.
+
+    Pre-auth limits and admission run inside CORS and the request context, so
+    their own 401/429/503 answers still carry ``Access-Control-Allow-Origin``
+    and ``X-Request-ID``; browsers hide cross-origin responses without them.
+    """
+
+    if settings.admission_enabled:
+        app.add_middleware(
+            AdmissionControlMiddleware,
+            max_concurrency=settings.admission_max_concurrency,
+            queue_timeouts_ms=settings.admission_queue_timeout_ms,
+            route_priorities=settings.admission_route_priorities,
+            tenant_priorities=settings.admission_tenant_priorities,
+            default_priority=settings.admission_default_priority,
+            retry_after=settings.admission_retry_after_seconds,
+        )
+    if settings.pre_auth_enabled:
+        # outside admission, so abusive requests never take an ingress slot
+        app.add_middleware(
+            PreAuthLimitMiddleware,
+            guard=get_pre_auth_guard(settings),
+            forwarded_hops=settings.pre_auth_forwarded_hops,
+            exempt_prefixes=settings.pre_auth_exempt_prefixes,
+        )
+    app.add_middleware(RequestContextMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.allowed_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"]
+    )
+    if settings.metrics_enabled:
+        app.add_middleware(
+            MetricsMiddleware,
+            tenant_labels=settings.metrics_tenant_labels,
+            max_tenants=settings.metrics_max_tenants,
+        )
+
+
 app = FastAPI(title=settings.app_name, lifespan=lifespan)
-app.add_middleware(RequestContextMiddleware)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.allowed_origins,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"]
-)
+install_middleware(app, settings)
 
 app.include_router(health.router)
 app.include_router(auth.router)
 app.include_router(assistant.router)
 app.include_router(documents.router)
+if settings.metrics_enabled:
+    app.include_router(metrics.router)
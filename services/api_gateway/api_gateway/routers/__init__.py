@@ -1,3 +1,3 @@
-from . import assistant, auth, documents, health
+from . import assistant, auth, documents, health, metrics
 
-__all__ = ["assistant", "auth", "documents", "health"]
+__all__ = ["assistant", "auth", "documents", "health", "metrics"]
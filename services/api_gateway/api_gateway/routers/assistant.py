@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional, Union
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
 
 from api_gateway.clients.orchestrator import OrchestratorClient
+from api_gateway.clients.embedded_safety import EmbeddedSafetyClient
 from api_gateway.clients.safety import SafetyClient
 from api_gateway.core.context import AuthenticatedUser, get_request_context
+from api_gateway.core.conversation import ConversationCache
+from api_gateway.core.idempotency import IdempotencyStore, fingerprint, scoped_key
 from api_gateway.core.rate_limit import RateLimiter
 from api_gateway.dependencies import (
+    get_conversation_cache,
     get_current_user,
+    get_idempotency_store,
     get_orchestrator_client,
     get_rate_limiter,
     get_safety_client,
@@ -18,12 +25,40 @@ router = APIRouter(prefix="/api/v1/assistant", tags=["assistant"])
 @router.post("/query", response_model=AssistantResponse)
 async def query_assistant(
     payload: AssistantQueryRequest,
+    response: Response,
     user: AuthenticatedUser = Depends(get_current_user),
     safety_client: SafetyClient = Depends(get_safety_client),
     orchestrator_client: OrchestratorClient = Depends(get_orchestrator_client),
     rate_limiter: RateLimiter = Depends(get_rate_limiter),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store),
+    conversations: Optional[ConversationCache] = Depends(get_conversation_cache),
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
 ) -> AssistantResponse:
     await rate_limiter.check(key=f"assistant:{user.tenant_id}:{user.user_id}")
+    if idempotency_key is None:
+        return await _answer(payload, user, safety_client, orchestrator_client, conversations)
+
+    async def produce() -> dict:
+        answer = await _answer(payload, user, safety_client, orchestrator_client, conversations)
+        return answer.model_dump(mode="json")
+
+    body, replayed = await idempotency_store.run(
+        scoped_key(user.tenant_id, "assistant-query", idempotency_key),
+        fingerprint(user.user_id, payload.model_dump(mode="json")),
+        produce,
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return AssistantResponse(**body)
+
+
+async def _answer(
+    payload: AssistantQueryRequest,
+    user: AuthenticatedUser,
+    safety_client: Union[SafetyClient, EmbeddedSafetyClient],
+    orchestrator_client: OrchestratorClient,
+    conversations: Optional[ConversationCache] = None,
+) -> AssistantResponse:
     ctx = get_request_context()
 
     safety_result = await safety_client.check_input(
@@ -54,6 +89,12 @@ async def query_assistant(
         }
     )
 
+    conversation_id = payload.context.conversation_id if payload.context else None
+    conversation = None
+    if conversations is not None and conversation_id:
+        conversation = await conversations.load(user.tenant_id, user.user_id, conversation_id)
+        downstream_payload["conversation"] = conversation.downstream()
+
     orchestrator_response = await orchestrator_client.query(downstream_payload)
 
     sources = [AssistantSource(**src) for src in orchestrator_response.get("sources", [])]
@@ -64,5 +105,16 @@ async def query_assistant(
         safety=meta_payload.get("safety") or {"input": safety_result.get("status")},
     )
     answer = orchestrator_response.get("answer", "")
+    if conversation is not None:
+        await conversations.record(
+            user.tenant_id,
+            user.user_id,
+            conversation_id,
+            conversation,
+            payload.query,
+            answer,
+            orchestrator_response.get("sources", []),
+            meta_payload.get("retrieved_chunk_ids") or [],
+        )
 
     return AssistantResponse(answer=answer, sources=sources, meta=meta)
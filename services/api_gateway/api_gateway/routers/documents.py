@@ -1,24 +1,40 @@
-from typing import List, Optional
+from math import ceil
+from typing import AsyncIterator, List, Optional
 
-from fastapi import APIRouter, Depends, File, Form, Query, UploadFile
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import StreamingResponse
 
 from api_gateway.clients.documents import DocumentClient
 from api_gateway.clients.ingestion import IngestionClient
+from api_gateway.config import Settings, get_settings
 from api_gateway.core.context import AuthenticatedUser
+from api_gateway.core.document_events import SSE_HEARTBEAT, DocumentEventHub, sse_event
+from api_gateway.core.idempotency import IdempotencyStore, fingerprint, scoped_key
 from api_gateway.core.rate_limit import RateLimiter
 from api_gateway.dependencies import (
     get_current_user,
     get_document_client,
+    get_document_event_hub,
+    get_idempotency_store,
     get_ingestion_client,
     get_rate_limiter,
 )
-from api_gateway.schemas import DocumentDetail, DocumentItem, DocumentUploadResponse
+from api_gateway.schemas import (
+    DocumentBatchError,
+    DocumentBatchGetRequest,
+    DocumentBatchGetResponse,
+    DocumentBatchItem,
+    DocumentDetail,
+    DocumentItem,
+    DocumentUploadResponse,
+)
 
 router = APIRouter(prefix="/api/v1/documents", tags=["documents"])
 
 
 @router.post("/upload", response_model=DocumentUploadResponse, status_code=202)
 async def upload_document(
+    response: Response,
     file: UploadFile = File(...),
     product: Optional[str] = Form(None),
     version: Optional[str] = Form(None),
@@ -26,14 +42,29 @@ async def upload_document(
     user: AuthenticatedUser = Depends(get_current_user),
     ingestion_client: IngestionClient = Depends(get_ingestion_client),
     rate_limiter: RateLimiter = Depends(get_rate_limiter),
+    idempotency_store: IdempotencyStore = Depends(get_idempotency_store),
+    idempotency_key: Optional[str] = Header(default=None, alias="Idempotency-Key"),
 ) -> DocumentUploadResponse:
     await rate_limiter.check(key=f"doc-upload:{user.tenant_id}:{user.user_id}")
     file_bytes = await file.read()
     files = {"file": (file.filename, file_bytes, file.content_type or "application/octet-stream")}
     metadata = {"tenant_id": user.tenant_id, "product": product, "version": version, "tags": tags}
     cleaned_metadata = {k: v for k, v in metadata.items() if v}
-    response = await ingestion_client.enqueue(cleaned_metadata, files)
-    return DocumentUploadResponse(**response)
+    if idempotency_key is None:
+        return DocumentUploadResponse(**await ingestion_client.enqueue(cleaned_metadata, files))
+
+    async def produce() -> dict:
+        enqueued = DocumentUploadResponse(**await ingestion_client.enqueue(cleaned_metadata, files))
+        return enqueued.model_dump(mode="json")
+
+    body, replayed = await idempotency_store.run(
+        scoped_key(user.tenant_id, "doc-upload", idempotency_key),
+        fingerprint(cleaned_metadata, file.filename, file_bytes),
+        produce,
+    )
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return DocumentUploadResponse(**body)
 
 
 @router.get("", response_model=List[DocumentItem])
@@ -59,6 +90,90 @@ async def list_documents(
     return [DocumentItem(**doc) for doc in documents]
 
 
+@router.get("/events", response_class=StreamingResponse)
+async def document_events(
+    user: AuthenticatedUser = Depends(get_current_user),
+    document_client: DocumentClient = Depends(get_document_client),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+    hub: DocumentEventHub = Depends(get_document_event_hub),
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    """Server-sent events with status changes of the caller's tenant documents.
+
+    The stream starts with a ``snapshot`` event, then sends one ``status`` event per
+    change and a comment line as heartbeat. A client too slow to keep up gets a new
+    ``snapshot`` instead of the events it missed.
+    """
+
+    await rate_limiter.check(key=f"doc-events:{user.tenant_id}:{user.user_id}")
+    subscription = hub.subscribe(user.tenant_id, document_client.list_documents_page)
+
+    async def stream() -> AsyncIterator[bytes]:
+        try:
+            yield sse_event("snapshot", await hub.snapshot(subscription))
+            while True:
+                event = await hub.next_event(subscription, settings.document_events_heartbeat_seconds)
+                if event is None:
+                    yield SSE_HEARTBEAT
+                elif event.get("resync"):
+                    yield sse_event("snapshot", await hub.snapshot(subscription))
+                else:
+                    yield sse_event("status", event)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post(":batchGet", response_model=DocumentBatchGetResponse)
+async def batch_get_documents(
+    payload: DocumentBatchGetRequest,
+    user: AuthenticatedUser = Depends(get_current_user),
+    document_client: DocumentClient = Depends(get_document_client),
+    rate_limiter: RateLimiter = Depends(get_rate_limiter),
+    settings: Settings = Depends(get_settings),
+) -> DocumentBatchGetResponse:
+    """Fetch several documents in one request; failures are reported per ``doc_id``.
+
+    Duplicate ids are fetched once and returned once, in first-seen order.
+    """
+
+    doc_ids = list(dict.fromkeys(payload.doc_ids))
+    if len(doc_ids) > settings.documents_batch_max_ids:
+        raise HTTPException(
+            status_code=422,
+            detail={"code": "too_many_doc_ids", "max": settings.documents_batch_max_ids},
+        )
+    await rate_limiter.check(
+        key=f"doc-detail:{user.tenant_id}:{user.user_id}",
+        cost=ceil(len(doc_ids) / max(1, settings.documents_batch_ids_per_rate_hit)),
+    )
+    results = await document_client.batch_get(doc_ids, concurrency=settings.documents_batch_concurrency)
+    items = []
+    for doc_id in doc_ids:
+        result = results[doc_id]
+        if isinstance(result, HTTPException):
+            items.append(DocumentBatchItem(doc_id=doc_id, error=_batch_error(result)))
+        else:
+            items.append(DocumentBatchItem(doc_id=doc_id, document=DocumentDetail(**result)))
+    return DocumentBatchGetResponse(documents=items)
+
+
+def _batch_error(exc: HTTPException) -> DocumentBatchError:
+    detail = exc.detail
+    if isinstance(detail, dict):
+        code = str(detail.get("code", "downstream_error"))
+        message = str(detail.get("reason") or detail.get("message") or code)
+    else:
+        code = "not_found" if exc.status_code == 404 else "downstream_error"
+        message = str(detail)
+    return DocumentBatchError(status=exc.status_code, code=code, message=message)
+
+
 @router.get("/{doc_id}", response_model=DocumentDetail)
 async def get_document(
     doc_id: str,
@@ -63,6 +63,26 @@ class DocumentDetail(DocumentItem):
     sections: Optional[List[dict[str, Any]]] = None
 
 
+class DocumentBatchGetRequest(BaseModel):
+    doc_ids: List[str] = Field(min_length=1)
+
+
+class DocumentBatchError(BaseModel):
+    status: int
+    code: str
+    message: str
+
+
+class DocumentBatchItem(BaseModel):
+    doc_id: str
+    document: Optional[DocumentDetail] = None
+    error: Optional[DocumentBatchError] = None
+
+
+class DocumentBatchGetResponse(BaseModel):
+    documents: List[DocumentBatchItem]
+
+
 class DocumentUploadResponse(BaseModel):
     doc_id: str
     status: str
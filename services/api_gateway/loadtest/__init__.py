@@ -0,0 +1,5 @@
+"""Reproducible load-test harness for the API gateway.
+
+Starts the gateway against local stub downstreams and drives open-loop traffic,
+see ``python -m loadtest --help``.
+"""
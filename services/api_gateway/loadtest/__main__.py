@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+from loadtest.config import LoadConfig
+from loadtest.runner import run
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m loadtest", description="Open-loop load test for the API gateway")
+    parser.add_argument("--config", type=Path, help="JSON file with LoadConfig fields (stubs, mix, rps, ...)")
+    parser.add_argument("--rps", type=float, help="override target requests per second")
+    parser.add_argument("--duration", type=float, help="override measured duration in seconds")
+    parser.add_argument("--workers", type=int, help="override gateway worker count")
+    parser.add_argument("--target", help="drive an already running gateway at this base URL instead of starting one")
+    parser.add_argument("--output", type=Path, help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+
+    config = LoadConfig.load(args.config)
+    if args.rps is not None:
+        config.rps = args.rps
+    if args.duration is not None:
+        config.duration_seconds = args.duration
+    if args.workers is not None:
+        config.gateway_workers = args.workers
+
+    report = json.dumps(run(config, target=args.target), indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(report + "\n")
+    else:
+        sys.stdout.write(report + "\n")
+
+
+if __name__ == "__main__":
+    main()
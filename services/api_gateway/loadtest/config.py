@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import random
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+STUB_SERVICES = ("safety", "orchestrator", "documents", "ingestion", "auth")
+ENDPOINTS = ("assistant_query", "documents_list", "documents_upload")
+
+
+@dataclass
+class LatencyProfile:
+    """Latency distribution for a stub downstream.
+
+    ``kind`` is one of ``constant`` (``ms``), ``uniform`` (``min_ms``..``max_ms``),
+    ``exponential`` (``mean_ms``) or ``lognormal`` (``median_ms``, ``sigma``).
+    """
+
+    kind: str = "constant"
+    ms: float = 0.0
+    min_ms: float = 0.0
+    max_ms: float = 0.0
+    mean_ms: float = 0.0
+    median_ms: float = 0.0
+    sigma: float = 0.5
+
+    def sample(self, rng: random.Random) -> float:
+        """Return a delay in seconds."""
+
+        if self.kind == "constant":
+            value = self.ms
+        elif self.kind == "uniform":
+            value = rng.uniform(self.min_ms, self.max_ms)
+        elif self.kind == "exponential":
+            value = rng.expovariate(1.0 / self.mean_ms) if self.mean_ms > 0 else 0.0
+        elif self.kind == "lognormal":
+            value = rng.lognormvariate(0.0, self.sigma) * self.median_ms
+        else:
+            raise ValueError(f"unknown latency distribution '{self.kind}'")
+        return max(0.0, value) / 1000.0
+
+
+@dataclass
+class StubConfig:
+    latency: LatencyProfile = field(default_factory=LatencyProfile)
+    error_rate: float = 0.0
+    error_status: int = 503
+
+
+@dataclass
+class LoadConfig:
+    rps: float = 500.0
+    duration_seconds: float = 30.0
+    warmup_seconds: float = 3.0
+    arrival: str = "poisson"  # poisson / uniform
+    seed: int = 1
+    tenants: int = 10
+    users_per_tenant: int = 10
+    upload_bytes: int = 4096
+    max_in_flight: int = 10000
+    request_timeout_seconds: float = 30.0
+    # relative weights of the driven endpoints
+    mix: Dict[str, float] = field(
+        default_factory=lambda: {"assistant_query": 0.7, "documents_list": 0.25, "documents_upload": 0.05}
+    )
+    stubs: Dict[str, StubConfig] = field(default_factory=lambda: {name: StubConfig() for name in STUB_SERVICES})
+    gateway_workers: int = 1
+    gateway_port: int = 18080
+    stub_base_port: int = 18100
+    gateway_env: Dict[str, str] = field(default_factory=dict)
+
+    def stub_port(self, service: str) -> int:
+        return self.stub_base_port + STUB_SERVICES.index(service)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LoadConfig":
+        data = dict(data)
+        stubs = {name: StubConfig() for name in STUB_SERVICES}
+        for name, raw in (data.pop("stubs", None) or {}).items():
+            if name not in STUB_SERVICES:
+                raise ValueError(f"unknown stub service '{name}'")
+            raw = dict(raw)
+            latency = LatencyProfile(**raw.pop("latency", {}))
+            stubs[name] = StubConfig(latency=latency, **raw)
+        unknown = set(data.get("mix", {})) - set(ENDPOINTS)
+        if unknown:
+            raise ValueError(f"unknown endpoints in mix: {sorted(unknown)}")
+        return cls(stubs=stubs, **data)
+
+    @classmethod
+    def load(cls, path: Optional[Path]) -> "LoadConfig":
+        if path is None:
+            return cls()
+        return cls.from_dict(json.loads(Path(path).read_text()))
@@ -0,0 +1,255 @@
+"""Open-loop load driver and process orchestration for the gateway harness."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import httpx
+
+from loadtest.config import ENDPOINTS, STUB_SERVICES, LoadConfig
+
+SERVICE_ROOT = Path(__file__).resolve().parent.parent
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile over an already sorted list."""
+
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+@dataclass
+class EndpointStats:
+    latencies: List[float] = field(default_factory=list)
+    errors: Counter = field(default_factory=Counter)
+    sent: int = 0
+
+    def record(self, latency: float, outcome: str) -> None:
+        if outcome == "ok":
+            self.latencies.append(latency)
+        else:
+            self.errors[outcome] += 1
+
+    def summary(self, window_seconds: float) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        ok = len(latencies)
+        to_ms = lambda value: round(value * 1000, 3) if value is not None else None  # noqa: E731
+        return {
+            "sent": self.sent,
+            "ok": ok,
+            "errors": dict(self.errors),
+            "error_rate": round(sum(self.errors.values()) / self.sent, 4) if self.sent else 0.0,
+            "throughput_rps": round(ok / window_seconds, 2) if window_seconds else 0.0,
+            "latency_ms": {
+                "p50": to_ms(percentile(latencies, 50)),
+                "p95": to_ms(percentile(latencies, 95)),
+                "p99": to_ms(percentile(latencies, 99)),
+                "max": to_ms(latencies[-1] if latencies else None),
+            },
+        }
+
+
+class OpenLoopDriver:
+    """Fire requests on a fixed schedule regardless of how fast responses come back.
+
+    Latency is measured from the *scheduled* send time, so a slow gateway cannot
+    hide queueing delay by slowing the generator down (coordinated omission).
+    """
+
+    def __init__(self, config: LoadConfig, base_url: str) -> None:
+        self.config = config
+        self.base_url = base_url.rstrip("/")
+        self.rng = random.Random(config.seed)
+        self.stats: Dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self._in_flight = 0
+        self._upload_payload = b"x" * config.upload_bytes
+        endpoints = [name for name in ENDPOINTS if config.mix.get(name, 0) > 0]
+        self._endpoints = endpoints
+        self._weights = [config.mix[name] for name in endpoints]
+
+    def _token(self) -> str:
+        tenant = self.rng.randrange(self.config.tenants)
+        user = self.rng.randrange(self.config.users_per_tenant)
+        return f"tenant-{tenant}:user-{user}"
+
+    async def _send(self, client: httpx.AsyncClient, endpoint: str, token: str) -> httpx.Response:
+        headers = {"Authorization": f"Bearer {token}"}
+        if endpoint == "assistant_query":
+            return await client.post(
+                "/api/v1/assistant/query", json={"query": "Как настроить LDAP?", "language": "ru"}, headers=headers
+            )
+        if endpoint == "documents_list":
+            return await client.get("/api/v1/documents", headers=headers)
+        return await client.post(
+            "/api/v1/documents/upload",
+            files={"file": ("load.txt", self._upload_payload, "text/plain")},
+            data={"product": "Orion"},
+            headers=headers,
+        )
+
+    async def _fire(self, client: httpx.AsyncClient, endpoint: str, token: str, scheduled: float, record: bool) -> None:
+        try:
+            response = await self._send(client, endpoint, token)
+            outcome = "ok" if response.status_code < 400 else f"http_{response.status_code}"
+        except httpx.TimeoutException:
+            outcome = "timeout"
+        except httpx.HTTPError as exc:
+            outcome = type(exc).__name__
+        finally:
+            self._in_flight -= 1
+        if record:
+            self.stats[endpoint].record(time.perf_counter() - scheduled, outcome)
+
+    async def run(self) -> Dict[str, Any]:
+        config = self.config
+        limits = httpx.Limits(max_connections=config.max_in_flight, max_keepalive_connections=config.max_in_flight)
+        async with httpx.AsyncClient(base_url=self.base_url, limits=limits, timeout=config.request_timeout_seconds) as client:
+            tasks: List[asyncio.Task] = []
+            start = time.perf_counter()
+            warmup_end = start + config.warmup_seconds
+            end = warmup_end + config.duration_seconds
+            next_send = start
+            late_sends = 0
+            while next_send < end:
+                now = time.perf_counter()
+                if next_send > now:
+                    await asyncio.sleep(next_send - now)
+                elif now - next_send > 0.01:
+                    late_sends += 1
+                endpoint = self.rng.choices(self._endpoints, self._weights)[0]
+                record = next_send >= warmup_end
+                if record:
+                    self.stats[endpoint].sent += 1
+                if self._in_flight >= config.max_in_flight:
+                    if record:
+                        self.stats[endpoint].record(0.0, "client_in_flight_cap")
+                else:
+                    self._in_flight += 1
+                    tasks.append(asyncio.create_task(self._fire(client, endpoint, self._token(), next_send, record)))
+                if config.arrival == "poisson":
+                    next_send += self.rng.expovariate(config.rps)
+                else:
+                    next_send += 1.0 / config.rps
+            if tasks:
+                await asyncio.gather(*tasks)
+            elapsed = time.perf_counter() - start
+
+        window = config.duration_seconds
+        per_endpoint = {name: stats.summary(window) for name, stats in sorted(self.stats.items())}
+        total = EndpointStats()
+        for stats in self.stats.values():
+            total.latencies.extend(stats.latencies)
+            total.errors.update(stats.errors)
+            total.sent += stats.sent
+        return {
+            "target_rps": config.rps,
+            "duration_seconds": config.duration_seconds,
+            "wall_seconds": round(elapsed, 3),
+            "late_sends": late_sends,
+            "total": total.summary(window),
+            "endpoints": per_endpoint,
+        }
+
+
+def _wait_until_up(url: str, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(url, timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{url} did not come up within {timeout}s")
+
+
+def gateway_env(config: LoadConfig, host: str = "127.0.0.1") -> Dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "API_GATEWAY_MOCK_MODE": "false",
+            "API_GATEWAY_SAFETY_BASE_URL": f"http://{host}:{config.stub_port('safety')}",
+            "API_GATEWAY_ORCHESTRATOR_BASE_URL": f"http://{host}:{config.stub_port('orchestrator')}",
+            "API_GATEWAY_DOCUMENTS_BASE_URL": f"http://{host}:{config.stub_port('documents')}",
+            "API_GATEWAY_INGESTION_BASE_URL": f"http://{host}:{config.stub_port('ingestion')}",
+            "API_GATEWAY_AUTH_INTROSPECTION_URL": f"http://{host}:{config.stub_port('auth')}/introspect",
+            # the harness measures the gateway, not the per-user limiter
+            "API_GATEWAY_RATE_LIMIT_PER_MINUTE": "100000000",
+            # every simulated client connects from the same address
+            "API_GATEWAY_PRE_AUTH_ENABLED": "false",
+            "API_GATEWAY_LOG_LEVEL": "warning",
+        }
+    )
+    env.update(config.gateway_env)
+    return env
+
+
+@contextmanager
+def running_stack(config: LoadConfig, host: str = "127.0.0.1") -> Iterator[str]:
+    """Start stub downstreams and the gateway as subprocesses; yield the gateway base URL."""
+
+    stubs = subprocess.Popen(
+        [sys.executable, "-m", "loadtest.stubs", "--config-json", json.dumps(config.to_dict())],
+        cwd=SERVICE_ROOT,
+    )
+    gateway = None
+    try:
+        for service in STUB_SERVICES:
+            _wait_until_up(f"http://{host}:{config.stub_port(service)}/")
+        gateway = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "uvicorn",
+                "api_gateway.main:app",
+                "--host",
+                host,
+                "--port",
+                str(config.gateway_port),
+                "--workers",
+                str(config.gateway_workers),
+                "--no-access-log",
+                "--log-level",
+                "warning",
+            ],
+            cwd=SERVICE_ROOT,
+            env=gateway_env(config, host),
+        )
+        base_url = f"http://{host}:{config.gateway_port}"
+        _wait_until_up(f"{base_url}/api/v1/health")
+        yield base_url
+    finally:
+        for process in (gateway, stubs):
+            if process is not None:
+                process.terminate()
+        for process in (gateway, stubs):
+            if process is not None:
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:  # pragma: no cover
+                    process.kill()
+
+
+def run(config: LoadConfig, target: Optional[str] = None) -> Dict[str, Any]:
+    """Run a load test; when ``target`` is given, drive an already running gateway instead."""
+
+    if target:
+        report = asyncio.run(OpenLoopDriver(config, target).run())
+    else:
+        with running_stack(config) as base_url:
+            report = asyncio.run(OpenLoopDriver(config, base_url).run())
+    report["config"] = config.to_dict()
+    return report
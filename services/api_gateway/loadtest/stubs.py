@@ -0,0 +1,113 @@
+"""Stub downstream services with configurable latency and error rates."""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import random
+import secrets
+from typing import Awaitable, Callable
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from loadtest.config import STUB_SERVICES, LoadConfig, StubConfig
+
+Handler = Callable[[Request], Awaitable[Response]]
+
+
+def _with_profile(handler: Handler, config: StubConfig, rng: random.Random) -> Handler:
+    async def wrapped(request: Request) -> Response:
+        delay = config.latency.sample(rng)
+        if delay:
+            await asyncio.sleep(delay)
+        if config.error_rate and rng.random() < config.error_rate:
+            return JSONResponse({"detail": "stub failure"}, status_code=config.error_status)
+        return await handler(request)
+
+    return wrapped
+
+
+async def _safety_input_check(request: Request) -> Response:
+    await request.body()
+    return JSONResponse({"status": "allowed", "reason": "clean", "risk_tags": []})
+
+
+async def _orchestrator_query(request: Request) -> Response:
+    payload = await request.json()
+    return JSONResponse(
+        {
+            "answer": "Stub answer",
+            "sources": [{"doc_id": "doc_1", "doc_title": "Stub guide", "page_start": 1, "page_end": 2}],
+            "meta": {"latency_ms": 1, "trace_id": payload.get("trace_id")},
+        }
+    )
+
+
+_DOCUMENTS = [
+    {"doc_id": f"doc_{i}", "name": f"Manual {i}", "status": "indexed", "product": "Orion", "tags": ["stub"]}
+    for i in range(20)
+]
+
+
+async def _documents_list(request: Request) -> Response:
+    return JSONResponse(_DOCUMENTS)
+
+
+async def _documents_get(request: Request) -> Response:
+    doc_id = request.path_params["doc_id"]
+    return JSONResponse({"doc_id": doc_id, "name": doc_id, "status": "indexed", "sections": []})
+
+
+async def _ingestion_enqueue(request: Request) -> Response:
+    await request.body()
+    return JSONResponse({"doc_id": f"doc_{secrets.token_hex(4)}", "status": "uploaded"})
+
+
+async def _introspect(request: Request) -> Response:
+    form = await request.form()
+    # tokens are "<tenant>:<user>" so the harness controls tenant/user spread
+    tenant, _, user = str(form.get("token", "")).partition(":")
+    return JSONResponse({"active": True, "sub": user or "user", "username": user or "user", "tenant_id": tenant or "tenant"})
+
+
+ROUTES = {
+    "safety": [("/internal/safety/input-check", _safety_input_check, ["POST"])],
+    "orchestrator": [("/internal/ai/query", _orchestrator_query, ["POST"])],
+    "documents": [
+        ("/internal/documents/list", _documents_list, ["GET"]),
+        ("/internal/documents/{doc_id}", _documents_get, ["GET"]),
+    ],
+    "ingestion": [("/internal/ingestion/enqueue", _ingestion_enqueue, ["POST"])],
+    "auth": [("/introspect", _introspect, ["POST"])],
+}
+
+
+def build_stub_app(service: str, config: StubConfig, seed: int = 0) -> Starlette:
+    rng = random.Random(f"{seed}:{service}")
+    routes = [Route(path, _with_profile(handler, config, rng), methods=methods) for path, handler, methods in ROUTES[service]]
+    return Starlette(routes=routes)
+
+
+async def serve_stubs(config: LoadConfig, host: str = "127.0.0.1") -> None:
+    servers = []
+    for service in STUB_SERVICES:
+        app = build_stub_app(service, config.stubs[service], config.seed)
+        uv_config = uvicorn.Config(app, host=host, port=config.stub_port(service), log_level="warning", access_log=False)
+        servers.append(uvicorn.Server(uv_config))
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run gateway stub downstreams")
+    parser.add_argument("--config-json", required=True, help="serialized LoadConfig")
+    args = parser.parse_args()
+    asyncio.run(serve_stubs(LoadConfig.from_dict(json.loads(args.config_json))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import asyncio
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from api_gateway.config import Settings
+from api_gateway.core.admission import (
+    AdaptiveConcurrencyLimiter,
+    AdmissionControlMiddleware,
+    PriorityLimiter,
+    VerifiedTenantCache,
+)
+
+
+def test_priority_limiter_serves_higher_priority_first() -> None:
+    async def scenario() -> list:
+        limiter = PriorityLimiter(capacity=1)
+        assert await limiter.acquire()
+        order: list = []
+
+        async def waiter(name: str, priority: int) -> None:
+            assert await limiter.acquire(priority, max_wait=1.0)
+            order.append(name)
+            limiter.release()
+
+        tasks = [asyncio.create_task(waiter("low", 3)), asyncio.create_task(waiter("high", 1))]
+        await asyncio.sleep(0)
+        limiter.release()
+        await asyncio.gather(*tasks)
+        assert limiter.in_flight == 0
+        return order
+
+    assert asyncio.run(scenario()) == ["high", "low"]
+
+
+def test_priority_limiter_sheds_after_queue_timeout() -> None:
+    async def scenario() -> None:
+        limiter = PriorityLimiter(capacity=1)
+        assert await limiter.acquire()
+        assert not await limiter.acquire(max_wait=0.01)
+        limiter.release()
+        # the expired waiter must not block the next caller
+        assert await limiter.acquire(max_wait=0)
+
+    asyncio.run(scenario())
+
+
+def test_adaptive_limiter_backs_off_and_recovers() -> None:
+    async def scenario() -> None:
+        limiter = AdaptiveConcurrencyLimiter("aimd-test", initial_limit=10, min_limit=2, max_limit=12, latency_floor=0.0)
+        limiter.on_sample(0.01, ok=True)
+        limiter.on_sample(0.01, ok=False)
+        assert limiter.limit == 9
+        for _ in range(50):
+            limiter._last_decrease = 0.0
+            limiter.on_sample(1.0, ok=True)  # 100x the minimum RTT
+        assert limiter.limit == 2
+
+        async with limiter.slot():
+            async with limiter.slot():
+                with pytest.raises(HTTPException) as exc_info:
+                    async with limiter.slot():
+                        pass
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == "1"
+
+        for _ in range(5):
+            async with limiter.slot():
+                async with limiter.slot():
+                    limiter.on_sample(0.01, ok=True)
+        assert limiter.limit > 2
+
+    asyncio.run(scenario())
+
+
+def _slow_app(timeouts: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/slow")
+    async def slow() -> dict:
+        await asyncio.sleep(0.2)
+        return {"ok": True}
+
+    @app.get("/health")
+    async def health() -> dict:
+        return {"ok": True}
+
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        max_concurrency=1,
+        queue_timeouts_ms=timeouts,
+        route_priorities={"/health": "critical"},
+        retry_after=2,
+    )
+    return app
+
+
+def test_admission_middleware_sheds_with_retry_after() -> None:
+    app = _slow_app({"normal": 0})
+
+    async def scenario() -> list:
+        import httpx
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            slow = asyncio.create_task(client.get("/slow"))
+            await asyncio.sleep(0.05)
+            shed = await client.get("/slow")
+            health = await client.get("/health")
+            return [await slow, shed, health]
+
+    first, shed, health = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "2"
+    assert shed.json()["detail"]["code"] == "overloaded"
+    assert health.status_code == 200
+
+
+def test_admission_middleware_rejects_unknown_priority() -> None:
+    with pytest.raises(ValueError):
+        TestClient(_slow_app({"urgent": 10})).get("/health")
+
+
+def test_tenant_priority_requires_verified_token() -> None:
+    cache = VerifiedTenantCache(maxsize=2)
+    middleware = AdmissionControlMiddleware(
+        FastAPI(),
+        route_priorities={"/api/v1/assistant": "low"},
+        tenant_priorities={"vip": "high"},
+        tenant_cache=cache,
+    )
+
+    def scope(*headers):
+        return {"type": "http", "path": "/api/v1/assistant/query", "headers": list(headers)}
+
+    # a claimed tenant header is ignored
+    assert middleware.classify(scope((b"x-tenant-id", b"vip"), (b"authorization", b"Bearer t1"))) == "low"
+    cache.remember("t1", "vip")
+    assert middleware.classify(scope((b"authorization", b"Bearer t1"))) == "high"
+    assert middleware.classify(scope((b"authorization", b"Bearer other"))) == "low"
+    cache.remember("t2", "x")
+    cache.remember("t3", "y")
+    assert cache.lookup("t1") is None
+
+
+def test_event_streams_bypass_admission_for_every_tenant() -> None:
+    cache = VerifiedTenantCache()
+    middleware = AdmissionControlMiddleware(
+        FastAPI(),
+        route_priorities=Settings().admission_route_priorities,
+        tenant_priorities={"vip": "high"},
+        tenant_cache=cache,
+    )
+    cache.remember("t1", "vip")
+
+    def scope(path):
+        return {"type": "http", "path": path, "headers": [(b"authorization", b"Bearer t1")]}
+
+    assert middleware.classify(scope("/api/v1/documents/events")) == "critical"
+    assert middleware.classify(scope("/api/v1/documents")) == "high"
+    assert middleware.classify({"type": "http", "path": "/api/v1/documents/abc", "headers": []}) == "high"
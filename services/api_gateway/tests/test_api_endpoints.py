@@ -85,9 +85,11 @@ class DummyIngestionClient:
 class DummyRateLimiter:
     def __init__(self) -> None:
         self.keys: List[str] = []
+        self.costs: List[int] = []
 
-    async def check(self, key: str) -> None:
+    async def check(self, key: str, cost: int = 1) -> None:
         self.keys.append(key)
+        self.costs.append(cost)
 
 
 @pytest.fixture
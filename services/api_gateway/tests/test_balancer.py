@@ -0,0 +1,118 @@
+import asyncio
+import json
+import os
+import random
+import time
+from collections import Counter
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from api_gateway.clients.orchestrator import OrchestratorClient
+from api_gateway.core.balancer import EndpointPool, EndpointsFile
+from api_gateway.core.context import build_request_context, reset_request_context, set_request_context
+
+URLS = ["http://a:8000", "http://b:8000", "http://c:8000"]
+
+
+def test_p2c_and_least_outstanding_avoid_busy_endpoints() -> None:
+    pool = EndpointPool("lb-test", URLS, rng=random.Random(1))
+    busy = pool.endpoints[0]
+    busy.outstanding = 10
+    picks = Counter(pool.pick().url for _ in range(300))
+    # p2c only takes the busy endpoint when it is sampled twice, which sample() never does
+    assert picks[busy.url] == 0 and len(picks) == 2
+
+    least = EndpointPool("lb-test", URLS, strategy="least_outstanding", rng=random.Random(1))
+    least.endpoints[1].outstanding = 1
+    least.endpoints[2].outstanding = 2
+    assert least.pick() is least.endpoints[0]
+    with pytest.raises(ValueError):
+        EndpointPool("lb-test", URLS, strategy="round_robin")
+
+
+def test_tenant_affinity_is_stable_bounded_and_moves_little() -> None:
+    pool = EndpointPool("lb-test", URLS)
+    tenants = [f"tenant-{n}" for n in range(300)]
+    before = {tenant: pool.pick(tenant).url for tenant in tenants}
+    assert all(pool.pick(tenant).url == url for tenant, url in before.items())
+    assert len(set(before.values())) == 3
+
+    pool.update([*URLS, "http://d:8000"])
+    after = {tenant: pool.pick(tenant).url for tenant in tenants}
+    moved = [tenant for tenant in tenants if after[tenant] != before[tenant]]
+    # only the new replica's share moves, and only onto it
+    assert {after[tenant] for tenant in moved} == {"http://d:8000/"}
+    assert len(moved) < len(tenants) / 2
+
+    home = pool.pick("hot")
+    home.outstanding = 20
+    assert pool.pick("hot") is not home
+
+
+def test_failing_endpoint_is_ejected_and_returns() -> None:
+    pool = EndpointPool("lb-test", URLS[:2], max_failures=2, ejection_seconds=60)
+    bad, good = pool.endpoints
+    for _ in range(2):
+        with pool.track(bad) as outcome:
+            outcome.ok = False
+    assert not bad.available(time.monotonic())
+    assert {pool.pick().url for _ in range(20)} == {good.url}
+    assert pool.pick("tenant") is good
+
+    # never more than half the endpoints out at once
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            with pool.track(good):
+                raise RuntimeError("connection refused")
+    assert good.available(time.monotonic())
+
+    bad.ejected_until = 0.0
+    pool.update(list(reversed(URLS[:2])))
+    assert pool.endpoints[1] is bad and bad.ejections == 1
+
+
+def test_endpoints_file_is_reloaded_when_it_changes(tmp_path) -> None:
+    path = tmp_path / "endpoints.json"
+    path.write_text(json.dumps({"orchestrator": URLS[:1]}))
+    endpoints = EndpointsFile(str(path), interval=0)
+    assert endpoints.get("orchestrator") == URLS[:1] and endpoints.get("safety") is None
+
+    path.write_text(json.dumps({"orchestrator": URLS}))
+    os.utime(path, (1, 1))
+    assert endpoints.get("orchestrator") == URLS
+
+    path.write_text("{not json")
+    os.utime(path, (2, 2))
+    assert endpoints.get("orchestrator") == URLS
+
+
+def test_orchestrator_client_spreads_calls_and_skips_a_dead_replica() -> None:
+    hits: Counter = Counter()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        hits[request.url.host] += 1
+        if request.url.host == "a":
+            raise httpx.ConnectError("connection refused", request=request)
+        return httpx.Response(200, json={"answer": request.url.host, "sources": [], "meta": {}})
+
+    async def scenario() -> Counter:
+        pool = EndpointPool("orchestrator-lb-test", URLS, max_failures=2, ejection_seconds=60)
+        answers: Counter = Counter()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+            client = OrchestratorClient(http_client, None, service_name="orchestrator", endpoints=pool, affinity=True)
+            for n in range(60):
+                token = set_request_context(build_request_context(user=None, tenant_id=f"tenant-{n % 30}"))
+                try:
+                    answers[(await client.query({"tenant_id": f"tenant-{n % 30}"}))["answer"]] += 1
+                except HTTPException as exc:
+                    assert exc.status_code == 502
+                    answers["failed"] += 1
+                finally:
+                    reset_request_context(token)
+        return answers
+
+    answers = asyncio.run(scenario())
+    assert hits["a"] == 2 and answers["failed"] == 2
+    assert answers["b"] + answers["c"] == 58 and answers["b"] and answers["c"]
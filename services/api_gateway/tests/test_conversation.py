@@ -0,0 +1,81 @@
+import asyncio
+import dataclasses
+
+from api_gateway.core.conversation import ConversationCache, ConversationState, LocalConversationBackend, record_turn
+from api_gateway.dependencies import get_conversation_cache
+from api_gateway.main import app
+from tests.test_api_endpoints import client_with_stubs  # noqa: F401
+
+
+def test_old_turns_are_compacted_into_a_bounded_summary() -> None:
+    state = ConversationState()
+    for turn in range(10):
+        record_turn(
+            state,
+            f"Question {turn}? With details.",
+            f"Answer {turn}. More text follows here.",
+            [{"doc_id": f"doc_{turn % 3}", "section_id": "sec_1", "doc_title": "Guide"}],
+            [f"ch_{turn}"],
+            max_turns=3,
+            max_sources=2,
+            summary_max_chars=60,
+        )
+    assert state.turn == 10
+    assert [turn["query"] for turn in state.turns] == [f"Question {n}? With details." for n in (7, 8, 9)]
+    assert state.summary.endswith("Q: Question 6? A: Answer 6.") and len(state.summary) <= 60
+    assert "\n" in state.summary and not state.summary.startswith("Q: Question 0")
+    assert state.sources == [{"doc_id": "doc_0", "section_id": "sec_1"}, {"doc_id": "doc_2", "section_id": "sec_1"}]
+    assert state.chunk_ids[0] == "ch_9"
+    assert ConversationState.loads(state.dumps()) == state
+
+
+def test_local_backend_bounds_each_tenant_separately_and_expires() -> None:
+    async def scenario():
+        backend = LocalConversationBackend(ttl=60, max_per_tenant=2)
+        for name in ("a", "b", "c"):
+            await backend.put("t1", name, ConversationState(turn=1))
+        await backend.put("t2", "a", ConversationState(turn=2))
+        assert await backend.get("t1", "a") is None
+        assert (await backend.get("t1", "c")).turn == 1 and (await backend.get("t2", "a")).turn == 2
+        expiring = LocalConversationBackend(ttl=0)
+        await expiring.put("t1", "a", ConversationState())
+        assert await expiring.get("t1", "a") is None
+
+    asyncio.run(scenario())
+
+
+class BrokenBackend(LocalConversationBackend):
+    async def get(self, tenant_id, key):
+        raise ConnectionError("redis down")
+
+    async def put(self, tenant_id, key, state):
+        raise ConnectionError("redis down")
+
+
+def test_follow_up_turns_carry_previous_retrieval(client_with_stubs) -> None:  # noqa: F811
+    client, stubs = client_with_stubs
+    cache = ConversationCache(LocalConversationBackend(), max_turns=2)
+    app.dependency_overrides[get_conversation_cache] = lambda: cache
+    headers = {"Authorization": "Bearer demo"}
+
+    def ask(query, conversation_id="conv-1"):
+        body = {"query": query, "context": {"conversation_id": conversation_id}}
+        assert client.post("/api/v1/assistant/query", json=body, headers=headers).status_code == 200
+        return stubs["orchestrator"].payloads[-1].get("conversation")
+
+    first = ask("How do I configure LDAP?")
+    assert first["turn"] == 1 and first["recent_turns"] == [] and first["retrieved_sources"] == []
+    second = ask("And for Kerberos?")
+    assert second["turn"] == 2
+    assert second["recent_turns"] == [{"query": "How do I configure LDAP?", "answer": "Mocked response"}]
+    assert second["retrieved_sources"] == [{"doc_id": "doc_1"}]
+    assert ask("Other conversation", "conv-2")["turn"] == 1
+
+    stubs["user"] = dataclasses.replace(stubs["user"], user_id="someone-else")
+    assert ask("Guessing the id", "conv-1")["turn"] == 1
+
+    client.post("/api/v1/assistant/query", json={"query": "no conversation"}, headers=headers)
+    assert "conversation" not in stubs["orchestrator"].payloads[-1]
+
+    app.dependency_overrides[get_conversation_cache] = lambda: ConversationCache(BrokenBackend())
+    assert ask("Still answered")["turn"] == 1
@@ -0,0 +1,89 @@
+import asyncio
+import json
+
+import httpx
+
+from api_gateway.clients.documents import DocumentClient
+from api_gateway.core.context import build_request_context, reset_request_context, set_request_context
+from tests.test_api_endpoints import client_with_stubs  # noqa: F401
+
+
+def _document(doc_id: str) -> dict:
+    return {"doc_id": doc_id, "name": doc_id, "status": "indexed"}
+
+
+def _batch_get(handler, base_url: str, doc_ids, concurrency: int = 8) -> dict:
+    async def scenario() -> dict:
+        token = set_request_context(build_request_context(user=None, tenant_id="t"))
+        try:
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+                client = DocumentClient(http_client, base_url, service_name="documents")
+                return await client.batch_get(doc_ids, concurrency=concurrency)
+        finally:
+            reset_request_context(token)
+
+    return asyncio.run(scenario())
+
+
+def test_batch_endpoint_is_one_round_trip() -> None:
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.url.path)
+        doc_ids = json.loads(request.content)["doc_ids"]
+        return httpx.Response(200, json={"documents": [_document(doc_id) for doc_id in doc_ids if doc_id != "gone"]})
+
+    results = _batch_get(handler, "http://docs-batch", ["a", "b", "gone"])
+    assert seen == ["/internal/documents/batchGet"]
+    assert results["a"]["doc_id"] == "a"
+    assert results["gone"].status_code == 404
+
+
+def test_fan_out_fallback_is_bounded_and_reports_per_item() -> None:
+    seen = []
+    in_flight = 0
+    peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        seen.append(request.url.path)
+        if request.url.path.endswith("batchGet"):
+            return httpx.Response(404)
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        doc_id = request.url.path.rsplit("/", 1)[1]
+        if doc_id == "d3":
+            return httpx.Response(500, text="boom")
+        return httpx.Response(200, json=_document(doc_id))
+
+    doc_ids = [f"d{i}" for i in range(10)]
+    results = _batch_get(handler, "http://docs-single", doc_ids, concurrency=3)
+    assert peak == 3
+    assert results["d3"].status_code == 500
+    assert results["d4"]["doc_id"] == "d4"
+    # the unsupported batch endpoint is remembered
+    _batch_get(handler, "http://docs-single", ["d0"])
+    assert seen.count("/internal/documents/batchGet") == 1
+
+
+def test_batch_get_endpoint_coalesces_and_weights_rate_limit(client_with_stubs) -> None:  # noqa: F811
+    client, stubs = client_with_stubs
+    calls = []
+
+    async def batch_get(doc_ids, concurrency):
+        calls.append(list(doc_ids))
+        return {doc_id: _document(doc_id) for doc_id in doc_ids}
+
+    stubs["documents"].batch_get = batch_get
+    doc_ids = [f"doc_{i}" for i in range(25)]
+    response = client.post("/api/v1/documents:batchGet", json={"doc_ids": doc_ids + doc_ids[:5]})
+    assert response.status_code == 200
+    assert [item["doc_id"] for item in response.json()["documents"]] == doc_ids
+    assert calls == [doc_ids]
+    assert stubs["rate_limiter"].costs == [3]
+
+    too_many = client.post("/api/v1/documents:batchGet", json={"doc_ids": [f"x{i}" for i in range(101)]})
+    assert too_many.status_code == 422
+    assert too_many.json()["detail"]["code"] == "too_many_doc_ids"
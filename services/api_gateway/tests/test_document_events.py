@@ -0,0 +1,125 @@
+import asyncio
+
+from api_gateway.core.context import (
+    AuthenticatedUser,
+    build_request_context,
+    get_request_context,
+    set_request_context,
+)
+from api_gateway.core.document_events import DocumentEventHub, sse_event
+
+
+class FakeDocuments:
+    def __init__(self, page_size: int = 500) -> None:
+        self.calls = 0
+        self.page_size = page_size
+        self.docs = {"d1": "processing", "d2": "indexed"}
+
+    async def list_documents(self, params):
+        self.calls += 1
+        assert params["tenant_id"] == "t1"
+        items = [{"doc_id": doc_id, "status": state} for doc_id, state in self.docs.items()]
+        start = int(params.get("cursor", 0))
+        end = start + min(params["limit"], self.page_size)
+        return items[start:end], str(end) if end < len(items) else None
+
+
+def test_one_poller_fans_out_status_changes() -> None:
+    upstream = FakeDocuments()
+
+    async def scenario():
+        hub = DocumentEventHub(poll_interval=0.01)
+        subs = [hub.subscribe("t1", upstream.list_documents) for _ in range(50)]
+        snapshot = await hub.snapshot(subs[0])
+        upstream.docs["d1"] = "indexed"
+        del upstream.docs["d2"]
+        events = [[await hub.next_event(sub, 1.0), await hub.next_event(sub, 1.0)] for sub in subs]
+        heartbeat = await hub.next_event(subs[0], 0.02)
+        calls_while_open = upstream.calls
+        for sub in subs:
+            hub.unsubscribe(sub)
+        await asyncio.sleep(0.05)
+        return snapshot, events, heartbeat, calls_while_open
+
+    snapshot, events, heartbeat, calls_while_open = asyncio.run(scenario())
+    assert {doc["doc_id"] for doc in snapshot} == {"d1", "d2"}
+    assert all(pair == [{"doc_id": "d1", "status": "indexed"}, {"doc_id": "d2", "status": "deleted"}] for pair in events)
+    assert heartbeat is None
+    # 50 subscribers, a handful of poll intervals: calls track intervals, not subscribers
+    assert calls_while_open < 20
+    assert upstream.calls == calls_while_open
+
+
+def test_slow_subscriber_gets_resync_instead_of_blocking() -> None:
+    upstream = FakeDocuments()
+
+    async def scenario():
+        hub = DocumentEventHub(poll_interval=0.005, queue_size=2)
+        sub = hub.subscribe("t1", upstream.list_documents)
+        await hub.snapshot(sub)
+        for state in ("a", "b", "c", "d"):
+            upstream.docs["d1"] = state
+            await asyncio.sleep(0.02)
+        event = await hub.next_event(sub, 1.0)
+        hub.unsubscribe(sub)
+        return event, sub.dropped
+
+    event, dropped = asyncio.run(scenario())
+    assert event == {"resync": True}
+    assert dropped >= 2
+    assert sse_event("status", {"a": 1}) == b'event: status\ndata: {"a": 1}\n\n'
+
+
+def test_documents_beyond_the_first_page_are_not_reported_deleted() -> None:
+    upstream = FakeDocuments(page_size=2)
+    upstream.docs = {f"d{n}": "indexed" for n in range(5)}
+
+    async def scenario():
+        hub = DocumentEventHub(poll_interval=0.005)
+        sub = hub.subscribe("t1", upstream.list_documents)
+        snapshot = await hub.snapshot(sub)
+        await asyncio.sleep(0.03)
+        quiet = await hub.next_event(sub, 0.01)
+        del upstream.docs["d4"]
+        deleted = await hub.next_event(sub, 1.0)
+        hub.unsubscribe(sub)
+
+        # a listing cut short by max_pages reports changes, never deletions
+        truncated = DocumentEventHub(poll_interval=0.005, max_pages=1)
+        sub = truncated.subscribe("t1", upstream.list_documents)
+        await truncated.snapshot(sub)
+        upstream.docs["d0"] = "failed"
+        changed = await truncated.next_event(sub, 1.0)
+        after = await truncated.next_event(sub, 0.03)
+        truncated.unsubscribe(sub)
+        return snapshot, quiet, deleted, changed, after
+
+    snapshot, quiet, deleted, changed, after = asyncio.run(scenario())
+    assert len(snapshot) == 5
+    assert quiet is None
+    assert deleted == {"doc_id": "d4", "status": "deleted"}
+    assert changed == {"doc_id": "d0", "status": "failed"}
+    assert after is None
+
+
+def test_poller_does_not_inherit_the_first_subscribers_context() -> None:
+    seen = []
+
+    async def list_page(params):
+        context = get_request_context()
+        seen.append((context.tenant_id, context.user, context.trace_id))
+        return [], None
+
+    async def scenario():
+        user = AuthenticatedUser(user_id="alice", username="alice", tenant_id="t1", roles=["admin"])
+        set_request_context(build_request_context(user=user, tenant_id="t1", trace_id="alice-trace"))
+        hub = DocumentEventHub(poll_interval=0.005)
+        sub = hub.subscribe("t1", list_page)
+        await hub.snapshot(sub)
+        await asyncio.sleep(0.02)
+        hub.unsubscribe(sub)
+
+    asyncio.run(scenario())
+    assert len(seen) >= 2
+    assert all(tenant == "t1" and user is None and trace != "alice-trace" for tenant, user, trace in seen)
+    assert len({trace for _, _, trace in seen}) == len(seen)
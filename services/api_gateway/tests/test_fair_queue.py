@@ -0,0 +1,62 @@
+import asyncio
+from typing import List
+
+import pytest
+from fastapi import HTTPException
+
+from api_gateway.core.fair_queue import WeightedFairScheduler
+
+
+async def _run_backlog(scheduler: WeightedFairScheduler, arrivals: List[str]) -> List[str]:
+    served: List[str] = []
+    gate = asyncio.Event()
+
+    async def call(tenant: str) -> None:
+        async with scheduler.slot(tenant):
+            served.append(tenant)
+            await gate.wait()
+
+    # occupy the only slot so every following call queues
+    blocker = asyncio.create_task(call("blocker"))
+    await asyncio.sleep(0)
+    tasks = []
+    for tenant in arrivals:
+        tasks.append(asyncio.create_task(call(tenant)))
+        await asyncio.sleep(0)
+    gate.set()
+    await asyncio.gather(blocker, *tasks)
+    return served[1:]
+
+
+def test_small_tenant_is_not_stuck_behind_bulk_tenant() -> None:
+    scheduler = WeightedFairScheduler(capacity=1)
+    order = asyncio.run(_run_backlog(scheduler, ["bulk"] * 10 + ["small", "small"]))
+    assert order.index("small") <= 2
+    assert scheduler.in_flight == 0
+
+
+def test_weights_split_capacity_proportionally() -> None:
+    scheduler = WeightedFairScheduler(capacity=1, weights={"gold": 2.0})
+    order = asyncio.run(_run_backlog(scheduler, ["gold"] * 6 + ["basic"] * 6))
+    first_six = order[:6]
+    assert first_six.count("gold") == 4
+    assert first_six.count("basic") == 2
+
+
+def test_per_tenant_queue_depth_and_timeout() -> None:
+    async def scenario() -> None:
+        scheduler = WeightedFairScheduler(capacity=1, max_queue_depth=1, queue_timeout=0.05)
+        async with scheduler.slot("a"):
+            waiter = asyncio.create_task(scheduler.slot("a").__aenter__())
+            await asyncio.sleep(0)
+            with pytest.raises(HTTPException) as full:
+                async with scheduler.slot("a"):
+                    pass
+            assert full.value.status_code == 429
+            with pytest.raises(HTTPException) as timed_out:
+                await waiter
+            assert timed_out.value.status_code == 503
+        assert scheduler.in_flight == 0
+        assert scheduler.queue_depth("a") == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,88 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from api_gateway.core.idempotency import IdempotencyStore, LocalIdempotencyBackend, fingerprint, scoped_key
+from api_gateway.dependencies import get_idempotency_store
+from api_gateway.main import app
+from tests.test_api_endpoints import client_with_stubs  # noqa: F401
+
+
+def test_concurrent_retries_attach_and_later_ones_replay() -> None:
+    calls = []
+
+    async def produce():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"answer": len(calls)}
+
+    async def scenario():
+        store = IdempotencyStore(LocalIdempotencyBackend())
+        first = await asyncio.gather(*(store.run("t:op:k", "fp", produce) for _ in range(5)))
+        later = await store.run("t:op:k", "fp", produce)
+        return first, later
+
+    first, later = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert [replayed for _, replayed in first].count(False) == 1
+    assert all(body == {"answer": 1} for body, _ in first)
+    assert later == ({"answer": 1}, True)
+
+
+def test_failures_are_not_stored_and_mismatch_is_rejected() -> None:
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise HTTPException(status_code=502, detail="upstream")
+        return {"ok": True}
+
+    async def scenario():
+        store = IdempotencyStore(LocalIdempotencyBackend())
+        with pytest.raises(HTTPException):
+            await store.run("k", "fp", flaky)
+        assert await store.run("k", "fp", flaky) == ({"ok": True}, False)
+        with pytest.raises(HTTPException) as exc:
+            await store.run("k", "other", flaky)
+        return exc.value
+
+    error = asyncio.run(scenario())
+    assert error.status_code == 422
+    assert len(attempts) == 2
+
+
+def test_local_backend_is_bounded_and_expires() -> None:
+    async def scenario():
+        backend = LocalIdempotencyBackend(max_entries=2)
+        for key in ("a", "b", "c"):
+            assert await backend.claim(key, "fp", ttl=60)
+        assert await backend.get("a") is None
+        assert await backend.claim("d", "fp", ttl=0) and await backend.get("d") is None
+
+    asyncio.run(scenario())
+    with pytest.raises(HTTPException):
+        scoped_key("t", "op", "x" * 300)
+
+
+def test_endpoints_replay_on_retry(client_with_stubs) -> None:  # noqa: F811
+    client, stubs = client_with_stubs
+    store = IdempotencyStore(LocalIdempotencyBackend())
+    app.dependency_overrides[get_idempotency_store] = lambda: store
+    headers = {"Authorization": "Bearer demo", "Idempotency-Key": "retry-1"}
+
+    first = client.post("/api/v1/assistant/query", json={"query": "hi"}, headers=headers)
+    second = client.post("/api/v1/assistant/query", json={"query": "hi"}, headers=headers)
+    assert first.json() == second.json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert len(stubs["orchestrator"].payloads) == 1
+    assert client.post("/api/v1/assistant/query", json={"query": "bye"}, headers=headers).status_code == 422
+
+    upload = {"files": {"file": ("a.txt", b"payload", "text/plain")}, "data": {"product": "Orion"}}
+    ids = [client.post("/api/v1/documents/upload", headers=headers, **upload).json()["doc_id"] for _ in range(2)]
+    assert ids == ["doc_upload", "doc_upload"]
+    stubs["ingestion"].last_data = None
+    client.post("/api/v1/documents/upload", headers=headers, **upload)
+    assert stubs["ingestion"].last_data is None  # replayed, not re-enqueued
+    assert fingerprint({"a": 1}, b"x") == fingerprint({"a": 1}, b"x")
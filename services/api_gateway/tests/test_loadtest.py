@@ -0,0 +1,56 @@
+import random
+
+import pytest
+from fastapi.testclient import TestClient
+
+from loadtest.config import LatencyProfile, LoadConfig, StubConfig
+from loadtest.runner import EndpointStats, percentile
+from loadtest.stubs import build_stub_app
+
+
+def test_percentile_nearest_rank() -> None:
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 50) is None
+
+
+def test_latency_profiles_are_seeded() -> None:
+    profile = LatencyProfile(kind="lognormal", median_ms=10, sigma=0.5)
+    first = [profile.sample(random.Random(7)) for _ in range(3)]
+    second = [profile.sample(random.Random(7)) for _ in range(3)]
+    assert first == second
+    assert LatencyProfile(kind="constant", ms=5).sample(random.Random()) == 0.005
+    with pytest.raises(ValueError):
+        LatencyProfile(kind="bogus").sample(random.Random())
+
+
+def test_config_round_trip() -> None:
+    config = LoadConfig.from_dict(
+        {"rps": 10, "stubs": {"orchestrator": {"latency": {"kind": "uniform", "min_ms": 1, "max_ms": 2}, "error_rate": 0.1}}}
+    )
+    assert config.stubs["orchestrator"].error_rate == 0.1
+    assert LoadConfig.from_dict(config.to_dict()) == config
+    with pytest.raises(ValueError):
+        LoadConfig.from_dict({"mix": {"unknown": 1.0}})
+
+
+def test_stub_error_rate_and_payloads() -> None:
+    failing = TestClient(build_stub_app("safety", StubConfig(error_rate=1.0)))
+    assert failing.post("/internal/safety/input-check", json={}).status_code == 503
+
+    auth = TestClient(build_stub_app("auth", StubConfig()))
+    payload = auth.post("/introspect", data={"token": "tenant-3:user-7"}).json()
+    assert payload["tenant_id"] == "tenant-3"
+    assert payload["sub"] == "user-7"
+
+
+def test_endpoint_stats_summary() -> None:
+    stats = EndpointStats(sent=4)
+    for latency in (0.01, 0.02, 0.03):
+        stats.record(latency, "ok")
+    stats.record(0.5, "http_503")
+    summary = stats.summary(window_seconds=1.0)
+    assert summary["ok"] == 3
+    assert summary["errors"] == {"http_503": 1}
+    assert summary["latency_ms"]["p50"] == 20.0
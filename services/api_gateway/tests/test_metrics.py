@@ -0,0 +1,74 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from api_gateway.clients.base import DownstreamClient
+from api_gateway.core.context import build_request_context, reset_request_context, set_request_context
+from api_gateway.core.metrics import REGISTRY, TenantLabeler
+from api_gateway.core.rate_limit import RateLimiter
+from api_gateway.main import app
+
+
+def _sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint_reports_route_templates() -> None:
+    with TestClient(app) as client:
+        assert client.get("/api/v1/health").status_code == 200
+        response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/v1/health"' in response.text
+    assert "gateway_http_requests_in_flight" in response.text
+
+
+def test_rate_limiter_rejections_are_counted_by_scope() -> None:
+    limiter = RateLimiter(limit_per_minute=1)
+    before = _sample("gateway_rate_limit_rejections_total", {"scope": "metrics-test"})
+
+    async def scenario() -> None:
+        await limiter.check("metrics-test:tenant:user")
+        with pytest.raises(HTTPException):
+            await limiter.check("metrics-test:tenant:user")
+
+    asyncio.run(scenario())
+    assert _sample("gateway_rate_limit_rejections_total", {"scope": "metrics-test"}) == before + 1
+
+
+def test_downstream_latency_and_errors_labeled_by_service() -> None:
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(503 if request.url.path.endswith("fail") else 200, json={})
+
+    labels_ok = {"service": "metrics-stub", "method": "GET", "outcome": "2xx"}
+    errors = {"service": "metrics-stub", "kind": "5xx"}
+    before_ok = _sample("gateway_downstream_request_duration_seconds_count", labels_ok)
+    before_err = _sample("gateway_downstream_errors_total", errors)
+
+    async def scenario() -> None:
+        token = set_request_context(build_request_context(user=None, tenant_id="t"))
+        try:
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+                client = DownstreamClient(http_client, "http://stub", service_name="metrics-stub")
+                await client.get("/ok")
+                with pytest.raises(HTTPException):
+                    await client.get("/fail")
+        finally:
+            reset_request_context(token)
+
+    asyncio.run(scenario())
+    assert _sample("gateway_downstream_request_duration_seconds_count", labels_ok) == before_ok + 1
+    assert _sample("gateway_downstream_errors_total", errors) == before_err + 1
+    assert _sample("gateway_downstream_requests_in_flight", {"service": "metrics-stub"}) == 0
+
+
+def test_tenant_labeler_caps_cardinality() -> None:
+    labeler = TenantLabeler(max_tenants=2)
+    assert labeler.label("a") == "a"
+    assert labeler.label("b") == "b"
+    assert labeler.label("c") == "__other__"
+    assert labeler.label("a") == "a"
+    assert labeler.label(None) == "__other__"
@@ -0,0 +1,123 @@
+from fastapi import Depends, FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+from api_gateway.config import Settings, get_settings
+from api_gateway.core.context import AuthenticatedUser
+from api_gateway.core.middleware import RequestContextMiddleware
+from api_gateway.core.pre_auth import KeyedTokenBuckets, PreAuthGuard, PreAuthLimitMiddleware, client_ip
+from api_gateway.dependencies import get_auth_client, get_current_user, get_pre_auth_guard
+
+
+class CountingAuthClient:
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def introspect(self, token: str) -> AuthenticatedUser:
+        self.calls += 1
+        if token.startswith("bad"):
+            raise HTTPException(status_code=401, detail="invalid token")
+        if token == "outage":
+            raise HTTPException(status_code=502, detail="auth provider unavailable")
+        return AuthenticatedUser(user_id="u", username="u", tenant_id="t")
+
+
+def _app(settings: Settings, auth_client: CountingAuthClient) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/me")
+    async def me(user: AuthenticatedUser = Depends(get_current_user)) -> dict:
+        return {"user": user.user_id}
+
+    @app.get("/api/v1/health")
+    async def health() -> dict:
+        return {"ok": True}
+
+    app.add_middleware(RequestContextMiddleware)
+    app.add_middleware(
+        PreAuthLimitMiddleware,
+        guard=get_pre_auth_guard(settings),
+        exempt_prefixes=settings.pre_auth_exempt_prefixes,
+    )
+    app.dependency_overrides[get_settings] = lambda: settings
+    app.dependency_overrides[get_auth_client] = lambda: auth_client
+    return app
+
+
+def test_token_buckets_refill_and_stay_bounded() -> None:
+    buckets = KeyedTokenBuckets(per_minute=60, maxsize=2)
+    assert buckets.take("a", cost=60, now=0.0) == 0.0
+    assert buckets.take("a", now=0.0) == 1.0
+    assert buckets.exhausted("a", now=0.5) == 0.5
+    assert buckets.take("a", now=1.0) == 0.0
+    buckets.take("b", now=1.0)
+    buckets.take("c", now=1.0)
+    # "a" was evicted and starts full again
+    assert buckets.exhausted("a", now=1.0) == 0.0 and buckets.take("a", cost=60, now=1.0) == 0.0
+
+
+def test_client_ip_trusts_only_proxy_appended_hops() -> None:
+    scope = {"client": ("10.0.0.9", 1234), "headers": [(b"x-forwarded-for", b"6.6.6.6, 203.0.113.7")]}
+    assert client_ip(scope) == "10.0.0.9"
+    assert client_ip(scope, forwarded_hops=1) == "203.0.113.7"
+    assert client_ip({"client": None, "headers": []}, forwarded_hops=1) is None
+
+
+def test_failed_tokens_are_not_introspected_again() -> None:
+    settings = Settings(pre_auth_enabled=True, pre_auth_ip_failures_per_minute=3)
+    auth_client = CountingAuthClient()
+    get_pre_auth_guard(settings).clear()
+    client = TestClient(_app(settings, auth_client))
+
+    assert client.get("/me", headers={"Authorization": "Bearer bad-1"}).status_code == 401
+    repeat = client.get("/me", headers={"Authorization": "Bearer bad-1"})
+    assert repeat.status_code == 401 and repeat.json()["detail"] == "invalid token"
+    assert auth_client.calls == 1
+
+    # rotating bad tokens spend the address's failure budget, then nothing reaches auth
+    client.get("/me", headers={"Authorization": "Bearer bad-2"})
+    flooded = [client.get("/me", headers={"Authorization": f"Bearer bad-{n}"}) for n in range(3, 10)]
+    assert {response.status_code for response in flooded} == {429}
+    assert flooded[0].json()["detail"]["code"] == "rate_limit_exceeded"
+    assert int(flooded[0].headers["retry-after"]) >= 1
+    assert auth_client.calls == 2
+    assert client.get("/api/v1/health").status_code == 200
+
+
+def test_auth_outages_are_not_cached_as_failures() -> None:
+    settings = Settings(pre_auth_enabled=True, pre_auth_ip_failures_per_minute=1)
+    auth_client = CountingAuthClient()
+    get_pre_auth_guard(settings).clear()
+    client = TestClient(_app(settings, auth_client))
+    for _ in range(3):
+        assert client.get("/me", headers={"Authorization": "Bearer outage"}).status_code == 502
+    assert auth_client.calls == 3
+    assert client.get("/me", headers={"Authorization": "Bearer good"}).json() == {"user": "u"}
+
+
+def test_guard_limits_each_address_and_token() -> None:
+    guard = PreAuthGuard(ip_per_minute=2, token_per_minute=1)
+    assert guard.check("1.1.1.1", "t") is None
+    assert guard.check("2.2.2.2", "t")[:2] == (429, "token")
+    assert guard.check("1.1.1.1", None) is None
+    assert guard.check("1.1.1.1", None)[:2] == (429, "ip")
+
+
+def test_rejections_carry_cors_and_request_id_headers() -> None:
+    from api_gateway.main import install_middleware
+
+    settings = Settings(pre_auth_enabled=True, pre_auth_ip_per_minute=1, metrics_enabled=False)
+    get_pre_auth_guard(settings).clear()
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping() -> dict:
+        return {"ok": True}
+
+    install_middleware(app, settings)
+    client = TestClient(app)
+    headers = {"Origin": "https://app.example.com"}
+    assert client.get("/ping", headers=headers).status_code == 200
+    rejected = client.get("/ping", headers=headers)
+    assert rejected.status_code == 429
+    assert rejected.headers["access-control-allow-origin"] == "https://app.example.com"
+    assert rejected.headers["x-request-id"]
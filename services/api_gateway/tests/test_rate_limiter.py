@@ -32,3 +32,17 @@ def test_rate_limiter_isolated_keys() -> None:
         await limiter.check("tenant:user-b")
 
     asyncio.run(scenario())
+
+
+def test_rate_limiter_charges_cost() -> None:
+    limiter = RateLimiter(limit_per_minute=5)
+
+    async def scenario() -> None:
+        await limiter.check("tenant:user", cost=3)
+        with pytest.raises(HTTPException):
+            await limiter.check("tenant:user", cost=3)
+        await limiter.check("tenant:user", cost=2)
+        with pytest.raises(HTTPException):
+            await limiter.check("tenant:user")
+
+    asyncio.run(scenario())
@@ -0,0 +1,51 @@
+import asyncio
+
+import httpx
+import pytest
+
+from api_gateway.clients import base
+from api_gateway.clients.safety import SafetyClient
+from api_gateway.core.context import build_request_context, reset_request_context, set_request_context
+
+msgpack = pytest.importorskip("msgpack")
+
+
+def _check(handler, base_url: str) -> dict:
+    async def scenario() -> dict:
+        token = set_request_context(build_request_context(user=None, tenant_id="t"))
+        try:
+            async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as http_client:
+                client = SafetyClient(http_client, base_url, service_name="safety", wire_format="msgpack")
+                return await client.check_input({"query": "hi"})
+        finally:
+            reset_request_context(token)
+
+    return asyncio.run(scenario())
+
+
+def test_msgpack_round_trip() -> None:
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["content-type"])
+        assert msgpack.unpackb(request.content) == {"query": "hi"}
+        return httpx.Response(200, content=msgpack.packb({"status": "allowed"}), headers={"content-type": "application/msgpack"})
+
+    assert _check(handler, "http://safety-msgpack") == {"status": "allowed"}
+    assert seen == ["application/msgpack"]
+
+
+def test_falls_back_to_json_after_415() -> None:
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request.headers["content-type"])
+        if request.headers["content-type"] == "application/msgpack":
+            return httpx.Response(415)
+        return httpx.Response(200, json={"status": "allowed"})
+
+    assert _check(handler, "http://safety-json-only") == {"status": "allowed"}
+    assert _check(handler, "http://safety-json-only") == {"status": "allowed"}
+    # the second call goes straight to JSON
+    assert seen == ["application/msgpack", "application/json", "application/json"]
+    assert "http://safety-json-only/" in base._msgpack_unsupported
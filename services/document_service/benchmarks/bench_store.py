@@ -0,0 +1,121 @@
+"""List/search latency of the document store as one tenant's library grows.
+
+Fills a fresh database step by step up to ``--docs`` documents for the measured
+tenant (plus ``--noise-docs`` for another tenant) and, at every size, times
+each query shape ``--queries`` times. Prints p50/p99 in milliseconds as JSON::
+
+    python benchmarks/bench_store.py --docs 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from document_service.core.store import DocumentStore  # noqa: E402
+
+WORDS = (
+    "orion ldap backup restore cluster admin guide network storage monitoring alert agent install upgrade "
+    "policy audit report license proxy certificate replication snapshot quota dashboard api integration "
+    "kerberos firewall metrics logging schedule migration"
+).split()
+PRODUCTS = ("Orion X", "Orion Y", "Orion Z", "Visior")
+STATUSES = ("indexed",) * 17 + ("processing", "uploaded", "failed")
+RARE_WORD = "zeppelin"
+
+
+def _documents(rng: random.Random, start: int, count: int) -> Iterator[Dict[str, Any]]:
+    for i in range(start, start + count):
+        words = rng.sample(WORDS, 4)
+        if i % 5000 == 0:
+            words.append(RARE_WORD)
+        yield {
+            "doc_id": f"doc_{i}",
+            "name": " ".join(words).title(),
+            "product": rng.choice(PRODUCTS),
+            "version": f"{rng.randint(1, 5)}.{rng.randint(0, 9)}",
+            "status": rng.choice(STATUSES),
+            "tags": rng.sample(WORDS, 2),
+        }
+
+
+def _deep_cursor(store: DocumentStore, tenant_id: str, pages: int) -> int | None:
+    cursor = None
+    for _ in range(pages):
+        _, cursor = store.list_documents(tenant_id, limit=50, cursor=cursor)
+        if cursor is None:
+            break
+    return cursor
+
+
+def _measure(fn: Callable[[], Any], queries: int) -> Dict[str, float]:
+    fn()  # warm the page cache
+    samples = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--steps", type=int, default=3, help="sizes measured: docs / 10**(steps-1) ... docs")
+    parser.add_argument("--noise-docs", type=int, default=20_000, help="documents of another tenant in the same file")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tenant = "tenant-bench"
+    sizes = sorted({max(1, args.docs // 10**step) for step in range(args.steps)})
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        store = DocumentStore(str(Path(tmp) / "bench.db"))
+        store.upsert_many("tenant-noise", _documents(rng, 0, args.noise_docs))
+        loaded = 0
+        for size in sizes:
+            started = time.perf_counter()
+            store.upsert_many(tenant, _documents(rng, loaded, size - loaded))
+            load_seconds = time.perf_counter() - started
+            loaded = size
+            deep = _deep_cursor(store, tenant, min(20, size // 50))
+            cases = {
+                "list_first_page": lambda: store.list_documents(tenant, limit=50),
+                "list_page_21": lambda: store.list_documents(tenant, limit=50, cursor=deep),
+                "list_status_failed": lambda: store.list_documents(tenant, status="failed", limit=50),
+                "list_product": lambda: store.list_documents(tenant, product="Visior", limit=50),
+                "list_tag": lambda: store.list_documents(tenant, tag="kerberos", limit=50),
+                "search_common": lambda: store.list_documents(tenant, search="orion", limit=50),
+                "search_two_prefixes": lambda: store.list_documents(tenant, search="ldap back", limit=50),
+                "search_rare": lambda: store.list_documents(tenant, search=RARE_WORD, limit=50),
+                "search_and_status": lambda: store.list_documents(tenant, search="backup", status="failed", limit=50),
+                "get_document": lambda: store.get_document(tenant, f"doc_{size // 2}"),
+            }
+            results.append(
+                {
+                    "tenant_docs": size,
+                    "load_seconds": round(load_seconds, 2),
+                    "cases": {name: _measure(fn, args.queries) for name, fn in cases.items()},
+                }
+            )
+        store.close()
+    print(json.dumps({"noise_docs": args.noise_docs, "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
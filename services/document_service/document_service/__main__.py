@@ -0,0 +1,12 @@
+import uvicorn
+
+from document_service.config import get_settings
+
+
+def main() -> None:
+    settings = get_settings()
+    uvicorn.run("document_service.main:app", host=settings.host, port=settings.port, log_level=settings.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,27 @@
+from functools import lru_cache
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="DOCUMENT_SERVICE_", env_file=".env", extra="ignore")
+
+    app_name: str = "document-service"
+    host: str = "0.0.0.0"
+    port: int = 8083
+    log_level: str = "info"
+
+    # SQLite database file; created with its indexes on first start
+    db_path: str = "documents.db"
+    default_page_size: int = 50
+    max_page_size: int = 500
+    batch_get_max_ids: int = 500
+
+    # read-through cache of single-document reads, invalidated on every write
+    cache_max_entries: int = 10000
+    cache_ttl_seconds: float = 30.0
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+from document_service.core.metrics import CACHE_REQUESTS
+
+V = TypeVar("V")
+
+_MISSING = object()
+
+
+class ReadThroughCache(Generic[V]):
+    """Bounded LRU with per-entry expiry in front of the store.
+
+    Handlers run in the threadpool, so access is guarded by a lock. Writers
+    call ``invalidate`` after committing; the TTL only bounds staleness for
+    writes made by another process against the same database file.
+    ``None`` results (unknown documents) are not cached, and a value loaded
+    while an invalidation happened is returned but not stored, so a read racing
+    a write cannot put the old row back.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 30.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return _MISSING
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return _MISSING
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, value: V, generation: Optional[int] = None) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Optional[V]]) -> Optional[V]:
+        value = self.get(key)
+        if value is not _MISSING:
+            CACHE_REQUESTS.labels("hit").inc()
+            return value
+        CACHE_REQUESTS.labels("miss").inc()
+        generation = self._generation
+        value = loader()
+        if value is not None:
+            self.put(key, value, generation)
+        return value
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+QUERY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+QUERY_DURATION = Histogram(
+    "document_query_duration_seconds",
+    "Store time per read operation (list, search, get, batch_get).",
+    ("operation",),
+    buckets=QUERY_BUCKETS,
+    registry=REGISTRY,
+)
+STATUS_UPDATES = Counter(
+    "document_status_total",
+    "Applied ingestion status updates by new status.",
+    ("status",),
+    registry=REGISTRY,
+)
+CACHE_REQUESTS = Counter(
+    "document_cache_requests_total",
+    "Single-document reads by cache result (hit / miss).",
+    ("result",),
+    registry=REGISTRY,
+)
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,398 @@
+"""SQLite-backed document metadata store.
+
+Every list query is answered from an index in ``id`` order (newest first) and
+stops after ``limit + 1`` rows, so a page costs the same whether the tenant
+has a hundred documents or a million:
+
+* no filter, ``status`` and ``product`` use partial indexes on
+  ``(tenant_id, [column,] id)`` that only contain live (not soft-deleted) rows;
+* ``tag`` walks ``document_tags``, a ``WITHOUT ROWID`` table keyed by
+  ``(tenant_id, tag, id)``;
+* ``search`` goes through the FTS5 table, which also indexes the tenant id as
+  a token, so the match is restricted to the tenant inside the full-text index.
+
+Pagination is keyset-based: the cursor is the last ``id`` of the previous page
+and the next page starts with ``id < cursor``. Deep pages cost the same as the
+first one, and rows inserted meanwhile never shift the pages being read.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from document_service.core.metrics import QUERY_DURATION, STATUS_UPDATES
+
+STATUSES = ("uploaded", "processing", "indexed", "failed")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    tenant_id TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    product TEXT,
+    version TEXT,
+    status TEXT NOT NULL,
+    error TEXT,
+    storage_uri TEXT,
+    pages INTEGER,
+    tags TEXT NOT NULL DEFAULT '[]',
+    created_at TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    deleted_at TEXT,
+    UNIQUE (tenant_id, doc_id)
+);
+CREATE INDEX IF NOT EXISTS documents_by_tenant
+    ON documents (tenant_id, id) WHERE deleted_at IS NULL;
+CREATE INDEX IF NOT EXISTS documents_by_status
+    ON documents (tenant_id, status, id) WHERE deleted_at IS NULL;
+CREATE INDEX IF NOT EXISTS documents_by_product
+    ON documents (tenant_id, product, id) WHERE deleted_at IS NULL;
+CREATE TABLE IF NOT EXISTS document_tags (
+    tenant_id TEXT NOT NULL,
+    tag TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    PRIMARY KEY (tenant_id, tag, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS document_tags_by_doc ON document_tags (id);
+CREATE TABLE IF NOT EXISTS document_sections (
+    id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    section_id TEXT NOT NULL,
+    title TEXT,
+    page_start INTEGER,
+    page_end INTEGER,
+    summary TEXT,
+    chunk_ids TEXT NOT NULL DEFAULT '[]',
+    PRIMARY KEY (id, position)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    tenant, name, tags, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3 4 5 6'
+);
+"""
+
+_COLUMNS = "d.id, d.doc_id, d.name, d.product, d.version, d.status, d.error, d.storage_uri, d.pages, d.tags, d.created_at, d.updated_at"
+_TERM = re.compile(r"\w+", re.UNICODE)
+# must match the fts5 ``prefix`` option: longer prefixes would make FTS5 merge
+# every matching term's full doclist, which grows with the library
+MAX_PREFIX = 6
+_IN_CHUNK = 500  # stays below SQLITE_MAX_VARIABLE_NUMBER on old builds
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _quote(value: str) -> str:
+    return '"' + value.replace('"', '""') + '"'
+
+
+def fts_query(tenant_id: str, search: str) -> Optional[str]:
+    """All words of ``search`` as prefixes, restricted to the tenant's token; ``None`` if no words.
+
+    Words are cut to ``MAX_PREFIX`` characters so that every prefix lookup is
+    served by a prefix index; "replication" therefore also matches "replicas".
+    Single characters are matched as whole words.
+    """
+
+    terms = _TERM.findall(search)
+    if not terms:
+        return None
+    words = " AND ".join(_quote(term) if len(term) < 2 else f"{_quote(term[:MAX_PREFIX])} *" for term in terms)
+    return f"tenant : {_quote(tenant_id)} AND {{name tags}} : ({words})"
+
+
+def _chunks(values: Sequence[str]) -> Iterator[Sequence[str]]:
+    for start in range(0, len(values), _IN_CHUNK):
+        yield values[start : start + _IN_CHUNK]
+
+
+def _row_to_item(row: sqlite3.Row) -> Dict[str, Any]:
+    return {
+        "doc_id": row["doc_id"],
+        "name": row["name"],
+        "status": row["status"],
+        "product": row["product"],
+        "version": row["version"],
+        "tags": json.loads(row["tags"]),
+        "error": row["error"],
+        "created_at": row["created_at"],
+        "updated_at": row["updated_at"],
+    }
+
+
+def build_list_query(
+    tenant_id: str,
+    status: Optional[str] = None,
+    product: Optional[str] = None,
+    tag: Optional[str] = None,
+    search: Optional[str] = None,
+    limit: int = 50,
+    cursor: Optional[int] = None,
+) -> Tuple[str, List[Any], str]:
+    """SQL, parameters and metric label of one list page; the driving index is picked by the filters."""
+
+    match = fts_query(tenant_id, search) if search else None
+    params: List[Any] = []
+    where = ["d.tenant_id = ?", "d.deleted_at IS NULL"]
+    if match is not None:
+        source = "documents_fts f JOIN documents d ON d.id = f.rowid"
+        where.insert(0, "documents_fts MATCH ?")
+        params.append(match)
+        order = "f.rowid"
+    elif tag:
+        source = "document_tags t JOIN documents d ON d.id = t.id"
+        where.insert(0, "t.tenant_id = ? AND t.tag = ?")
+        params.extend((tenant_id, tag))
+        order = "t.id"
+    else:
+        source = "documents d"
+        order = "d.id"
+    params.append(tenant_id)
+    if match is not None and tag:
+        where.append("EXISTS (SELECT 1 FROM document_tags t WHERE t.tenant_id = d.tenant_id AND t.tag = ? AND t.id = d.id)")
+        params.append(tag)
+    if status:
+        where.append("d.status = ?")
+        params.append(status)
+    if product:
+        where.append("d.product = ?")
+        params.append(product)
+    if cursor is not None:
+        where.append(f"{order} < ?")
+        params.append(cursor)
+    params.append(limit + 1)
+    sql = f"SELECT {_COLUMNS} FROM {source} WHERE {' AND '.join(where)} ORDER BY {order} DESC LIMIT ?"
+    return sql, params, "search" if match is not None else "list"
+
+
+class DocumentStore:
+    """Thread-safe store; each thread gets its own connection to the WAL-mode database."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+        with self._write_lock:
+            self._connection().executescript(SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30.0, isolation_level=None, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._connections.append(connection)
+        return connection
+
+    def close(self) -> None:
+        for connection in self._connections:
+            connection.close()
+        self._connections.clear()
+        self._local = threading.local()
+
+    # -- writes -----------------------------------------------------------------
+
+    def upsert_many(self, tenant_id: str, documents: Iterable[Dict[str, Any]]) -> int:
+        """Insert or replace documents (metadata, tags and optional sections) in one transaction."""
+
+        now = _now()
+        count = 0
+        with self._write_lock:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for document in documents:
+                    self._upsert(connection, tenant_id, document, now)
+                    count += 1
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return count
+
+    def _upsert(self, connection: sqlite3.Connection, tenant_id: str, document: Dict[str, Any], now: str) -> None:
+        tags = sorted({str(tag) for tag in document.get("tags") or []})
+        row = connection.execute(
+            """
+            INSERT INTO documents (tenant_id, doc_id, name, product, version, status, error, storage_uri, pages, tags, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (tenant_id, doc_id) DO UPDATE SET
+                name = excluded.name, product = excluded.product, version = excluded.version,
+                status = excluded.status, error = excluded.error, storage_uri = excluded.storage_uri,
+                pages = COALESCE(excluded.pages, documents.pages), tags = excluded.tags,
+                updated_at = excluded.updated_at, deleted_at = NULL
+            RETURNING id
+            """,
+            (
+                tenant_id,
+                document["doc_id"],
+                document["name"],
+                document.get("product"),
+                document.get("version"),
+                document.get("status") or "uploaded",
+                document.get("error"),
+                document.get("storage_uri"),
+                document.get("pages"),
+                json.dumps(tags, ensure_ascii=False),
+                document.get("created_at") or now,
+                now,
+            ),
+        ).fetchone()
+        rowid = row[0]
+        connection.execute("DELETE FROM document_tags WHERE id = ?", (rowid,))
+        connection.executemany(
+            "INSERT INTO document_tags (tenant_id, tag, id) VALUES (?, ?, ?)", [(tenant_id, tag, rowid) for tag in tags]
+        )
+        connection.execute("DELETE FROM documents_fts WHERE rowid = ?", (rowid,))
+        connection.execute(
+            "INSERT INTO documents_fts (rowid, tenant, name, tags) VALUES (?, ?, ?, ?)",
+            (rowid, tenant_id, document["name"], " ".join(tags)),
+        )
+        if document.get("sections") is not None:
+            self._replace_sections(connection, rowid, document["sections"])
+
+    @staticmethod
+    def _replace_sections(connection: sqlite3.Connection, rowid: int, sections: List[Dict[str, Any]]) -> None:
+        connection.execute("DELETE FROM document_sections WHERE id = ?", (rowid,))
+        connection.executemany(
+            """
+            INSERT INTO document_sections (id, position, section_id, title, page_start, page_end, summary, chunk_ids)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            [
+                (
+                    rowid,
+                    position,
+                    section["section_id"],
+                    section.get("title"),
+                    section.get("page_start"),
+                    section.get("page_end"),
+                    section.get("summary"),
+                    json.dumps(section.get("chunk_ids") or []),
+                )
+                for position, section in enumerate(sections)
+            ],
+        )
+
+    def update_statuses(self, tenant_id: str, updates: Sequence[Dict[str, Any]]) -> List[str]:
+        """Apply ingestion status updates in one transaction; returns doc ids that were not found."""
+
+        now = _now()
+        missing: List[str] = []
+        with self._write_lock:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                for update in updates:
+                    row = connection.execute(
+                        """
+                        UPDATE documents SET status = ?, error = ?, pages = COALESCE(?, pages), updated_at = ?
+                        WHERE tenant_id = ? AND doc_id = ? AND deleted_at IS NULL
+                        RETURNING id
+                        """,
+                        (update["status"], update.get("error"), update.get("pages"), now, tenant_id, update["doc_id"]),
+                    ).fetchone()
+                    if row is None:
+                        missing.append(update["doc_id"])
+                        continue
+                    if update.get("sections") is not None:
+                        self._replace_sections(connection, row[0], update["sections"])
+                    STATUS_UPDATES.labels(update["status"]).inc()
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return missing
+
+    def soft_delete(self, tenant_id: str, doc_id: str) -> bool:
+        with self._write_lock:
+            connection = self._connection()
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                row = connection.execute(
+                    "UPDATE documents SET deleted_at = ?, updated_at = ? WHERE tenant_id = ? AND doc_id = ? AND deleted_at IS NULL RETURNING id",
+                    (_now(), _now(), tenant_id, doc_id),
+                ).fetchone()
+                if row is not None:
+                    # the row stays for audit; drop it from the search paths that do not check deleted_at
+                    connection.execute("DELETE FROM document_tags WHERE id = ?", (row[0],))
+                    connection.execute("DELETE FROM documents_fts WHERE rowid = ?", (row[0],))
+                connection.execute("COMMIT")
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+        return row is not None
+
+    # -- reads ------------------------------------------------------------------
+
+    def list_documents(
+        self,
+        tenant_id: str,
+        status: Optional[str] = None,
+        product: Optional[str] = None,
+        tag: Optional[str] = None,
+        search: Optional[str] = None,
+        limit: int = 50,
+        cursor: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """One page, newest first, and the cursor of the next page (``None`` on the last page)."""
+
+        started = time.perf_counter()
+        sql, params, operation = build_list_query(tenant_id, status, product, tag, search, limit, cursor)
+        rows = self._connection().execute(sql, params).fetchall()
+        QUERY_DURATION.labels(operation).observe(time.perf_counter() - started)
+        next_cursor = rows[limit - 1]["id"] if len(rows) > limit else None
+        return [_row_to_item(row) for row in rows[:limit]], next_cursor
+
+    def get_document(self, tenant_id: str, doc_id: str) -> Optional[Dict[str, Any]]:
+        started = time.perf_counter()
+        connection = self._connection()
+        row = connection.execute(
+            f"SELECT {_COLUMNS} FROM documents d WHERE d.tenant_id = ? AND d.doc_id = ? AND d.deleted_at IS NULL",
+            (tenant_id, doc_id),
+        ).fetchone()
+        if row is None:
+            return None
+        document = _row_to_item(row)
+        document.update(tenant_id=tenant_id, pages=row["pages"], storage_uri=row["storage_uri"])
+        document["sections"] = [
+            {
+                "section_id": section["section_id"],
+                "title": section["title"],
+                "page_start": section["page_start"],
+                "page_end": section["page_end"],
+                "summary": section["summary"],
+                "chunk_ids": json.loads(section["chunk_ids"]),
+            }
+            for section in connection.execute(
+                "SELECT * FROM document_sections WHERE id = ? ORDER BY position", (row["id"],)
+            )
+        ]
+        QUERY_DURATION.labels("get").observe(time.perf_counter() - started)
+        return document
+
+    def get_many(self, tenant_id: str, doc_ids: Sequence[str]) -> List[Dict[str, Any]]:
+        """List items (no sections) for the given ids; unknown ids are left out."""
+
+        started = time.perf_counter()
+        connection = self._connection()
+        found: List[Dict[str, Any]] = []
+        for chunk in _chunks(list(doc_ids)):
+            rows = connection.execute(
+                f"SELECT {_COLUMNS} FROM documents d "
+                f"WHERE d.tenant_id = ? AND d.doc_id IN ({','.join('?' * len(chunk))}) AND d.deleted_at IS NULL",
+                (tenant_id, *chunk),
+            )
+            found.extend({**_row_to_item(row), "pages": row["pages"]} for row in rows)
+        QUERY_DURATION.labels("batch_get").observe(time.perf_counter() - started)
+        return found
@@ -0,0 +1,50 @@
+from typing import Any, Dict, Optional
+
+from fastapi import Depends, Header, HTTPException, Query, status
+
+from document_service.config import Settings, get_settings
+from document_service.core.cache import ReadThroughCache
+from document_service.core.store import DocumentStore
+
+_store: Optional[DocumentStore] = None
+_cache: Optional[ReadThroughCache[Dict[str, Any]]] = None
+
+
+def get_store(settings: Settings = Depends(get_settings)) -> DocumentStore:
+    global _store
+    if _store is None or _store.path != settings.db_path:
+        if _store is not None:
+            _store.close()
+        _store = DocumentStore(settings.db_path)
+    return _store
+
+
+def get_document_cache(settings: Settings = Depends(get_settings)) -> ReadThroughCache[Dict[str, Any]]:
+    global _cache
+    if _cache is None:
+        _cache = ReadThroughCache(settings.cache_max_entries, settings.cache_ttl_seconds)
+    return _cache
+
+
+def close_store() -> None:
+    global _store, _cache
+    if _store is not None:
+        _store.close()
+        _store = None
+    _cache = None
+
+
+def get_tenant_id(
+    x_tenant_id: Optional[str] = Header(default=None, alias="X-Tenant-ID"),
+    tenant_id: Optional[str] = Query(default=None),
+) -> str:
+    """Tenant from the gateway header; a ``tenant_id`` query parameter must agree with it."""
+
+    if not x_tenant_id:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail={"code": "missing_tenant", "reason": "X-Tenant-ID header is required"},
+        )
+    if tenant_id is not None and tenant_id != x_tenant_id:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail={"code": "tenant_mismatch"})
+    return x_tenant_id
@@ -0,0 +1,27 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from document_service.config import get_settings
+from document_service.dependencies import close_store
+from document_service.logging import configure_logging
+from document_service.routers import documents, metrics
+
+settings = get_settings()
+configure_logging(settings.log_level)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    close_store()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app.include_router(documents.router)
+app.include_router(metrics.router)
+
+
+@app.get("/health", tags=["health"])
+async def health() -> dict[str, str]:
+    return {"status": "ok"}
@@ -0,0 +1,3 @@
+from . import documents, metrics
+
+__all__ = ["documents", "metrics"]
@@ -0,0 +1,145 @@
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from document_service.config import Settings, get_settings
+from document_service.core.cache import ReadThroughCache
+from document_service.core.store import DocumentStore
+from document_service.dependencies import get_document_cache, get_store, get_tenant_id
+from document_service.schemas import (
+    BatchGetRequest,
+    BatchGetResponse,
+    DocumentDetail,
+    DocumentItem,
+    DocumentUpsert,
+    Section,
+    StatusBatch,
+    StatusRequest,
+    StatusUpdateResult,
+)
+
+router = APIRouter(prefix="/internal/documents", tags=["documents"])
+
+# Handlers are plain functions on purpose: SQLite calls block, so FastAPI runs them in its threadpool.
+
+
+def _not_found(doc_id: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"code": "document_not_found", "doc_id": doc_id})
+
+
+@router.get("", response_model=List[DocumentItem])
+@router.get("/list", response_model=List[DocumentItem], include_in_schema=False)
+def list_documents(
+    response: Response,
+    status_filter: Optional[str] = Query(default=None, alias="status"),
+    product: Optional[str] = Query(default=None),
+    tag: Optional[str] = Query(default=None),
+    search: Optional[str] = Query(default=None),
+    limit: Optional[int] = Query(default=None, ge=1),
+    cursor: Optional[int] = Query(default=None),
+    tenant_id: str = Depends(get_tenant_id),
+    store: DocumentStore = Depends(get_store),
+    settings: Settings = Depends(get_settings),
+) -> List[Dict[str, Any]]:
+    """One page, newest first; ``X-Next-Cursor`` carries the ``cursor`` of the next page."""
+
+    page_size = min(limit or settings.default_page_size, settings.max_page_size)
+    items, next_cursor = store.list_documents(
+        tenant_id, status=status_filter, product=product, tag=tag, search=search, limit=page_size, cursor=cursor
+    )
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = str(next_cursor)
+    return items
+
+
+@router.post("/status", response_model=StatusUpdateResult)
+def update_statuses(
+    payload: StatusRequest,
+    tenant_id: str = Depends(get_tenant_id),
+    store: DocumentStore = Depends(get_store),
+    cache: ReadThroughCache = Depends(get_document_cache),
+) -> StatusUpdateResult:
+    """Apply one update or ``{"updates": [...]}`` in a single transaction."""
+
+    updates = payload.updates if isinstance(payload, StatusBatch) else [payload]
+    missing = store.update_statuses(tenant_id, [update.model_dump(exclude_none=True) for update in updates])
+    for update in updates:
+        cache.invalidate((tenant_id, update.doc_id))
+    return StatusUpdateResult(updated=len(updates) - len(missing), missing=missing)
+
+
+@router.post("/batchGet", response_model=BatchGetResponse)
+def batch_get(
+    payload: BatchGetRequest,
+    tenant_id: str = Depends(get_tenant_id),
+    store: DocumentStore = Depends(get_store),
+    settings: Settings = Depends(get_settings),
+) -> Dict[str, Any]:
+    doc_ids = list(dict.fromkeys(payload.doc_ids))
+    if len(doc_ids) > settings.batch_get_max_ids:
+        raise HTTPException(status_code=422, detail={"code": "too_many_doc_ids", "max": settings.batch_get_max_ids})
+    return {"documents": store.get_many(tenant_id, doc_ids)}
+
+
+@router.get("/{doc_id}", response_model=DocumentDetail)
+def get_document(
+    doc_id: str,
+    tenant_id: str = Depends(get_tenant_id),
+    store: DocumentStore = Depends(get_store),
+    cache: ReadThroughCache = Depends(get_document_cache),
+) -> Dict[str, Any]:
+    document = cache.get_or_load((tenant_id, doc_id), lambda: store.get_document(tenant_id, doc_id))
+    if document is None:
+        raise _not_found(doc_id)
+    return document
+
+
+@router.put("/{doc_id}", response_model=DocumentDetail)
+def upsert_document(
+    doc_id: str,
+    payload: DocumentUpsert,
+    tenant_id: str = Depends(get_tenant_id),
+    store: DocumentStore = Depends(get_store),
+    cache: ReadThroughCache = Depends(get_document_cache),
+) -> Dict[str, Any]:
+    store.upsert_many(tenant_id, [{"doc_id": doc_id, **payload.model_dump(exclude_none=True)}])
+    cache.invalidate((tenant_id, doc_id))
+    document = store.get_document(tenant_id, doc_id)
+    if document is None:  # pragma: no cover - deleted concurrently
+        raise _not_found(doc_id)
+    return document
+
+
+@router.delete("/{doc_id}", status_code=204)
+def delete_document(
+    doc_id: str,
+    tenant_id: str = Depends(get_tenant_id),
+    store: DocumentStore = Depends(get_store),
+    cache: ReadThroughCache = Depends(get_document_cache),
+) -> Response:
+    """Soft delete: the row is kept with ``deleted_at`` but disappears from every read."""
+
+    if not store.soft_delete(tenant_id, doc_id):
+        raise _not_found(doc_id)
+    cache.invalidate((tenant_id, doc_id))
+    return Response(status_code=204)
+
+
+@router.get("/{doc_id}/sections/{section_id}", response_model=Section)
+def get_section(
+    doc_id: str,
+    section_id: str,
+    tenant_id: str = Depends(get_tenant_id),
+    store: DocumentStore = Depends(get_store),
+    cache: ReadThroughCache = Depends(get_document_cache),
+) -> Dict[str, Any]:
+    document = cache.get_or_load((tenant_id, doc_id), lambda: store.get_document(tenant_id, doc_id))
+    if document is None:
+        raise _not_found(doc_id)
+    for section in document["sections"]:
+        if section["section_id"] == section_id:
+            return section
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail={"code": "section_not_found", "doc_id": doc_id, "section_id": section_id},
+    )
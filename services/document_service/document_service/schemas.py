@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import List, Literal, Optional, Union
+
+from pydantic import BaseModel, Field
+
+DocumentStatus = Literal["uploaded", "processing", "indexed", "failed"]
+
+
+class Section(BaseModel):
+    section_id: str
+    title: Optional[str] = None
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    summary: Optional[str] = None
+    chunk_ids: List[str] = Field(default_factory=list)
+
+
+class DocumentItem(BaseModel):
+    doc_id: str
+    name: str
+    status: str
+    product: Optional[str] = None
+    version: Optional[str] = None
+    tags: List[str] = Field(default_factory=list)
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+class DocumentDetail(DocumentItem):
+    tenant_id: str
+    pages: Optional[int] = None
+    storage_uri: Optional[str] = None
+    sections: List[Section] = Field(default_factory=list)
+
+
+class DocumentUpsert(BaseModel):
+    name: str
+    product: Optional[str] = None
+    version: Optional[str] = None
+    status: DocumentStatus = "uploaded"
+    tags: List[str] = Field(default_factory=list)
+    storage_uri: Optional[str] = None
+    pages: Optional[int] = None
+    sections: Optional[List[Section]] = None
+
+
+class StatusUpdate(BaseModel):
+    doc_id: str
+    status: DocumentStatus
+    error: Optional[str] = None
+    pages: Optional[int] = None
+    # parse results from ingestion replace the stored sections when present
+    sections: Optional[List[Section]] = None
+
+
+class StatusBatch(BaseModel):
+    updates: List[StatusUpdate] = Field(min_length=1)
+
+
+class StatusUpdateResult(BaseModel):
+    updated: int
+    missing: List[str] = Field(default_factory=list)
+
+
+class BatchGetRequest(BaseModel):
+    doc_ids: List[str] = Field(min_length=1)
+
+
+class BatchGetResponse(BaseModel):
+    documents: List[DocumentItem]
+
+
+StatusRequest = Union[StatusBatch, StatusUpdate]
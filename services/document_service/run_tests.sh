@@ -0,0 +1,4 @@
+#!/usr/bin/env bash
+set -Eeuo pipefail
+cd "$(dirname "$0")"
+python -m pytest "$@"
@@ -0,0 +1,69 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from document_service.config import Settings, get_settings
+from document_service.dependencies import close_store
+from document_service.main import app
+
+HEADERS = {"X-Tenant-ID": "tenant-a", "X-Request-ID": "trace-1"}
+
+
+@pytest.fixture
+def client(tmp_path):
+    app.dependency_overrides[get_settings] = lambda: Settings(db_path=str(tmp_path / "documents.db"), default_page_size=2)
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        app.dependency_overrides.clear()
+        close_store()
+
+
+def _put(client, doc_id: str, **fields) -> None:
+    body = {"name": f"Guide {doc_id}", "tags": ["ldap"], **fields}
+    assert client.put(f"/internal/documents/{doc_id}", json=body, headers=HEADERS).status_code == 200
+
+
+def test_list_pages_with_cursor_header(client) -> None:
+    for doc_id in ("a", "b", "c"):
+        _put(client, doc_id)
+    first = client.get("/internal/documents/list", params={"tenant_id": "tenant-a"}, headers=HEADERS)
+    assert [item["doc_id"] for item in first.json()] == ["c", "b"]
+    second = client.get("/internal/documents", params={"cursor": first.headers["X-Next-Cursor"]}, headers=HEADERS)
+    assert [item["doc_id"] for item in second.json()] == ["a"]
+    assert "X-Next-Cursor" not in second.headers
+
+    assert client.get("/internal/documents").status_code == 400
+    assert client.get("/internal/documents", params={"tenant_id": "other"}, headers=HEADERS).status_code == 403
+
+
+def test_status_updates_invalidate_cached_detail(client) -> None:
+    _put(client, "a", sections=[{"section_id": "intro", "title": "Введение", "page_start": 1, "page_end": 3}])
+    assert client.get("/internal/documents/a", headers=HEADERS).json()["status"] == "uploaded"
+    single = client.post("/internal/documents/status", json={"doc_id": "a", "status": "processing"}, headers=HEADERS)
+    assert single.json() == {"updated": 1, "missing": []}
+    assert client.get("/internal/documents/a", headers=HEADERS).json()["status"] == "processing"
+    batch = client.post(
+        "/internal/documents/status",
+        json={"updates": [{"doc_id": "a", "status": "indexed", "pages": 142}, {"doc_id": "zz", "status": "failed"}]},
+        headers=HEADERS,
+    )
+    assert batch.json() == {"updated": 1, "missing": ["zz"]}
+    detail = client.get("/internal/documents/a", headers=HEADERS).json()
+    assert (detail["status"], detail["pages"], detail["tenant_id"]) == ("indexed", 142, "tenant-a")
+    section = client.get("/internal/documents/a/sections/intro", headers=HEADERS)
+    assert section.json()["title"] == "Введение"
+    assert client.get("/internal/documents/a/sections/nope", headers=HEADERS).status_code == 404
+    assert client.get("/internal/documents/a", headers={"X-Tenant-ID": "tenant-b"}).status_code == 404
+    assert client.post("/internal/documents/status", json={"doc_id": "a", "status": "done"}, headers=HEADERS).status_code == 422
+
+
+def test_batch_get_and_delete(client) -> None:
+    _put(client, "a")
+    _put(client, "b")
+    response = client.post("/internal/documents/batchGet", json={"doc_ids": ["b", "missing", "b"]}, headers=HEADERS)
+    assert [doc["doc_id"] for doc in response.json()["documents"]] == ["b"]
+    assert client.delete("/internal/documents/a", headers=HEADERS).status_code == 204
+    assert client.get("/internal/documents/a", headers=HEADERS).status_code == 404
+    assert client.delete("/internal/documents/a", headers=HEADERS).status_code == 404
+    assert b"document_query_duration_seconds" in client.get("/metrics").content
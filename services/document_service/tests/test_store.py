@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+
+from document_service.core.cache import ReadThroughCache
+from document_service.core.store import DocumentStore, build_list_query, fts_query
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = DocumentStore(str(tmp_path / "documents.db"))
+    yield store
+    store.close()
+
+
+def _seed(store: DocumentStore, tenant_id: str, count: int) -> None:
+    store.upsert_many(
+        tenant_id,
+        (
+            {
+                "doc_id": f"doc_{i}",
+                "name": f"Orion {'LDAP' if i % 2 else 'Backup'} Guide {i}",
+                "product": "Orion X" if i % 3 else "Orion Y",
+                "status": "indexed" if i % 4 else "failed",
+                "tags": ["admin", f"t{i % 5}"],
+            }
+            for i in range(count)
+        ),
+    )
+
+
+def _plan(store: DocumentStore, **filters) -> str:
+    sql, params, _ = build_list_query("tenant-a", **filters)
+    return " | ".join(row["detail"] for row in store._connection().execute(f"EXPLAIN QUERY PLAN {sql}", params))
+
+
+def test_keyset_pagination_walks_every_document_once(store) -> None:
+    _seed(store, "tenant-a", 23)
+    seen = []
+    cursor = None
+    while True:
+        items, cursor = store.list_documents("tenant-a", limit=5, cursor=cursor)
+        seen.extend(item["doc_id"] for item in items)
+        if cursor is None:
+            break
+    assert seen == [f"doc_{i}" for i in reversed(range(23))]
+
+
+def test_filters_and_search_are_tenant_scoped(store) -> None:
+    _seed(store, "tenant-a", 20)
+    _seed(store, "tenant-b", 20)
+    failed, _ = store.list_documents("tenant-a", status="failed", limit=100)
+    assert {item["doc_id"] for item in failed} == {f"doc_{i}" for i in range(0, 20, 4)}
+    tagged, _ = store.list_documents("tenant-a", tag="t2", product="Orion X", limit=100)
+    assert {item["doc_id"] for item in tagged} == {"doc_2", "doc_7", "doc_17"}
+    found, _ = store.list_documents("tenant-a", search="ldap gui", limit=100)
+    assert len(found) == 10 and all("LDAP" in item["name"] for item in found)
+    # search never matches the tenant column itself
+    assert store.list_documents("tenant-a", search="tenant", limit=100)[0] == []
+    assert fts_query("t", "  !! ") is None
+    # long words are cut to the longest prefix index
+    assert fts_query("t", "x replication") == 'tenant : "t" AND {name tags} : ("x" AND "replic" *)'
+
+
+def test_every_filter_is_served_by_an_index(store) -> None:
+    assert "documents_by_tenant" in _plan(store)
+    assert "documents_by_status" in _plan(store, status="indexed")
+    assert "documents_by_product" in _plan(store, product="Orion X")
+    assert all("TEMP B-TREE" not in _plan(store, **filters) for filters in ({}, {"status": "failed"}, {"tag": "admin"}))
+    assert "SEARCH t USING PRIMARY KEY (tenant_id=? AND tag=? AND id<?)" in _plan(store, tag="admin", cursor=10)
+    plan = _plan(store, search="ldap", status="failed")
+    assert "VIRTUAL TABLE" in plan and "TEMP B-TREE" not in plan
+
+
+def test_status_batch_sections_and_soft_delete(store) -> None:
+    _seed(store, "tenant-a", 3)
+    missing = store.update_statuses(
+        "tenant-a",
+        [
+            {"doc_id": "doc_1", "status": "processing"},
+            {"doc_id": "doc_2", "status": "indexed", "pages": 12, "sections": [{"section_id": "s1", "chunk_ids": ["c1"]}]},
+            {"doc_id": "nope", "status": "failed", "error": "parse"},
+        ],
+    )
+    assert missing == ["nope"]
+    assert store.get_document("tenant-a", "doc_1")["status"] == "processing"
+    detail = store.get_document("tenant-a", "doc_2")
+    assert detail["pages"] == 12 and detail["sections"][0]["chunk_ids"] == ["c1"]
+    assert store.get_document("tenant-b", "doc_2") is None
+
+    assert store.soft_delete("tenant-a", "doc_2")
+    assert not store.soft_delete("tenant-a", "doc_2")
+    assert store.get_document("tenant-a", "doc_2") is None
+    assert "doc_2" not in {item["doc_id"] for item in store.list_documents("tenant-a", tag="admin")[0]}
+    assert [doc["doc_id"] for doc in store.get_many("tenant-a", ["doc_0", "doc_2", "x"])] == ["doc_0"]
+
+
+def test_concurrent_readers_and_writer(store) -> None:
+    _seed(store, "tenant-a", 50)
+    errors = []
+
+    def read() -> None:
+        try:
+            for _ in range(50):
+                store.list_documents("tenant-a", search="orion", limit=10)
+        except Exception as exc:  # pragma: no cover - surfaced below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=read) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for i in range(20):
+        store.update_statuses("tenant-a", [{"doc_id": f"doc_{i}", "status": "processing"}])
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_read_through_cache_skips_stale_fill_after_invalidate() -> None:
+    cache = ReadThroughCache(max_entries=2, ttl=60)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        cache.invalidate("k")  # a write commits while this read is in flight
+        return {"v": len(loads)}
+
+    assert cache.get_or_load("k", loader) == {"v": 1}
+    assert cache.get_or_load("k", lambda: {"v": 2}) == {"v": 2}
+    assert cache.get_or_load("k", lambda: {"v": 3}) == {"v": 2}
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert len(cache) == 2
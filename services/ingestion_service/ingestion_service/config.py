@@ -0,0 +1,57 @@
+from functools import lru_cache
+from typing import List, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="INGESTION_SERVICE_", env_file=".env", extra="ignore")
+
+    app_name: str = "ingestion-service"
+    host: str = "0.0.0.0"
+    port: int = 8084
+    log_level: str = "info"
+
+    # uploads are spooled here; index output goes to index_dir/<tenant>/<doc_id>/
+    spool_dir: str = "ingestion_spool"
+    index_dir: str = "ingestion_index"
+    max_file_size_mb: int = 100
+    max_pages: int = 2000
+
+    # process pool for parsing and chunking, 0 = one per CPU
+    workers: int = 0
+    # documents parsed concurrently; the rest wait in the admission queue
+    max_active_documents: int = 8
+    pdf_pages_per_task: int = 16
+
+    max_section_tokens: int = 2000
+    chunk_size_tokens: int = 400
+    # token counts stored per chunk: "words", "tiktoken:<encoding>" or "hf:<model>"; see core/tokenizers.py
+    token_count_tokenizers: List[str] = ["words"]
+    summary_max_tokens: int = 256
+    doc_summary_sections: int = 3
+
+    # bounded hand-off between stages, per document
+    stage_queue_per_document: int = 8
+    summarize_batch_size: int = 16
+    embed_batch_size: int = 128
+    batch_window_ms: float = 20.0
+
+    # "hashing" / "extractive" stubs, "llm" (LLM service) or "package.module:Class"
+    embedder: str = "hashing"
+    embedding_dim: int = 384
+    summarizer: str = "extractive"
+    llm_service_url: Optional[str] = None
+    llm_concurrency: int = 8
+
+    # SQLite file of summaries and embeddings keyed by text hash; empty disables it
+    content_cache_path: Optional[str] = "ingestion_cache.db"
+    content_cache_max_entries: int = 1_000_000
+
+    # POST /internal/documents/status on the document service when set
+    document_service_url: Optional[str] = None
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
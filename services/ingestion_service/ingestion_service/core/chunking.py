@@ -0,0 +1,188 @@
+"""Sectionizer and chunker.
+
+``Sectionizer`` runs in the event loop and only looks at line starts, so it
+stays cheap. ``chunk_section`` does the per-character work (normalization,
+token counting, splitting) and runs in the process pool, one section per task.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from ingestion_service.core.parsing import Page
+from ingestion_service.core.tokenizers import count_tokens, token_counts
+
+NUMBERED_HEADING = re.compile(r"^\s*(\d+(?:\.\d+){0,5})\.?\s+([A-ZА-ЯЁ][^\n]{0,118})$")
+MARKDOWN_HEADING = re.compile(r"^\s*#{1,6}\s+(\S[^\n]{0,150})$")
+SENTENCE_END = re.compile(r"(?<=[.!?…])\s+")
+_SLUG = re.compile(r"\w+")
+
+
+def normalize_text(text: str) -> str:
+    text = text.replace("\u00ad", "")
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)  # words hyphenated across lines
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    text = re.sub(r" *\n *", "\n", text)
+    return re.sub(r"\n{3,}", "\n\n", text).strip()
+
+
+def heading_title(line: str) -> Optional[str]:
+    match = MARKDOWN_HEADING.match(line)
+    if match:
+        return match.group(1).strip()
+    match = NUMBERED_HEADING.match(line)
+    if match and not line.rstrip().endswith((".", ",", ";", ":")):
+        return f"{match.group(1)} {match.group(2).strip()}"
+    return None
+
+
+@dataclass
+class Section:
+    section_id: str
+    title: str
+    page_start: int
+    page_end: int
+    paragraphs: List[Tuple[int, str]] = field(default_factory=list)  # (page, text)
+
+    @property
+    def text(self) -> str:
+        return "\n\n".join(text for _, text in self.paragraphs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class Sectionizer:
+    """Turn a page stream into sections at headings; oversized sections are split into parts."""
+
+    def __init__(self, max_section_tokens: int = 2000, default_title: str = "") -> None:
+        self.max_section_tokens = max_section_tokens
+        self.default_title = default_title
+        self._ids: Set[str] = set()
+        self._current: Optional[Section] = None
+        self._tokens = 0
+        self._paragraph: List[str] = []
+        self._paragraph_page = 1
+
+    def feed(self, page: Page) -> Iterator[Section]:
+        for line in page.text.splitlines():
+            title = heading_title(line)
+            if title is not None:
+                yield from self._close_paragraph()
+                yield from self._close_section()
+                self._current = self._new_section(title, page.number)
+            elif line.strip():
+                if not self._paragraph:
+                    self._paragraph_page = page.number
+                self._paragraph.append(line)
+            else:
+                yield from self._close_paragraph()
+        # paragraphs do not continue across page breaks in the parsed text we get
+        yield from self._close_paragraph()
+
+    def finish(self) -> Iterator[Section]:
+        yield from self._close_paragraph()
+        yield from self._close_section()
+
+    def _new_section(self, title: str, page: int) -> Section:
+        base = "sec_" + ("_".join(_SLUG.findall(title.lower()))[:40] or str(len(self._ids) + 1))
+        section_id = base
+        suffix = 2
+        while section_id in self._ids:
+            section_id = f"{base}_{suffix}"
+            suffix += 1
+        self._ids.add(section_id)
+        self._tokens = 0
+        return Section(section_id, title, page, page)
+
+    def _close_paragraph(self) -> Iterator[Section]:
+        if not self._paragraph:
+            return
+        text = "\n".join(self._paragraph)
+        self._paragraph = []
+        if self._current is None:
+            self._current = self._new_section(self.default_title, self._paragraph_page)
+        tokens = count_tokens(text)
+        if self._current.paragraphs and self._tokens + tokens > self.max_section_tokens:
+            title = self._current.title
+            yield from self._close_section()
+            self._current = self._new_section(title, self._paragraph_page)
+        self._current.paragraphs.append((self._paragraph_page, text))
+        self._current.page_end = self._paragraph_page
+        self._tokens += tokens
+
+    def _close_section(self) -> Iterator[Section]:
+        section, self._current = self._current, None
+        if section is not None and section.paragraphs:
+            yield section
+
+
+def _split_paragraph(text: str, budget: int) -> List[str]:
+    """Split an oversized paragraph at sentence ends, then at word boundaries."""
+
+    pieces: List[str] = []
+    current: List[str] = []
+    current_tokens = 0
+    for sentence in SENTENCE_END.split(text):
+        tokens = count_tokens(sentence)
+        if tokens > budget:
+            words = sentence.split()
+            step = max(1, len(words) * budget // max(tokens, 1))
+            for start in range(0, len(words), step):
+                pieces.append(" ".join(words[start : start + step]))
+            continue
+        if current and current_tokens + tokens > budget:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += tokens
+    if current:
+        pieces.append(" ".join(current))
+    return pieces
+
+
+def chunk_section(section: Dict[str, Any], chunk_tokens: int = 400, tokenizers: Sequence[str] = ()) -> List[Dict[str, Any]]:
+    """Merge small paragraphs and split large ones into ~``chunk_tokens`` chunks (runs in a worker).
+
+    Each chunk also gets its ``token_counts`` under every name in ``tokenizers``
+    (see ``ingestion_service.core.tokenizers``).
+    """
+
+    chunks: List[Dict[str, Any]] = []
+    buffer: List[str] = []
+    buffer_tokens = 0
+    pages: List[int] = []
+
+    def flush() -> None:
+        nonlocal buffer, buffer_tokens, pages
+        if buffer:
+            text = "\n\n".join(buffer)
+            chunks.append(
+                {
+                    "chunk_id": f"ch_{section['section_id']}_{len(chunks)}",
+                    "section_id": section["section_id"],
+                    "text": text,
+                    "tokens": buffer_tokens,
+                    "token_counts": token_counts(text, tokenizers),
+                    "page_start": min(pages),
+                    "page_end": max(pages),
+                }
+            )
+        buffer, buffer_tokens, pages = [], 0, []
+
+    for page, raw in section["paragraphs"]:
+        text = normalize_text(raw)
+        if not text:
+            continue
+        tokens = count_tokens(text)
+        pieces = [(text, tokens)] if tokens <= chunk_tokens else [(piece, count_tokens(piece)) for piece in _split_paragraph(text, chunk_tokens)]
+        for piece, piece_tokens in pieces:
+            if buffer and buffer_tokens + piece_tokens > chunk_tokens:
+                flush()
+            buffer.append(piece)
+            buffer_tokens += piece_tokens
+            pages.append(page)
+    flush()
+    return chunks
@@ -0,0 +1,129 @@
+"""Content-addressed cache of embeddings and summaries.
+
+Entries are keyed by the hash of the whitespace-normalized input text and
+the id of the model that produced them. Any document, or any version of a
+document, that contains the same text reuses the result. The cache lives in
+one SQLite file, so it survives restarts: a re-upload a week later still
+hits. The least recently used entries are pruned once the file holds more
+than ``max_entries`` rows.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import sqlite3
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, Sequence, Tuple
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS summaries (
+    model TEXT NOT NULL,
+    text_hash TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (model, text_hash)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS embeddings_by_use ON embeddings (last_used);
+CREATE INDEX IF NOT EXISTS summaries_by_use ON summaries (last_used);
+"""
+# SQLite's default limit on bound parameters is 999 in older builds
+LOOKUP_CHUNK = 400
+PRUNE_EVERY = 1000
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(" ".join(text.split()).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ContentCache:
+    def __init__(self, path: str, max_entries: int = 1_000_000) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._inserted = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _get(self, table: str, column: str, model: str, hashes: Sequence[str]) -> Dict[str, object]:
+        found: Dict[str, object] = {}
+        unique = list(dict.fromkeys(hashes))
+        now = int(time.time())
+        with self._lock:
+            for start in range(0, len(unique), LOOKUP_CHUNK):
+                part = unique[start : start + LOOKUP_CHUNK]
+                marks = ",".join("?" * len(part))
+                rows = self._conn.execute(
+                    f"SELECT text_hash, {column} FROM {table} WHERE model = ? AND text_hash IN ({marks})", (model, *part)
+                ).fetchall()
+                found.update(rows)
+            if found:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    f"UPDATE {table} SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(now, model, text_hash) for text_hash in found],
+                )
+                self._conn.execute("COMMIT")
+        return found
+
+    def _put(self, table: str, column: str, model: str, entries: Iterable[Tuple[str, object]]) -> None:
+        now = int(time.time())
+        rows = [(model, text_hash, value, now) for text_hash, value in entries]
+        if not rows:
+            return
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(f"INSERT OR REPLACE INTO {table} (model, text_hash, {column}, last_used) VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute("COMMIT")
+            self._inserted += len(rows)
+            if self._inserted >= PRUNE_EVERY:
+                self._inserted = 0
+                self._prune()
+
+    def _prune(self) -> None:
+        for table in ("embeddings", "summaries"):
+            (count,) = self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()
+            if count > self.max_entries:
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE (model, text_hash) IN "
+                    f"(SELECT model, text_hash FROM {table} ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def get_embeddings(self, model: str, hashes: Sequence[str]) -> Dict[str, array]:
+        vectors: Dict[str, array] = {}
+        for text_hash, blob in self._get("embeddings", "vector", model, hashes).items():
+            vector = array("f")
+            vector.frombytes(blob)  # type: ignore[arg-type]
+            vectors[text_hash] = vector
+        return vectors
+
+    def put_embeddings(self, model: str, entries: Iterable[Tuple[str, array]]) -> None:
+        self._put("embeddings", "vector", model, ((text_hash, vector.tobytes()) for text_hash, vector in entries))
+
+    def get_summaries(self, model: str, hashes: Sequence[str]) -> Dict[str, str]:
+        return {key: str(value) for key, value in self._get("summaries", "summary", model, hashes).items()}
+
+    def put_summaries(self, model: str, entries: Iterable[Tuple[str, str]]) -> None:
+        self._put("summaries", "summary", model, entries)
+
+    def size(self) -> Dict[str, int]:
+        with self._lock:
+            return {table: self._conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] for table in ("embeddings", "summaries")}
+
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Generic, Hashable, List, TypeVar
+
+T = TypeVar("T")
+
+
+class FairBatchQueue(Generic[T]):
+    """Hand-off between two pipeline stages, bounded per document and drained round-robin.
+
+    ``put`` blocks only the producing document once it has ``per_key`` items
+    waiting, so a 500-page manual cannot fill the queue and stall small uploads.
+    ``get_batch`` takes one item per document per pass, so every document with
+    pending work is in the next batch.
+    """
+
+    def __init__(self, per_key: int = 8) -> None:
+        self.per_key = per_key
+        self._items: "OrderedDict[Hashable, Deque[T]]" = OrderedDict()
+        self._size = 0
+        self._changed = asyncio.Condition()
+
+    def qsize(self) -> int:
+        return self._size
+
+    async def put(self, key: Hashable, item: T) -> None:
+        async with self._changed:
+            await self._changed.wait_for(lambda: len(self._items.get(key, ())) < self.per_key)
+            self._items.setdefault(key, deque()).append(item)
+            self._size += 1
+            self._changed.notify_all()
+
+    async def discard(self, key: Hashable) -> int:
+        """Drop everything queued for ``key`` (failed document); returns the number of items dropped."""
+
+        async with self._changed:
+            dropped = self._items.pop(key, None) or ()
+            self._size -= len(dropped)
+            self._changed.notify_all()
+            return len(dropped)
+
+    async def get_batch(self, max_cost: int, window: float = 0.0, cost: Callable[[T], int] = lambda item: 1) -> List[T]:
+        """Wait for work, give other producers up to ``window`` seconds to add more, then drain fairly.
+
+        At least one item is returned even if it alone exceeds ``max_cost``.
+        """
+
+        async with self._changed:
+            await self._changed.wait_for(lambda: self._size > 0)
+            if window > 0 and self._size < max_cost:
+                try:
+                    await asyncio.wait_for(self._changed.wait_for(lambda: self._size >= max_cost), window)
+                except asyncio.TimeoutError:
+                    pass
+            batch: List[T] = []
+            used = 0
+            while self._items and used < max_cost:
+                for key in list(self._items):
+                    queue = self._items[key]
+                    item = queue[0]
+                    if batch and used + cost(item) > max_cost:
+                        used = max_cost
+                        break
+                    queue.popleft()
+                    batch.append(item)
+                    used += cost(item)
+                    self._size -= 1
+                    if queue:
+                        self._items.move_to_end(key)  # the next batch starts with another document
+                    else:
+                        del self._items[key]
+                    if used >= max_cost:
+                        break
+            self._changed.notify_all()
+            return batch
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+INGESTION_JOBS = Counter(
+    "ingestion_jobs_total",
+    "Finished ingestion jobs by final status.",
+    ("status",),
+    registry=REGISTRY,
+)
+INGESTION_LATENCY = Histogram(
+    "ingestion_latency_seconds",
+    "Time from enqueue to indexed.",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 900.0),
+    registry=REGISTRY,
+)
+INGESTION_CHUNKS = Counter(
+    "ingestion_chunks_total",
+    "Chunks written to the index.",
+    registry=REGISTRY,
+)
+INGESTION_FAILURES = Counter(
+    "ingestion_failures_total",
+    "Failed ingestion jobs by the stage that failed.",
+    ("stage",),
+    registry=REGISTRY,
+)
+STAGE_BATCH_SIZE = Histogram(
+    "ingestion_stage_batch_size",
+    "Items per batch handed to a batched stage.",
+    ("stage",),
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512),
+    registry=REGISTRY,
+)
+STAGE_QUEUE_DEPTH = Gauge(
+    "ingestion_stage_queue_depth",
+    "Items waiting in front of a stage.",
+    ("stage",),
+    registry=REGISTRY,
+)
+ACTIVE_DOCUMENTS = Gauge(
+    "ingestion_active_documents",
+    "Documents currently being parsed or waiting for their sections to be indexed.",
+    registry=REGISTRY,
+)
+CACHE_REQUESTS = Counter(
+    "ingestion_cache_requests_total",
+    "Summary and embedding lookups by where they were answered: previous version, content cache, or model.",
+    ("kind", "result"),
+    registry=REGISTRY,
+)
+CACHE_HIT_RATIO = Histogram(
+    "ingestion_cache_hit_ratio",
+    "Share of a document's summaries or embeddings that were reused instead of recomputed.",
+    ("kind",),
+    buckets=(0.0, 0.1, 0.25, 0.5, 0.75, 0.9, 0.95, 0.99, 1.0),
+    registry=REGISTRY,
+)
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,139 @@
+"""Embedders and summarizers.
+
+Both work on batches: the pipeline collects texts from many documents and
+hands them over in one call. The hashing embedder and the extractive
+summarizer are deterministic local stubs, so the whole pipeline runs offline.
+Anything else is plugged in by settings, either by a registered name or as
+``package.module:Class``, constructed with the ``Settings`` object.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import math
+import re
+import zlib
+from array import array
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+
+from ingestion_service.core.chunking import SENTENCE_END, count_tokens
+
+_WORD = re.compile(r"\w+")
+
+
+class Embedder:
+    model_id: str = "embedder"
+    dim: int = 0
+
+    async def embed(self, texts: List[str]) -> List[array]:
+        """One float32 ``array('f')`` of length ``dim`` per text."""
+
+        raise NotImplementedError
+
+
+class Summarizer:
+    # part of the summary cache key; change it when the model or prompt changes
+    model_id: str = "summarizer"
+
+    async def summarize(self, texts: List[str], max_tokens: int) -> List[str]:
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """Signed feature hashing of lowercased words and word bigrams, L2-normalized."""
+
+    def __init__(self, dim: int = 384) -> None:
+        self.dim = dim
+        self.model_id = f"hashing-{dim}"
+
+    def embed_one(self, text: str) -> array:
+        vector = array("f", bytes(4 * self.dim))
+        words = _WORD.findall(text.lower())
+        for feature in (*words, *(f"{a} {b}" for a, b in zip(words, words[1:]))):
+            digest = zlib.crc32(feature.encode())
+            vector[digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        for index in range(self.dim):
+            vector[index] /= norm
+        return vector
+
+    async def embed(self, texts: List[str]) -> List[array]:
+        return await asyncio.to_thread(lambda: [self.embed_one(text) for text in texts])
+
+
+class ExtractiveSummarizer(Summarizer):
+    """Leading sentences up to the token budget."""
+
+    model_id = "extractive"
+
+    async def summarize(self, texts: List[str], max_tokens: int) -> List[str]:
+        return [self._summarize(text, max_tokens) for text in texts]
+
+    @staticmethod
+    def _summarize(text: str, max_tokens: int) -> str:
+        picked: List[str] = []
+        used = 0
+        for sentence in SENTENCE_END.split(" ".join(text.split())):
+            tokens = count_tokens(sentence)
+            if picked and used + tokens > max_tokens:
+                break
+            picked.append(sentence)
+            used += tokens
+        return " ".join(picked)
+
+
+class LLMServiceSummarizer(Summarizer):
+    """``mode: summary`` calls to the LLM service, at most ``concurrency`` in flight per batch."""
+
+    def __init__(self, url: str, concurrency: int = 8, timeout: float = 120.0) -> None:
+        self.url = url.rstrip("/") + "/internal/llm/generate"
+        self.model_id = "llm-service"
+        self.concurrency = concurrency
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def summarize(self, texts: List[str], max_tokens: int) -> List[str]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(text: str) -> str:
+            async with semaphore:
+                response = await self._client.post(self.url, json={"mode": "summary", "text": text, "max_tokens": max_tokens})
+                response.raise_for_status()
+                body = response.json()
+                return body.get("summary") or body.get("answer") or ""
+
+        return list(await asyncio.gather(*(one(text) for text in texts)))
+
+
+def _import(spec: str) -> Callable[..., Any]:
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(f"unknown plugin {spec!r}; expected a registered name or 'package.module:Class'")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+EMBEDDERS: Dict[str, Callable[[Any], Embedder]] = {
+    "hashing": lambda settings: HashingEmbedder(settings.embedding_dim),
+}
+SUMMARIZERS: Dict[str, Callable[[Any], Summarizer]] = {
+    "extractive": lambda settings: ExtractiveSummarizer(),
+    "llm": lambda settings: LLMServiceSummarizer(_require(settings.llm_service_url, "llm_service_url"), settings.llm_concurrency),
+}
+
+
+def _require(value: Optional[str], name: str) -> str:
+    if not value:
+        raise ValueError(f"{name} must be set")
+    return value
+
+
+def load_embedder(settings: Any) -> Embedder:
+    factory = EMBEDDERS.get(settings.embedder)
+    return factory(settings) if factory else _import(settings.embedder)(settings)
+
+
+def load_summarizer(settings: Any) -> Summarizer:
+    factory = SUMMARIZERS.get(settings.summarizer)
+    return factory(settings) if factory else _import(settings.summarizer)(settings)
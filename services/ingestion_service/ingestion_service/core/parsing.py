@@ -0,0 +1,153 @@
+"""Streaming page readers.
+
+Every reader yields ``Page`` objects one at a time, so a document is never
+held in memory as a whole. Text formats are decoded incrementally in the event
+loop's thread pool. PDF text extraction is CPU-bound, so it runs in the
+process pool ``pdf_pages_per_task`` pages at a time, with the next range
+already extracting while the current one is consumed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import codecs
+import json
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, List, Optional
+
+try:  # optional, see the `pdf` extra
+    import pypdf
+except ImportError:  # pragma: no cover - depends on environment
+    pypdf = None
+
+PAGE_BREAK = "\f"
+READ_SIZE = 1 << 16
+# a page without form feeds is cut into fragments of this size (same page number)
+MAX_FRAGMENT_CHARS = 1 << 20
+
+TEXT_TYPES = {"text/plain": "text", "text/markdown": "text", "application/x-ndjson": "ndjson", "application/pdf": "pdf"}
+EXTENSIONS = {".txt": "text", ".md": "text", ".ndjson": "ndjson", ".jsonl": "ndjson", ".pdf": "pdf"}
+
+
+class ParseError(ValueError):
+    pass
+
+
+@dataclass
+class Page:
+    number: int
+    text: str
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> str:
+    base_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if base_type in TEXT_TYPES:
+        return TEXT_TYPES[base_type]
+    suffix = Path(filename or "").suffix.lower()
+    if suffix in EXTENSIONS:
+        return EXTENSIONS[suffix]
+    raise ParseError(f"unsupported document type {content_type or filename!r}")
+
+
+async def iter_pages(
+    path: Path,
+    fmt: str,
+    executor: Optional[Executor] = None,
+    pages_per_task: int = 16,
+    max_pages: int = 2000,
+) -> AsyncIterator[Page]:
+    if fmt == "text":
+        source = _text_pages(path)
+    elif fmt == "ndjson":
+        source = _ndjson_pages(path)
+    elif fmt == "pdf":
+        source = _pdf_pages(path, executor, pages_per_task)
+    else:
+        raise ParseError(f"unsupported format {fmt!r}")
+    async for page in source:
+        if page.number > max_pages:
+            raise ParseError(f"document has more than {max_pages} pages")
+        yield page
+
+
+async def _text_pages(path: Path) -> AsyncIterator[Page]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    number = 1
+    pending = ""
+    with path.open("rb") as handle:
+        while True:
+            chunk = await asyncio.to_thread(handle.read, READ_SIZE)
+            pending += decoder.decode(chunk, final=not chunk)
+            *complete, pending = pending.split(PAGE_BREAK)
+            for text in complete:
+                yield Page(number, text)
+                number += 1
+            while len(pending) > MAX_FRAGMENT_CHARS:
+                cut = pending.rfind("\n", 0, MAX_FRAGMENT_CHARS) + 1 or MAX_FRAGMENT_CHARS
+                yield Page(number, pending[:cut])
+                pending = pending[cut:]
+            if not chunk:
+                break
+    if pending or number == 1:
+        yield Page(number, pending)
+
+
+async def _ndjson_pages(path: Path) -> AsyncIterator[Page]:
+    """One ``{"page": n, "text": "..."}`` object per line, the shape of the spec's parser output."""
+
+    number = 0
+    with path.open("rb") as handle:
+        while True:
+            line = await asyncio.to_thread(handle.readline)
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+                text = item["text"]
+                number = int(item.get("page") or number + 1)
+            except (ValueError, KeyError, TypeError, AttributeError) as exc:
+                raise ParseError(f"invalid page line: {exc}") from exc
+            yield Page(number, text)
+
+
+def pdf_page_count(path: str) -> int:
+    if pypdf is None:  # pragma: no cover - depends on environment
+        raise ParseError("PDF support requires the `pdf` extra")
+    try:
+        return len(pypdf.PdfReader(path).pages)
+    except Exception as exc:  # pragma: no cover - depends on the file
+        raise ParseError(f"PDF parse error: {exc}") from exc
+
+
+def extract_pdf_pages(path: str, start: int, stop: int) -> List[str]:
+    """Runs in a worker process; re-opening the file is cheap next to text extraction."""
+
+    if pypdf is None:  # pragma: no cover - depends on environment
+        raise ParseError("PDF support requires the `pdf` extra")
+    try:
+        reader = pypdf.PdfReader(path)
+        return [reader.pages[index].extract_text() or "" for index in range(start, stop)]
+    except Exception as exc:  # pragma: no cover - depends on the file
+        raise ParseError(f"PDF parse error: {exc}") from exc
+
+
+async def _pdf_pages(path: Path, executor: Optional[Executor], pages_per_task: int) -> AsyncIterator[Page]:
+    loop = asyncio.get_running_loop()
+    total = await loop.run_in_executor(executor, pdf_page_count, str(path))
+    ranges = [(start, min(total, start + pages_per_task)) for start in range(0, total, pages_per_task)]
+    if not ranges:
+        return
+    upcoming = loop.run_in_executor(executor, extract_pdf_pages, str(path), *ranges[0])
+    try:
+        for index, (start, _) in enumerate(ranges):
+            texts = await upcoming
+            if index + 1 < len(ranges):
+                upcoming = loop.run_in_executor(executor, extract_pdf_pages, str(path), *ranges[index + 1])
+            for offset, text in enumerate(texts):
+                yield Page(start + offset + 1, text)
+    finally:
+        upcoming.cancel()
@@ -0,0 +1,591 @@
+"""Staged ingestion pipeline.
+
+::
+
+    admission ─► parse + sectionize ─► chunk ─► summarize ─► embed ─► index
+    (FIFO)       (per document,        (process  (batched)   (batched) (thread)
+                  up to N at once)      pool)
+
+Parsing streams pages and emits a section as soon as the next heading starts.
+Each section is chunked in the process pool and then travels alone through
+the batched stages, so memory holds a few sections per active document, not
+whole documents. The hand-offs are ``FairBatchQueue`` instances. They are
+bounded per document and drained round-robin, so a 500-page manual shares
+every batch with the small uploads next to it instead of queueing them behind
+itself. Throughput scales with the pool size (``workers``) for parsing and
+chunking, and with the batch sizes for the model calls.
+
+Model calls go through two lookups first. The first is the document's
+previous version in the index. The second is the content-addressed
+``ContentCache``, keyed by text hash and model id. On re-ingestion, only
+sections and chunks whose text changed reach the summarizer and embedder.
+The job reports the diff and the hit counts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+import time
+import uuid
+from array import array
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from ingestion_service.core.chunking import Section, Sectionizer, chunk_section
+from ingestion_service.core.content_cache import ContentCache, content_hash
+from ingestion_service.core.fair_queue import FairBatchQueue
+from ingestion_service.core.metrics import (
+    ACTIVE_DOCUMENTS,
+    CACHE_HIT_RATIO,
+    CACHE_REQUESTS,
+    INGESTION_CHUNKS,
+    INGESTION_FAILURES,
+    INGESTION_JOBS,
+    INGESTION_LATENCY,
+    STAGE_BATCH_SIZE,
+    STAGE_QUEUE_DEPTH,
+)
+from ingestion_service.core.models import Embedder, Summarizer
+from ingestion_service.core.parsing import iter_pages
+from ingestion_service.core.sink import DocumentStatusReporter, LocalIndexSink, PreviousVersion
+from ingestion_service.core.tokenizers import DEFAULT as DEFAULT_TOKENIZER, get_counter
+from ingestion_service.logging import get_logger
+
+logger = get_logger(__name__)
+
+# sections of one document being chunked at the same time; keeps order and lets parsing run ahead
+CHUNK_IN_FLIGHT = 2
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass
+class JobProgress:
+    job_id: str
+    doc_id: str
+    tenant_id: str
+    name: str
+    status: str = "queued"  # queued / processing / indexed / failed
+    stage: str = "queued"
+    pages: int = 0
+    sections_total: int = 0
+    sections_summarized: int = 0
+    sections_embedded: int = 0
+    sections_indexed: int = 0
+    chunks: int = 0
+    # re-ingestion diff against the indexed version
+    sections_unchanged: int = 0
+    sections_removed: int = 0
+    summary_cache_hits: int = 0
+    summary_cache_misses: int = 0
+    embedding_cache_hits: int = 0
+    embedding_cache_misses: int = 0
+    error: Optional[str] = None
+    created_at: str = field(default_factory=_now)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+
+@dataclass(eq=False)
+class Job:
+    progress: JobProgress
+    path: Path
+    fmt: str
+    metadata: Dict[str, Any]
+    enqueued: float = field(default_factory=time.monotonic)
+    parse_done: bool = False
+    failed: bool = False
+    idle: asyncio.Event = field(default_factory=asyncio.Event)  # nothing in flight: all sections indexed, or failed
+    done: asyncio.Event = field(default_factory=asyncio.Event)
+    summaries: List[Dict[str, Any]] = field(default_factory=list)  # section records for the document service
+    previous: Optional[PreviousVersion] = None
+    section_hashes: set = field(default_factory=set)
+
+    @property
+    def key(self) -> str:
+        return self.progress.job_id
+
+    def check_idle(self) -> None:
+        progress = self.progress
+        if self.failed or (self.parse_done and progress.sections_indexed == progress.sections_total):
+            self.idle.set()
+
+
+@dataclass(eq=False)
+class SectionWork:
+    job: Job
+    section: Section
+    chunks: List[Dict[str, Any]]
+    content_hash: str = ""
+    summary: str = ""
+    section_vector: Optional[array] = None
+    chunk_vectors: List[array] = field(default_factory=list)
+
+    @property
+    def texts(self) -> int:
+        return 1 + len(self.chunks)
+
+
+class IngestionPipeline:
+    def __init__(
+        self,
+        embedder: Embedder,
+        summarizer: Summarizer,
+        sink: LocalIndexSink,
+        reporter: Optional[DocumentStatusReporter] = None,
+        executor: Optional[Executor] = None,
+        cache: Optional[ContentCache] = None,
+        workers: int = 0,
+        max_active_documents: int = 8,
+        max_pages: int = 2000,
+        pdf_pages_per_task: int = 16,
+        max_section_tokens: int = 2000,
+        chunk_size_tokens: int = 400,
+        tokenizers: Sequence[str] = (DEFAULT_TOKENIZER,),
+        summary_max_tokens: int = 256,
+        doc_summary_sections: int = 3,
+        stage_queue_per_document: int = 8,
+        summarize_batch_size: int = 16,
+        embed_batch_size: int = 128,
+        batch_window: float = 0.02,
+        max_jobs_kept: int = 10000,
+    ) -> None:
+        self.embedder = embedder
+        self.summarizer = summarizer
+        self.sink = sink
+        self.reporter = reporter
+        self.cache = cache
+        self._owns_executor = executor is None
+        self.executor = executor or ProcessPoolExecutor(max_workers=workers if workers > 0 else None)
+        self.max_active_documents = max_active_documents
+        self.max_pages = max_pages
+        self.pdf_pages_per_task = pdf_pages_per_task
+        self.max_section_tokens = max_section_tokens
+        self.chunk_size_tokens = chunk_size_tokens
+        for name in tokenizers:
+            get_counter(name)  # fail at startup, not in every chunking task
+        self.tokenizers = tuple(tokenizers)
+        self.summary_max_tokens = summary_max_tokens
+        self.summary_model = f"{summarizer.model_id}:{summary_max_tokens}"
+        self.doc_summary_sections = doc_summary_sections
+        self.summarize_batch_size = summarize_batch_size
+        self.embed_batch_size = embed_batch_size
+        self.batch_window = batch_window
+        self.max_jobs_kept = max_jobs_kept
+        self._admission: "asyncio.Queue[Job]" = asyncio.Queue()
+        self._to_summarize: FairBatchQueue[SectionWork] = FairBatchQueue(stage_queue_per_document)
+        self._to_embed: FairBatchQueue[SectionWork] = FairBatchQueue(stage_queue_per_document)
+        self._to_index: FairBatchQueue[SectionWork] = FairBatchQueue(stage_queue_per_document)
+        self._jobs: Dict[str, Job] = {}
+        self._latest_by_doc: Dict[tuple, str] = {}
+        self._finished: Deque[str] = deque()
+        self._tasks: List[asyncio.Task] = []
+
+    # -- lifecycle ----------------------------------------------------------------
+
+    async def start(self) -> None:
+        self._tasks = [
+            *(asyncio.create_task(self._document_worker(), name=f"ingest-doc-{n}") for n in range(self.max_active_documents)),
+            asyncio.create_task(self._summarize_loop(), name="ingest-summarize"),
+            asyncio.create_task(self._embed_loop(), name="ingest-embed"),
+            asyncio.create_task(self._index_loop(), name="ingest-index"),
+        ]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._owns_executor:
+            self.executor.shutdown(cancel_futures=True)
+        if self.reporter is not None:
+            await self.reporter.aclose()
+
+    # -- jobs ---------------------------------------------------------------------
+
+    async def submit(
+        self,
+        tenant_id: str,
+        path: Path,
+        fmt: str,
+        name: str,
+        doc_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> JobProgress:
+        job_id = f"ing_{uuid.uuid4().hex[:12]}"
+        progress = JobProgress(job_id=job_id, doc_id=doc_id or f"doc_{uuid.uuid4().hex[:12]}", tenant_id=tenant_id, name=name)
+        job = Job(progress, path, fmt, {"name": name, **(metadata or {})})
+        self._jobs[job_id] = job
+        self._latest_by_doc[(tenant_id, progress.doc_id)] = job_id
+        if self.reporter is not None:
+            await self.reporter.register(tenant_id, progress.doc_id, job.metadata)
+        self._admission.put_nowait(job)
+        STAGE_QUEUE_DEPTH.labels("admission").set(self._admission.qsize())
+        return progress
+
+    def get(self, job_id: str) -> Optional[JobProgress]:
+        job = self._jobs.get(job_id)
+        return job.progress if job is not None else None
+
+    def latest_for_document(self, tenant_id: str, doc_id: str) -> Optional[JobProgress]:
+        job_id = self._latest_by_doc.get((tenant_id, doc_id))
+        return self.get(job_id) if job_id else None
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> JobProgress:
+        job = self._jobs[job_id]
+        await asyncio.wait_for(job.done.wait(), timeout)
+        return job.progress
+
+    def _forget_old_jobs(self, job_id: str) -> None:
+        self._finished.append(job_id)
+        while len(self._finished) > self.max_jobs_kept:
+            old = self._jobs.pop(self._finished.popleft(), None)
+            if old is not None and self._latest_by_doc.get((old.progress.tenant_id, old.progress.doc_id)) == old.key:
+                del self._latest_by_doc[(old.progress.tenant_id, old.progress.doc_id)]
+
+    # -- parse + chunk --------------------------------------------------------------
+
+    async def _document_worker(self) -> None:
+        while True:
+            job = await self._admission.get()
+            STAGE_QUEUE_DEPTH.labels("admission").set(self._admission.qsize())
+            ACTIVE_DOCUMENTS.inc()
+            try:
+                await self._run_document(job)
+            finally:
+                ACTIVE_DOCUMENTS.dec()
+
+    async def _run_document(self, job: Job) -> None:
+        progress = job.progress
+        progress.status = progress.stage = "processing"
+        progress.started_at = _now()
+        logger.info("ingestion_started", job_id=job.key, doc_id=progress.doc_id, tenant_id=progress.tenant_id)
+        if self.reporter is not None:
+            await self.reporter.report(progress.tenant_id, progress.doc_id, "processing")
+        stage = "parse"
+        try:
+            await asyncio.to_thread(self.sink.begin, progress.tenant_id, progress.doc_id, job.key)
+            job.previous = await asyncio.to_thread(
+                self.sink.load_previous, progress.tenant_id, progress.doc_id, self.embedder.model_id, self.summary_model
+            )
+            await self._parse(job)
+            stage = "index"
+            await job.idle.wait()
+            if job.failed:
+                raise RuntimeError(progress.error or "ingestion failed")
+            stage = "finalize"
+            await self._finish(job)
+        except asyncio.CancelledError:
+            self._fail(job, "parse", "cancelled")
+            raise
+        except Exception as exc:
+            self._fail(job, stage, str(exc) or type(exc).__name__)
+            await self._cleanup_failed(job)
+        finally:
+            job.path.unlink(missing_ok=True)
+            progress.finished_at = _now()
+            self._forget_old_jobs(job.key)
+            job.done.set()
+
+    async def _parse(self, job: Job) -> None:
+        loop = asyncio.get_running_loop()
+        sectionizer = Sectionizer(self.max_section_tokens, default_title=job.metadata.get("name") or "")
+        pending: Deque[tuple] = deque()
+
+        async def drain(limit: int) -> None:
+            while len(pending) > limit:
+                section, future = pending.popleft()
+                chunks = await future
+                progress.chunks += len(chunks)
+                digest = content_hash(section.text)
+                job.section_hashes.add(digest)
+                if job.previous is not None and digest in job.previous.section_hashes:
+                    progress.sections_unchanged += 1
+                await self._to_summarize.put(job.key, SectionWork(job, section, chunks, digest))
+
+        progress = job.progress
+        try:
+            async for page in iter_pages(job.path, job.fmt, self.executor, self.pdf_pages_per_task, self.max_pages):
+                progress.pages = max(progress.pages, page.number)
+                for section in sectionizer.feed(page):
+                    if job.failed:
+                        return
+                    progress.sections_total += 1
+                    pending.append((section, loop.run_in_executor(self.executor, chunk_section, section.to_dict(), self.chunk_size_tokens, self.tokenizers)))
+                    await drain(CHUNK_IN_FLIGHT - 1)
+            for section in sectionizer.finish():
+                progress.sections_total += 1
+                pending.append((section, loop.run_in_executor(self.executor, chunk_section, section.to_dict(), self.chunk_size_tokens, self.tokenizers)))
+            await drain(0)
+        finally:
+            for _, future in pending:
+                future.cancel()
+        job.parse_done = True
+        progress.stage = "enrich"
+        job.check_idle()
+
+    # -- batched stages -------------------------------------------------------------
+
+    async def _summarize_loop(self) -> None:
+        while True:
+            batch = await self._to_summarize.get_batch(self.summarize_batch_size, self.batch_window)
+            batch = [work for work in batch if not work.job.failed]
+            STAGE_QUEUE_DEPTH.labels("summarize").set(self._to_summarize.qsize())
+            if not batch:
+                continue
+            STAGE_BATCH_SIZE.labels("summarize").observe(len(batch))
+            try:
+                summaries = await self._summarize([(work.job, work.section.text) for work in batch])
+            except Exception as exc:
+                await self._fail_batch(batch, "summarize", exc)
+                continue
+            for work, summary in zip(batch, summaries):
+                work.summary = summary
+                work.job.progress.sections_summarized += 1
+                await self._to_embed.put(work.job.key, work)
+
+    async def _embed_loop(self) -> None:
+        while True:
+            batch = await self._to_embed.get_batch(self.embed_batch_size, self.batch_window, cost=lambda work: work.texts)
+            batch = [work for work in batch if not work.job.failed]
+            STAGE_QUEUE_DEPTH.labels("embed").set(self._to_embed.qsize())
+            if not batch:
+                continue
+            items: List[Tuple[Job, str]] = []
+            for work in batch:
+                items.append((work.job, work.summary or work.section.title))
+                items.extend((work.job, chunk["text"]) for chunk in work.chunks)
+            STAGE_BATCH_SIZE.labels("embed").observe(len(items))
+            try:
+                vectors = await self._embed(items)
+            except Exception as exc:
+                await self._fail_batch(batch, "embed", exc)
+                continue
+            offset = 0
+            for work in batch:
+                work.section_vector = vectors[offset]
+                work.chunk_vectors = vectors[offset + 1 : offset + work.texts]
+                offset += work.texts
+                work.job.progress.sections_embedded += 1
+                await self._to_index.put(work.job.key, work)
+
+    async def _index_loop(self) -> None:
+        while True:
+            batch = await self._to_index.get_batch(self.embed_batch_size, 0.0, cost=lambda work: work.texts)
+            batch = [work for work in batch if not work.job.failed]
+            STAGE_QUEUE_DEPTH.labels("index").set(self._to_index.qsize())
+            if not batch:
+                continue
+            by_job: Dict[Job, List[SectionWork]] = {}
+            for work in batch:
+                by_job.setdefault(work.job, []).append(work)
+            for job, works in by_job.items():
+                try:
+                    await asyncio.to_thread(self._write, job, works)
+                except Exception as exc:
+                    await self._fail_batch(works, "index", exc)
+                    continue
+                for work in works:
+                    job.progress.sections_indexed += 1
+                    INGESTION_CHUNKS.inc(len(work.chunks))
+                job.check_idle()
+
+    def _write(self, job: Job, works: List[SectionWork]) -> None:
+        progress = job.progress
+        sections = []
+        chunks = []
+        chunk_vectors: List[array] = []
+        for work in works:
+            section = work.section
+            record = {
+                "section_id": section.section_id,
+                "doc_id": progress.doc_id,
+                "title": section.title,
+                "page_start": section.page_start,
+                "page_end": section.page_end,
+                "summary": work.summary,
+                "content_hash": work.content_hash,
+                "chunk_ids": [chunk["chunk_id"] for chunk in work.chunks],
+            }
+            sections.append(record)
+            job.summaries.append({key: value for key, value in record.items() if key != "doc_id"})
+            chunks.extend({**chunk, "doc_id": progress.doc_id} for chunk in work.chunks)
+            chunk_vectors.extend(work.chunk_vectors)
+        self.sink.write_sections(
+            progress.tenant_id,
+            progress.doc_id,
+            job.key,
+            sections,
+            [work.section_vector for work in works],
+            chunks,
+            chunk_vectors,
+            [work.section.paragraphs for work in works],
+        )
+
+    # -- reuse of previous results ----------------------------------------------------
+
+    async def _summarize(self, items: List[Tuple[Job, str]]) -> List[str]:
+        return await self._reuse(
+            "summary",
+            items,
+            lambda previous: previous.summaries,
+            lambda keys: self.cache.get_summaries(self.summary_model, keys),
+            lambda entries: self.cache.put_summaries(self.summary_model, entries),
+            lambda texts: self.summarizer.summarize(texts, self.summary_max_tokens),
+        )
+
+    async def _embed(self, items: List[Tuple[Job, str]]) -> List[array]:
+        return await self._reuse(
+            "embedding",
+            items,
+            lambda previous: previous.vectors,
+            lambda keys: self.cache.get_embeddings(self.embedder.model_id, keys),
+            lambda entries: self.cache.put_embeddings(self.embedder.model_id, entries),
+            self.embedder.embed,
+        )
+
+    async def _reuse(
+        self,
+        kind: str,
+        items: List[Tuple[Job, str]],
+        from_previous: Callable[[PreviousVersion], Dict[str, Any]],
+        cache_get: Callable[[List[str]], Dict[str, Any]],
+        cache_put: Callable[[List[Tuple[str, Any]]], None],
+        compute: Callable[[List[str]], Awaitable[List[Any]]],
+    ) -> List[Any]:
+        """Results for ``items`` in order; only texts found nowhere else reach ``compute``.
+
+        Lookups go to the job's previous version, then to the content cache.
+        Texts repeated within the batch are computed once.
+        """
+
+        keys = [content_hash(text) for _, text in items]
+        values: Dict[str, Any] = {}
+        sources: Dict[str, str] = {}
+        for (job, _), key in zip(items, keys):
+            if key not in values and job.previous is not None:
+                value = from_previous(job.previous).get(key)
+                if value is not None:
+                    values[key] = value
+                    sources[key] = "previous"
+        missing = [key for key in dict.fromkeys(keys) if key not in values]
+        if missing and self.cache is not None:
+            cached = await self._cache_io(cache_get, missing) or {}
+            values.update(cached)
+            sources.update(dict.fromkeys(cached, "cache"))
+        pending: Dict[str, str] = {}
+        for (_, text), key in zip(items, keys):
+            if key not in values:
+                pending.setdefault(key, text)
+        if pending:
+            computed = dict(zip(pending, await compute(list(pending.values()))))
+            values.update(computed)
+            sources.update(dict.fromkeys(computed, "model"))
+            if self.cache is not None:
+                await self._cache_io(cache_put, list(computed.items()))
+        counted: set = set()
+        for (job, _), key in zip(items, keys):
+            result = sources[key]
+            if result == "model" and key in counted:
+                result = "batch"  # duplicate of a text computed for this batch
+            counted.add(key)
+            CACHE_REQUESTS.labels(kind, result).inc()
+            field_name = f"{kind}_cache_misses" if result == "model" else f"{kind}_cache_hits"
+            setattr(job.progress, field_name, getattr(job.progress, field_name) + 1)
+        return [values[key] for key in keys]
+
+    async def _cache_io(self, call: Callable[[Any], Any], argument: Any) -> Any:
+        # the cache only saves work; when it is unusable the pipeline recomputes
+        try:
+            return await asyncio.to_thread(call, argument)
+        except sqlite3.Error as exc:
+            logger.warning("content_cache_error", error=str(exc))
+            return None
+
+    def _observe_reuse(self, job: Job) -> Dict[str, Any]:
+        progress = job.progress
+        stats: Dict[str, Any] = {}
+        for kind in ("summary", "embedding"):
+            hits = getattr(progress, f"{kind}_cache_hits")
+            total = hits + getattr(progress, f"{kind}_cache_misses")
+            ratio = hits / total if total else 0.0
+            if total:
+                CACHE_HIT_RATIO.labels(kind).observe(ratio)
+            stats[f"{kind}_hit_ratio"] = round(ratio, 4)
+        stats["sections_unchanged"] = progress.sections_unchanged
+        stats["sections_removed"] = progress.sections_removed
+        return stats
+
+    # -- completion -------------------------------------------------------------------
+
+    async def _finish(self, job: Job) -> None:
+        progress = job.progress
+        lead = " ".join(section["summary"] for section in job.summaries[: self.doc_summary_sections])
+        [doc_vector] = await self._embed([(job, f"{job.metadata.get('name', '')}\n{lead}".strip())])
+        if job.previous is not None:
+            progress.sections_removed = len(job.previous.section_hashes - job.section_hashes)
+        reuse = self._observe_reuse(job)
+        document = {
+            "doc_id": progress.doc_id,
+            "tenant_id": progress.tenant_id,
+            "job_id": job.key,
+            "pages": progress.pages,
+            "sections": progress.sections_total,
+            "chunks": progress.chunks,
+            "embedding_model": self.embedder.model_id,
+            "embedding_dim": self.embedder.dim,
+            "summary_model": self.summary_model,
+            **reuse,
+            **job.metadata,
+        }
+        await asyncio.to_thread(self.sink.finish, progress.tenant_id, progress.doc_id, job.key, document, doc_vector)
+        progress.status = progress.stage = "indexed"
+        INGESTION_JOBS.labels("indexed").inc()
+        INGESTION_LATENCY.observe(time.monotonic() - job.enqueued)
+        logger.info(
+            "document_ingested",
+            job_id=job.key,
+            doc_id=progress.doc_id,
+            sections=progress.sections_total,
+            chunks=progress.chunks,
+            sections_unchanged=progress.sections_unchanged,
+            sections_removed=progress.sections_removed,
+            summary_hit_ratio=reuse["summary_hit_ratio"],
+            embedding_hit_ratio=reuse["embedding_hit_ratio"],
+            duration_ms=int((time.monotonic() - job.enqueued) * 1000),
+        )
+        if self.reporter is not None:
+            await self.reporter.report(progress.tenant_id, progress.doc_id, "indexed", pages=progress.pages, sections=job.summaries)
+
+    def _fail(self, job: Job, stage: str, error: str) -> None:
+        if job.progress.status in ("failed", "indexed"):
+            return
+        job.failed = True
+        job.progress.status = "failed"
+        job.progress.error = error
+        job.progress.stage = stage
+        INGESTION_JOBS.labels("failed").inc()
+        INGESTION_FAILURES.labels(stage).inc()
+        logger.warning("ingestion_failed", job_id=job.key, doc_id=job.progress.doc_id, stage=stage, error=error)
+        job.idle.set()
+
+    async def _fail_batch(self, batch: List[SectionWork], stage: str, exc: Exception) -> None:
+        for job in {work.job for work in batch}:
+            self._fail(job, stage, f"{stage} error: {exc}")
+
+    async def _cleanup_failed(self, job: Job) -> None:
+        for queue in (self._to_summarize, self._to_embed, self._to_index):
+            await queue.discard(job.key)
+        await asyncio.to_thread(self.sink.abort, job.progress.tenant_id, job.progress.doc_id, job.key)
+        if self.reporter is not None:
+            await self.reporter.report(job.progress.tenant_id, job.progress.doc_id, "failed", error=job.progress.error)
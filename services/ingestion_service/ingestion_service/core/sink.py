@@ -0,0 +1,180 @@
+"""Local index output and document-service status callbacks.
+
+``LocalIndexSink`` writes one directory per document::
+
+    <index_dir>/<tenant_id>/<doc_id>/
+        document.json          metadata, section list, embedding model id
+        doc_vector.f32         one float32 row
+        sections.jsonl         one record per section, with its byte range in text.bin
+        section_vectors.f32    float32 rows in sections.jsonl order
+        chunks.jsonl           one record per chunk, with text
+        chunk_vectors.f32      float32 rows in chunks.jsonl order
+        text.bin, text_*       full text with page and term indexes (see ``text_store``)
+
+Sections are appended while the document is still being parsed, into a
+``.partial`` directory. ``finish`` renames it over the previous version, so
+readers see either the old or the new index of a document, never a mix, and a
+failed run leaves the previous version untouched.
+
+``load_previous`` reads the current version back before a re-ingestion. The
+pipeline can then reuse the summaries and vectors of every section and chunk
+whose text did not change.
+"""
+
+from __future__ import annotations
+
+import json
+import shutil
+from array import array
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+import httpx
+
+from ingestion_service.core import text_store
+from ingestion_service.core.content_cache import content_hash
+from ingestion_service.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+def _safe(part: str) -> str:
+    return "".join(char if char.isalnum() or char in "-_." else "_" for char in part).lstrip(".") or "_"
+
+
+@dataclass
+class PreviousVersion:
+    section_hashes: Set[str] = field(default_factory=set)
+    summaries: Dict[str, str] = field(default_factory=dict)  # section content hash -> summary
+    vectors: Dict[str, array] = field(default_factory=dict)  # embedded text hash -> vector
+
+
+def _rows(records_path: Path, vectors_path: Path, dim: int) -> Iterator[tuple]:
+    with records_path.open(encoding="utf-8") as records, vectors_path.open("rb") as vectors:
+        for line in records:
+            vector = array("f")
+            vector.fromfile(vectors, dim)
+            yield json.loads(line), vector
+
+
+class LocalIndexSink:
+    def __init__(self, root: str) -> None:
+        self.root = Path(root)
+
+    def document_dir(self, tenant_id: str, doc_id: str) -> Path:
+        return self.root / _safe(tenant_id) / _safe(doc_id)
+
+    def _partial(self, tenant_id: str, doc_id: str, job_id: str) -> Path:
+        return self.document_dir(tenant_id, doc_id).with_name(f"{_safe(doc_id)}.{job_id}.partial")
+
+    def begin(self, tenant_id: str, doc_id: str, job_id: str) -> None:
+        partial = self._partial(tenant_id, doc_id, job_id)
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+
+    def write_sections(
+        self,
+        tenant_id: str,
+        doc_id: str,
+        job_id: str,
+        sections: Sequence[Dict[str, Any]],
+        section_vectors: Sequence[array],
+        chunks: Sequence[Dict[str, Any]],
+        chunk_vectors: Sequence[array],
+        texts: Optional[Sequence[Sequence[Tuple[int, str]]]] = None,
+    ) -> None:
+        """Append sections and their chunks; ``texts`` are the sections' ``(page, paragraph)`` lists."""
+
+        partial = self._partial(tenant_id, doc_id, job_id)
+        if texts is not None:
+            for record, (start, end) in zip(sections, text_store.append_sections(partial, texts)):
+                record["text_start"], record["text_end"] = start, end
+        self._append(partial / "sections.jsonl", partial / "section_vectors.f32", sections, section_vectors)
+        self._append(partial / "chunks.jsonl", partial / "chunk_vectors.f32", chunks, chunk_vectors)
+
+    @staticmethod
+    def _append(records_path: Path, vectors_path: Path, records: Sequence[Dict[str, Any]], vectors: Sequence[array]) -> None:
+        with records_path.open("a", encoding="utf-8") as handle:
+            handle.writelines(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+        with vectors_path.open("ab") as handle:
+            for vector in vectors:
+                vector.tofile(handle)
+
+    def finish(self, tenant_id: str, doc_id: str, job_id: str, document: Dict[str, Any], doc_vector: array) -> Path:
+        partial = self._partial(tenant_id, doc_id, job_id)
+        text_store.finish(partial, int(document.get("pages") or 0))
+        (partial / "document.json").write_text(json.dumps(document, ensure_ascii=False), encoding="utf-8")
+        with (partial / "doc_vector.f32").open("wb") as handle:
+            doc_vector.tofile(handle)
+        final = self.document_dir(tenant_id, doc_id)
+        previous = final.with_name(f"{_safe(doc_id)}.{job_id}.old")
+        if final.exists():
+            final.rename(previous)
+        partial.rename(final)
+        shutil.rmtree(previous, ignore_errors=True)
+        return final
+
+    def load_previous(self, tenant_id: str, doc_id: str, embedding_model: str, summary_model: str) -> Optional[PreviousVersion]:
+        """Summaries and vectors of the indexed version, if it was built with the same models."""
+
+        directory = self.document_dir(tenant_id, doc_id)
+        try:
+            document = json.loads((directory / "document.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        previous = PreviousVersion()
+        dim = int(document.get("embedding_dim") or 0)
+        same_embedder = document.get("embedding_model") == embedding_model and dim > 0
+        same_summarizer = document.get("summary_model") == summary_model
+        try:
+            for record, vector in _rows(directory / "sections.jsonl", directory / "section_vectors.f32", dim):
+                if record.get("content_hash"):
+                    previous.section_hashes.add(record["content_hash"])
+                    if same_summarizer:
+                        previous.summaries[record["content_hash"]] = record.get("summary") or ""
+                if same_embedder:
+                    previous.vectors[content_hash(record.get("summary") or record.get("title") or "")] = vector
+            if same_embedder:
+                for record, vector in _rows(directory / "chunks.jsonl", directory / "chunk_vectors.f32", dim):
+                    previous.vectors[content_hash(record.get("text") or "")] = vector
+        except (OSError, ValueError, EOFError) as exc:
+            logger.warning("previous_version_unreadable", tenant_id=tenant_id, doc_id=doc_id, error=str(exc))
+            return None
+        return previous
+
+    def abort(self, tenant_id: str, doc_id: str, job_id: str) -> None:
+        shutil.rmtree(self._partial(tenant_id, doc_id, job_id), ignore_errors=True)
+
+
+class DocumentStatusReporter:
+    """Registers uploads and reports ingestion progress to the document service; failures are only logged."""
+
+    def __init__(self, base_url: str, timeout: float = 10.0) -> None:
+        self.base_url = base_url.rstrip("/")
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def register(self, tenant_id: str, doc_id: str, metadata: Dict[str, Any]) -> None:
+        await self._send("PUT", f"/internal/documents/{doc_id}", tenant_id, {**metadata, "status": "uploaded"})
+
+    async def report(
+        self,
+        tenant_id: str,
+        doc_id: str,
+        status: str,
+        error: Optional[str] = None,
+        pages: Optional[int] = None,
+        sections: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        body: Dict[str, Any] = {"doc_id": doc_id, "status": status, "error": error, "pages": pages, "sections": sections}
+        await self._send("POST", "/internal/documents/status", tenant_id, {k: v for k, v in body.items() if v is not None})
+
+    async def _send(self, method: str, path: str, tenant_id: str, body: Dict[str, Any]) -> None:
+        try:
+            response = await self._client.request(method, self.base_url + path, json=body, headers={"X-Tenant-ID": tenant_id})
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            logger.warning("document_status_report_failed", path=path, error=str(exc))
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
@@ -0,0 +1,128 @@
+"""Per-document text store for the MCP document tools.
+
+Written next to the vectors of every indexed document::
+
+    text.bin                 normalized paragraphs in reading order, "\\n\\n" between them
+    text_paragraphs.u32      (byte start, byte end, page) per paragraph
+    text_pages.u32           (byte start, byte end) per page, page 1 first
+    text_terms.u64           sorted hashes of the lowercased words of the document
+    text_postings_idx.u32    postings offsets, one more than terms
+    text_postings.u32        paragraph numbers per term
+
+All binary files are little-endian arrays without a header. Paragraphs never
+cross pages, and sections and pages are both runs of consecutive
+paragraphs. So a section (``text_start``/``text_end`` in ``sections.jsonl``)
+and a page range are each one byte slice of ``text.bin``. Readers map the
+files and slice them. They never re-parse the document or query a database.
+Terms are stored as hashes (``term_hash``) so that a reader can
+binary-search the mapped array without loading a vocabulary.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+import sys
+from array import array
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+from ingestion_service.core.chunking import normalize_text
+
+TEXT = "text.bin"
+PARAGRAPHS = "text_paragraphs.u32"
+PAGES = "text_pages.u32"
+TERMS = "text_terms.u64"
+POSTINGS_INDEX = "text_postings_idx.u32"
+POSTINGS = "text_postings.u32"
+SEPARATOR = b"\n\n"
+WORD = re.compile(r"\w+")
+
+
+def term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _le(values: array) -> bytes:
+    if sys.byteorder != "little":  # pragma: no cover - depends on platform
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _read(path: Path, typecode: str) -> array:
+    values = array(typecode)
+    values.frombytes(path.read_bytes())
+    if sys.byteorder != "little":  # pragma: no cover - depends on platform
+        values.byteswap()
+    return values
+
+
+def append_sections(directory: Path, sections: Sequence[Sequence[Tuple[int, str]]]) -> List[Tuple[int, int]]:
+    """Append the ``(page, text)`` paragraphs of each section; returns each section's byte range."""
+
+    ranges: List[Tuple[int, int]] = []
+    paragraphs = array("I")
+    with (directory / TEXT).open("ab") as handle:
+        position = handle.tell()
+        for section in sections:
+            start = end = None
+            for page, raw in section:
+                data = normalize_text(raw).encode("utf-8")
+                if not data:
+                    continue
+                if position:
+                    handle.write(SEPARATOR)
+                    position += len(SEPARATOR)
+                handle.write(data)
+                paragraphs.extend((position, position + len(data), page))
+                start = position if start is None else start
+                position = end = position + len(data)
+            ranges.append((start, end) if start is not None else (position, position))
+    with (directory / PARAGRAPHS).open("ab") as handle:
+        handle.write(_le(paragraphs))
+    return ranges
+
+
+def finish(directory: Path, pages: int) -> None:
+    """Write the page ranges and the inverted index once all sections are appended."""
+
+    text_path = directory / TEXT
+    text_path.touch()
+    paragraphs = _read(directory / PARAGRAPHS, "I") if (directory / PARAGRAPHS).exists() else array("I")
+    (directory / PARAGRAPHS).touch()
+    text = text_path.read_bytes()
+
+    page_count = max([pages] + [paragraphs[index + 2] for index in range(0, len(paragraphs), 3)])
+    bounds = array("I", [0, 0] * page_count)
+    previous_end = 0
+    filled = [False] * page_count
+    for index in range(0, len(paragraphs), 3):
+        start, end, page = paragraphs[index : index + 3]
+        slot = page - 1
+        if not filled[slot]:
+            bounds[2 * slot] = start
+            filled[slot] = True
+        bounds[2 * slot + 1] = end
+    # a page without text is an empty range where it would have been
+    for slot in range(page_count):
+        if filled[slot]:
+            previous_end = bounds[2 * slot + 1]
+        else:
+            bounds[2 * slot] = bounds[2 * slot + 1] = previous_end
+    (directory / PAGES).write_bytes(_le(bounds))
+
+    postings: Dict[int, List[int]] = {}
+    for number, index in enumerate(range(0, len(paragraphs), 3)):
+        start, end = paragraphs[index], paragraphs[index + 1]
+        for term in set(WORD.findall(text[start:end].decode("utf-8").lower())):
+            postings.setdefault(term_hash(term), []).append(number)
+    terms = array("Q", sorted(postings))
+    offsets = array("I", [0])
+    flat = array("I")
+    for term in terms:
+        flat.extend(postings[term])
+        offsets.append(len(flat))
+    (directory / TERMS).write_bytes(_le(terms))
+    (directory / POSTINGS_INDEX).write_bytes(_le(offsets))
+    (directory / POSTINGS).write_bytes(_le(flat))
@@ -0,0 +1,76 @@
+"""Token counters for the per-tokenizer chunk token counts.
+
+Every chunk record carries ``token_counts``, one count per configured
+tokenizer, so the retrieval context builder can fit a model's context window
+without tokenizing candidates per query. Names:
+
+* ``words``: the word-piece approximation the chunker itself budgets with
+  (``count_tokens``); always available.
+* ``tiktoken:<encoding>``: e.g. ``tiktoken:cl100k_base``; needs the
+  ``tiktoken`` extra.
+* ``hf:<model>``: the tokenizer of a Hugging Face model; needs the
+  ``tokenizers`` extra.
+
+Loading a tokenizer reads vocabulary files, so counters are cached per
+process. The pool workers that run ``chunk_section`` each load them once.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Sequence
+
+try:  # optional, see the `tiktoken` extra
+    import tiktoken
+except ImportError:  # pragma: no cover - depends on environment
+    tiktoken = None
+
+try:  # optional, see the `tokenizers` extra
+    from tokenizers import Tokenizer as HFTokenizer
+except ImportError:  # pragma: no cover - depends on environment
+    HFTokenizer = None
+
+DEFAULT = "words"
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def count_tokens(text: str) -> int:
+    """Word-piece approximation used for chunk budgets; close to BPE counts for prose."""
+
+    return len(TOKEN.findall(text))
+
+
+def _tiktoken(encoding_name: str) -> Callable[[str], int]:
+    if tiktoken is None:  # pragma: no cover - depends on environment
+        raise RuntimeError("tiktoken token counts require the `tiktoken` extra")
+    encoding = tiktoken.get_encoding(encoding_name)
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def _huggingface(model: str) -> Callable[[str], int]:
+    if HFTokenizer is None:  # pragma: no cover - depends on environment
+        raise RuntimeError("hf token counts require the `tokenizers` extra")
+    tokenizer = HFTokenizer.from_pretrained(model)
+    return lambda text: len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+FAMILIES: Dict[str, Callable[[str], Callable[[str], int]]] = {
+    "tiktoken": _tiktoken,
+    "hf": _huggingface,
+}
+
+
+@lru_cache(maxsize=None)
+def get_counter(name: str) -> Callable[[str], int]:
+    if name == DEFAULT:
+        return count_tokens
+    family, _, argument = name.partition(":")
+    factory = FAMILIES.get(family)
+    if factory is None or not argument:
+        raise ValueError(f"unknown tokenizer {name!r}; expected 'words', 'tiktoken:<encoding>' or 'hf:<model>'")
+    return factory(argument)
+
+
+def token_counts(text: str, names: Sequence[str]) -> Dict[str, int]:
+    return {name: get_counter(name)(text) for name in names}
@@ -0,0 +1,61 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from ingestion_service.config import Settings
+from ingestion_service.core.content_cache import ContentCache
+from ingestion_service.core.models import load_embedder, load_summarizer
+from ingestion_service.core.pipeline import IngestionPipeline
+from ingestion_service.core.sink import DocumentStatusReporter, LocalIndexSink
+
+_pipeline: Optional[IngestionPipeline] = None
+_cache: Optional[ContentCache] = None
+
+
+def build_pipeline(settings: Settings, cache: Optional[ContentCache] = None) -> IngestionPipeline:
+    reporter = DocumentStatusReporter(settings.document_service_url) if settings.document_service_url else None
+    return IngestionPipeline(
+        embedder=load_embedder(settings),
+        summarizer=load_summarizer(settings),
+        sink=LocalIndexSink(settings.index_dir),
+        reporter=reporter,
+        cache=cache,
+        workers=settings.workers,
+        max_active_documents=settings.max_active_documents,
+        max_pages=settings.max_pages,
+        pdf_pages_per_task=settings.pdf_pages_per_task,
+        max_section_tokens=settings.max_section_tokens,
+        chunk_size_tokens=settings.chunk_size_tokens,
+        tokenizers=settings.token_count_tokenizers,
+        summary_max_tokens=settings.summary_max_tokens,
+        doc_summary_sections=settings.doc_summary_sections,
+        stage_queue_per_document=settings.stage_queue_per_document,
+        summarize_batch_size=settings.summarize_batch_size,
+        embed_batch_size=settings.embed_batch_size,
+        batch_window=settings.batch_window_ms / 1000,
+    )
+
+
+async def start_pipeline(settings: Settings) -> IngestionPipeline:
+    global _pipeline, _cache
+    if settings.content_cache_path:
+        _cache = ContentCache(settings.content_cache_path, settings.content_cache_max_entries)
+    _pipeline = build_pipeline(settings, _cache)
+    await _pipeline.start()
+    return _pipeline
+
+
+async def stop_pipeline() -> None:
+    global _pipeline, _cache
+    if _pipeline is not None:
+        await _pipeline.stop()
+        _pipeline = None
+    if _cache is not None:
+        _cache.close()
+        _cache = None
+
+
+def get_pipeline() -> IngestionPipeline:
+    if _pipeline is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail={"code": "pipeline_not_running"})
+    return _pipeline
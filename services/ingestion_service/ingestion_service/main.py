@@ -0,0 +1,28 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from ingestion_service.config import get_settings
+from ingestion_service.dependencies import start_pipeline, stop_pipeline
+from ingestion_service.logging import configure_logging
+from ingestion_service.routers import ingestion, metrics
+
+settings = get_settings()
+configure_logging(settings.log_level)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_pipeline(get_settings())
+    yield
+    await stop_pipeline()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app.include_router(ingestion.router)
+app.include_router(metrics.router)
+
+
+@app.get("/health", tags=["health"])
+async def health() -> dict[str, str]:
+    return {"status": "ok"}
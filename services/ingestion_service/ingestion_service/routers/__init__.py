@@ -0,0 +1,3 @@
+from . import ingestion, metrics
+
+__all__ = ["ingestion", "metrics"]
@@ -0,0 +1,93 @@
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+
+from ingestion_service.config import Settings, get_settings
+from ingestion_service.core import parsing
+from ingestion_service.core.pipeline import IngestionPipeline
+from ingestion_service.dependencies import get_pipeline
+from ingestion_service.schemas import EnqueueResponse, JobStatus
+
+router = APIRouter(prefix="/internal/ingestion", tags=["ingestion"])
+
+COPY_CHUNK = 1 << 20
+
+
+async def _spool(upload: UploadFile, directory: Path, limit: int) -> Path:
+    """Copy the upload to the spool directory without reading it into memory at once."""
+
+    directory.mkdir(parents=True, exist_ok=True)
+    target = directory / f"{uuid.uuid4().hex}{Path(upload.filename or '').suffix.lower()}"
+    written = 0
+    try:
+        with target.open("wb") as handle:
+            while chunk := await upload.read(COPY_CHUNK):
+                written += len(chunk)
+                if written > limit:
+                    raise HTTPException(status_code=413, detail={"code": "file_too_large", "limit_bytes": limit})
+                handle.write(chunk)
+    except BaseException:
+        target.unlink(missing_ok=True)
+        raise
+    if written == 0:
+        target.unlink(missing_ok=True)
+        raise HTTPException(status_code=422, detail={"code": "empty_file"})
+    return target
+
+
+@router.post("/enqueue", response_model=EnqueueResponse, status_code=status.HTTP_202_ACCEPTED)
+async def enqueue(
+    file: UploadFile = File(...),
+    tenant_id: str = Form(...),
+    product: Optional[str] = Form(None),
+    version: Optional[str] = Form(None),
+    tags: Optional[str] = Form(None),
+    doc_id: Optional[str] = Form(None),
+    settings: Settings = Depends(get_settings),
+    pipeline: IngestionPipeline = Depends(get_pipeline),
+) -> EnqueueResponse:
+    try:
+        fmt = parsing.detect_format(file.filename, file.content_type)
+    except parsing.ParseError as exc:
+        raise HTTPException(status_code=415, detail={"code": "unsupported_media_type", "message": str(exc)}) from exc
+    if fmt == "pdf" and parsing.pypdf is None:
+        raise HTTPException(status_code=415, detail={"code": "pdf_support_unavailable", "message": "install the 'pdf' extra"})
+    path = await _spool(file, Path(settings.spool_dir), settings.max_file_size_mb * 1024 * 1024)
+    metadata = {
+        "product": product,
+        "version": version,
+        "tags": [tag.strip() for tag in (tags or "").split(",") if tag.strip()],
+    }
+    progress = await pipeline.submit(
+        tenant_id,
+        path,
+        fmt,
+        name=file.filename or "document",
+        doc_id=doc_id,
+        metadata={key: value for key, value in metadata.items() if value},
+    )
+    return EnqueueResponse(doc_id=progress.doc_id, status="uploaded", job_id=progress.job_id)
+
+
+@router.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, pipeline: IngestionPipeline = Depends(get_pipeline)) -> JobStatus:
+    progress = pipeline.get(job_id)
+    if progress is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"code": "job_not_found"})
+    return JobStatus(**progress.to_dict())
+
+
+@router.get("/documents/{doc_id}", response_model=JobStatus)
+async def get_document_job(
+    doc_id: str,
+    tenant_id: str,
+    pipeline: IngestionPipeline = Depends(get_pipeline),
+) -> JobStatus:
+    """Latest ingestion job for a document."""
+
+    progress = pipeline.latest_for_document(tenant_id, doc_id)
+    if progress is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"code": "job_not_found"})
+    return JobStatus(**progress.to_dict())
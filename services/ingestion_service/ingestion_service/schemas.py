@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+JobState = Literal["queued", "processing", "indexed", "failed"]
+
+
+class EnqueueResponse(BaseModel):
+    doc_id: str
+    status: str
+    job_id: str
+
+
+class JobStatus(BaseModel):
+    job_id: str
+    doc_id: str
+    tenant_id: str
+    name: str
+    status: JobState
+    stage: str
+    pages: int
+    sections_total: int
+    sections_summarized: int
+    sections_embedded: int
+    sections_indexed: int
+    chunks: int
+    sections_unchanged: int = 0
+    sections_removed: int = 0
+    summary_cache_hits: int = 0
+    summary_cache_misses: int = 0
+    embedding_cache_hits: int = 0
+    embedding_cache_misses: int = 0
+    error: Optional[str] = None
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
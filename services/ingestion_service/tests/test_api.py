@@ -0,0 +1,55 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ingestion_service.config import get_settings
+from ingestion_service.main import app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setenv("INGESTION_SERVICE_SPOOL_DIR", str(tmp_path / "spool"))
+    monkeypatch.setenv("INGESTION_SERVICE_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setenv("INGESTION_SERVICE_CONTENT_CACHE_PATH", str(tmp_path / "cache.db"))
+    monkeypatch.setenv("INGESTION_SERVICE_WORKERS", "1")
+    monkeypatch.setenv("INGESTION_SERVICE_MAX_FILE_SIZE_MB", "1")
+    get_settings.cache_clear()
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        get_settings.cache_clear()
+
+
+def test_enqueue_then_poll_job_until_indexed(client, tmp_path) -> None:
+    files = {"file": ("guide.md", b"# Install\nRun the installer.\n\n# Configure\nSet the port.", "text/markdown")}
+    response = client.post("/internal/ingestion/enqueue", data={"tenant_id": "t1", "tags": "ldap, agent"}, files=files)
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] == "uploaded" and body["doc_id"].startswith("doc_")
+
+    deadline = time.monotonic() + 30
+    while True:
+        job = client.get(f"/internal/ingestion/jobs/{body['job_id']}").json()
+        if job["status"] in ("indexed", "failed") or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert job["status"] == "indexed", job
+    assert job["sections_indexed"] == job["sections_total"] == 2
+    assert (tmp_path / "index" / "t1" / body["doc_id"] / "chunks.jsonl").exists()
+
+    latest = client.get(f"/internal/ingestion/documents/{body['doc_id']}", params={"tenant_id": "t1"})
+    assert latest.json()["job_id"] == body["job_id"]
+    assert client.get("/internal/ingestion/jobs/missing").status_code == 404
+
+
+def test_enqueue_rejects_unsupported_and_oversized_files(client, tmp_path) -> None:
+    image = {"file": ("photo.png", b"\x89PNG", "image/png")}
+    assert client.post("/internal/ingestion/enqueue", data={"tenant_id": "t1"}, files=image).status_code == 415
+
+    big = {"file": ("big.txt", b"x" * (1024 * 1024 + 1), "text/plain")}
+    response = client.post("/internal/ingestion/enqueue", data={"tenant_id": "t1"}, files=big)
+    assert response.status_code == 413
+    assert response.json()["detail"]["code"] == "file_too_large"
+    assert list((tmp_path / "spool").iterdir()) == []
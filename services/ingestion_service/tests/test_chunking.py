@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from ingestion_service.core import tokenizers
+from ingestion_service.core.chunking import Sectionizer, chunk_section, heading_title
+from ingestion_service.core.parsing import Page, iter_pages
+
+
+def test_heading_detection() -> None:
+    assert heading_title("## Installing the agent") == "Installing the agent"
+    assert heading_title("2.1 Network requirements") == "2.1 Network requirements"
+    assert heading_title("3 servers were restarted.") is None
+    assert heading_title("plain text") is None
+
+
+def test_sectionizer_splits_at_headings_across_pages() -> None:
+    sectionizer = Sectionizer(max_section_tokens=1000, default_title="Guide")
+    pages = [
+        Page(1, "Intro paragraph.\n\n# Setup\nStep one.\n\nStep two."),
+        Page(2, "Still setup.\n# Setup\nAgain."),
+    ]
+    sections = [section for page in pages for section in sectionizer.feed(page)]
+    sections.extend(sectionizer.finish())
+    assert [(s.section_id, s.title, s.page_start, s.page_end) for s in sections] == [
+        ("sec_guide", "Guide", 1, 1),
+        ("sec_setup", "Setup", 1, 2),
+        ("sec_setup_2", "Setup", 2, 2),
+    ]
+    assert sections[1].text == "Step one.\n\nStep two.\n\nStill setup."
+
+
+def test_sectionizer_splits_oversized_sections() -> None:
+    sectionizer = Sectionizer(max_section_tokens=10)
+    page = Page(1, "# Big\n" + "\n\n".join(f"word {i} word word word" for i in range(6)))
+    sections = list(sectionizer.feed(page)) + list(sectionizer.finish())
+    assert len(sections) == 3
+    assert len({section.section_id for section in sections}) == 3
+    assert {section.title for section in sections} == {"Big"}
+
+
+def test_chunk_section_merges_and_splits() -> None:
+    long_sentence = " ".join(["alpha"] * 25) + "."
+    section = {
+        "section_id": "sec_a",
+        "paragraphs": [(1, "Short one."), (1, "Short  two."), (2, long_sentence)],
+    }
+    chunks = chunk_section(section, chunk_tokens=10)
+    assert chunks[0]["text"] == "Short one.\n\nShort two."
+    assert chunks[0]["page_start"] == chunks[0]["page_end"] == 1
+    assert all(chunk["tokens"] <= 10 for chunk in chunks[1:])
+    assert [chunk["chunk_id"] for chunk in chunks] == [f"ch_sec_a_{i}" for i in range(len(chunks))]
+    assert chunks[-1]["page_end"] == 2
+
+
+def test_chunks_carry_a_token_count_per_tokenizer(monkeypatch) -> None:
+    monkeypatch.setitem(tokenizers.FAMILIES, "chars", lambda argument: lambda text: len(text) // int(argument))
+    tokenizers.get_counter.cache_clear()
+    try:
+        section = {"section_id": "sec_a", "paragraphs": [(1, "Configure LDAP, then restart.")]}
+        [chunk] = chunk_section(section, chunk_tokens=50, tokenizers=("words", "chars:4"))
+        assert chunk["token_counts"] == {"words": chunk["tokens"], "chars:4": 7}
+        assert tokenizers.get_counter("chars:4") is tokenizers.get_counter("chars:4")
+        assert chunk_section(section)[0]["token_counts"] == {}
+        with pytest.raises(ValueError):
+            tokenizers.get_counter("sentencepiece")
+    finally:
+        tokenizers.get_counter.cache_clear()
+
+
+def test_text_pages_stream_form_feeds(tmp_path) -> None:
+    path = tmp_path / "doc.txt"
+    path.write_text("first page\fsecond page\fthird", encoding="utf-8")
+
+    async def collect():
+        return [page async for page in iter_pages(path, "text")]
+
+    pages = asyncio.run(collect())
+    assert [(page.number, page.text) for page in pages] == [(1, "first page"), (2, "second page"), (3, "third")]
@@ -0,0 +1,37 @@
+from array import array
+
+from ingestion_service.core.content_cache import ContentCache, content_hash
+
+
+def test_hash_ignores_whitespace_layout() -> None:
+    assert content_hash("Run the  installer.\n") == content_hash(" Run the installer.")
+    assert content_hash("Run the installer.") != content_hash("Run the uninstaller.")
+
+
+def test_entries_are_keyed_by_model_and_survive_reopening(tmp_path) -> None:
+    path = str(tmp_path / "cache.db")
+    cache = ContentCache(path)
+    cache.put_embeddings("hashing-4", [("a", array("f", [1.0, 0.0, 0.0, 0.0]))])
+    cache.put_summaries("extractive:256", [("a", "Short summary.")])
+    cache.close()
+
+    cache = ContentCache(path)
+    try:
+        assert list(cache.get_embeddings("hashing-4", ["a", "b"])["a"]) == [1.0, 0.0, 0.0, 0.0]
+        assert cache.get_embeddings("hashing-8", ["a"]) == {}
+        assert cache.get_summaries("extractive:256", ["a", "a"]) == {"a": "Short summary."}
+    finally:
+        cache.close()
+
+
+def test_least_recently_used_entries_are_pruned(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr("ingestion_service.core.content_cache.PRUNE_EVERY", 1)
+    cache = ContentCache(str(tmp_path / "cache.db"), max_entries=2)
+    try:
+        cache.put_summaries("m", [("old", "1")])
+        cache._conn.execute("UPDATE summaries SET last_used = 0 WHERE text_hash = 'old'")
+        cache.put_summaries("m", [("new", "2"), ("newer", "3")])
+        assert set(cache.get_summaries("m", ["old", "new", "newer"])) == {"new", "newer"}
+        assert cache.size()["summaries"] == 2
+    finally:
+        cache.close()
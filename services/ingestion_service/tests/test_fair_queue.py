@@ -0,0 +1,35 @@
+import asyncio
+
+from ingestion_service.core.fair_queue import FairBatchQueue
+
+
+def test_batches_interleave_documents_and_bound_producers() -> None:
+    async def scenario():
+        queue: FairBatchQueue[str] = FairBatchQueue(per_key=3)
+        for i in range(3):
+            await queue.put("big", f"big-{i}")
+        blocked = asyncio.create_task(queue.put("big", "big-3"))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()  # only the big document waits
+        await queue.put("small", "small-0")
+
+        first = await queue.get_batch(2)
+        await blocked
+        second = await queue.get_batch(10)
+        dropped = await queue.discard("big")
+        return first, second, dropped, queue.qsize()
+
+    first, second, dropped, size = asyncio.run(scenario())
+    assert first == ["big-0", "small-0"]
+    assert second == ["big-1", "big-2", "big-3"]
+    assert (dropped, size) == (0, 0)
+
+
+def test_cost_limits_batch_but_returns_at_least_one_item() -> None:
+    async def scenario():
+        queue: FairBatchQueue[int] = FairBatchQueue()
+        await queue.put("a", 50)
+        await queue.put("b", 5)
+        return await queue.get_batch(10, cost=lambda item: item), await queue.get_batch(10, cost=lambda item: item)
+
+    assert asyncio.run(scenario()) == ([50], [5])
@@ -0,0 +1,208 @@
+import asyncio
+import json
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from ingestion_service.core.models import ExtractiveSummarizer, HashingEmbedder, Summarizer
+from ingestion_service.core.pipeline import IngestionPipeline
+from ingestion_service.core.sink import LocalIndexSink
+
+DIM = 16
+
+
+def _write(path, sections: int, paragraphs: int = 2) -> None:
+    pages = []
+    for number in range(sections):
+        body = "\n\n".join(f"Paragraph {i} of part {number}. It explains a setting." for i in range(paragraphs))
+        pages.append(f"# Part {number}\n{body}")
+    path.write_text("\f".join(pages), encoding="utf-8")
+
+
+class SlowSummarizer(ExtractiveSummarizer):
+    def __init__(self) -> None:
+        self.batches = []
+
+    async def summarize(self, texts, max_tokens):
+        self.batches.append(len(texts))
+        await asyncio.sleep(0.01)
+        return await super().summarize(texts, max_tokens)
+
+
+class BrokenSummarizer(Summarizer):
+    async def summarize(self, texts, max_tokens):
+        raise RuntimeError("model unavailable")
+
+
+def _pipeline(tmp_path, summarizer, executor, **kwargs) -> IngestionPipeline:
+    return IngestionPipeline(
+        HashingEmbedder(DIM),
+        summarizer,
+        LocalIndexSink(str(tmp_path / "index")),
+        executor=executor,
+        chunk_size_tokens=20,
+        batch_window=0.001,
+        **kwargs,
+    )
+
+
+def test_documents_are_indexed_and_small_ones_overtake_large_ones(tmp_path) -> None:
+    big, small = tmp_path / "big.txt", tmp_path / "small.txt"
+    _write(big, sections=40, paragraphs=4)
+    _write(small, sections=2)
+
+    async def scenario():
+        summarizer = SlowSummarizer()
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            pipeline = _pipeline(tmp_path, summarizer, executor, summarize_batch_size=4, stage_queue_per_document=2)
+            await pipeline.start()
+            try:
+                big_job = await pipeline.submit("t1", big, "text", name="big.txt", metadata={"product": "agent"})
+                await asyncio.sleep(0.05)
+                small_job = await pipeline.submit("t1", small, "text", name="small.txt", doc_id="doc_small")
+                finished = []
+                for task in asyncio.as_completed([pipeline.wait(big_job.job_id, 60), pipeline.wait(small_job.job_id, 60)]):
+                    finished.append((await task).doc_id)
+                return finished, pipeline.get(big_job.job_id), pipeline.latest_for_document("t1", "doc_small"), summarizer.batches
+            finally:
+                await pipeline.stop()
+
+    finished, big_progress, small_progress, batches = asyncio.run(scenario())
+    assert finished[0] == "doc_small"
+    assert big_progress.status == small_progress.status == "indexed"
+    assert big_progress.sections_indexed == big_progress.sections_total == 40
+    assert max(batches) > 1
+    assert not big.exists() and not small.exists()
+
+    doc_dir = tmp_path / "index" / "t1" / big_progress.doc_id
+    document = json.loads((doc_dir / "document.json").read_text())
+    assert document["product"] == "agent" and document["embedding_model"] == f"hashing-{DIM}"
+    sections = [json.loads(line) for line in (doc_dir / "sections.jsonl").read_text().splitlines()]
+    chunks = [json.loads(line) for line in (doc_dir / "chunks.jsonl").read_text().splitlines()]
+    assert {section["title"] for section in sections} == {f"Part {n}" for n in range(40)}
+    assert len(chunks) == big_progress.chunks == sum(len(section["chunk_ids"]) for section in sections)
+    assert (doc_dir / "section_vectors.f32").stat().st_size == 4 * DIM * len(sections)
+    assert (doc_dir / "chunk_vectors.f32").stat().st_size == 4 * DIM * len(chunks)
+    vector = array("f")
+    vector.frombytes((doc_dir / "doc_vector.f32").read_bytes())
+    assert abs(sum(value * value for value in vector) - 1.0) < 1e-4
+    text = (doc_dir / "text.bin").read_bytes()
+    first = sections[0]
+    assert text[first["text_start"] : first["text_end"]].decode().startswith(f"Paragraph 0 of {first['title'].lower()}.")
+    assert [path.name for path in (tmp_path / "index" / "t1").iterdir() if path.name.endswith(".partial")] == []
+
+
+def test_failed_stage_keeps_previous_index(tmp_path) -> None:
+    source = tmp_path / "doc.txt"
+
+    async def run(summarizer):
+        _write(source, sections=3)
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            pipeline = _pipeline(tmp_path, summarizer, executor)
+            await pipeline.start()
+            try:
+                job = await pipeline.submit("t1", source, "text", name="doc.txt", doc_id="doc_1")
+                return await pipeline.wait(job.job_id, 30)
+            finally:
+                await pipeline.stop()
+
+    assert asyncio.run(run(ExtractiveSummarizer())).status == "indexed"
+    failed = asyncio.run(run(BrokenSummarizer()))
+    assert failed.status == "failed"
+    assert failed.stage == "summarize" and "model unavailable" in failed.error
+    assert sorted(path.name for path in (tmp_path / "index" / "t1").iterdir()) == ["doc_1"]
+    assert (tmp_path / "index" / "t1" / "doc_1" / "document.json").exists()
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self, dim: int) -> None:
+        super().__init__(dim)
+        self.texts = 0
+
+    async def embed(self, texts):
+        self.texts += len(texts)
+        return await super().embed(texts)
+
+
+class CountingSummarizer(ExtractiveSummarizer):
+    def __init__(self) -> None:
+        self.texts = 0
+
+    async def summarize(self, texts, max_tokens):
+        self.texts += len(texts)
+        return await super().summarize(texts, max_tokens)
+
+
+def test_reingestion_recomputes_only_changed_sections(tmp_path) -> None:
+    source = tmp_path / "doc.txt"
+    embedder, summarizer = CountingEmbedder(DIM), CountingSummarizer()
+
+    async def run(pages, cache=None):
+        source.write_text("\f".join(pages), encoding="utf-8")
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            pipeline = IngestionPipeline(
+                embedder,
+                summarizer,
+                LocalIndexSink(str(tmp_path / "index")),
+                executor=executor,
+                cache=cache,
+                chunk_size_tokens=20,
+                batch_window=0.001,
+            )
+            await pipeline.start()
+            try:
+                job = await pipeline.submit("t1", source, "text", name="doc.txt", doc_id="doc_1")
+                return await pipeline.wait(job.job_id, 30)
+            finally:
+                await pipeline.stop()
+
+    pages = [f"# Part {n}\nParagraph one of part {n}. It explains a setting.\n\nParagraph two of part {n}." for n in range(30)]
+    first = asyncio.run(run(pages))
+    full_embeds, full_summaries = embedder.texts, summarizer.texts
+    assert first.sections_unchanged == 0 and first.summary_cache_hits == 0
+
+    edited = pages[:-1]
+    edited[3] = edited[3].replace("explains", "describes")
+    embedder.texts = summarizer.texts = 0
+    second = asyncio.run(run(edited))
+    assert second.status == "indexed"
+    assert second.sections_unchanged == 28 and second.sections_removed == 2
+    assert summarizer.texts == second.summary_cache_misses == 1
+    assert embedder.texts * 10 <= full_embeds and summarizer.texts * 10 <= full_summaries
+
+    doc_dir = tmp_path / "index" / "t1" / "doc_1"
+    document = json.loads((doc_dir / "document.json").read_text())
+    assert document["sections_unchanged"] == 28 and document["summary_hit_ratio"] > 0.9
+    sections = [json.loads(line) for line in (doc_dir / "sections.jsonl").read_text().splitlines()]
+    assert len(sections) == 29 and all(section["content_hash"] for section in sections)
+    assert (doc_dir / "section_vectors.f32").stat().st_size == 4 * DIM * 29
+
+
+def test_content_cache_serves_other_documents(tmp_path) -> None:
+    from ingestion_service.core.content_cache import ContentCache
+
+    cache = ContentCache(str(tmp_path / "cache.db"))
+    embedder, summarizer = CountingEmbedder(DIM), CountingSummarizer()
+
+    async def run(doc_id):
+        source = tmp_path / f"{doc_id}.txt"
+        _write(source, sections=5)
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            pipeline = IngestionPipeline(
+                embedder, summarizer, LocalIndexSink(str(tmp_path / "index")), executor=executor, cache=cache, batch_window=0.001
+            )
+            await pipeline.start()
+            try:
+                job = await pipeline.submit("t1", source, "text", name="doc.txt", doc_id=doc_id)
+                return await pipeline.wait(job.job_id, 30)
+            finally:
+                await pipeline.stop()
+
+    try:
+        asyncio.run(run("doc_a"))
+        embedder.texts = summarizer.texts = 0
+        copy = asyncio.run(run("doc_b"))
+    finally:
+        cache.close()
+    assert copy.status == "indexed" and copy.sections_unchanged == 0
+    assert embedder.texts == summarizer.texts == 0
+    assert copy.summary_cache_misses == copy.embedding_cache_misses == 0
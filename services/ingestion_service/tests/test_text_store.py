@@ -0,0 +1,45 @@
+import json
+from array import array
+
+from ingestion_service.core import text_store
+
+
+def _array(path, typecode):
+    values = array(typecode)
+    values.frombytes(path.read_bytes())
+    return values
+
+
+def test_sections_and_pages_are_slices_of_one_text_file(tmp_path) -> None:
+    ranges = text_store.append_sections(tmp_path, [[(1, "Install  the agent."), (2, "Open port\n\n\n443.")]])
+    ranges += text_store.append_sections(tmp_path, [[(2, "Configure LDAP.")], [(4, "Restore the backup.")]])
+    text_store.finish(tmp_path, pages=5)
+
+    text = (tmp_path / text_store.TEXT).read_bytes()
+    assert [text[start:end].decode() for start, end in ranges] == [
+        "Install the agent.\n\nOpen port\n\n443.",
+        "Configure LDAP.",
+        "Restore the backup.",
+    ]
+    pages = _array(tmp_path / text_store.PAGES, "I")
+    page = lambda number: text[pages[2 * number - 2] : pages[2 * number - 1]].decode()  # noqa: E731
+    assert page(1) == "Install the agent."
+    assert page(2) == "Open port\n\n443.\n\nConfigure LDAP."
+    assert page(3) == page(5) == ""
+    assert text[pages[0] : pages[7]].decode().endswith("Restore the backup.")
+
+    terms = list(_array(tmp_path / text_store.TERMS, "Q"))
+    offsets = _array(tmp_path / text_store.POSTINGS_INDEX, "I")
+    postings = _array(tmp_path / text_store.POSTINGS, "I")
+    assert terms == sorted(terms) and len(offsets) == len(terms) + 1
+    row = terms.index(text_store.term_hash("ldap"))
+    assert list(postings[offsets[row] : offsets[row + 1]]) == [2]
+    row = terms.index(text_store.term_hash("the"))
+    assert list(postings[offsets[row] : offsets[row + 1]]) == [0, 3]
+
+
+def test_empty_document_gets_empty_store(tmp_path) -> None:
+    text_store.finish(tmp_path, pages=2)
+    assert (tmp_path / text_store.TEXT).read_bytes() == b""
+    assert list(_array(tmp_path / text_store.PAGES, "I")) == [0, 0, 0, 0]
+    assert json.dumps(list(_array(tmp_path / text_store.TERMS, "Q"))) == "[]"
@@ -0,0 +1,95 @@
+"""Throughput and interactive latency of the scheduler over the stub model.
+
+Runs the same load twice: batched (``--batch`` requests per batch) and
+unbatched (one request per batch, what the service did before the scheduler).
+``--bulk`` summary requests are submitted at once, as an ingestion run does.
+Meanwhile ``--interactive`` assistant requests arrive one every
+``--interval-ms``. Prints requests per second and the interactive p50/p95 in
+milliseconds as JSON::
+
+    python benchmarks/bench_scheduler.py --bulk 200 --interactive 40
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from llm_service.core.backends import StubBackend  # noqa: E402
+from llm_service.core.prompt import CONTEXT_HEADER, DEFAULT_SYSTEM_PROMPT, SUMMARY_INSTRUCTIONS  # noqa: E402
+from llm_service.core.scheduler import BatchScheduler  # noqa: E402
+from llm_service.core.tokenizer import Tokenizer  # noqa: E402
+
+WORDS = "ldap backup restore cluster agent install upgrade policy audit proxy certificate replication snapshot quota kerberos".split()
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    ordered = sorted(samples)
+    return {
+        "p50_ms": round(ordered[len(ordered) // 2], 1),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1),
+    }
+
+
+def _text(index: int, words: int) -> str:
+    return " ".join(WORDS[(index * 7 + offset) % len(WORDS)] for offset in range(words))
+
+
+async def run(args: argparse.Namespace, batch_size: int) -> Dict[str, object]:
+    tokenizer = Tokenizer()
+    backend = StubBackend(tokenizer, batch_overhead_ms=args.overhead_ms, prefill_ms_per_token=args.prefill_ms, decode_ms_per_step=args.decode_ms)
+    scheduler = BatchScheduler(backend, tokenizer, max_batch_size=batch_size, window=args.window_ms / 1000, max_queue=10_000, timeout=600)
+    scheduler.start()
+    summary_prefix = f"{DEFAULT_SYSTEM_PROMPT}\n\n{SUMMARY_INSTRUCTIONS}"
+    answer_prefix = f"{DEFAULT_SYSTEM_PROMPT}\n\n{CONTEXT_HEADER}"
+    latencies: List[float] = []
+
+    async def interactive(index: int) -> None:
+        await asyncio.sleep(index * args.interval_ms / 1000)
+        started = time.perf_counter()
+        await scheduler.submit(scheduler.prefix(answer_prefix), _text(index, args.prompt_words), args.max_tokens, "interactive")
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(scheduler.submit(scheduler.prefix(summary_prefix), _text(index, args.prompt_words), args.max_tokens, "bulk") for index in range(args.bulk)),
+            *(interactive(index) for index in range(args.interactive)),
+        )
+    finally:
+        await scheduler.stop()
+    elapsed = time.perf_counter() - started
+    return {
+        "batch_max_size": batch_size,
+        "requests_per_s": round((args.bulk + args.interactive) / elapsed, 1),
+        "mean_batch": round(sum(backend.calls) / len(backend.calls), 2),
+        "interactive": _percentiles(latencies),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bulk", type=int, default=200)
+    parser.add_argument("--interactive", type=int, default=40)
+    parser.add_argument("--interval-ms", type=float, default=50.0)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--prompt-words", type=int, default=400)
+    parser.add_argument("--max-tokens", type=int, default=64)
+    parser.add_argument("--overhead-ms", type=float, default=5.0)
+    parser.add_argument("--prefill-ms", type=float, default=0.05)
+    parser.add_argument("--decode-ms", type=float, default=2.0)
+    args = parser.parse_args()
+    results = [asyncio.run(run(args, args.batch)), asyncio.run(run(args, 1))]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
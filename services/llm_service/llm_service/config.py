@@ -0,0 +1,43 @@
+from functools import lru_cache
+from typing import Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="LLM_SERVICE_", env_file=".env", extra="ignore")
+
+    app_name: str = "llm-service"
+    host: str = "0.0.0.0"
+    port: int = 8086
+    log_level: str = "info"
+
+    # "stub" (deterministic CPU model), "openai" (/v1/chat/completions at llm_runtime_url) or "package.module:Class"
+    backend: str = "stub"
+    llm_runtime_url: Optional[str] = None
+    default_model_name: str = "stub-model"
+    runtime_timeout_seconds: float = 60.0
+
+    # per request, spec section 7
+    max_prompt_tokens: int = 4096
+    max_completion_tokens: int = 512
+    max_total_tokens: int = 5120
+
+    # micro-batching; one batch runs at a time per model instance
+    batch_max_size: int = 8
+    batch_max_tokens: int = 16384
+    batch_window_ms: float = 5.0
+    max_queue: int = 256
+    # watchdog: a request is answered with a timeout after this long, queued or running
+    generation_timeout_seconds: float = 30.0
+    prefix_cache_entries: int = 64
+
+    # cost model of the stub backend
+    stub_batch_overhead_ms: float = 5.0
+    stub_prefill_ms_per_token: float = 0.05
+    stub_decode_ms_per_step: float = 2.0
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -0,0 +1,168 @@
+"""Model backends behind the scheduler.
+
+A backend receives whole batches. ``encode_prefix`` runs once per shared
+prefix and model instance, and whatever it returns is kept in the prefix
+cache and handed back with every request that uses the prefix. Backends
+that cannot hold state across calls return ``None`` there. ``generate``
+returns one ``Completion`` per request, in order.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import zlib
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional
+
+import httpx
+
+from llm_service.core.prefix_cache import EncodedPrefix
+from llm_service.core.tokenizer import Tokenizer
+
+if TYPE_CHECKING:  # pragma: no cover
+    from llm_service.config import Settings
+    from llm_service.core.scheduler import Request
+
+
+@dataclass
+class Completion:
+    text: str
+    completion_tokens: int
+    finish_reason: str  # "stop" / "length"
+
+
+class ModelBackend:
+    model_name: str = "model"
+
+    async def encode_prefix(self, prefix: EncodedPrefix) -> Any:
+        return None
+
+    async def generate(self, batch: List["Request"]) -> List[Completion]:
+        raise NotImplementedError
+
+    async def aclose(self) -> None:
+        return None
+
+
+def _apply_stop(text: str, stop: List[str]) -> Optional[str]:
+    cut = min((text.find(marker) for marker in stop if marker and marker in text), default=-1)
+    return text[:cut] if cut >= 0 else None
+
+
+class StubBackend(ModelBackend):
+    """Deterministic CPU stand-in for a batched model runtime.
+
+    The answer is the leading ``max_tokens`` pieces of the prompt body, so
+    summaries are extractive and every output is reproducible. Time is spent
+    the way a batched decoder spends it: a fixed overhead per call, prefill
+    per prompt token not already cached, and one decode step per output
+    token of the longest sequence in the batch. Batching therefore shares
+    the decode steps, and prefix caching removes the shared prompt's prefill.
+    """
+
+    def __init__(
+        self,
+        tokenizer: Tokenizer,
+        model_name: str = "stub-model",
+        batch_overhead_ms: float = 5.0,
+        prefill_ms_per_token: float = 0.05,
+        decode_ms_per_step: float = 2.0,
+    ) -> None:
+        self.tokenizer = tokenizer
+        self.model_name = model_name
+        self.batch_overhead = batch_overhead_ms / 1000
+        self.prefill_per_token = prefill_ms_per_token / 1000
+        self.decode_per_step = decode_ms_per_step / 1000
+        self.calls: List[int] = []  # batch sizes, for tests and benchmarks
+
+    async def encode_prefix(self, prefix: EncodedPrefix) -> Any:
+        await asyncio.sleep(self.prefill_per_token * len(prefix.tokens))
+        return {"checksum": zlib.crc32(prefix.tokens.tobytes())}
+
+    async def generate(self, batch: List["Request"]) -> List[Completion]:
+        self.calls.append(len(batch))
+        completions = []
+        prefill = 0
+        for request in batch:
+            prefill += len(request.body) + (0 if request.prefix.encoded else len(request.prefix.tokens))
+            pieces = self.tokenizer.pieces(request.body_text)
+            text = " ".join(pieces[: request.max_tokens])
+            finish = "length" if len(pieces) > request.max_tokens else "stop"
+            stopped = _apply_stop(text, request.stop)
+            if stopped is not None:
+                text, finish = stopped.rstrip(), "stop"
+            completions.append(Completion(text, self.tokenizer.count(text), finish))
+        steps = max((completion.completion_tokens for completion in completions), default=0)
+        await asyncio.sleep(self.batch_overhead + self.prefill_per_token * prefill + self.decode_per_step * steps)
+        return completions
+
+
+class OpenAICompatibleBackend(ModelBackend):
+    """``/v1/chat/completions`` of a vLLM or OpenAI-compatible runtime.
+
+    The chat API takes one conversation per call, so a batch becomes
+    concurrent calls that the runtime batches again on its side. The shared
+    prefix is sent as the system message, byte-identical for every request,
+    which is what the runtime's own prefix caching keys on.
+    """
+
+    def __init__(self, url: str, model_name: str, timeout: float = 60.0) -> None:
+        self.url = url.rstrip("/") + "/v1/chat/completions"
+        self.model_name = model_name
+        self._client = httpx.AsyncClient(timeout=timeout)
+
+    async def generate(self, batch: List["Request"]) -> List[Completion]:
+        return list(await asyncio.gather(*(self._one(request) for request in batch)))
+
+    async def _one(self, request: "Request") -> Completion:
+        payload: Dict[str, Any] = {
+            "model": self.model_name,
+            "messages": [{"role": "system", "content": request.prefix.text}, {"role": "user", "content": request.body_text}],
+            "max_tokens": request.max_tokens,
+            **request.params,
+        }
+        if request.stop:
+            payload["stop"] = request.stop
+        response = await self._client.post(self.url, json=payload)
+        response.raise_for_status()
+        body = response.json()
+        choice = body["choices"][0]
+        text = choice.get("message", {}).get("content") or ""
+        tokens = (body.get("usage") or {}).get("completion_tokens") or 0
+        return Completion(text, int(tokens), choice.get("finish_reason") or "stop")
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+def _import(spec: str) -> Callable[..., Any]:
+    module_name, _, attribute = spec.partition(":")
+    if not attribute:
+        raise ValueError(f"unknown backend {spec!r}; expected a registered name or 'package.module:Class'")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _require(value: Optional[str], name: str) -> str:
+    if not value:
+        raise ValueError(f"{name} must be set")
+    return value
+
+
+BACKENDS: Dict[str, Callable[[Any, Tokenizer], ModelBackend]] = {
+    "stub": lambda settings, tokenizer: StubBackend(
+        tokenizer,
+        settings.default_model_name,
+        settings.stub_batch_overhead_ms,
+        settings.stub_prefill_ms_per_token,
+        settings.stub_decode_ms_per_step,
+    ),
+    "openai": lambda settings, tokenizer: OpenAICompatibleBackend(
+        _require(settings.llm_runtime_url, "llm_runtime_url"), settings.default_model_name, settings.runtime_timeout_seconds
+    ),
+}
+
+
+def load_backend(settings: "Settings", tokenizer: Tokenizer) -> ModelBackend:
+    factory = BACKENDS.get(settings.backend)
+    return factory(settings, tokenizer) if factory else _import(settings.backend)(settings, tokenizer)
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+LLM_REQUESTS = Counter(
+    "llm_requests_total",
+    "Generate requests by mode.",
+    ("mode",),
+    registry=REGISTRY,
+)
+LLM_LATENCY = Histogram(
+    "llm_latency_ms",
+    "Generate latency in milliseconds, queueing included, by priority.",
+    ("priority",),
+    buckets=(10, 25, 50, 100, 200, 400, 800, 1500, 3000, 6000, 15000, 30000),
+    registry=REGISTRY,
+)
+LLM_TOKEN_USAGE = Counter(
+    "llm_token_usage",
+    "Tokens processed, by kind (prompt/completion/prefix_reused).",
+    ("kind",),
+    registry=REGISTRY,
+)
+LLM_ERRORS = Counter(
+    "llm_errors_total",
+    "Failed generate requests by error code.",
+    ("code",),
+    registry=REGISTRY,
+)
+LLM_BATCH_SIZE = Histogram(
+    "llm_batch_size",
+    "Requests per batch sent to the model.",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+    registry=REGISTRY,
+)
+LLM_QUEUE_WAIT = Histogram(
+    "llm_queue_wait_ms",
+    "Time from arrival to the start of the request's batch, by priority.",
+    ("priority",),
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000),
+    registry=REGISTRY,
+)
+LLM_QUEUE_DEPTH = Gauge(
+    "llm_queue_depth",
+    "Requests waiting for a batch, by priority.",
+    ("priority",),
+    registry=REGISTRY,
+)
+LLM_PREFIX_CACHE = Counter(
+    "llm_prefix_cache_total",
+    "Prompt prefixes per batched request: reused from the cache (hit) or encoded (miss).",
+    ("result",),
+    registry=REGISTRY,
+)
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import hashlib
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Optional
+
+
+def prefix_key(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class EncodedPrefix:
+    """A shared prompt prefix: its tokens and whatever the backend keeps for it (e.g. KV state)."""
+
+    key: str
+    text: str
+    tokens: array
+    state: Any = None
+    encoded: bool = False  # set once the backend has processed it
+
+
+class PrefixCache:
+    """LRU of encoded prompt prefixes (system prompt, context header, tool instructions).
+
+    Most requests share one of a few prefixes. Tokenizing and prefilling them
+    once per model instance, not once per request, removes the largest
+    repeated part of the prompt from every call.
+    """
+
+    def __init__(self, max_entries: int = 64) -> None:
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, EncodedPrefix]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[EncodedPrefix]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, entry: EncodedPrefix) -> None:
+        self._entries[entry.key] = entry
+        self._entries.move_to_end(entry.key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
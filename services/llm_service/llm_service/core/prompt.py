@@ -0,0 +1,79 @@
+"""Prompt layout from spec section 5.1, split into a shared prefix and a per-request body.
+
+The prefix (system prompt, context header, tool instructions) is the same for
+every request of a mode, so the scheduler encodes it once and reuses it. The
+body carries the retrieved chunks and the conversation. Chunks are dropped
+from the end, the least relevant first, until the prompt fits
+``max_prompt_tokens``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+from llm_service.core.tokenizer import Tokenizer
+
+DEFAULT_SYSTEM_PROMPT = "You are Visior, the internal AI assistant of Orion Soft. Answer precisely and only from the given documentation."
+CONTEXT_HEADER = "Below are relevant sections from Orion documentation. Cite the document and pages you used."
+TOOL_INSTRUCTIONS = (
+    "You may use the following tools: read_doc_section, read_doc_pages, read_doc_metadata, doc_local_search.\n"
+    'Return tool calls in JSON format: {"tool_name": "...", "arguments": {...}}'
+)
+SUMMARY_INSTRUCTIONS = "Summarize the following documentation section in a few sentences. Keep product names, settings and numbers."
+
+
+class PromptTooLong(ValueError):
+    pass
+
+
+@dataclass
+class Prompt:
+    prefix: str
+    body: str
+    dropped_chunks: int = 0
+
+
+def _chunk(chunk: Dict[str, Any]) -> str:
+    pages = f" p.{chunk['page_start']}-{chunk['page_end']}" if chunk.get("page_start") else ""
+    return f"[{chunk.get('doc_id', '')}{pages}]\n{chunk.get('text', '')}"
+
+
+def build_prompt(
+    mode: str,
+    system_prompt: Optional[str],
+    messages: List[Dict[str, str]],
+    context_chunks: List[Dict[str, Any]],
+    text: Optional[str],
+    tokenizer: Tokenizer,
+    prefix_tokens: Callable[[str], int],
+    max_prompt_tokens: int,
+) -> Prompt:
+    """``prefix_tokens`` counts the prefix, normally from the scheduler's prefix cache."""
+
+    system = system_prompt or DEFAULT_SYSTEM_PROMPT
+    if mode == "summary":
+        prefix = f"{system}\n\n{SUMMARY_INSTRUCTIONS}"
+        budget = max_prompt_tokens - prefix_tokens(prefix)
+        pieces = tokenizer.pieces(text or "")
+        if budget <= 0:
+            raise PromptTooLong("system prompt exceeds max_prompt_tokens")
+        # long sections are cut; the lead carries most of a summary anyway
+        body = (text or "") if len(pieces) <= budget else " ".join(pieces[:budget])
+        return Prompt(prefix, body)
+
+    prefix = f"{system}\n\n{CONTEXT_HEADER}" + (f"\n\n{TOOL_INSTRUCTIONS}" if mode == "mcp" else "")
+    conversation = "\n".join(f"{message['role']}: {message['content']}" for message in messages)
+    budget = max_prompt_tokens - prefix_tokens(prefix) - tokenizer.count(conversation)
+    if budget < 0:
+        raise PromptTooLong("messages exceed max_prompt_tokens")
+    kept: List[str] = []
+    for chunk in context_chunks:
+        rendered = _chunk(chunk)
+        tokens = tokenizer.count(rendered)
+        if tokens > budget:
+            break
+        kept.append(rendered)
+        budget -= tokens
+    body = "\n\n".join(kept + [conversation])
+    return Prompt(prefix, body, len(context_chunks) - len(kept))
@@ -0,0 +1,259 @@
+"""Micro-batching request scheduler for one model instance.
+
+Requests queue in two classes. ``interactive`` covers assistant answers and
+``bulk`` covers ingestion summaries. Batches take interactive requests
+first, so a backlog of summaries delays an answer by at most the batch
+already running. One batch runs at a time. Requests that arrive meanwhile
+form the next batch, so batches grow with load. An idle scheduler waits at
+most ``window`` for company before starting.
+
+A batch is closed by ``max_batch_size`` or by ``max_batch_tokens``. The
+token cost of a request is its prompt tokens that still need prefill plus
+its completion budget. Shared prompt prefixes are tokenized once and
+encoded by the backend once, then reused from the ``PrefixCache``. The
+watchdog answers a request with ``GenerationTimeout`` once it has waited
+``timeout`` seconds, queued or running. Requests that time out while queued
+never reach the model, and a batch that exceeds the timeout is cancelled.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from array import array
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from llm_service.core.backends import ModelBackend
+from llm_service.core.metrics import (
+    LLM_BATCH_SIZE,
+    LLM_PREFIX_CACHE,
+    LLM_QUEUE_DEPTH,
+    LLM_QUEUE_WAIT,
+    LLM_TOKEN_USAGE,
+)
+from llm_service.core.prefix_cache import EncodedPrefix, PrefixCache, prefix_key
+from llm_service.core.tokenizer import Tokenizer
+from llm_service.logging import get_logger
+
+logger = get_logger(__name__)
+
+PRIORITIES = ("interactive", "bulk")
+
+
+class SchedulerOverloaded(RuntimeError):
+    pass
+
+
+class GenerationTimeout(RuntimeError):
+    pass
+
+
+class BackendError(RuntimeError):
+    pass
+
+
+@dataclass(eq=False)
+class Request:
+    prefix: EncodedPrefix
+    body_text: str
+    body: array
+    max_tokens: int
+    priority: str
+    stop: List[str] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict)  # sampling parameters, passed to the runtime as is
+    enqueued: float = field(default_factory=time.monotonic)
+    future: Optional[asyncio.Future] = None
+    abandoned: bool = False
+
+
+@dataclass
+class Generation:
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+    finish_reason: str
+    batch_size: int
+    prefix_cached: bool
+    queue_ms: int
+
+
+class BatchScheduler:
+    def __init__(
+        self,
+        backend: ModelBackend,
+        tokenizer: Tokenizer,
+        max_batch_size: int = 8,
+        max_batch_tokens: int = 16384,
+        window: float = 0.005,
+        max_queue: int = 256,
+        timeout: float = 30.0,
+        prefix_cache_entries: int = 64,
+    ) -> None:
+        self.backend = backend
+        self.tokenizer = tokenizer
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.window = window
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.prefixes = PrefixCache(prefix_cache_entries)
+        self._queues: Dict[str, Deque[Request]] = {priority: deque() for priority in PRIORITIES}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    # -- lifecycle ------------------------------------------------------------------
+
+    def start(self) -> None:
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="llm-scheduler")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for queue in self._queues.values():
+            for request in queue:
+                if request.future is not None and not request.future.done():
+                    request.future.cancel()
+            queue.clear()
+
+    # -- submission -----------------------------------------------------------------
+
+    def prefix(self, text: str) -> EncodedPrefix:
+        """The cached prefix for ``text``; tokenized here on first use, encoded by the backend in its first batch."""
+
+        key = prefix_key(text)
+        entry = self.prefixes.get(key)
+        if entry is None:
+            entry = EncodedPrefix(key, text, self.tokenizer.encode(text))
+            self.prefixes.put(entry)
+        return entry
+
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def submit(
+        self,
+        prefix: EncodedPrefix,
+        body_text: str,
+        max_tokens: int,
+        priority: str = "interactive",
+        stop: Optional[List[str]] = None,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> Generation:
+        if self._wakeup is None:
+            raise RuntimeError("scheduler is not running")
+        if self.queued() >= self.max_queue:
+            raise SchedulerOverloaded("model overloaded")
+        request = Request(
+            prefix,
+            body_text,
+            self.tokenizer.encode(body_text),
+            max_tokens,
+            priority,
+            stop or [],
+            params or {},
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._queues[priority].append(request)
+        LLM_QUEUE_DEPTH.labels(priority).set(len(self._queues[priority]))
+        self._wakeup.set()
+        try:
+            return await asyncio.wait_for(asyncio.shield(request.future), self.timeout)
+        except asyncio.TimeoutError:
+            request.abandoned = True
+            raise GenerationTimeout("model timeout") from None
+        except asyncio.CancelledError:
+            request.abandoned = True
+            raise
+
+    # -- batching -------------------------------------------------------------------
+
+    async def _run(self) -> None:
+        assert self._wakeup is not None
+        while True:
+            await self._wakeup.wait()
+            if self.queued() < self.max_batch_size and self.window > 0:
+                await asyncio.sleep(self.window)
+            batch = self._take()
+            if not self.queued():
+                self._wakeup.clear()
+            if batch:
+                await self._execute(batch)
+
+    def _cost(self, request: Request, batch: List[Request]) -> int:
+        prefill = 0 if request.prefix.encoded or any(other.prefix is request.prefix for other in batch) else len(request.prefix.tokens)
+        return prefill + len(request.body) + request.max_tokens
+
+    def _take(self) -> List[Request]:
+        batch: List[Request] = []
+        tokens = 0
+        for priority in PRIORITIES:
+            queue = self._queues[priority]
+            while queue and len(batch) < self.max_batch_size:
+                request = queue[0]
+                if request.abandoned or request.future.done():
+                    queue.popleft()
+                    continue
+                cost = self._cost(request, batch)
+                if batch and tokens + cost > self.max_batch_tokens:
+                    break
+                queue.popleft()
+                batch.append(request)
+                tokens += cost
+            LLM_QUEUE_DEPTH.labels(priority).set(len(queue))
+            if batch and (len(batch) == self.max_batch_size or queue):
+                break
+        return batch
+
+    async def _execute(self, batch: List[Request]) -> None:
+        started = time.monotonic()
+        LLM_BATCH_SIZE.observe(len(batch))
+        cached = {id(request): request.prefix.encoded for request in batch}
+        for request in batch:
+            LLM_QUEUE_WAIT.labels(request.priority).observe((started - request.enqueued) * 1000)
+            LLM_PREFIX_CACHE.labels("hit" if cached[id(request)] else "miss").inc()
+        try:
+            completions = await asyncio.wait_for(self._generate(batch), self.timeout)
+        except asyncio.TimeoutError:
+            logger.warning("llm_batch_timeout", batch_size=len(batch), timeout_s=self.timeout)
+            self._fail(batch, GenerationTimeout("model timeout"))
+            return
+        except Exception as exc:
+            logger.warning("llm_batch_failed", batch_size=len(batch), error=str(exc) or type(exc).__name__)
+            self._fail(batch, BackendError(str(exc) or type(exc).__name__))
+            return
+        for request, completion in zip(batch, completions):
+            prompt_tokens = len(request.prefix.tokens) + len(request.body)
+            LLM_TOKEN_USAGE.labels("prompt").inc(prompt_tokens)
+            LLM_TOKEN_USAGE.labels("completion").inc(completion.completion_tokens)
+            if cached[id(request)]:
+                LLM_TOKEN_USAGE.labels("prefix_reused").inc(len(request.prefix.tokens))
+            if not request.future.done():
+                request.future.set_result(
+                    Generation(
+                        completion.text,
+                        prompt_tokens,
+                        completion.completion_tokens,
+                        completion.finish_reason,
+                        len(batch),
+                        cached[id(request)],
+                        int((started - request.enqueued) * 1000),
+                    )
+                )
+
+    async def _generate(self, batch: List[Request]) -> list:
+        for prefix in {id(request.prefix): request.prefix for request in batch if not request.prefix.encoded}.values():
+            prefix.state = await self.backend.encode_prefix(prefix)
+            prefix.encoded = True
+        return await self.backend.generate(batch)
+
+    @staticmethod
+    def _fail(batch: List[Request], error: Exception) -> None:
+        for request in batch:
+            if not request.future.done():
+                request.future.set_exception(error)
+                request.future.exception()  # retrieved; abandoned requests have nobody waiting
@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+import re
+import zlib
+from array import array
+
+TOKEN = re.compile(r"\w+|[^\w\s]")
+VOCABULARY = 1 << 20
+
+
+class Tokenizer:
+    """Word-piece approximation of a BPE tokenizer, used for budgets and by the stub model.
+
+    Ids are stable across processes (``crc32`` of the piece), so encoded
+    prefixes can be compared and cached.
+    """
+
+    def encode(self, text: str) -> array:
+        return array("I", (zlib.crc32(piece.encode("utf-8")) % VOCABULARY for piece in TOKEN.findall(text)))
+
+    def count(self, text: str) -> int:
+        return sum(1 for _ in TOKEN.finditer(text))
+
+    def pieces(self, text: str) -> list:
+        return TOKEN.findall(text)
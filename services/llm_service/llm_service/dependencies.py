@@ -0,0 +1,48 @@
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from llm_service.config import Settings
+from llm_service.core.backends import ModelBackend, load_backend
+from llm_service.core.scheduler import BatchScheduler
+from llm_service.core.tokenizer import Tokenizer
+from llm_service.logging import get_logger
+
+logger = get_logger(__name__)
+
+_backend: Optional[ModelBackend] = None
+_scheduler: Optional[BatchScheduler] = None
+
+
+def get_scheduler() -> BatchScheduler:
+    if _scheduler is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail={"code": "llm_not_running"})
+    return _scheduler
+
+
+async def start_scheduler(settings: Settings) -> None:
+    global _backend, _scheduler
+    tokenizer = Tokenizer()
+    _backend = load_backend(settings, tokenizer)
+    _scheduler = BatchScheduler(
+        _backend,
+        tokenizer,
+        max_batch_size=settings.batch_max_size,
+        max_batch_tokens=settings.batch_max_tokens,
+        window=settings.batch_window_ms / 1000,
+        max_queue=settings.max_queue,
+        timeout=settings.generation_timeout_seconds,
+        prefix_cache_entries=settings.prefix_cache_entries,
+    )
+    _scheduler.start()
+    logger.info("llm_scheduler_started", backend=settings.backend, model=_backend.model_name, batch_max_size=settings.batch_max_size)
+
+
+async def stop_scheduler() -> None:
+    global _backend, _scheduler
+    if _scheduler is not None:
+        await _scheduler.stop()
+        _scheduler = None
+    if _backend is not None:
+        await _backend.aclose()
+        _backend = None
@@ -0,0 +1,28 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from llm_service.config import get_settings
+from llm_service.dependencies import start_scheduler, stop_scheduler
+from llm_service.logging import configure_logging
+from llm_service.routers import llm, metrics
+
+settings = get_settings()
+configure_logging(settings.log_level)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_scheduler(get_settings())
+    yield
+    await stop_scheduler()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app.include_router(llm.router)
+app.include_router(metrics.router)
+
+
+@app.get("/health", tags=["health"])
+async def health() -> dict[str, str]:
+    return {"status": "ok"}
@@ -0,0 +1,3 @@
+from . import llm, metrics
+
+__all__ = ["llm", "metrics"]
@@ -0,0 +1,90 @@
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+
+from llm_service.config import Settings, get_settings
+from llm_service.core.metrics import LLM_ERRORS, LLM_LATENCY, LLM_REQUESTS
+from llm_service.core.prompt import PromptTooLong, build_prompt
+from llm_service.core.scheduler import BackendError, BatchScheduler, GenerationTimeout, SchedulerOverloaded
+from llm_service.dependencies import get_scheduler
+from llm_service.logging import get_logger
+from llm_service.schemas import GenerateMeta, GenerateRequest, GenerateResponse, UsedTokens
+
+router = APIRouter(prefix="/internal/llm", tags=["llm"])
+logger = get_logger(__name__)
+
+SAMPLING = ("temperature", "top_p", "presence_penalty", "frequency_penalty")
+
+
+def _error(status_code: int, code: str, message: str, headers: Optional[Dict[str, str]] = None) -> HTTPException:
+    LLM_ERRORS.labels(code).inc()
+    return HTTPException(status_code=status_code, detail={"code": code, "message": message}, headers=headers)
+
+
+@router.post("/generate", response_model=GenerateResponse)
+async def generate(
+    payload: GenerateRequest,
+    settings: Settings = Depends(get_settings),
+    scheduler: BatchScheduler = Depends(get_scheduler),
+) -> GenerateResponse:
+    started = time.perf_counter()
+    LLM_REQUESTS.labels(payload.mode).inc()
+    if payload.mode == "summary" and not payload.text:
+        raise _error(422, "LLM_INVALID_REQUEST", "summary mode requires `text`")
+    if payload.mode != "summary" and not payload.messages:
+        raise _error(422, "LLM_INVALID_REQUEST", "`messages` must not be empty")
+
+    try:
+        prompt = build_prompt(
+            payload.mode,
+            payload.system_prompt,
+            [message.model_dump() for message in payload.messages],
+            [chunk.model_dump() for chunk in payload.context_chunks],
+            payload.text,
+            scheduler.tokenizer,
+            lambda text: len(scheduler.prefix(text).tokens),
+            settings.max_prompt_tokens,
+        )
+    except PromptTooLong as exc:
+        raise _error(422, "LLM_LIMIT_EXCEEDED", str(exc)) from None
+    prefix = scheduler.prefix(prompt.prefix)
+    prompt_tokens = len(prefix.tokens) + scheduler.tokenizer.count(prompt.body)
+    requested = payload.generation_params.max_tokens or payload.max_tokens or settings.max_completion_tokens
+    max_tokens = min(requested, settings.max_completion_tokens, settings.max_total_tokens - prompt_tokens)
+    if max_tokens < 1:
+        raise _error(422, "LLM_LIMIT_EXCEEDED", "prompt leaves no room for the completion within max_total_tokens")
+
+    params: Dict[str, Any] = {
+        name: value for name in SAMPLING if (value := getattr(payload.generation_params, name)) is not None
+    }
+    priority = payload.priority or ("bulk" if payload.mode == "summary" else "interactive")
+    try:
+        result = await scheduler.submit(
+            prefix, prompt.body, max_tokens, priority, payload.generation_params.stop, params
+        )
+    except SchedulerOverloaded:
+        raise _error(status.HTTP_503_SERVICE_UNAVAILABLE, "LLM_RUNTIME_ERROR", "Model overloaded", {"Retry-After": "1"}) from None
+    except GenerationTimeout:
+        logger.warning("llm_generation_timeout", trace_id=payload.trace_id, mode=payload.mode, priority=priority)
+        raise _error(status.HTTP_504_GATEWAY_TIMEOUT, "LLM_RUNTIME_ERROR", "Model timeout") from None
+    except BackendError as exc:
+        raise _error(status.HTTP_502_BAD_GATEWAY, "LLM_RUNTIME_ERROR", str(exc)) from None
+
+    latency_ms = int((time.perf_counter() - started) * 1000)
+    LLM_LATENCY.labels(priority).observe(latency_ms)
+    return GenerateResponse(
+        answer=result.text,
+        summary=result.text if payload.mode == "summary" else None,
+        used_tokens=UsedTokens(prompt=result.prompt_tokens, completion=result.completion_tokens),
+        meta=GenerateMeta(
+            model_name=scheduler.backend.model_name,
+            latency_ms=latency_ms,
+            trace_id=payload.trace_id,
+            finish_reason=result.finish_reason,
+            batch_size=result.batch_size,
+            prefix_cached=result.prefix_cached,
+            queue_ms=result.queue_ms,
+            dropped_context_chunks=prompt.dropped_chunks,
+        ),
+    )
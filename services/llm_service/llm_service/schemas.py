@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+Mode = Literal["rag", "mcp", "summary", "direct"]
+Priority = Literal["interactive", "bulk"]
+
+
+class Message(BaseModel):
+    role: str = Field(min_length=1)
+    content: str
+
+
+class ContextChunk(BaseModel):
+    doc_id: str = ""
+    section_id: Optional[str] = None
+    text: str = ""
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+
+
+class GenerationParams(BaseModel):
+    max_tokens: Optional[int] = Field(default=None, ge=1)
+    temperature: Optional[float] = Field(default=None, ge=0)
+    top_p: Optional[float] = Field(default=None, gt=0, le=1)
+    presence_penalty: Optional[float] = None
+    frequency_penalty: Optional[float] = None
+    stop: List[str] = Field(default_factory=list, max_length=8)
+
+
+class GenerateRequest(BaseModel):
+    mode: Mode = "rag"
+    system_prompt: Optional[str] = None
+    messages: List[Message] = Field(default_factory=list)
+    context_chunks: List[ContextChunk] = Field(default_factory=list)
+    generation_params: GenerationParams = Field(default_factory=GenerationParams)
+    # `mode: summary` calls of the ingestion worker send the section text and the budget at the top level
+    text: Optional[str] = None
+    max_tokens: Optional[int] = Field(default=None, ge=1)
+    # default: `bulk` for summaries, `interactive` otherwise
+    priority: Optional[Priority] = None
+    trace_id: Optional[str] = None
+
+
+class UsedTokens(BaseModel):
+    prompt: int
+    completion: int
+
+
+class GenerateMeta(BaseModel):
+    model_name: str
+    latency_ms: int
+    tool_steps: int = 0
+    trace_id: Optional[str] = None
+    finish_reason: str
+    batch_size: int
+    prefix_cached: bool
+    queue_ms: int
+    dropped_context_chunks: int = 0
+
+
+class GenerateResponse(BaseModel):
+    answer: str
+    summary: Optional[str] = None
+    used_tokens: UsedTokens
+    tools_called: List[Dict[str, Any]] = Field(default_factory=list)
+    meta: GenerateMeta
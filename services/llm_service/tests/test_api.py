@@ -0,0 +1,58 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from llm_service.config import get_settings
+from llm_service.main import app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("LLM_SERVICE_STUB_DECODE_MS_PER_STEP", "0.1")
+    monkeypatch.setenv("LLM_SERVICE_MAX_PROMPT_TOKENS", "300")
+    monkeypatch.setenv("LLM_SERVICE_MAX_TOTAL_TOKENS", "320")
+    get_settings.cache_clear()
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        get_settings.cache_clear()
+
+
+def test_rag_generate_follows_spec_shape(client) -> None:
+    payload = {
+        "mode": "rag",
+        "messages": [{"role": "user", "content": "How to configure LDAP integration?"}],
+        "context_chunks": [{"doc_id": "doc_123", "section_id": "sec_ldap", "text": "To configure LDAP open Settings.", "page_start": 6, "page_end": 7}],
+        "generation_params": {"max_tokens": 5, "temperature": 0.2, "top_p": 0.9},
+        "trace_id": "abc-def-123",
+    }
+    response = client.post("/internal/llm/generate", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["answer"] == "[ doc_123 p . 6"
+    assert body["used_tokens"]["completion"] == 5 and body["used_tokens"]["prompt"] > 20
+    assert body["tools_called"] == []
+    assert body["meta"]["model_name"] == "stub-model" and body["meta"]["trace_id"] == "abc-def-123"
+    assert body["meta"]["finish_reason"] == "length" and body["meta"]["prefix_cached"] is False
+
+    second = client.post("/internal/llm/generate", json=payload).json()
+    assert second["meta"]["prefix_cached"] is True
+    metrics = client.get("/metrics").text
+    assert 'llm_prefix_cache_total{result="hit"} 1.0' in metrics and "llm_batch_size" in metrics
+
+
+def test_summary_mode_answers_the_ingestion_client(client) -> None:
+    body = client.post("/internal/llm/generate", json={"mode": "summary", "text": "LDAP sync runs hourly. It imports groups.", "max_tokens": 4}).json()
+    assert body["summary"] == body["answer"] == "LDAP sync runs hourly"
+    assert client.post("/internal/llm/generate", json={"mode": "summary"}).json()["detail"]["code"] == "LLM_INVALID_REQUEST"
+
+
+def test_limits_are_enforced(client) -> None:
+    long_question = {"mode": "rag", "messages": [{"role": "user", "content": "word " * 400}]}
+    response = client.post("/internal/llm/generate", json=long_question)
+    assert response.status_code == 422 and response.json()["detail"]["code"] == "LLM_LIMIT_EXCEEDED"
+
+    # the completion is capped by what the prompt leaves of max_total_tokens
+    question = {"mode": "direct", "messages": [{"role": "user", "content": "word " * 250}], "generation_params": {"max_tokens": 100}}
+    body = client.post("/internal/llm/generate", json=question).json()
+    assert body["used_tokens"]["completion"] == 320 - body["used_tokens"]["prompt"]
@@ -0,0 +1,153 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from llm_service.core.backends import Completion, StubBackend
+from llm_service.core.prompt import PromptTooLong, build_prompt
+from llm_service.core.scheduler import BackendError, BatchScheduler, GenerationTimeout, SchedulerOverloaded
+from llm_service.core.tokenizer import Tokenizer
+
+TOKENIZER = Tokenizer()
+PREFIX = "You are Visior. " * 50
+
+
+def _scheduler(backend=None, **kwargs) -> BatchScheduler:
+    options = {"window": 0.01, "timeout": 5.0}
+    options.update(kwargs)
+    return BatchScheduler(backend or StubBackend(TOKENIZER, decode_ms_per_step=0.1), TOKENIZER, **options)
+
+
+def test_concurrent_requests_share_a_batch_and_the_encoded_prefix() -> None:
+    async def scenario():
+        scheduler = _scheduler(max_batch_size=8)
+        scheduler.start()
+        try:
+            results = await asyncio.gather(
+                *(scheduler.submit(scheduler.prefix(PREFIX), f"question {index} about LDAP", 3) for index in range(6))
+            )
+            again = await scheduler.submit(scheduler.prefix(PREFIX), "one more", 3)
+        finally:
+            await scheduler.stop()
+        return scheduler, results, again
+
+    scheduler, results, again = asyncio.run(scenario())
+    assert scheduler.backend.calls == [6, 1]
+    assert [result.text for result in results] == [f"question {index} about" for index in range(6)]
+    assert all(result.batch_size == 6 and not result.prefix_cached for result in results)
+    assert results[0].finish_reason == "length" and results[0].completion_tokens == 3
+    assert again.prefix_cached and again.text == "one more" and again.finish_reason == "stop"
+    assert again.prompt_tokens == len(TOKENIZER.encode(PREFIX)) + 2
+    assert len(scheduler.prefixes) == 1
+
+
+def test_token_budget_closes_a_batch() -> None:
+    async def scenario():
+        # each request costs 1 body token + 100 completion tokens once the prefix is encoded
+        scheduler = _scheduler(max_batch_size=8, max_batch_tokens=250)
+        scheduler.start()
+        prefix = scheduler.prefix("short prefix")
+        prefix.encoded = True
+        try:
+            await asyncio.gather(*(scheduler.submit(prefix, "word", 100) for _ in range(5)))
+        finally:
+            await scheduler.stop()
+        return scheduler.backend.calls
+
+    assert asyncio.run(scenario()) == [2, 2, 1]
+
+
+def test_interactive_requests_jump_the_bulk_backlog() -> None:
+    async def scenario():
+        scheduler = _scheduler(max_batch_size=2)
+        scheduler.start()
+        order: List[str] = []
+        prefix = scheduler.prefix(PREFIX)
+
+        async def one(name: str, priority: str) -> None:
+            await scheduler.submit(prefix, name, 2, priority)
+            order.append(name)
+
+        try:
+            bulk = [asyncio.create_task(one(f"bulk{index}", "bulk")) for index in range(6)]
+            await asyncio.sleep(0)
+            await one("answer", "interactive")
+            await asyncio.gather(*bulk)
+        finally:
+            await scheduler.stop()
+        return order
+
+    order = asyncio.run(scenario())
+    assert order.index("answer") <= 2
+
+
+class SlowBackend(StubBackend):
+    async def generate(self, batch):
+        self.calls.append(len(batch))
+        await asyncio.sleep(1.0)
+        return []
+
+
+class BrokenBackend(StubBackend):
+    async def generate(self, batch):
+        raise RuntimeError("CUDA error")
+
+
+def test_watchdog_times_out_running_and_queued_requests() -> None:
+    async def scenario():
+        backend = SlowBackend(TOKENIZER)
+        scheduler = _scheduler(backend, max_batch_size=1, timeout=0.1)
+        scheduler.start()
+        prefix = scheduler.prefix(PREFIX)
+        try:
+            outcomes = await asyncio.gather(*(scheduler.submit(prefix, "hello", 2) for _ in range(3)), return_exceptions=True)
+            await asyncio.sleep(0.2)
+        finally:
+            await scheduler.stop()
+        return backend, outcomes
+
+    backend, outcomes = asyncio.run(scenario())
+    assert all(isinstance(outcome, GenerationTimeout) for outcome in outcomes)
+    # the queued requests were abandoned before they reached the model
+    assert len(backend.calls) == 1
+
+
+def test_backend_failures_and_overload_are_reported() -> None:
+    async def scenario():
+        scheduler = _scheduler(BrokenBackend(TOKENIZER), max_queue=2)
+        scheduler.start()
+        prefix = scheduler.prefix(PREFIX)
+        try:
+            outcomes = await asyncio.gather(*(scheduler.submit(prefix, "hello", 2) for _ in range(3)), return_exceptions=True)
+        finally:
+            await scheduler.stop()
+        return outcomes
+
+    outcomes = asyncio.run(scenario())
+    assert isinstance(outcomes[2], SchedulerOverloaded)
+    assert all(isinstance(outcome, BackendError) and "CUDA" in str(outcome) for outcome in outcomes[:2])
+
+
+def test_stub_applies_stop_sequences() -> None:
+    class Request:
+        def __init__(self, body_text, max_tokens, stop):
+            self.body_text, self.body, self.max_tokens, self.stop = body_text, TOKENIZER.encode(body_text), max_tokens, stop
+            self.prefix = type("Prefix", (), {"encoded": True, "tokens": TOKENIZER.encode("")})()
+
+    backend = StubBackend(TOKENIZER, batch_overhead_ms=0, decode_ms_per_step=0)
+    [completion] = asyncio.run(backend.generate([Request("alpha beta </ answer > gamma", 10, ["<"])]))
+    assert completion == Completion("alpha beta", 2, "stop")
+
+
+def test_prompt_drops_trailing_chunks_to_fit_and_rejects_oversized_messages() -> None:
+    chunks = [{"doc_id": f"doc_{index}", "text": "word " * 40, "page_start": 1, "page_end": 2} for index in range(5)]
+    messages = [{"role": "user", "content": "How to configure LDAP?"}]
+    prompt = build_prompt("mcp", None, messages, chunks, None, TOKENIZER, TOKENIZER.count, 200)
+    assert "read_doc_section" in prompt.prefix
+    assert prompt.dropped_chunks == 3 and prompt.body.endswith("user: How to configure LDAP?")
+    assert TOKENIZER.count(prompt.prefix) + TOKENIZER.count(prompt.body) <= 200
+
+    summary = build_prompt("summary", None, [], [], "word " * 500, TOKENIZER, TOKENIZER.count, 100)
+    assert TOKENIZER.count(summary.prefix) + TOKENIZER.count(summary.body) <= 100
+    with pytest.raises(PromptTooLong):
+        build_prompt("rag", None, [{"role": "user", "content": "word " * 300}], chunks, None, TOKENIZER, TOKENIZER.count, 200)
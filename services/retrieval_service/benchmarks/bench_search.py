@@ -0,0 +1,150 @@
+"""Search latency of the mapped engine on a synthetic corpus.
+
+Writes ``--docs`` documents with ``--sections`` sections of ``--chunks``
+chunks each, in the ingestion layout. Vectors are drawn around ``--topics``
+random topic directions (one topic per document), and queries are drawn the
+same way. Builds flat float16 and int8 snapshots and an int8 snapshot with
+IVF. Then it times single searches and batches of ``--batch`` searches per
+mode and prints p50/p95 in milliseconds as JSON, plus the IVF's recall@10
+against the flat int8 results::
+
+    python benchmarks/bench_search.py --docs 2000 --sections 20 --chunks 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from retrieval_service.core.builder import build_snapshot  # noqa: E402
+from retrieval_service.core.embedding import Embedder  # noqa: E402
+from retrieval_service.core.engine import RetrievalEngine, SearchQuery  # noqa: E402
+from retrieval_service.core.snapshot import open_current  # noqa: E402
+
+WORDS = "ldap backup restore cluster agent install upgrade policy audit proxy certificate replication snapshot quota kerberos".split()
+
+
+def _unit(matrix: np.ndarray) -> np.ndarray:
+    matrix = matrix.astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def _around(rng: np.random.Generator, center: np.ndarray, rows: int) -> np.ndarray:
+    # cosine to the topic direction is about 0.7
+    return _unit(center + rng.standard_normal((rows, center.shape[-1])) / np.sqrt(center.shape[-1]))
+
+
+class QueryTable(Embedder):
+    """Looks queries named ``q<n>`` up in a precomputed matrix, posing as the corpus' embedder."""
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        self.vectors = vectors
+        self.dim = vectors.shape[1]
+        self.model_id = f"hashing-{self.dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        return self.vectors[[int(text[1:]) for text in texts]]
+
+
+def write_corpus(root: Path, docs: int, sections: int, chunks: int, dim: int, tenants: int, topics: np.ndarray) -> None:
+    rng = np.random.default_rng(7)
+    for doc in range(docs):
+        center = topics[rng.integers(len(topics))]
+        directory = root / f"tenant_{doc % tenants}" / f"doc_{doc:06d}"
+        directory.mkdir(parents=True)
+        section_lines, chunk_lines = [], []
+        for section in range(sections):
+            section_id = f"sec_{section}"
+            ids = [f"ch_{section_id}_{index}" for index in range(chunks)]
+            section_lines.append(json.dumps({"section_id": section_id, "title": f"Section {section}", "page_start": section + 1, "page_end": section + 1, "chunk_ids": ids}))
+            for chunk_id in ids:
+                text = " ".join(rng.choice(WORDS, size=60))
+                chunk_lines.append(json.dumps({"chunk_id": chunk_id, "section_id": section_id, "text": text, "tokens": 60, "page_start": section + 1, "page_end": section + 1}))
+        (directory / "sections.jsonl").write_text("\n".join(section_lines) + "\n")
+        (directory / "chunks.jsonl").write_text("\n".join(chunk_lines) + "\n")
+        _around(rng, center, sections).tofile(directory / "section_vectors.f32")
+        _around(rng, center, sections * chunks).tofile(directory / "chunk_vectors.f32")
+        _around(rng, center, 1).tofile(directory / "doc_vector.f32")
+        (directory / "document.json").write_text(json.dumps({"doc_id": directory.name, "tenant_id": directory.parent.name, "embedding_model": f"hashing-{dim}", "embedding_dim": dim}))
+
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) * 1000
+    return {"p50": round(float(np.percentile(values, 50)), 2), "p95": round(float(np.percentile(values, 95)), 2)}
+
+
+def measure(engine: RetrievalEngine, mode: str, queries: int, batch: int) -> Dict[str, object]:
+    texts = [f"q{index}" for index in range(queries)]
+    single = []
+    for text in texts:
+        started = time.perf_counter()
+        engine.search_batch([SearchQuery("tenant_0", text, mode=mode)])
+        single.append(time.perf_counter() - started)
+    batched = []
+    for start in range(0, queries, batch):
+        group = [SearchQuery("tenant_0", text, mode=mode) for text in texts[start : start + batch]]
+        started = time.perf_counter()
+        engine.search_batch(group)
+        batched.append((time.perf_counter() - started) / len(group))
+    return {"single_ms": _percentiles(single), "batched_ms_per_query": _percentiles(batched), "qps_batched": round(1 / float(np.mean(batched)))}
+
+
+def recall(flat: RetrievalEngine, ivf: RetrievalEngine, queries: int) -> float:
+    hits = total = 0
+    for index in range(queries):
+        query = SearchQuery("tenant_0", f"q{index}", mode="chunk_priority", max_chunks=10, hybrid=False)
+        expected = {chunk["chunk_id"] + chunk["doc_id"] for chunk in flat.search_batch([query])[0].chunks}
+        found = {chunk["chunk_id"] + chunk["doc_id"] for chunk in ivf.search_batch([query])[0].chunks}
+        hits += len(expected & found)
+        total += len(expected)
+    return round(hits / max(total, 1), 3)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--docs", type=int, default=2000)
+    parser.add_argument("--sections", type=int, default=20)
+    parser.add_argument("--chunks", type=int, default=5)
+    parser.add_argument("--tenants", type=int, default=1)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--batch", type=int, default=32)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--topics", type=int, default=256)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(3)
+    topics = _unit(rng.standard_normal((args.topics, args.dim)))
+    embedder = QueryTable(np.concatenate([_around(rng, topics[rng.integers(args.topics)], 1) for _ in range(args.queries)]))
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_corpus(root / "source", args.docs, args.sections, args.chunks, args.dim, args.tenants, topics)
+        rows = args.docs * args.sections * args.chunks
+        report: Dict[str, object] = {"chunks": rows}
+        engines = {}
+        for label, options in (
+            ("float16", {"dtype": "float16", "ivf_min_rows": rows + 1}),
+            ("int8", {"dtype": "int8", "ivf_min_rows": rows + 1}),
+            ("int8_ivf", {"dtype": "int8", "ivf_lists": int(np.sqrt(rows))}),
+        ):
+            started = time.perf_counter()
+            build_snapshot(str(root / "source"), str(root / label), **options)
+            build_s = time.perf_counter() - started
+            engine = engines[label] = RetrievalEngine(open_current(root / label), embedder, ivf_min_rows=1, ivf_nprobe=args.nprobe)
+            modes = ("chunk_priority",) if label.endswith("ivf") else ("doc_first", "section_first", "chunk_priority")
+            report[label] = {"build_s": round(build_s, 2), **{mode: measure(engine, mode, args.queries, args.batch) for mode in modes}}
+        report["int8_ivf"]["recall_at_10"] = recall(engines["int8"], engines["int8_ivf"], args.queries)
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""Build a retrieval snapshot from ingestion output.
+
+    python -m retrieval_service.build [--source ingestion_index] [--out retrieval_index] [--dtype int8] [--ivf-lists 256]
+
+Defaults come from the ``RETRIEVAL_SERVICE_*`` settings. Running servers pick
+the new generation up within ``reload_interval_seconds``.
+"""
+
+import argparse
+
+from retrieval_service.config import get_settings
+from retrieval_service.core.builder import build_snapshot
+from retrieval_service.logging import configure_logging
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default=settings.source_dir)
+    parser.add_argument("--out", default=settings.index_dir)
+    parser.add_argument("--dtype", choices=("float16", "int8"), default=settings.vector_dtype)
+    parser.add_argument("--ivf-lists", type=int, default=settings.ivf_lists)
+    parser.add_argument("--ivf-min-rows", type=int, default=settings.ivf_min_rows)
+    parser.add_argument("--keep", type=int, default=2, help="generations kept on disk")
+    args = parser.parse_args()
+    configure_logging(settings.log_level)
+    path = build_snapshot(args.source, args.out, args.dtype, args.ivf_lists, args.ivf_min_rows, args.keep)
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
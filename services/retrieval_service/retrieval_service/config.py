@@ -0,0 +1,56 @@
+from functools import lru_cache
+from typing import Literal, Optional
+
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="RETRIEVAL_SERVICE_", env_file=".env", extra="ignore")
+
+    app_name: str = "retrieval-service"
+    host: str = "0.0.0.0"
+    port: int = 8085
+    log_level: str = "info"
+
+    # snapshots built by `python -m retrieval_service.build`; CURRENT names the one served
+    index_dir: str = "retrieval_index"
+    # ingestion output read by the builder
+    source_dir: str = "ingestion_index"
+    vector_dtype: Literal["float16", "int8"] = "int8"
+    # coarse quantizer over chunk vectors; 0 = sqrt(rows) when there are at least ivf_min_rows chunks
+    ivf_lists: int = 0
+    ivf_min_rows: int = 50000
+    ivf_nprobe: int = 8
+    reload_interval_seconds: float = 5.0
+
+    embedder: str = "hashing"
+    embedding_dim: int = 384
+
+    default_max_docs: int = 20
+    default_max_sections: int = 50
+    default_max_chunks: int = 40
+    default_token_limit: int = 4096
+    enable_hybrid: bool = True
+    hybrid_dense_weight: float = 0.7
+    # token counts used for context_token_limit unless the request names a tokenizer
+    default_tokenizer: str = "words"
+    # estimated Jaccard similarity of word 3-shingles at which a lower-scored chunk is dropped as a duplicate
+    dedup_similarity: float = 0.8
+
+    # concurrent searches are scored together, up to this many per batch
+    batch_max_size: int = 32
+    batch_window_ms: float = 2.0
+    slow_query_ms: float = 120.0
+
+    # MCP document tools, served from the text stores in source_dir
+    text_max_open_documents: int = 256
+    read_section_max_tokens: int = 2000
+    read_pages_max_pages: int = 5
+    read_pages_max_tokens: int = 4000
+    local_search_max_results: int = 5
+    local_search_snippet_chars: int = 240
+
+
+@lru_cache
+def get_settings() -> Settings:
+    return Settings()
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, List, Optional, Tuple
+
+from retrieval_service.core.engine import RetrievalEngine, SearchQuery, SearchResult
+from retrieval_service.core.metrics import RETRIEVAL_BATCH_SIZE
+
+
+class SearchBatcher:
+    """Coalesces concurrent searches into ``RetrievalEngine.search_batch`` calls.
+
+    One batch runs at a time per process, in a worker thread. Requests that
+    arrive meanwhile form the next batch, so batches grow with load and an
+    idle server answers after at most ``window`` seconds of extra wait.
+    Parallelism across cores comes from running more server processes over
+    the same mapped snapshot.
+    """
+
+    def __init__(self, engine: Callable[[], Optional[RetrievalEngine]], max_size: int = 32, window: float = 0.002) -> None:
+        self._engine = engine
+        self.max_size = max_size
+        self.window = window
+        self._pending: List[Tuple[SearchQuery, asyncio.Future]] = []
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run(), name="retrieval-batcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        for _, future in self._pending:
+            future.cancel()
+        self._pending.clear()
+
+    async def search(self, query: SearchQuery) -> SearchResult:
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((query, future))
+        self._wakeup.set()
+        return await future
+
+    async def _run(self) -> None:
+        while True:
+            await self._wakeup.wait()
+            if len(self._pending) < self.max_size and self.window > 0:
+                await asyncio.sleep(self.window)
+            batch, self._pending = self._pending[: self.max_size], self._pending[self.max_size :]
+            if not self._pending:
+                self._wakeup.clear()
+            batch = [(query, future) for query, future in batch if not future.done()]
+            if not batch:
+                continue
+            RETRIEVAL_BATCH_SIZE.observe(len(batch))
+            engine = self._engine()
+            try:
+                results = await asyncio.to_thread(engine.search_batch, [query for query, _ in batch]) if engine else [SearchResult() for _ in batch]
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
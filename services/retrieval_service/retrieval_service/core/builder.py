@@ -0,0 +1,377 @@
+"""Compile ingestion output into a mapped index snapshot.
+
+Reads ``<source_dir>/<tenant>/<doc_id>/`` directories as written by the
+ingestion worker (``document.json``, ``*.jsonl`` records and float32 vector
+files). The first pass only reads ``document.json`` and file sizes to size
+the output arrays. The second pass streams every document into preallocated
+``.npy`` memmaps, so building never holds the corpus in memory. Vectors are
+L2-normalized and then stored as float16, or as int8 with one float32 scale
+per row.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from retrieval_service.core.context import SIGNATURE_SIZE, signature, term_hashes
+from retrieval_service.core.snapshot import CURRENT, DEFAULT_TOKENIZER, FORMAT_VERSION, MANIFEST, StringWriter, current_generation
+from retrieval_service.logging import get_logger
+
+logger = get_logger(__name__)
+
+KMEANS_ITERATIONS = 12
+KMEANS_SAMPLE_PER_LIST = 64
+BLOCK_ROWS = 65536
+
+
+@dataclass
+class _SourceDoc:
+    tenant_id: str
+    doc_id: str
+    path: Path
+    product: str
+    sections: int
+    chunks: int
+
+
+def _vector_rows(path: Path, dim: int) -> int:
+    size = path.stat().st_size if path.exists() else 0
+    if size % (4 * dim):
+        raise ValueError(f"{path} is not a whole number of {dim}-d float32 rows")
+    return size // (4 * dim)
+
+
+def _scan(source_dir: Path) -> Tuple[List[_SourceDoc], int, str]:
+    docs: List[_SourceDoc] = []
+    dim: Optional[int] = None
+    model: Optional[str] = None
+    for tenant_dir in sorted(path for path in source_dir.iterdir() if path.is_dir()):
+        for doc_dir in sorted(path for path in tenant_dir.iterdir() if path.is_dir()):
+            meta_path = doc_dir / "document.json"
+            if not meta_path.exists():  # .partial / .old directories of running jobs
+                continue
+            try:
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                doc_dim, doc_model = int(meta["embedding_dim"]), str(meta["embedding_model"])
+                if dim is None:
+                    dim, model = doc_dim, doc_model
+                elif (doc_dim, doc_model) != (dim, model):
+                    raise ValueError(f"embedded with {doc_model}/{doc_dim}, the index uses {model}/{dim}")
+                docs.append(
+                    _SourceDoc(
+                        tenant_id=str(meta.get("tenant_id") or tenant_dir.name),
+                        doc_id=str(meta.get("doc_id") or doc_dir.name),
+                        path=doc_dir,
+                        product=str(meta.get("product") or ""),
+                        sections=_vector_rows(doc_dir / "section_vectors.f32", doc_dim),
+                        chunks=_vector_rows(doc_dir / "chunk_vectors.f32", doc_dim),
+                    )
+                )
+            except (OSError, ValueError, KeyError) as exc:
+                logger.warning("retrieval_index_skipped_document", path=str(doc_dir), error=str(exc))
+    if dim is None or model is None:
+        raise ValueError(f"no indexed documents under {source_dir}")
+    docs.sort(key=lambda doc: (doc.tenant_id, doc.doc_id))
+    return docs, dim, model
+
+
+def _records(path: Path) -> Iterator[Dict[str, Any]]:
+    if not path.exists():
+        return
+    with path.open(encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _read_vectors(path: Path, dim: int) -> np.ndarray:
+    if not path.exists():
+        return np.zeros((0, dim), dtype=np.float32)
+    return np.fromfile(path, dtype=np.float32).reshape(-1, dim)
+
+
+def normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return (matrix / np.maximum(norms, 1e-12)).astype(np.float32, copy=False)
+
+
+def quantize(matrix: np.ndarray, dtype: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    if dtype == "float16":
+        return matrix.astype(np.float16), None
+    scales = np.abs(matrix).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    return np.rint(matrix / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+
+
+class _LevelWriter:
+    def __init__(self, directory: Path, name: str, rows: int, dim: int, dtype: str) -> None:
+        self.vectors = np.lib.format.open_memmap(directory / f"{name}_vectors.npy", mode="w+", dtype=np.dtype(dtype), shape=(rows, dim))
+        self.scales = (
+            np.lib.format.open_memmap(directory / f"{name}_scales.npy", mode="w+", dtype=np.float32, shape=(rows,))
+            if dtype == "int8"
+            else None
+        )
+        self.dtype = dtype
+        self.row = 0
+
+    def write(self, matrix: np.ndarray) -> None:
+        values, scales = quantize(normalize(matrix), self.dtype)
+        stop = self.row + len(values)
+        self.vectors[self.row : stop] = values
+        if self.scales is not None:
+            self.scales[self.row : stop] = scales
+        self.row = stop
+
+    def flush(self) -> None:
+        self.vectors.flush()
+        if self.scales is not None:
+            self.scales.flush()
+
+
+def dequantize(vectors: np.ndarray, scales: Optional[np.ndarray], rows: slice | np.ndarray) -> np.ndarray:
+    block = np.asarray(vectors[rows], dtype=np.float32)
+    if scales is not None:
+        block *= np.asarray(scales[rows], dtype=np.float32)[:, None]
+    return block
+
+
+def _train_ivf(vectors: np.ndarray, scales: Optional[np.ndarray], lists: int, seed: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+    """Spherical k-means on a sample, then every row is assigned to its nearest centroid."""
+
+    rows = vectors.shape[0]
+    rng = np.random.default_rng(seed)
+    sample_rows = np.sort(rng.choice(rows, size=min(rows, lists * KMEANS_SAMPLE_PER_LIST), replace=False))
+    sample = dequantize(vectors, scales, sample_rows)
+    centroids = sample[rng.choice(len(sample), size=lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assignment = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignment, sample)
+        empty = np.bincount(assignment, minlength=lists) == 0
+        if empty.any():  # restart empty lists from random rows
+            sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+        centroids = normalize(sums)
+    assignment = np.empty(rows, dtype=np.int32)
+    for start in range(0, rows, BLOCK_ROWS):
+        block = dequantize(vectors, scales, slice(start, start + BLOCK_ROWS))
+        assignment[start : start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return centroids, assignment
+
+
+def build_snapshot(
+    source_dir: str,
+    index_dir: str,
+    dtype: str = "int8",
+    ivf_lists: int = 0,
+    ivf_min_rows: int = 50000,
+    keep: int = 2,
+) -> Path:
+    """Build a new generation from ``source_dir``, point ``CURRENT`` at it and prune old generations."""
+
+    started = time.monotonic()
+    source, root = Path(source_dir), Path(index_dir)
+    docs, dim, model = _scan(source)
+    # sortable by build time, which is what pruning relies on
+    generation = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f") + f"-{uuid.uuid4().hex[:6]}"
+    root.mkdir(parents=True, exist_ok=True)
+    work = root / f"{generation}.tmp"
+    work.mkdir()
+
+    n_docs, n_sections, n_chunks = len(docs), sum(doc.sections for doc in docs), sum(doc.chunks for doc in docs)
+    levels = {
+        "doc": _LevelWriter(work, "doc", n_docs, dim, dtype),
+        "section": _LevelWriter(work, "section", n_sections, dim, dtype),
+        "chunk": _LevelWriter(work, "chunk", n_chunks, dim, dtype),
+    }
+    doc_sections = np.zeros(n_docs + 1, dtype=np.int64)
+    doc_chunks = np.zeros(n_docs + 1, dtype=np.int64)
+    section_doc = np.zeros(n_sections, dtype=np.int32)
+    section_chunks = np.zeros(n_sections + 1, dtype=np.int64)
+    section_pages = np.zeros((n_sections, 2), dtype=np.int32)
+    chunk_doc = np.zeros(n_chunks, dtype=np.int32)
+    chunk_section = np.zeros(n_chunks, dtype=np.int32)
+    chunk_pages = np.zeros((n_chunks, 2), dtype=np.int32)
+    chunk_tokens = np.zeros(n_chunks, dtype=np.int32)
+    # other tokenizers' counts from the chunk records' token_counts; -1 until seen
+    tokenizer_tokens: Dict[str, np.ndarray] = {}
+    chunk_signatures = np.zeros((n_chunks, SIGNATURE_SIZE), dtype=np.uint32)
+    chunk_term_offsets = np.zeros(n_chunks + 1, dtype=np.int64)
+    terms_out = (work / "chunk_terms.tmp").open("wb")
+    strings = {name: StringWriter(work, name) for name in ("doc_ids", "section_ids", "section_titles", "chunk_ids", "chunk_text")}
+    tenants: Dict[str, List[int]] = {}
+    products: Dict[str, List[int]] = {}
+
+    section_row = chunk_row = 0
+    for row, doc in enumerate(docs):
+        tenants.setdefault(doc.tenant_id, [row, row])[1] = row + 1
+        if doc.product:
+            products.setdefault(doc.product, []).append(row)
+        strings["doc_ids"].append(doc.doc_id)
+        doc_vector = _read_vectors(doc.path / "doc_vector.f32", dim)[:1]
+        levels["doc"].write(doc_vector if len(doc_vector) else np.zeros((1, dim), dtype=np.float32))
+
+        sections = list(_records(doc.path / "sections.jsonl"))[: doc.sections]
+        section_vectors = _read_vectors(doc.path / "section_vectors.f32", dim)[: len(sections)]
+        chunks = list(_records(doc.path / "chunks.jsonl"))[: doc.chunks]
+        chunk_vectors = _read_vectors(doc.path / "chunk_vectors.f32", dim)[: len(chunks)]
+        local = {section["section_id"]: index for index, section in enumerate(sections)}
+        # chunk rows are grouped by section so a section's chunks are one range
+        order = sorted((local[chunk["section_id"]], index) for index, chunk in enumerate(chunks) if chunk.get("section_id") in local)
+
+        levels["section"].write(section_vectors)
+        counts = np.bincount([section for section, _ in order], minlength=len(sections))
+        for index, section in enumerate(sections):
+            at = section_row + index
+            strings["section_ids"].append(section["section_id"])
+            strings["section_titles"].append(section.get("title") or "")
+            section_doc[at] = row
+            section_pages[at] = (section.get("page_start") or 0, section.get("page_end") or 0)
+            section_chunks[at + 1] = section_chunks[at] + counts[index]
+
+        levels["chunk"].write(chunk_vectors[[index for _, index in order]] if order else chunk_vectors[:0])
+        for offset, (section_index, index) in enumerate(order):
+            chunk = chunks[index]
+            at = chunk_row + offset
+            strings["chunk_ids"].append(chunk["chunk_id"])
+            text = chunk.get("text") or ""
+            strings["chunk_text"].append(text)
+            chunk_doc[at] = row
+            chunk_section[at] = section_row + section_index
+            chunk_pages[at] = (chunk.get("page_start") or 0, chunk.get("page_end") or 0)
+            chunk_tokens[at] = chunk.get("tokens") or 0
+            for name, count in (chunk.get("token_counts") or {}).items():
+                if name != DEFAULT_TOKENIZER:
+                    if name not in tokenizer_tokens:
+                        tokenizer_tokens[name] = np.full(n_chunks, -1, dtype=np.int32)
+                    tokenizer_tokens[name][at] = count
+            chunk_signatures[at] = signature(text)
+            terms = term_hashes(text)
+            terms_out.write(terms.tobytes())
+            chunk_term_offsets[at + 1] = chunk_term_offsets[at] + len(terms)
+        section_row += len(sections)
+        chunk_row += len(order)
+        doc_sections[row + 1] = section_row
+        doc_chunks[row + 1] = chunk_row
+
+    # rows dropped while reading (truncated files, orphan chunks) leave the tail unused
+    section_doc, section_pages, section_chunks = section_doc[:section_row], section_pages[:section_row], section_chunks[: section_row + 1]
+    chunk_doc, chunk_section = chunk_doc[:chunk_row], chunk_section[:chunk_row]
+    chunk_pages, chunk_tokens = chunk_pages[:chunk_row], chunk_tokens[:chunk_row]
+    chunk_signatures, chunk_term_offsets = chunk_signatures[:chunk_row], chunk_term_offsets[: chunk_row + 1]
+    terms_out.close()
+    np.save(work / "chunk_terms.npy", np.fromfile(work / "chunk_terms.tmp", dtype=np.uint32))
+    (work / "chunk_terms.tmp").unlink()
+    tokenizers = {DEFAULT_TOKENIZER: "chunk_tokens"}
+    fallbacks: Dict[str, int] = {}
+    for index, name in enumerate(sorted(tokenizer_tokens), start=1):
+        counts = tokenizer_tokens[name][:chunk_row]
+        missing = counts < 0
+        # documents ingested without this tokenizer fall back to the word-piece count
+        counts[missing] = chunk_tokens[missing]
+        fallbacks[name] = int(missing.sum())
+        tokenizers[name] = f"chunk_tokens_{index}"
+        np.save(work / f"chunk_tokens_{index}.npy", counts)
+    for writer in strings.values():
+        writer.close()
+    for level in levels.values():
+        level.flush()
+    for name, used in (("section", section_row), ("chunk", chunk_row)):
+        if used != levels[name].row or used != levels[name].vectors.shape[0]:
+            _truncate(work, name, used, levels[name])
+
+    for name, array in (
+        ("doc_sections", doc_sections),
+        ("doc_chunks", doc_chunks),
+        ("section_doc", section_doc),
+        ("section_chunks", section_chunks),
+        ("section_pages", section_pages),
+        ("chunk_doc", chunk_doc),
+        ("chunk_section", chunk_section),
+        ("chunk_pages", chunk_pages),
+        ("chunk_tokens", chunk_tokens),
+        ("chunk_signatures", chunk_signatures),
+        ("chunk_term_offsets", chunk_term_offsets),
+    ):
+        np.save(work / f"{name}.npy", array)
+
+    product_names = sorted(products)
+    bitmaps = np.zeros((len(product_names), n_docs), dtype=bool)
+    for index, name in enumerate(product_names):
+        bitmaps[index, products[name]] = True
+    np.save(work / "product_bitmaps.npy", np.packbits(bitmaps, axis=1))
+
+    ivf = None
+    lists = ivf_lists or (int(np.sqrt(chunk_row)) if chunk_row >= ivf_min_rows else 0)
+    if lists and chunk_row >= lists:
+        vectors = np.load(work / "chunk_vectors.npy", mmap_mode="r")
+        scales = np.load(work / "chunk_scales.npy", mmap_mode="r") if dtype == "int8" else None
+        centroids, assignment = _train_ivf(vectors, scales, lists)
+        np.save(work / "ivf_centroids.npy", centroids)
+        np.save(work / "ivf_offsets.npy", np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=lists)))).astype(np.int64))
+        # stable, so rows inside a list stay sorted and a tenant's rows are a searchsorted range
+        np.save(work / "ivf_rows.npy", np.argsort(assignment, kind="stable").astype(np.int64))
+        ivf = {"lists": lists}
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "generation": generation,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "source_dir": str(source),
+        "dtype": dtype,
+        "dim": dim,
+        "embedding_model": model,
+        "counts": {"docs": n_docs, "sections": section_row, "chunks": chunk_row},
+        "tenants": tenants,
+        "products": product_names,
+        "ivf": ivf,
+        "tokenizers": tokenizers,
+        "signatures": True,
+        "terms": True,
+    }
+    (work / MANIFEST).write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    final = root / generation
+    work.rename(final)
+    pointer = root / f"{CURRENT}.tmp"
+    pointer.write_text(generation, encoding="utf-8")
+    os.replace(pointer, root / CURRENT)
+    _prune(root, keep)
+    logger.info(
+        "retrieval_index_built",
+        generation=generation,
+        docs=n_docs,
+        sections=section_row,
+        chunks=chunk_row,
+        ivf_lists=lists if ivf else 0,
+        tokenizer_fallbacks=fallbacks,
+        duration_ms=int((time.monotonic() - started) * 1000),
+    )
+    return final
+
+
+def _truncate(directory: Path, name: str, rows: int, level: _LevelWriter) -> None:
+    vectors = np.array(level.vectors[:rows])
+    scales = np.array(level.scales[:rows]) if level.scales is not None else None
+    del level.vectors, level.scales
+    np.save(directory / f"{name}_vectors.npy", vectors)
+    if scales is not None:
+        np.save(directory / f"{name}_scales.npy", scales)
+
+
+def _prune(root: Path, keep: int) -> None:
+    """Remove old generations. Workers still mapping one keep their pages until they reload."""
+
+    current = current_generation(root)
+    generations = sorted(path for path in root.iterdir() if path.is_dir() and (path / MANIFEST).exists())
+    for path in generations[: max(0, len(generations) - keep)]:
+        if path.name != current:
+            shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,158 @@
+"""Token-aware context builder (spec step 5.6).
+
+The builder works on arrays. Token counts come from the snapshot, stored per
+tokenizer at ingestion time. Keyword terms (``term_hashes``) and MinHash
+signatures (``signature``) are computed when the snapshot is built. No
+candidate is tokenized or hashed per query, and chunk text is decoded only
+for the chunks returned.
+
+* ``distinct`` drops candidates that nearly duplicate a better-scored one:
+  the same paragraph in two versions of a manual, or a chunk that overlaps
+  another.
+* ``pack`` picks the subset with the highest total score that fits the token
+  limit and ``max_chunks``. Taking by score is optimal when the limit does
+  not bind. When it does, a 0/1 knapsack over token counts, rounded up to
+  ``KNAPSACK_CELLS`` capacity steps, finds a better fill. For example, two
+  short relevant chunks beat one long one.
+* ``runs`` merges picked chunks that follow each other in a section into one
+  passage in section order.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+SIGNATURE_SIZE = 16
+SHINGLE = 3
+KNAPSACK_CELLS = 512
+_WORD = re.compile(r"\w+")
+TERM = re.compile(r"\w{2,}")
+_rng = np.random.default_rng(0x5EED)
+_SEEDS = _rng.integers(0, 2**63, size=SIGNATURE_SIZE, dtype=np.uint64)
+_MULTIPLIERS = _rng.integers(0, 2**63, size=SIGNATURE_SIZE, dtype=np.uint64) | np.uint64(1)
+
+
+def term_hashes(text: str) -> np.ndarray:
+    """Sorted distinct hashes of the keyword terms of ``text``, as hybrid scoring compares them."""
+
+    return np.unique(np.fromiter((zlib.crc32(term.encode("utf-8")) for term in set(TERM.findall(text.lower()))), dtype=np.uint32))
+
+
+def signature(text: str) -> np.ndarray:
+    """MinHash of the lowercased word 3-shingles; equal positions estimate the Jaccard similarity."""
+
+    words = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in _WORD.findall(text.lower())), dtype=np.uint64)
+    if not len(words):
+        return np.full(SIGNATURE_SIZE, 0xFFFFFFFF, dtype=np.uint32)
+    size = min(SHINGLE, len(words))
+    shingles = np.zeros(len(words) - size + 1, dtype=np.uint64)
+    for offset in range(size):
+        shingles = shingles * np.uint64(0x100000001B3) + words[offset : len(words) - size + 1 + offset]
+    hashed = ((shingles[:, None] ^ _SEEDS) * _MULTIPLIERS) >> np.uint64(32)
+    return hashed.min(axis=0).astype(np.uint32)
+
+
+def signatures(texts: List[str]) -> np.ndarray:
+    if not texts:
+        return np.zeros((0, SIGNATURE_SIZE), dtype=np.uint32)
+    return np.stack([signature(text) for text in texts])
+
+
+def distinct(signatures: np.ndarray, similarity: float) -> np.ndarray:
+    """Positions of candidates (given best first) that are not near-duplicates of an earlier kept one."""
+
+    if not len(signatures):
+        return np.zeros(0, dtype=np.int64)
+    needed = int(np.ceil(similarity * SIGNATURE_SIZE))
+    equal = np.zeros((len(signatures), len(signatures)), dtype=np.uint8)
+    for column in signatures.T:  # one n×n comparison per hash is cheaper than one n×n×16 array
+        equal += column[:, None] == column[None, :]
+    earlier = np.tril(equal >= needed, k=-1)
+    keep = np.ones(len(signatures), dtype=bool)
+    # most candidates resemble no better one; only the others need the in-order pass
+    for position in np.flatnonzero(earlier.any(axis=1)).tolist():
+        if (earlier[position] & keep).any():
+            keep[position] = False
+    return np.flatnonzero(keep)
+
+
+def _greedy(scores: np.ndarray, tokens: np.ndarray, budget: int, max_items: int) -> Tuple[List[int], bool]:
+    picked: List[int] = []
+    skipped = False
+    for position in range(len(scores)):
+        if tokens[position] > budget:
+            skipped = True
+            continue
+        picked.append(position)
+        budget -= int(tokens[position])
+        if len(picked) >= max_items:
+            break
+    return picked, skipped
+
+
+def _knapsack(scores: np.ndarray, tokens: np.ndarray, budget: int) -> List[int]:
+    unit = max(1, -(-budget // KNAPSACK_CELLS))
+    capacity = budget // unit
+    weights = -(-tokens.astype(np.int64) // unit)  # rounded up, so the pick fits in real tokens
+    best = np.zeros(capacity + 1, dtype=np.float64)
+    taken = np.zeros((len(scores), capacity + 1), dtype=bool)
+    for position, (weight, value) in enumerate(zip(weights.tolist(), scores.tolist())):
+        if weight > capacity:
+            continue
+        candidate = best[: capacity + 1 - weight] + value
+        better = candidate > best[weight:]
+        taken[position, weight:] = better
+        np.maximum(best[weight:], candidate, out=best[weight:])
+    picked: List[int] = []
+    cell = int(np.argmax(best))
+    for position in range(len(scores) - 1, -1, -1):
+        if taken[position, cell]:
+            picked.append(position)
+            cell -= int(weights[position])
+    return sorted(picked)
+
+
+def pack(scores: np.ndarray, tokens: np.ndarray, budget: int, max_items: int) -> np.ndarray:
+    """Positions (of candidates given best first) with the highest total score within ``budget`` tokens and ``max_items``."""
+
+    picked, skipped = _greedy(scores, tokens, budget, max_items)
+    if not skipped:
+        # nothing was left out for size: the top candidates by score fit
+        return np.asarray(picked, dtype=np.int64)
+    fill = _knapsack(scores, tokens, budget)[:max_items]
+    if scores[fill].sum() > scores[picked].sum():
+        picked = fill
+    return np.asarray(picked, dtype=np.int64)
+
+
+def runs(rows: np.ndarray, sections: np.ndarray) -> List[List[int]]:
+    """Group picked chunks into runs of consecutive chunks of one section.
+
+    ``rows`` are the picked snapshot chunk rows, best first, and ``sections``
+    their section rows. A section's chunks are consecutive rows in reading
+    order, so row ``r + 1`` continues row ``r`` when both are in the same
+    section. Runs come back ordered by their best chunk, and each run lists
+    its positions in section order.
+    """
+
+    at = {row: position for position, row in enumerate(rows.tolist())}
+    section_of = sections.tolist()
+    grouped: List[List[int]] = []
+    done = set()
+    for position, row in enumerate(rows.tolist()):
+        if position in done:
+            continue
+        start = row
+        while start - 1 in at and section_of[at[start - 1]] == section_of[position]:
+            start -= 1
+        run = []
+        while start in at and section_of[at[start]] == section_of[position]:
+            run.append(at[start])
+            start += 1
+        done.update(run)
+        grouped.append(run)
+    return grouped
@@ -0,0 +1,201 @@
+"""Reads the ingestion worker's per-document text store for the MCP document tools.
+
+``read_doc_section``, ``read_doc_pages`` and ``doc_local_search`` are served
+from ``text.bin`` and its indexes in the source directory. See
+``ingestion_service.core.text_store`` for the layout. A document's files are
+mapped once and kept in a small LRU. A section or page range is then one
+slice of the mapped text, and a local search is a binary search over the
+mapped term hashes followed by reading the matching paragraphs. Nothing is
+parsed per call except the returned slice.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+WORD = re.compile(r"\w+")
+TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def _safe(part: str) -> str:
+    # same mapping as the ingestion sink uses for directory names
+    return "".join(char if char.isalnum() or char in "-_." else "_" for char in part).lstrip(".") or "_"
+
+
+def term_hash(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _map(path: Path, dtype: str, columns: int = 1) -> np.ndarray:
+    if not path.stat().st_size:
+        return np.zeros((0, columns) if columns > 1 else 0, dtype=dtype)
+    values = np.memmap(path, dtype=dtype, mode="r")
+    return values.reshape(-1, columns) if columns > 1 else values
+
+
+def trim_tokens(text: str, max_tokens: int) -> Tuple[str, int, bool]:
+    """``text`` cut after ``max_tokens`` word-piece tokens; returns ``(text, tokens, truncated)``."""
+
+    count = 0
+    for match in TOKEN.finditer(text):
+        count += 1
+        if count > max_tokens:
+            return text[: match.start()].rstrip(), max_tokens, True
+    return text, count, False
+
+
+class DocumentText:
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.document: Dict[str, Any] = json.loads((directory / "document.json").read_text(encoding="utf-8"))
+        self.text = _map(directory / "text.bin", "u1")
+        self.paragraphs = _map(directory / "text_paragraphs.u32", "<u4", 3)
+        self.pages = _map(directory / "text_pages.u32", "<u4", 2)
+        self.terms = _map(directory / "text_terms.u64", "<u8")
+        self.postings_index = _map(directory / "text_postings_idx.u32", "<u4")
+        self.postings = _map(directory / "text_postings.u32", "<u4")
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        starts = []
+        with (directory / "sections.jsonl").open(encoding="utf-8") as handle:
+            for line in handle:
+                record = json.loads(line)
+                if "text_start" in record:
+                    self.sections[record["section_id"]] = record
+                    starts.append((record["text_start"], record["section_id"]))
+        starts.sort()
+        self._section_starts = np.asarray([start for start, _ in starts], dtype=np.int64)
+        self._section_order = [section_id for _, section_id in starts]
+
+    def _slice(self, start: int, end: int) -> str:
+        return self.text[start:end].tobytes().decode("utf-8")
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pages)
+
+    def section(self, section_id: str, max_tokens: int) -> Optional[Dict[str, Any]]:
+        record = self.sections.get(section_id)
+        if record is None:
+            return None
+        text, tokens, truncated = trim_tokens(self._slice(record["text_start"], record["text_end"]), max_tokens)
+        return {
+            "doc_id": self.document.get("doc_id"),
+            "section_id": section_id,
+            "title": record.get("title"),
+            "text": text,
+            "page_start": record.get("page_start"),
+            "page_end": record.get("page_end"),
+            "tokens": tokens,
+            "truncated": truncated,
+        }
+
+    def read_pages(self, page_start: int, page_end: int, max_tokens: int) -> Dict[str, Any]:
+        last = min(page_end, self.page_count)
+        text = self._slice(int(self.pages[page_start - 1, 0]), int(self.pages[last - 1, 1])) if page_start <= last else ""
+        text, tokens, truncated = trim_tokens(text, max_tokens)
+        return {
+            "doc_id": self.document.get("doc_id"),
+            "page_start": page_start,
+            "page_end": max(last, page_start),
+            "text": text,
+            "tokens": tokens,
+            "truncated": truncated,
+        }
+
+    def search(self, query: str, max_results: int, snippet_chars: int) -> List[Dict[str, Any]]:
+        """Paragraphs ranked by the summed IDF of the query words they contain, with a snippet each."""
+
+        words = list(dict.fromkeys(WORD.findall(query.lower())))
+        if not words or not len(self.terms):
+            return []
+        hashes = np.asarray([term_hash(word) for word in words], dtype=np.uint64)
+        rows = np.searchsorted(self.terms, hashes)
+        total = len(self.paragraphs)
+        scores: Dict[int, float] = {}
+        for row, value in zip(rows.tolist(), hashes.tolist()):
+            if row >= len(self.terms) or int(self.terms[row]) != value:
+                continue
+            postings = self.postings[self.postings_index[row] : self.postings_index[row + 1]]
+            idf = math.log(1 + total / len(postings))
+            for paragraph in postings.tolist():
+                scores[paragraph] = scores.get(paragraph, 0.0) + idf
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:max_results]
+        pattern = re.compile(r"\b(?:" + "|".join(re.escape(word) for word in words) + r")\b", re.IGNORECASE)
+        results = []
+        for paragraph, score in ranked:
+            start, end, page = (int(value) for value in self.paragraphs[paragraph])
+            text = self._slice(start, end)
+            results.append(
+                {
+                    "doc_id": self.document.get("doc_id"),
+                    "section_id": self._section_at(start),
+                    "page": page,
+                    "score": round(score, 4),
+                    "snippet": _snippet(text, pattern, snippet_chars),
+                }
+            )
+        return results
+
+    def _section_at(self, offset: int) -> Optional[str]:
+        index = int(np.searchsorted(self._section_starts, offset, side="right")) - 1
+        return self._section_order[index] if index >= 0 else None
+
+
+def _snippet(text: str, pattern: re.Pattern, width: int) -> str:
+    if len(text) <= width:
+        return text
+    match = pattern.search(text)
+    center = match.start() if match else 0
+    start = max(0, min(center - width // 3, len(text) - width))
+    piece = text[start : start + width]
+    return ("…" if start else "") + piece + ("…" if start + width < len(text) else "")
+
+
+class DocumentTextCache:
+    """Mapped text stores of recently read documents.
+
+    A re-ingested document is a new directory (the sink renames it into
+    place), so entries are checked against ``document.json``'s inode and
+    mtime on every lookup: one ``stat`` call.
+    """
+
+    def __init__(self, root: str, max_documents: int = 256) -> None:
+        self.root = Path(root)
+        self.max_documents = max_documents
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Tuple[int, int], DocumentText]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, tenant_id: str, doc_id: str) -> Optional[DocumentText]:
+        directory = self.root / _safe(tenant_id) / _safe(doc_id)
+        try:
+            stat = (directory / "document.json").stat()
+        except OSError:
+            return None
+        version = (stat.st_ino, stat.st_mtime_ns)
+        key = (tenant_id, doc_id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                return entry[1]
+        if not (directory / "text.bin").exists():
+            return None  # indexed before the text store existed
+        try:
+            document = DocumentText(directory)
+        except (OSError, ValueError):
+            return None  # replaced while being opened; the next call sees the new version
+        with self._lock:
+            self._entries[key] = (version, document)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_documents:
+                self._entries.popitem(last=False)
+        return document
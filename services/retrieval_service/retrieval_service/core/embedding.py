@@ -0,0 +1,66 @@
+"""Query embedders.
+
+Queries must be embedded with the model that embedded the index, so the
+engine refuses a snapshot whose ``embedding_model`` differs from
+``Embedder.model_id``. ``HashingEmbedder`` reproduces the ingestion worker's
+stub embedder, so a local index built from ``ingestion_service`` output can be
+searched without a model server. Anything else is ``package.module:Class``,
+constructed with the ``Settings`` object.
+"""
+
+from __future__ import annotations
+
+import importlib
+import re
+import zlib
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+_WORD = re.compile(r"\w+")
+
+
+class Embedder:
+    model_id: str = "embedder"
+    dim: int = 0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """``(len(texts), dim)`` float32, L2-normalized rows."""
+
+        raise NotImplementedError
+
+
+class HashingEmbedder(Embedder):
+    """Signed feature hashing of lowercased words and word bigrams (same features as ingestion)."""
+
+    def __init__(self, dim: int = 384) -> None:
+        self.dim = dim
+        self.model_id = f"hashing-{dim}"
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            words = _WORD.findall(text.lower())
+            features = (*words, *(f"{a} {b}" for a, b in zip(words, words[1:])))
+            if not features:
+                continue
+            digests = np.fromiter((zlib.crc32(feature.encode()) for feature in features), dtype=np.uint32, count=len(features))
+            signs = np.where(digests & 0x80000000, 1.0, -1.0).astype(np.float32)
+            np.add.at(matrix[row], digests % self.dim, signs)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+
+EMBEDDERS: Dict[str, Callable[[Any], Embedder]] = {
+    "hashing": lambda settings: HashingEmbedder(settings.embedding_dim),
+}
+
+
+def load_embedder(settings: Any) -> Embedder:
+    factory = EMBEDDERS.get(settings.embedder)
+    if factory is not None:
+        return factory(settings)
+    module_name, _, attribute = settings.embedder.partition(":")
+    if not attribute:
+        raise ValueError(f"unknown embedder {settings.embedder!r}; expected a registered name or 'package.module:Class'")
+    return getattr(importlib.import_module(module_name), attribute)(settings)
@@ -0,0 +1,346 @@
+"""doc → section → chunk search over a mapped snapshot.
+
+All scoring is matrix work on float32 blocks converted from the stored
+float16/int8 rows. ``search_batch`` embeds all queries of a batch at once.
+Queries of the same tenant share the first-level scan: one block conversion
+and one ``(rows × dim) @ (dim × queries)`` product, with top-k taken per
+column by ``argpartition``. The following levels only touch the row ranges
+under the previous level's winners. Chunk-first searches on large tenants go
+through the IVF lists when the snapshot has them.
+"""
+
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from retrieval_service.core.context import TERM, distinct, pack, runs, signatures
+from retrieval_service.core.embedding import Embedder
+from retrieval_service.core.snapshot import DEFAULT_TOKENIZER, IndexSnapshot, Level
+
+BLOCK_ROWS = 2048
+# chunks scored densely before hybrid rescoring and dedup, relative to max_chunks
+CANDIDATE_FACTOR = 3
+MODES = ("doc_first", "section_first", "chunk_priority", "hybrid_only")
+
+
+@dataclass
+class SearchQuery:
+    tenant_id: str
+    query: str
+    mode: str = "section_first"
+    max_docs: int = 20
+    max_sections: int = 50
+    max_chunks: int = 40
+    token_limit: int = 4096
+    hybrid: bool = True
+    # whose token counts the token limit is measured in; unknown names fall back to "words"
+    tokenizer: str = DEFAULT_TOKENIZER
+    product: Optional[str] = None
+    doc_ids: Optional[Sequence[str]] = None
+
+
+@dataclass
+class SearchResult:
+    chunks: List[Dict[str, object]] = field(default_factory=list)
+    used_docs: List[Dict[str, object]] = field(default_factory=list)
+    used_sections: List[Dict[str, object]] = field(default_factory=list)
+    hybrid_used: bool = False
+    ivf_used: bool = False
+    generation: Optional[str] = None
+    tokenizer: str = DEFAULT_TOKENIZER
+    candidates: Dict[str, int] = field(default_factory=dict)
+
+
+def _block(level: Level, rows: slice | np.ndarray) -> np.ndarray:
+    block = np.asarray(level.vectors[rows], dtype=np.float32)
+    if level.scales is not None:
+        block *= np.asarray(level.scales[rows], dtype=np.float32)[:, None]
+    return block
+
+
+def score_range(level: Level, lo: int, hi: int, queries: np.ndarray) -> np.ndarray:
+    """Scores of rows ``lo:hi`` against every query, shape ``(hi - lo, len(queries))``."""
+
+    scores = np.empty((hi - lo, len(queries)), dtype=np.float32)
+    for start in range(lo, hi, BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, hi)
+        scores[start - lo : stop - lo] = _block(level, slice(start, stop)) @ queries.T
+    return scores
+
+
+def score_rows(level: Level, rows: np.ndarray, query: np.ndarray) -> np.ndarray:
+    if not len(rows):
+        return np.zeros(0, dtype=np.float32)
+    return _block(level, rows) @ query
+
+
+def topk(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the ``k`` best finite scores, best first."""
+
+    k = min(k, int(np.isfinite(scores).sum()))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    best = np.argpartition(-scores, k - 1)[:k] if k < len(scores) else np.arange(len(scores))
+    return best[np.argsort(-scores[best], kind="stable")]
+
+
+def ranges(offsets: np.ndarray, parents: np.ndarray) -> np.ndarray:
+    """Concatenated child rows of ``parents`` from CSR ``offsets``."""
+
+    if not len(parents):
+        return np.zeros(0, dtype=np.int64)
+    starts, stops = np.asarray(offsets[parents], dtype=np.int64), np.asarray(offsets[parents + 1], dtype=np.int64)
+    lengths = stops - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    # start of each run repeated over its length, plus the position inside the run
+    run_starts = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return run_starts + np.arange(total)
+
+
+def query_terms(text: str) -> set:
+    return set(TERM.findall(text.lower()))
+
+
+class RetrievalEngine:
+    def __init__(
+        self,
+        snapshot: IndexSnapshot,
+        embedder: Embedder,
+        dense_weight: float = 0.7,
+        ivf_min_rows: int = 50000,
+        ivf_nprobe: int = 8,
+        dedup_similarity: float = 0.8,
+    ) -> None:
+        if snapshot.embedding_model != embedder.model_id or snapshot.dim != embedder.dim:
+            raise ValueError(
+                f"snapshot {snapshot.generation} was embedded with {snapshot.embedding_model}/{snapshot.dim}, "
+                f"the query embedder is {embedder.model_id}/{embedder.dim}"
+            )
+        self.snapshot = snapshot
+        self.embedder = embedder
+        self.dense_weight = dense_weight
+        self.ivf_min_rows = ivf_min_rows
+        self.ivf_nprobe = ivf_nprobe
+        self.dedup_similarity = dedup_similarity
+
+    # -- filters -------------------------------------------------------------------
+
+    def _doc_mask(self, query: SearchQuery, lo: int, hi: int) -> Optional[np.ndarray]:
+        """Allowed docs inside the tenant range, or ``None`` when every doc is allowed."""
+
+        snapshot = self.snapshot
+        mask: Optional[np.ndarray] = None
+        if query.product is not None:
+            row = snapshot.products.get(query.product)
+            mask = np.zeros(hi - lo, dtype=bool)
+            if row is not None:
+                mask = np.unpackbits(snapshot.product_bitmaps[row], count=len(snapshot.docs))[lo:hi].astype(bool)
+        if query.doc_ids is not None:
+            wanted = np.zeros(hi - lo, dtype=bool)
+            for doc_id in query.doc_ids:
+                doc_row = snapshot.doc_row(query.tenant_id, doc_id)
+                if doc_row is not None:
+                    wanted[doc_row - lo] = True
+            mask = wanted if mask is None else mask & wanted
+        return mask
+
+    # -- search --------------------------------------------------------------------
+
+    def search_batch(self, queries: Sequence[SearchQuery]) -> List[SearchResult]:
+        results = [SearchResult(generation=self.snapshot.generation) for _ in queries]
+        if not queries:
+            return results
+        vectors = self.embedder.embed([query.query for query in queries]).astype(np.float32, copy=False)
+        groups: Dict[Tuple[str, str], List[int]] = {}
+        for index, query in enumerate(queries):
+            if query.tenant_id in self.snapshot.tenants:
+                first_level = "doc" if query.mode == "doc_first" else "section" if query.mode == "section_first" else "chunk"
+                groups.setdefault((query.tenant_id, first_level), []).append(index)
+        for (tenant_id, first_level), members in groups.items():
+            lo, hi = self.snapshot.tenants[tenant_id]
+            if first_level == "chunk":
+                self._chunk_first(tenant_id, lo, hi, [queries[i] for i in members], vectors[members], [results[i] for i in members])
+            else:
+                self._shared_scan(first_level, lo, hi, [queries[i] for i in members], vectors[members], [results[i] for i in members])
+        return results
+
+    def _shared_scan(
+        self,
+        first_level: str,
+        lo: int,
+        hi: int,
+        queries: List[SearchQuery],
+        vectors: np.ndarray,
+        results: List[SearchResult],
+    ) -> None:
+        snapshot = self.snapshot
+        if first_level == "doc":
+            level, row_lo, row_hi, owner = snapshot.docs, lo, hi, None
+        else:
+            level, owner = snapshot.sections, snapshot.section_doc
+            row_lo, row_hi = int(snapshot.doc_sections[lo]), int(snapshot.doc_sections[hi])
+        scores = score_range(level, row_lo, row_hi, vectors)
+        for column, (query, result) in enumerate(zip(queries, results)):
+            column_scores = scores[:, column]
+            mask = self._doc_mask(query, lo, hi)
+            if mask is not None:
+                allowed = mask if owner is None else mask[np.asarray(owner[row_lo:row_hi]) - lo]
+                column_scores = np.where(allowed, column_scores, -np.inf)
+            vector = vectors[column]
+            if first_level == "doc":
+                best = topk(column_scores, query.max_docs)
+                doc_rows = best + lo
+                doc_scores = column_scores[best]
+                section_rows = ranges(snapshot.doc_sections, doc_rows)
+                section_scores = score_rows(snapshot.sections, section_rows, vector)
+                result.candidates["docs"] = len(doc_rows)
+            else:
+                section_rows, section_scores = np.arange(row_lo, row_hi), column_scores
+                doc_rows = doc_scores = None
+            best = topk(section_scores, query.max_sections)
+            section_rows, section_scores = section_rows[best], section_scores[best]
+            chunk_rows = ranges(snapshot.section_chunks, section_rows)
+            chunk_scores = score_rows(snapshot.chunks, chunk_rows, vector)
+            result.candidates["sections"] = len(section_rows)
+            self._finish(query, result, chunk_rows, chunk_scores, dict(zip(section_rows.tolist(), section_scores.tolist())), doc_rows, doc_scores)
+
+    def _chunk_first(
+        self,
+        tenant_id: str,
+        lo: int,
+        hi: int,
+        queries: List[SearchQuery],
+        vectors: np.ndarray,
+        results: List[SearchResult],
+    ) -> None:
+        snapshot = self.snapshot
+        row_lo, row_hi = int(snapshot.doc_chunks[lo]), int(snapshot.doc_chunks[hi])
+        use_ivf = bool(snapshot.ivf) and row_hi - row_lo >= self.ivf_min_rows
+        scores = None if use_ivf else score_range(snapshot.chunks, row_lo, row_hi, vectors)
+        for column, (query, result) in enumerate(zip(queries, results)):
+            if use_ivf:
+                rows = self._ivf_candidates(vectors[column], row_lo, row_hi)
+                column_scores = score_rows(snapshot.chunks, rows, vectors[column])
+                result.ivf_used = True
+            else:
+                rows, column_scores = np.arange(row_lo, row_hi), scores[:, column]
+            mask = self._doc_mask(query, lo, hi)
+            if mask is not None:
+                column_scores = np.where(mask[np.asarray(snapshot.chunk_doc[rows]) - lo], column_scores, -np.inf)
+            best = topk(column_scores, query.max_chunks * CANDIDATE_FACTOR)
+            self._finish(query, result, rows[best], column_scores[best], None, None, None)
+
+    def _ivf_candidates(self, vector: np.ndarray, row_lo: int, row_hi: int) -> np.ndarray:
+        """Chunk rows of the tenant in the ``ivf_nprobe`` lists closest to the query."""
+
+        snapshot = self.snapshot
+        lists = topk(np.asarray(snapshot.ivf_centroids) @ vector, self.ivf_nprobe)
+        parts = []
+        for list_id in lists:
+            start, stop = int(snapshot.ivf_offsets[list_id]), int(snapshot.ivf_offsets[list_id + 1])
+            members = snapshot.ivf_rows[start:stop]
+            # rows inside a list are sorted, so the tenant's rows are one slice of it
+            parts.append(np.asarray(members[np.searchsorted(members, row_lo) : np.searchsorted(members, row_hi)]))
+        return np.sort(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+
+    # -- assembly ------------------------------------------------------------------
+
+    def _keyword_overlap(self, rows: np.ndarray, terms: set) -> Optional[np.ndarray]:
+        """Share of the query terms each chunk contains, from the stored term hashes."""
+
+        snapshot = self.snapshot
+        if snapshot.chunk_terms is None:
+            return None
+        wanted = np.unique(np.fromiter((zlib.crc32(term.encode("utf-8")) for term in terms), dtype=np.uint32))
+        offsets = np.asarray(snapshot.chunk_term_offsets)
+        lengths = offsets[rows + 1] - offsets[rows]
+        hits = np.isin(np.asarray(snapshot.chunk_terms[ranges(offsets, rows)]), wanted)
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        return (np.bincount(owner, weights=hits, minlength=len(rows)) / len(terms)).astype(np.float32)
+
+    def _finish(
+        self,
+        query: SearchQuery,
+        result: SearchResult,
+        chunk_rows: np.ndarray,
+        chunk_scores: np.ndarray,
+        section_scores: Optional[Dict[int, float]],
+        doc_rows: Optional[np.ndarray],
+        doc_scores: Optional[np.ndarray],
+    ) -> None:
+        snapshot = self.snapshot
+        pool = topk(chunk_scores, query.max_chunks * CANDIDATE_FACTOR)
+        chunk_rows, dense = chunk_rows[pool], np.clip(chunk_scores[pool], 0.0, 1.0)
+        texts: Optional[List[str]] = None
+        scores = dense
+        if query.hybrid or query.mode == "hybrid_only":
+            terms = query_terms(query.query)
+            if terms:
+                sparse = self._keyword_overlap(chunk_rows, terms)
+                if sparse is None:  # snapshot without stored terms
+                    texts = snapshot.chunk_text.take(chunk_rows)
+                    sparse = np.fromiter((len(terms & query_terms(text)) / len(terms) for text in texts), dtype=np.float32, count=len(texts))
+                scores = self.dense_weight * dense + (1 - self.dense_weight) * sparse
+                result.hybrid_used = True
+        result.candidates["chunks"] = len(chunk_rows)
+
+        order = np.argsort(-scores, kind="stable")
+        chunk_rows, scores = chunk_rows[order], scores[order]
+        if snapshot.chunk_signatures is not None:
+            minhashes = np.asarray(snapshot.chunk_signatures[chunk_rows])
+        else:
+            minhashes = signatures([texts[position] for position in order] if texts is not None else snapshot.chunk_text.take(chunk_rows))
+        keep = distinct(minhashes, self.dedup_similarity)
+        chunk_rows, scores = chunk_rows[keep], scores[keep]
+        counts = snapshot.token_counts.get(query.tokenizer)
+        if counts is None:
+            counts, result.tokenizer = snapshot.chunk_tokens, DEFAULT_TOKENIZER
+        else:
+            result.tokenizer = query.tokenizer
+        tokens = np.asarray(counts[chunk_rows], dtype=np.int64)
+        chosen = pack(scores, tokens, query.token_limit, query.max_chunks)
+        chunk_rows, scores, tokens = chunk_rows[chosen], scores[chosen], tokens[chosen]
+        sections = np.asarray(snapshot.chunk_section[chunk_rows])
+
+        doc_score_by_row = dict(zip(doc_rows.tolist(), doc_scores.tolist())) if doc_rows is not None else {}
+        best_doc: Dict[int, float] = {}
+        best_section: Dict[int, float] = {}
+        for run in runs(chunk_rows, sections):
+            rows = chunk_rows[run]
+            first, score = int(rows[0]), float(scores[run].max())
+            doc_row, section_row = int(snapshot.chunk_doc[first]), int(sections[run[0]])
+            doc_id = snapshot.doc_ids[doc_row]
+            pages = np.asarray(snapshot.chunk_pages[rows])
+            page_start, page_end = int(pages[:, 0].min()), int(pages[:, 1].max())
+            chunk_ids = snapshot.chunk_ids.take(rows)
+            result.chunks.append(
+                {
+                    "chunk_id": chunk_ids[0],
+                    "chunk_ids": chunk_ids,
+                    "doc_id": doc_id,
+                    "section_id": snapshot.section_ids[section_row],
+                    "text": "\n\n".join(snapshot.chunk_text.take(rows)),
+                    "tokens": int(tokens[run].sum()),
+                    "page_start": page_start,
+                    "page_end": page_end,
+                    "score": round(score, 4),
+                    "mcp_link": {"doc_id": doc_id, "page_start": page_start, "page_end": page_end},
+                }
+            )
+            section_score = section_scores.get(section_row, score) if section_scores is not None else score
+            best_section[section_row] = max(best_section.get(section_row, 0.0), section_score)
+            best_doc[doc_row] = max(best_doc.get(doc_row, 0.0), doc_score_by_row.get(doc_row, section_score))
+        result.used_docs = [
+            {"doc_id": snapshot.doc_ids[row], "score": round(max(0.0, score), 4)}
+            for row, score in sorted(best_doc.items(), key=lambda item: -item[1])
+        ]
+        result.used_sections = [
+            {"section_id": snapshot.section_ids[row], "doc_id": snapshot.doc_ids[int(snapshot.section_doc[row])], "score": round(max(0.0, score), 4)}
+            for row, score in sorted(best_section.items(), key=lambda item: -item[1])
+        ]
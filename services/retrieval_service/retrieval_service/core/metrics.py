@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+RETRIEVAL_REQUESTS = Counter(
+    "retrieval_requests_total",
+    "Search requests.",
+    registry=REGISTRY,
+)
+RETRIEVAL_LATENCY = Histogram(
+    "retrieval_latency_ms",
+    "Search latency in milliseconds, including time spent waiting for a batch.",
+    buckets=(1, 2, 5, 10, 20, 35, 50, 75, 100, 120, 150, 200, 300, 500, 1000),
+    registry=REGISTRY,
+)
+RETRIEVAL_MODE = Counter(
+    "retrieval_mode_count",
+    "Search requests by retrieval mode.",
+    ("mode",),
+    registry=REGISTRY,
+)
+RETRIEVAL_HYBRID_USAGE = Counter(
+    "retrieval_hybrid_usage_total",
+    "Searches that combined dense and keyword scores.",
+    registry=REGISTRY,
+)
+RETRIEVAL_EMPTY_RESULTS = Counter(
+    "retrieval_empty_results_total",
+    "Searches that returned no chunks.",
+    registry=REGISTRY,
+)
+RETRIEVAL_BATCH_SIZE = Histogram(
+    "retrieval_batch_size",
+    "Searches scored together in one batch.",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+    registry=REGISTRY,
+)
+RETRIEVAL_INDEX_ROWS = Gauge(
+    "retrieval_index_rows",
+    "Rows in the served snapshot by level.",
+    ("level",),
+    registry=REGISTRY,
+)
+
+DOCUMENT_TOOL_LATENCY = Histogram(
+    "retrieval_document_tool_latency_ms",
+    "Latency of the MCP document reads (read_doc_section / read_doc_pages / doc_local_search) in milliseconds.",
+    ("tool",),
+    buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 50, 80, 120, 200),
+    registry=REGISTRY,
+)
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
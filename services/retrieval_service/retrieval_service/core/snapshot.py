@@ -0,0 +1,180 @@
+"""On-disk index snapshot, opened with ``mmap``.
+
+A snapshot is one directory under ``index_dir``; ``CURRENT`` holds the name of
+the one being served::
+
+    <index_dir>/CURRENT
+    <index_dir>/<generation>/
+        manifest.json                 dtype, dim, model id, counts, tenant row ranges
+        {doc,section,chunk}_vectors.npy   float16, or int8 with {level}_scales.npy
+        doc_sections.npy, doc_chunks.npy  CSR offsets: doc row -> section / chunk rows
+        section_doc.npy, section_chunks.npy, section_pages.npy
+        chunk_doc.npy, chunk_section.npy, chunk_pages.npy
+        chunk_tokens.npy, chunk_tokens_<n>.npy    token counts per tokenizer, named in the manifest
+        chunk_signatures.npy          MinHash of each chunk's text, for near-duplicate removal
+        chunk_terms.npy, chunk_term_offsets.npy   keyword term hashes per chunk (CSR), for hybrid scoring
+        product_bitmaps.npy           packed doc bitmaps, one row per product
+        ivf_centroids.npy, ivf_offsets.npy, ivf_rows.npy   (optional)
+        <name>.bin + <name>.idx.npy   string tables (ids, titles, chunk text)
+
+Rows are sorted by tenant and then by document, so the rows of a tenant and
+the rows of a document are contiguous ranges. Tenant and document filters
+are slices, and product filters are one ``unpackbits`` over that slice. All
+arrays are loaded with ``mmap_mode="r"``. Worker processes serving the same
+snapshot share its pages through the OS page cache instead of each holding
+a private copy.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+CURRENT = "CURRENT"
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+LEVELS = ("doc", "section", "chunk")
+DEFAULT_TOKENIZER = "words"
+
+
+class SnapshotError(RuntimeError):
+    pass
+
+
+class StringWriter:
+    """Streams strings into ``<name>.bin`` and records their offsets for ``StringTable``."""
+
+    def __init__(self, directory: Path, name: str) -> None:
+        self._directory = directory
+        self._name = name
+        self._handle = (directory / f"{name}.bin").open("wb")
+        self._offsets = [0]
+
+    def append(self, value: str) -> None:
+        data = value.encode("utf-8")
+        self._handle.write(data)
+        self._offsets.append(self._offsets[-1] + len(data))
+
+    def close(self) -> None:
+        self._handle.close()
+        np.save(self._directory / f"{self._name}.idx.npy", np.asarray(self._offsets, dtype=np.int64))
+
+
+class StringTable:
+    """Read-only list of strings backed by a mapped blob and an offset array."""
+
+    def __init__(self, directory: Path, name: str) -> None:
+        self._offsets = np.load(directory / f"{name}.idx.npy", mmap_mode="r")
+        blob = directory / f"{name}.bin"
+        self._blob = np.memmap(blob, dtype=np.uint8, mode="r") if blob.stat().st_size else np.zeros(0, dtype=np.uint8)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        start, stop = int(self._offsets[row]), int(self._offsets[row + 1])
+        return self._blob[start:stop].tobytes().decode("utf-8")
+
+    def take(self, rows: Iterable[int]) -> List[str]:
+        return [self[int(row)] for row in rows]
+
+
+class Level:
+    """Vectors of one index level, plus the dequantization scales for int8."""
+
+    def __init__(self, directory: Path, name: str) -> None:
+        self.vectors = np.load(directory / f"{name}_vectors.npy", mmap_mode="r")
+        scales = directory / f"{name}_scales.npy"
+        self.scales: Optional[np.ndarray] = np.load(scales, mmap_mode="r") if scales.exists() else None
+
+    def __len__(self) -> int:
+        return self.vectors.shape[0]
+
+
+class IndexSnapshot:
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        try:
+            self.manifest = json.loads((path / MANIFEST).read_text(encoding="utf-8"))
+        except (OSError, ValueError) as exc:
+            raise SnapshotError(f"cannot read snapshot manifest in {path}: {exc}") from exc
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise SnapshotError(f"unsupported snapshot format {self.manifest.get('format')!r} in {path}")
+        load = lambda name: np.load(path / f"{name}.npy", mmap_mode="r")  # noqa: E731
+
+        self.generation: str = self.manifest["generation"]
+        self.dim: int = self.manifest["dim"]
+        self.embedding_model: str = self.manifest["embedding_model"]
+        self.docs = Level(path, "doc")
+        self.sections = Level(path, "section")
+        self.chunks = Level(path, "chunk")
+
+        self.doc_sections = load("doc_sections")
+        self.doc_chunks = load("doc_chunks")
+        self.section_doc = load("section_doc")
+        self.section_chunks = load("section_chunks")
+        self.section_pages = load("section_pages")
+        self.chunk_doc = load("chunk_doc")
+        self.chunk_section = load("chunk_section")
+        self.chunk_pages = load("chunk_pages")
+        self.chunk_tokens = load("chunk_tokens")
+        # snapshots built before per-tokenizer counts, signatures and terms only have the word-piece counts
+        self.token_counts: Dict[str, np.ndarray] = {
+            name: load(file) for name, file in self.manifest.get("tokenizers", {DEFAULT_TOKENIZER: "chunk_tokens"}).items()
+        }
+        self.chunk_signatures: Optional[np.ndarray] = load("chunk_signatures") if self.manifest.get("signatures") else None
+        self.chunk_terms: Optional[np.ndarray] = load("chunk_terms") if self.manifest.get("terms") else None
+        self.chunk_term_offsets: Optional[np.ndarray] = load("chunk_term_offsets") if self.manifest.get("terms") else None
+        self.product_bitmaps = load("product_bitmaps")
+
+        self.doc_ids = StringTable(path, "doc_ids")
+        self.section_ids = StringTable(path, "section_ids")
+        self.section_titles = StringTable(path, "section_titles")
+        self.chunk_ids = StringTable(path, "chunk_ids")
+        self.chunk_text = StringTable(path, "chunk_text")
+
+        self.tenants: Dict[str, Tuple[int, int]] = {name: tuple(bounds) for name, bounds in self.manifest["tenants"].items()}
+        self.products: Dict[str, int] = {name: row for row, name in enumerate(self.manifest["products"])}
+        self.ivf = self.manifest.get("ivf")
+        if self.ivf:
+            self.ivf_centroids = load("ivf_centroids")
+            self.ivf_offsets = load("ivf_offsets")
+            self.ivf_rows = load("ivf_rows")
+        # doc id -> row, per tenant; built on first use, documents are few compared to chunks
+        self._doc_rows: Dict[str, Dict[str, int]] = {}
+
+    def doc_row(self, tenant_id: str, doc_id: str) -> Optional[int]:
+        rows = self._doc_rows.get(tenant_id)
+        if rows is None:
+            lo, hi = self.tenants.get(tenant_id, (0, 0))
+            rows = self._doc_rows[tenant_id] = {self.doc_ids[row]: row for row in range(lo, hi)}
+        return rows.get(doc_id)
+
+    def stats(self) -> Dict[str, object]:
+        return {
+            "generation": self.generation,
+            "dtype": self.manifest["dtype"],
+            "dim": self.dim,
+            "embedding_model": self.embedding_model,
+            "docs": len(self.docs),
+            "sections": len(self.sections),
+            "chunks": len(self.chunks),
+            "tenants": len(self.tenants),
+            "ivf_lists": self.ivf["lists"] if self.ivf else 0,
+            "tokenizers": sorted(self.token_counts),
+        }
+
+
+def current_generation(index_dir: Path) -> Optional[str]:
+    try:
+        return (index_dir / CURRENT).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def open_current(index_dir: Path) -> Optional[IndexSnapshot]:
+    generation = current_generation(index_dir)
+    return IndexSnapshot(index_dir / generation) if generation else None
@@ -0,0 +1,100 @@
+import asyncio
+from pathlib import Path
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+from retrieval_service.config import Settings
+from retrieval_service.core.batcher import SearchBatcher
+from retrieval_service.core.doc_text import DocumentTextCache
+from retrieval_service.core.embedding import Embedder, load_embedder
+from retrieval_service.core.engine import RetrievalEngine
+from retrieval_service.core.metrics import RETRIEVAL_INDEX_ROWS
+from retrieval_service.core.snapshot import IndexSnapshot, SnapshotError, current_generation
+from retrieval_service.logging import get_logger
+
+logger = get_logger(__name__)
+
+_settings: Optional[Settings] = None
+_embedder: Optional[Embedder] = None
+_engine: Optional[RetrievalEngine] = None
+_batcher: Optional[SearchBatcher] = None
+_texts: Optional[DocumentTextCache] = None
+_watcher: Optional[asyncio.Task] = None
+
+
+def get_engine() -> Optional[RetrievalEngine]:
+    """Engine over the current snapshot, ``None`` until an index has been built."""
+
+    return _engine
+
+
+def get_batcher() -> SearchBatcher:
+    if _batcher is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail={"code": "retrieval_not_running"})
+    return _batcher
+
+
+def get_document_texts() -> DocumentTextCache:
+    if _texts is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail={"code": "retrieval_not_running"})
+    return _texts
+
+
+def reload_engine() -> Optional[str]:
+    """Open the generation named by ``CURRENT`` if it is not the one being served; returns the served generation."""
+
+    global _engine
+    assert _settings is not None and _embedder is not None
+    generation = current_generation(Path(_settings.index_dir))
+    if generation is None or (_engine is not None and _engine.snapshot.generation == generation):
+        return _engine.snapshot.generation if _engine else None
+    try:
+        engine = RetrievalEngine(
+            IndexSnapshot(Path(_settings.index_dir) / generation),
+            _embedder,
+            dense_weight=_settings.hybrid_dense_weight,
+            ivf_min_rows=_settings.ivf_min_rows,
+            ivf_nprobe=_settings.ivf_nprobe,
+            dedup_similarity=_settings.dedup_similarity,
+        )
+    except (SnapshotError, ValueError, OSError) as exc:
+        logger.error("retrieval_index_load_failed", generation=generation, error=str(exc))
+        return _engine.snapshot.generation if _engine else None
+    # requests already holding the previous engine finish on it; its maps close when it is collected
+    _engine = engine
+    for level, rows in (("doc", len(engine.snapshot.docs)), ("section", len(engine.snapshot.sections)), ("chunk", len(engine.snapshot.chunks))):
+        RETRIEVAL_INDEX_ROWS.labels(level).set(rows)
+    logger.info("retrieval_index_loaded", **engine.snapshot.stats())
+    return generation
+
+
+async def _watch(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        await asyncio.to_thread(reload_engine)
+
+
+async def start_engine(settings: Settings) -> None:
+    global _settings, _embedder, _batcher, _watcher, _texts
+    _settings = settings
+    _texts = DocumentTextCache(settings.source_dir, settings.text_max_open_documents)
+    _embedder = load_embedder(settings)
+    reload_engine()
+    _batcher = SearchBatcher(get_engine, settings.batch_max_size, settings.batch_window_ms / 1000)
+    _batcher.start()
+    if settings.reload_interval_seconds > 0:
+        _watcher = asyncio.create_task(_watch(settings.reload_interval_seconds), name="retrieval-index-watcher")
+
+
+async def stop_engine() -> None:
+    global _engine, _batcher, _watcher, _texts
+    if _watcher is not None:
+        _watcher.cancel()
+        await asyncio.gather(_watcher, return_exceptions=True)
+        _watcher = None
+    if _batcher is not None:
+        await _batcher.stop()
+        _batcher = None
+    _engine = None
+    _texts = None
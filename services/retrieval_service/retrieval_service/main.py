@@ -0,0 +1,29 @@
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI
+
+from retrieval_service.config import get_settings
+from retrieval_service.dependencies import start_engine, stop_engine
+from retrieval_service.logging import configure_logging
+from retrieval_service.routers import documents, metrics, retrieval
+
+settings = get_settings()
+configure_logging(settings.log_level)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_engine(get_settings())
+    yield
+    await stop_engine()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app.include_router(retrieval.router)
+app.include_router(documents.router)
+app.include_router(metrics.router)
+
+
+@app.get("/health", tags=["health"])
+async def health() -> dict[str, str]:
+    return {"status": "ok"}
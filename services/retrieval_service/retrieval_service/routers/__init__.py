@@ -0,0 +1,3 @@
+from . import documents, metrics, retrieval
+
+__all__ = ["documents", "metrics", "retrieval"]
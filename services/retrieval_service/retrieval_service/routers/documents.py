@@ -0,0 +1,79 @@
+import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from retrieval_service.config import Settings, get_settings
+from retrieval_service.core.doc_text import DocumentText, DocumentTextCache
+from retrieval_service.core.metrics import DOCUMENT_TOOL_LATENCY
+from retrieval_service.dependencies import get_document_texts
+from retrieval_service.schemas import LocalSearchResponse, PagesText, SectionText
+
+router = APIRouter(prefix="/internal/retrieval/documents", tags=["documents"])
+
+
+def _open(texts: DocumentTextCache, tenant_id: str, doc_id: str) -> DocumentText:
+    document = texts.get(tenant_id, doc_id)
+    if document is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"code": "document_text_not_found"})
+    return document
+
+
+@router.get("/{doc_id}/sections/{section_id}", response_model=SectionText)
+def read_section(
+    doc_id: str,
+    section_id: str,
+    tenant_id: str = Query(min_length=1),
+    max_tokens: Optional[int] = Query(default=None, ge=1),
+    settings: Settings = Depends(get_settings),
+    texts: DocumentTextCache = Depends(get_document_texts),
+) -> SectionText:
+    """``read_doc_section``: the section's text, trimmed to the token limit."""
+
+    started = time.perf_counter()
+    limit = min(max_tokens or settings.read_section_max_tokens, settings.read_section_max_tokens)
+    section = _open(texts, tenant_id, doc_id).section(section_id, limit)
+    if section is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail={"code": "section_not_found"})
+    DOCUMENT_TOOL_LATENCY.labels("read_doc_section").observe((time.perf_counter() - started) * 1000)
+    return SectionText(**section)
+
+
+@router.get("/{doc_id}/pages", response_model=PagesText)
+def read_pages(
+    doc_id: str,
+    tenant_id: str = Query(min_length=1),
+    page_start: int = Query(ge=1),
+    page_end: int = Query(ge=1),
+    settings: Settings = Depends(get_settings),
+    texts: DocumentTextCache = Depends(get_document_texts),
+) -> PagesText:
+    """``read_doc_pages``: text of at most ``read_pages_max_pages`` consecutive pages."""
+
+    started = time.perf_counter()
+    if page_end < page_start or page_end - page_start + 1 > settings.read_pages_max_pages:
+        raise HTTPException(
+            status_code=422,
+            detail={"code": "invalid_page_range", "reason": f"1..{settings.read_pages_max_pages} pages expected"},
+        )
+    pages = _open(texts, tenant_id, doc_id).read_pages(page_start, page_end, settings.read_pages_max_tokens)
+    DOCUMENT_TOOL_LATENCY.labels("read_doc_pages").observe((time.perf_counter() - started) * 1000)
+    return PagesText(**pages)
+
+
+@router.get("/{doc_id}/search", response_model=LocalSearchResponse)
+def local_search(
+    doc_id: str,
+    tenant_id: str = Query(min_length=1),
+    query: str = Query(min_length=1, max_length=1000),
+    max_results: Optional[int] = Query(default=None, ge=1),
+    settings: Settings = Depends(get_settings),
+    texts: DocumentTextCache = Depends(get_document_texts),
+) -> LocalSearchResponse:
+    """``doc_local_search``: best matching paragraphs of one document, with snippets."""
+
+    started = time.perf_counter()
+    limit = min(max_results or settings.local_search_max_results, settings.local_search_max_results)
+    results = _open(texts, tenant_id, doc_id).search(query, limit, settings.local_search_snippet_chars)
+    DOCUMENT_TOOL_LATENCY.labels("doc_local_search").observe((time.perf_counter() - started) * 1000)
+    return LocalSearchResponse(results=results)
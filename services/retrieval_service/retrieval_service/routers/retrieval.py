@@ -0,0 +1,83 @@
+import time
+from typing import Any, Dict, Optional
+
+from fastapi import APIRouter, Depends
+
+from retrieval_service.config import Settings, get_settings
+from retrieval_service.core.batcher import SearchBatcher
+from retrieval_service.core.engine import RetrievalEngine, SearchQuery
+from retrieval_service.core.metrics import (
+    RETRIEVAL_EMPTY_RESULTS,
+    RETRIEVAL_HYBRID_USAGE,
+    RETRIEVAL_LATENCY,
+    RETRIEVAL_MODE,
+    RETRIEVAL_REQUESTS,
+)
+from retrieval_service.dependencies import get_batcher, get_engine, reload_engine
+from retrieval_service.logging import get_logger
+from retrieval_service.schemas import SearchMeta, SearchRequest, SearchResponse
+
+router = APIRouter(prefix="/internal/retrieval", tags=["retrieval"])
+logger = get_logger(__name__)
+
+
+@router.post("/search", response_model=SearchResponse)
+async def search(
+    payload: SearchRequest,
+    settings: Settings = Depends(get_settings),
+    batcher: SearchBatcher = Depends(get_batcher),
+) -> SearchResponse:
+    started = time.perf_counter()
+    params = payload.params
+    query = SearchQuery(
+        tenant_id=payload.tenant_id,
+        query=payload.query,
+        mode=params.retrieval_mode,
+        max_docs=params.max_docs or settings.default_max_docs,
+        max_sections=params.max_sections or settings.default_max_sections,
+        max_chunks=params.max_chunks or settings.default_max_chunks,
+        token_limit=params.context_token_limit or settings.default_token_limit,
+        hybrid=settings.enable_hybrid if params.enable_hybrid is None else params.enable_hybrid,
+        tokenizer=params.tokenizer or settings.default_tokenizer,
+        product=params.product,
+        doc_ids=params.doc_ids,
+    )
+    result = await batcher.search(query)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    RETRIEVAL_REQUESTS.inc()
+    RETRIEVAL_MODE.labels(query.mode).inc()
+    RETRIEVAL_LATENCY.observe(elapsed_ms)
+    if result.hybrid_used:
+        RETRIEVAL_HYBRID_USAGE.inc()
+    if not result.chunks:
+        RETRIEVAL_EMPTY_RESULTS.inc()
+    if elapsed_ms >= settings.slow_query_ms:
+        logger.warning("retrieval_slow_query", trace_id=payload.trace_id, duration_ms=int(elapsed_ms), mode=query.mode, **result.candidates)
+    return SearchResponse(
+        chunks=result.chunks,
+        used_docs=result.used_docs,
+        used_sections=result.used_sections,
+        meta=SearchMeta(
+            retrieval_time_ms=int(elapsed_ms),
+            mode=query.mode,
+            hybrid_used=result.hybrid_used,
+            ivf_used=result.ivf_used,
+            index_generation=result.generation,
+            tokenizer=result.tokenizer,
+            candidates=result.candidates,
+            trace_id=payload.trace_id,
+        ),
+    )
+
+
+@router.get("/index")
+async def index_stats(engine: Optional[RetrievalEngine] = Depends(get_engine)) -> Dict[str, Any]:
+    return engine.snapshot.stats() if engine else {"generation": None}
+
+
+@router.post("/index/reload")
+def reload_index() -> Dict[str, Any]:
+    """Switch to the generation in ``CURRENT`` now instead of at the next watcher tick."""
+
+    return {"generation": reload_engine()}
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+RetrievalMode = Literal["doc_first", "section_first", "chunk_priority", "hybrid_only"]
+
+
+class SearchParams(BaseModel):
+    # unset values come from the service defaults
+    max_docs: Optional[int] = Field(default=None, ge=1, le=1000)
+    max_sections: Optional[int] = Field(default=None, ge=1, le=5000)
+    max_chunks: Optional[int] = Field(default=None, ge=1, le=1000)
+    context_token_limit: Optional[int] = Field(default=None, ge=1)
+    retrieval_mode: RetrievalMode = "section_first"
+    enable_hybrid: Optional[bool] = None
+    enable_rerank: bool = False
+    # token counts the context_token_limit is measured in, e.g. "tiktoken:cl100k_base"
+    tokenizer: Optional[str] = None
+    product: Optional[str] = None
+    doc_ids: Optional[List[str]] = Field(default=None, max_length=1000)
+
+
+class SearchRequest(BaseModel):
+    tenant_id: str = Field(min_length=1)
+    query: str = Field(min_length=1, max_length=8000)
+    language: Optional[str] = None
+    params: SearchParams = Field(default_factory=SearchParams)
+    trace_id: Optional[str] = None
+
+
+class McpLink(BaseModel):
+    doc_id: str
+    page_start: int
+    page_end: int
+
+
+class ChunkResult(BaseModel):
+    chunk_id: str
+    # more than one when consecutive chunks of a section were merged into this passage
+    chunk_ids: List[str]
+    doc_id: str
+    section_id: str
+    text: str
+    tokens: int
+    page_start: int
+    page_end: int
+    score: float
+    mcp_link: McpLink
+
+
+class UsedDoc(BaseModel):
+    doc_id: str
+    score: float
+
+
+class UsedSection(BaseModel):
+    section_id: str
+    doc_id: str
+    score: float
+
+
+class SearchMeta(BaseModel):
+    retrieval_time_ms: int
+    mode: RetrievalMode
+    hybrid_used: bool
+    rerank_used: bool = False
+    ivf_used: bool = False
+    index_generation: Optional[str] = None
+    tokenizer: Optional[str] = None
+    candidates: Dict[str, int] = Field(default_factory=dict)
+    trace_id: Optional[str] = None
+
+
+class SectionText(BaseModel):
+    doc_id: str
+    section_id: str
+    title: Optional[str] = None
+    text: str
+    page_start: Optional[int] = None
+    page_end: Optional[int] = None
+    tokens: int
+    truncated: bool
+
+
+class PagesText(BaseModel):
+    doc_id: str
+    page_start: int
+    page_end: int
+    text: str
+    tokens: int
+    truncated: bool
+
+
+class LocalSearchHit(BaseModel):
+    doc_id: str
+    section_id: Optional[str] = None
+    page: int
+    score: float
+    snippet: str
+
+
+class LocalSearchResponse(BaseModel):
+    results: List[LocalSearchHit]
+
+
+class SearchResponse(BaseModel):
+    chunks: List[ChunkResult]
+    used_docs: List[UsedDoc]
+    used_sections: List[UsedSection]
+    meta: SearchMeta
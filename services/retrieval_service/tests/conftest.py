@@ -0,0 +1,106 @@
+import json
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pytest
+
+from retrieval_service.core.doc_text import term_hash
+from retrieval_service.core.embedding import HashingEmbedder
+
+DIM = 64
+
+
+class SourceWriter:
+    """Writes documents in the ingestion worker's index layout."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+        self.embedder = HashingEmbedder(DIM)
+
+    def add(
+        self,
+        tenant_id: str,
+        doc_id: str,
+        sections: Dict[str, List[str]],
+        product: Optional[str] = None,
+        name: str = "",
+        token_counts: bool = True,
+    ) -> None:
+        directory = self.root / tenant_id / doc_id
+        directory.mkdir(parents=True)
+        section_records, chunk_records = [], []
+        blob, paragraphs = b"", []
+        for number, (title, texts) in enumerate(sections.items(), start=1):
+            section_id = f"sec_{number}"
+            chunk_ids = [f"ch_{section_id}_{index}" for index in range(len(texts))]
+            start = len(blob) + (2 if blob else 0)
+            for paragraph in texts:
+                blob += (b"\n\n" if blob else b"") + paragraph.encode()
+                paragraphs.append((len(blob) - len(paragraph.encode()), len(blob), number))
+            section_records.append(
+                {"section_id": section_id, "title": title, "page_start": number, "page_end": number, "summary": texts[0], "chunk_ids": chunk_ids, "text_start": start, "text_end": len(blob)}
+            )
+            for chunk_id, text in zip(chunk_ids, texts):
+                record = {"chunk_id": chunk_id, "section_id": section_id, "doc_id": doc_id, "text": text, "tokens": len(text.split()), "page_start": number, "page_end": number}
+                if token_counts:
+                    # a second tokenizer, as ingestion writes with TOKEN_COUNT_TOKENIZERS=["words", "chars:4"]
+                    record["token_counts"] = {"words": record["tokens"], "chars:4": len(text) // 4}
+                chunk_records.append(record)
+        self._write(directory / "sections.jsonl", directory / "section_vectors.f32", section_records, [f"{r['title']} {r['summary']}" for r in section_records])
+        self._write(directory / "chunks.jsonl", directory / "chunk_vectors.f32", chunk_records, [r["text"] for r in chunk_records])
+        self._write_text(directory, blob, paragraphs)
+        self.embedder.embed([name or doc_id + " " + " ".join(sections)]).tofile(directory / "doc_vector.f32")
+        document = {"doc_id": doc_id, "tenant_id": tenant_id, "name": name or doc_id, "embedding_model": self.embedder.model_id, "embedding_dim": DIM}
+        if product:
+            document["product"] = product
+        (directory / "document.json").write_text(json.dumps(document), encoding="utf-8")
+
+    @staticmethod
+    def _write_text(directory: Path, text: bytes, paragraphs: List[tuple]) -> None:
+        # one page per section; see ingestion_service.core.text_store
+        (directory / "text.bin").write_bytes(text)
+        np.asarray(paragraphs, dtype="<u4").tofile(directory / "text_paragraphs.u32")
+        np.asarray([[min(p[0] for p in paragraphs if p[2] == page), max(p[1] for p in paragraphs if p[2] == page)] for page in sorted({p[2] for p in paragraphs})], dtype="<u4").tofile(directory / "text_pages.u32")
+        postings: Dict[int, List[int]] = {}
+        for number, (start, end, _) in enumerate(paragraphs):
+            for term in set(re.findall(r"\w+", text[start:end].decode().lower())):
+                postings.setdefault(term_hash(term), []).append(number)
+        terms = sorted(postings)
+        np.asarray(terms, dtype="<u8").tofile(directory / "text_terms.u64")
+        np.cumsum([0] + [len(postings[term]) for term in terms]).astype("<u4").tofile(directory / "text_postings_idx.u32")
+        np.asarray([number for term in terms for number in postings[term]], dtype="<u4").tofile(directory / "text_postings.u32")
+
+    def _write(self, records_path: Path, vectors_path: Path, records: List[dict], texts: List[str]) -> None:
+        records_path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+        vectors = self.embedder.embed(texts) if texts else np.zeros((0, DIM), dtype=np.float32)
+        vectors.astype(np.float32).tofile(vectors_path)
+
+
+@pytest.fixture
+def source(tmp_path) -> SourceWriter:
+    writer = SourceWriter(tmp_path / "source")
+    writer.root.mkdir()
+    writer.add(
+        "t1",
+        "doc_ldap",
+        {
+            "LDAP integration": ["Configure LDAP integration in Orion X with the bind DN and base DN.", "LDAP over TLS needs the server certificate."],
+            "Troubleshooting": ["Check the LDAP server logs when login fails."],
+        },
+        product="Orion X",
+        name="LDAP guide",
+    )
+    writer.add(
+        "t1",
+        "doc_backup",
+        {
+            "Backup schedule": ["Backups run nightly and keep seven copies.", "Restore a backup from the snapshot list."],
+            "Storage": ["Backup storage must have twice the data size free."],
+        },
+        product="Orion Y",
+        name="Backup guide",
+    )
+    writer.add("t2", "doc_other", {"LDAP": ["Other tenant LDAP integration notes for Orion X."]}, product="Orion X")
+    return writer
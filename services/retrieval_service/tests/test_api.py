@@ -0,0 +1,59 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from retrieval_service.config import get_settings
+from retrieval_service.core.builder import build_snapshot
+from retrieval_service.main import app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, source):
+    monkeypatch.setenv("RETRIEVAL_SERVICE_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setenv("RETRIEVAL_SERVICE_EMBEDDING_DIM", str(source.embedder.dim))
+    monkeypatch.setenv("RETRIEVAL_SERVICE_RELOAD_INTERVAL_SECONDS", "0")
+    get_settings.cache_clear()
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        get_settings.cache_clear()
+
+
+def test_search_before_any_index_returns_empty_result(client) -> None:
+    response = client.post("/internal/retrieval/search", json={"tenant_id": "t1", "query": "LDAP"})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["chunks"] == [] and body["meta"]["index_generation"] is None
+    assert client.get("/internal/retrieval/index").json() == {"generation": None}
+
+
+def test_search_follows_spec_shape_and_reloads_new_generations(client, source, tmp_path) -> None:
+    build_snapshot(str(source.root), str(tmp_path / "index"))
+    generation = client.post("/internal/retrieval/index/reload").json()["generation"]
+    assert generation
+
+    payload = {
+        "tenant_id": "t1",
+        "query": "Как настроить LDAP integration в Orion X?",
+        "params": {"max_chunks": 2, "retrieval_mode": "section_first", "enable_hybrid": True},
+        "trace_id": "abc-def-123",
+    }
+    response = client.post("/internal/retrieval/search", json=payload)
+    assert response.status_code == 200
+    body = response.json()
+    assert len(body["chunks"]) == 2
+    assert body["chunks"][0]["doc_id"] == "doc_ldap"
+    assert set(body["chunks"][0]) == {"chunk_id", "chunk_ids", "doc_id", "section_id", "text", "tokens", "page_start", "page_end", "score", "mcp_link"}
+    assert body["meta"]["trace_id"] == "abc-def-123"
+    assert body["meta"]["hybrid_used"] is True and body["meta"]["rerank_used"] is False
+    assert body["meta"]["index_generation"] == generation
+    assert body["meta"]["tokenizer"] == "words"
+
+    source.add("t1", "doc_new", {"Kerberos": ["Kerberos single sign-on setup."]})
+    build_snapshot(str(source.root), str(tmp_path / "index"))
+    assert client.post("/internal/retrieval/index/reload").json()["generation"] != generation
+    found = client.post("/internal/retrieval/search", json={"tenant_id": "t1", "query": "Kerberos sign-on"}).json()
+    assert found["chunks"][0]["doc_id"] == "doc_new"
+
+    assert client.post("/internal/retrieval/search", json={"tenant_id": "t1", "query": ""}).status_code == 422
+    assert "retrieval_requests_total" in client.get("/metrics").text
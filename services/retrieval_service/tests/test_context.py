@@ -0,0 +1,73 @@
+import json
+
+import numpy as np
+
+from retrieval_service.core.builder import build_snapshot
+from retrieval_service.core.context import distinct, pack, runs, signature, signatures
+from retrieval_service.core.engine import RetrievalEngine, SearchQuery
+from retrieval_service.core.snapshot import open_current
+
+
+def test_pack_takes_top_scores_when_they_fit_and_knapsack_when_the_limit_binds() -> None:
+    scores = np.asarray([0.9, 0.8, 0.7, 0.6])
+    assert pack(scores, np.asarray([10, 10, 10, 10]), 100, 3).tolist() == [0, 1, 2]
+    # greedy takes the long best chunk and has no room left; two short ones score more
+    assert pack(np.asarray([0.9, 0.6, 0.55]), np.asarray([100, 50, 50]), 100, 10).tolist() == [1, 2]
+    # nothing fits
+    assert pack(scores, np.asarray([200, 200, 200, 200]), 100, 3).tolist() == []
+    # large limits are packed on a coarse grid, but never beyond the limit in real tokens
+    tokens = np.asarray([3000, 2100, 2100, 1999, 7])
+    chosen = pack(np.asarray([0.9, 0.8, 0.8, 0.7, 0.1]), tokens, 4200, 10)
+    assert tokens[chosen].sum() <= 4200 and chosen.tolist() == [1, 3, 4]
+
+
+def test_distinct_drops_near_duplicates_of_better_chunks() -> None:
+    base = "Configure LDAP integration in Orion X with the bind DN and base DN of the directory server"
+    texts = [base, base.upper() + " ", base + " now", "Backups run nightly and keep seven copies."]
+    kept = distinct(signatures(texts), 0.8)
+    assert kept.tolist() == [0, 3]
+    assert signature("").tolist() == signature("  ").tolist()
+    assert (signature(base) == signature("Restore a backup from the snapshot list.")).sum() < 4
+
+
+def test_runs_merge_consecutive_chunks_of_a_section() -> None:
+    # rows 0-2 are section 0 and rows 3-4 section 1; picked best first: 2, 3, 0, 1, 4
+    assert runs(np.asarray([2, 3, 0, 1, 4]), np.asarray([0, 1, 0, 0, 1])) == [[2, 3, 0], [1, 4]]
+    assert runs(np.asarray([4, 0]), np.asarray([1, 0])) == [[0], [1]]
+
+
+def test_engine_uses_stored_counts_of_the_requested_tokenizer(source, tmp_path) -> None:
+    source.add("t1", "doc_legacy", {"Kerberos": ["Kerberos single sign-on setup for Orion X."]}, token_counts=False)
+    build_snapshot(str(source.root), str(tmp_path / "index"))
+    snapshot = open_current(tmp_path / "index")
+    assert sorted(snapshot.token_counts) == ["chars:4", "words"]
+    engine = RetrievalEngine(snapshot, source.embedder)
+    [chars, unknown, legacy] = engine.search_batch(
+        [
+            SearchQuery("t1", "LDAP integration", tokenizer="chars:4"),
+            SearchQuery("t1", "LDAP integration", tokenizer="sentencepiece"),
+            SearchQuery("t1", "Kerberos sign-on", tokenizer="chars:4", max_chunks=1),
+        ]
+    )
+    assert chars.tokenizer == "chars:4" and unknown.tokenizer == "words"
+    first = chars.chunks[0]
+    assert first["tokens"] == sum(len(text) // 4 for text in first["text"].split("\n\n"))
+    # documents ingested without the tokenizer fall back to the word-piece count
+    assert legacy.chunks[0]["doc_id"] == "doc_legacy" and legacy.chunks[0]["tokens"] == 7
+
+
+def test_snapshots_without_signatures_or_terms_score_and_deduplicate_the_same(source, tmp_path) -> None:
+    text = "LDAP over TLS needs the server certificate."
+    source.add("t1", "doc_copy", {"TLS": [text]})
+    build_snapshot(str(source.root), str(tmp_path / "index"))
+    snapshot = open_current(tmp_path / "index")
+    manifest = json.loads((snapshot.path / "manifest.json").read_text())
+    del manifest["signatures"], manifest["tokenizers"], manifest["terms"]
+    query = SearchQuery("t1", "LDAP TLS server certificate")
+    [current] = RetrievalEngine(snapshot, source.embedder).search_batch([query])
+    (snapshot.path / "manifest.json").write_text(json.dumps(manifest))
+    old = open_current(tmp_path / "index")
+    assert old.chunk_signatures is None and old.chunk_terms is None and list(old.token_counts) == ["words"]
+    [result] = RetrievalEngine(old, source.embedder).search_batch([query])
+    assert sum(chunk["text"].count(text) for chunk in result.chunks) == 1
+    assert [(chunk["chunk_ids"], chunk["score"]) for chunk in result.chunks] == [(chunk["chunk_ids"], chunk["score"]) for chunk in current.chunks]
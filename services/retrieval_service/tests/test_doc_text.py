@@ -0,0 +1,60 @@
+import shutil
+
+import pytest
+from fastapi.testclient import TestClient
+
+from retrieval_service.config import get_settings
+from retrieval_service.core.doc_text import DocumentTextCache, trim_tokens
+from retrieval_service.main import app
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, source):
+    monkeypatch.setenv("RETRIEVAL_SERVICE_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setenv("RETRIEVAL_SERVICE_SOURCE_DIR", str(source.root))
+    monkeypatch.setenv("RETRIEVAL_SERVICE_RELOAD_INTERVAL_SECONDS", "0")
+    monkeypatch.setenv("RETRIEVAL_SERVICE_READ_PAGES_MAX_PAGES", "2")
+    get_settings.cache_clear()
+    try:
+        with TestClient(app) as test_client:
+            yield test_client
+    finally:
+        get_settings.cache_clear()
+
+
+def test_sections_pages_and_local_search_are_served_from_the_text_store(client) -> None:
+    base = "/internal/retrieval/documents/doc_ldap"
+    section = client.get(f"{base}/sections/sec_1", params={"tenant_id": "t1"}).json()
+    assert section["text"] == "Configure LDAP integration in Orion X with the bind DN and base DN.\n\nLDAP over TLS needs the server certificate."
+    assert section["title"] == "LDAP integration" and section["page_start"] == 1 and not section["truncated"]
+    trimmed = client.get(f"{base}/sections/sec_1", params={"tenant_id": "t1", "max_tokens": 3}).json()
+    assert trimmed["text"] == "Configure LDAP integration" and trimmed["truncated"]
+
+    pages = client.get(f"{base}/pages", params={"tenant_id": "t1", "page_start": 2, "page_end": 2}).json()
+    assert pages["text"] == "Check the LDAP server logs when login fails."
+    assert client.get(f"{base}/pages", params={"tenant_id": "t1", "page_start": 1, "page_end": 3}).json()["detail"]["code"] == "invalid_page_range"
+
+    results = client.get(f"{base}/search", params={"tenant_id": "t1", "query": "LDAP server certificate"}).json()["results"]
+    assert [(hit["section_id"], hit["page"]) for hit in results] == [("sec_1", 1), ("sec_2", 2), ("sec_1", 1)]
+    assert results[0]["snippet"] == "LDAP over TLS needs the server certificate."
+
+    assert client.get(f"{base}/sections/sec_9", params={"tenant_id": "t1"}).json()["detail"]["code"] == "section_not_found"
+    other_tenant = client.get(f"{base}/sections/sec_1", params={"tenant_id": "t2"})
+    assert other_tenant.status_code == 404 and other_tenant.json()["detail"]["code"] == "document_text_not_found"
+
+
+def test_cache_reopens_replaced_documents(source) -> None:
+    cache = DocumentTextCache(str(source.root), max_documents=1)
+    first = cache.get("t1", "doc_ldap")
+    assert cache.get("t1", "doc_ldap") is first
+    assert cache.get("t1", "doc_backup") is not None and cache.get("t1", "doc_ldap") is not first
+    assert cache.get("t1", "../t2/doc_other") is None
+
+    shutil.rmtree(source.root / "t1" / "doc_ldap")
+    source.add("t1", "doc_ldap", {"Replaced": ["New text."]})
+    assert cache.get("t1", "doc_ldap").section("sec_1", 100)["text"] == "New text."
+
+
+def test_trim_tokens_counts_word_pieces() -> None:
+    assert trim_tokens("Set port 443, then restart.", 4) == ("Set port 443,", 4, True)
+    assert trim_tokens("short", 4) == ("short", 1, False)
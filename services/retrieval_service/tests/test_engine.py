@@ -0,0 +1,113 @@
+import numpy as np
+import pytest
+
+from retrieval_service.core.builder import build_snapshot
+from retrieval_service.core.embedding import HashingEmbedder
+from retrieval_service.core.engine import RetrievalEngine, SearchQuery, ranges, topk
+from retrieval_service.core.snapshot import open_current
+
+
+def _engine(source, tmp_path, **build) -> RetrievalEngine:
+    build_snapshot(str(source.root), str(tmp_path / "index"), **build)
+    return RetrievalEngine(open_current(tmp_path / "index"), source.embedder, ivf_min_rows=1, ivf_nprobe=64)
+
+
+def test_topk_and_ranges_helpers() -> None:
+    scores = np.array([0.1, 0.9, -np.inf, 0.5], dtype=np.float32)
+    assert topk(scores, 2).tolist() == [1, 3]
+    assert topk(scores, 10).tolist() == [1, 3, 0]
+    offsets = np.array([0, 2, 2, 5])
+    assert ranges(offsets, np.array([2, 0])).tolist() == [2, 3, 4, 0, 1]
+    assert ranges(offsets, np.array([1])).tolist() == []
+
+
+@pytest.mark.parametrize("mode", ["doc_first", "section_first", "chunk_priority", "hybrid_only"])
+def test_modes_find_the_relevant_document_within_the_tenant(source, tmp_path, mode) -> None:
+    engine = _engine(source, tmp_path)
+    [result] = engine.search_batch([SearchQuery("t1", "LDAP integration Orion X", mode=mode, max_docs=1)])
+    assert result.chunks
+    assert result.chunks[0]["doc_id"] == "doc_ldap"
+    assert {chunk["doc_id"] for chunk in result.chunks} <= {"doc_ldap", "doc_backup"}
+    assert result.used_docs[0]["doc_id"] == "doc_ldap"
+    chunk = result.chunks[0]
+    assert chunk["mcp_link"] == {"doc_id": "doc_ldap", "page_start": chunk["page_start"], "page_end": chunk["page_end"]}
+    assert [c["score"] for c in result.chunks] == sorted((c["score"] for c in result.chunks), reverse=True)
+
+
+def test_batch_matches_single_queries_and_skips_unknown_tenants(source, tmp_path) -> None:
+    engine = _engine(source, tmp_path)
+    queries = [
+        SearchQuery("t1", "backup restore snapshot"),
+        SearchQuery("t2", "LDAP"),
+        SearchQuery("t1", "LDAP certificate", mode="doc_first"),
+        SearchQuery("missing", "LDAP"),
+    ]
+    batched = engine.search_batch(queries)
+    single = [engine.search_batch([query])[0] for query in queries]
+    assert [r.chunks for r in batched] == [r.chunks for r in single]
+    assert batched[1].chunks[0]["doc_id"] == "doc_other"
+    assert batched[3].chunks == [] and batched[3].generation is not None
+
+
+def test_product_and_doc_filters(source, tmp_path) -> None:
+    engine = _engine(source, tmp_path)
+    [by_product, by_doc, unknown] = engine.search_batch(
+        [
+            SearchQuery("t1", "LDAP backup", product="Orion Y"),
+            SearchQuery("t1", "LDAP backup", mode="chunk_priority", doc_ids=["doc_ldap"]),
+            SearchQuery("t1", "LDAP backup", product="Nope"),
+        ]
+    )
+    assert {chunk["doc_id"] for chunk in by_product.chunks} == {"doc_backup"}
+    assert {chunk["doc_id"] for chunk in by_doc.chunks} == {"doc_ldap"}
+    assert unknown.chunks == []
+
+
+def test_token_limit_and_max_chunks(source, tmp_path) -> None:
+    engine = _engine(source, tmp_path)
+    [limited, capped] = engine.search_batch(
+        [SearchQuery("t1", "LDAP backup", token_limit=12), SearchQuery("t1", "LDAP backup", max_chunks=2)]
+    )
+    assert sum(chunk["tokens"] for chunk in limited.chunks) <= 12
+    # consecutive chunks of a section come back as one passage; max_chunks counts chunks
+    assert sum(len(chunk["chunk_ids"]) for chunk in capped.chunks) == 2
+
+
+def test_int8_and_ivf_snapshots_rank_like_float16(source, tmp_path) -> None:
+    float16 = _engine(source, tmp_path, dtype="float16")
+    query = [SearchQuery("t1", "LDAP server certificate", mode="chunk_priority", hybrid=False)]
+    expected = [chunk["chunk_id"] for chunk in float16.search_batch(query)[0].chunks]
+
+    int8 = _engine(source, tmp_path, dtype="int8")
+    assert int8.snapshot.chunks.scales is not None
+    assert [chunk["chunk_id"] for chunk in int8.search_batch(query)[0].chunks][:3] == expected[:3]
+
+    ivf = _engine(source, tmp_path, ivf_lists=2)
+    [result] = ivf.search_batch(query)
+    assert result.ivf_used
+    assert [chunk["chunk_id"] for chunk in result.chunks] == expected  # nprobe covers every list
+
+
+def test_snapshot_layout_is_memory_mapped(source, tmp_path) -> None:
+    engine = _engine(source, tmp_path)
+    snapshot = engine.snapshot
+    assert isinstance(snapshot.chunks.vectors, np.memmap)
+    assert snapshot.chunks.vectors.dtype == np.int8
+    assert snapshot.tenants == {"t1": (0, 2), "t2": (2, 3)}
+    assert snapshot.stats()["chunks"] == 7
+    first_doc_chunks = range(int(snapshot.doc_chunks[0]), int(snapshot.doc_chunks[1]))
+    assert {int(snapshot.chunk_doc[row]) for row in first_doc_chunks} == {0}
+
+
+def test_builder_keeps_previous_generations_bounded(source, tmp_path) -> None:
+    for _ in range(3):
+        build_snapshot(str(source.root), str(tmp_path / "index"), keep=2)
+    generations = [path for path in (tmp_path / "index").iterdir() if path.is_dir()]
+    assert len(generations) == 2
+    assert open_current(tmp_path / "index").generation in {path.name for path in generations}
+
+
+def test_engine_rejects_snapshot_from_another_model(source, tmp_path) -> None:
+    build_snapshot(str(source.root), str(tmp_path / "index"))
+    with pytest.raises(ValueError, match="embedded with"):
+        RetrievalEngine(open_current(tmp_path / "index"), HashingEmbedder(source.embedder.dim * 2))
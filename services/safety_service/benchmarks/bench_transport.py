@@ -0,0 +1,114 @@
+"""Compare JSON/TCP (default) with msgpack and Unix-socket transports for safety checks.
+
+Starts the safety service twice (TCP port and Unix socket) and sends the same
+input-check payload sequentially with each wire format, reporting req/s and
+latency percentiles as JSON::
+
+    python benchmarks/bench_transport.py --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import msgpack
+
+SERVICE_ROOT = Path(__file__).resolve().parent.parent
+PAYLOAD = {
+    "user": {"user_id": "user-1", "tenant_id": "tenant-1", "roles": ["user"]},
+    "query": "Как настроить LDAP интеграцию в Orion X? Пишите на admin@example.com",
+    "channel": "web",
+    "context": {"conversation_id": "conv-1", "ui_session_id": "sess-1"},
+    "meta": {"trace_id": "bench"},
+}
+
+
+def _start(args: list[str]) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "safety_service.main:app", "--log-level", "warning", "--no-access-log", *args],
+        cwd=SERVICE_ROOT,
+        env={**os.environ, "SAFETY_SERVICE_LOG_LEVEL": "warning"},
+    )
+
+
+async def _wait(client: httpx.AsyncClient, url: str) -> None:
+    for _ in range(200):
+        try:
+            await client.get(url)
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.05)
+    raise RuntimeError(f"{url} did not come up")
+
+
+async def _run_case(client: httpx.AsyncClient, url: str, wire: str, requests: int) -> dict:
+    if wire == "msgpack":
+        body = msgpack.packb(PAYLOAD)
+        headers = {"Content-Type": "application/msgpack", "Accept": "application/msgpack"}
+    else:
+        body = json.dumps(PAYLOAD).encode()
+        headers = {"Content-Type": "application/json"}
+    latencies = []
+    for _ in range(requests // 10):  # warmup
+        await client.post(url, content=body, headers=headers)
+    started = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        response = await client.post(url, content=body, headers=headers)
+        if wire == "msgpack":
+            msgpack.unpackb(response.content)
+        else:
+            response.json()
+        latencies.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests_per_second": round(requests / elapsed, 1),
+        "p50_us": round(statistics.median(latencies) * 1e6, 1),
+        "p99_us": round(latencies[int(len(latencies) * 0.99) - 1] * 1e6, 1),
+    }
+
+
+async def main_async(requests: int, port: int) -> dict:
+    path = "/internal/safety/input-check"
+    with tempfile.TemporaryDirectory() as tmp:
+        uds = os.path.join(tmp, "safety.sock")
+        processes = [_start(["--port", str(port)]), _start(["--uds", uds])]
+        try:
+            async with httpx.AsyncClient() as tcp, httpx.AsyncClient(transport=httpx.AsyncHTTPTransport(uds=uds)) as unix:
+                await _wait(tcp, f"http://127.0.0.1:{port}/health")
+                await _wait(unix, "http://safety/health")
+                results = {}
+                for transport, client, base in (("tcp", tcp, f"http://127.0.0.1:{port}"), ("uds", unix, "http://safety")):
+                    for wire in ("json", "msgpack"):
+                        results[f"{wire}/{transport}"] = await _run_case(client, base + path, wire, requests)
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait(timeout=10)
+    baseline = results["json/tcp"]["requests_per_second"]
+    for result in results.values():
+        result["speedup_vs_json_tcp"] = round(result["requests_per_second"] / baseline, 2)
+    return {"requests": requests, "payload_bytes": {"json": len(json.dumps(PAYLOAD).encode()), "msgpack": len(msgpack.packb(PAYLOAD))}, "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--port", type=int, default=18181)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main_async(args.requests, args.port)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
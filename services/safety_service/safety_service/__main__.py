@@ -0,0 +1,15 @@
+import uvicorn
+
+from safety_service.config import get_settings
+
+
+def main() -> None:
+    settings = get_settings()
+    if settings.uds_path:
+        uvicorn.run("safety_service.main:app", uds=settings.uds_path, log_level=settings.log_level)
+    else:
+        uvicorn.run("safety_service.main:app", host=settings.host, port=settings.port, log_level=settings.log_level)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,7 @@
 from functools import lru_cache
-from typing import List
+from typing import Dict, List, Optional
+
+from pydantic import Field
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -10,13 +12,55 @@ class Settings(BaseSettings):
     app_name: str = "safety-service"
     host: str = "0.0.0.0"
     port: int = 8081
+    uds_path: Optional[str] = None
     log_level: str = "info"
+    log_format: str = "console"  # console / json
+    log_queue_size: int = 10000
+    log_level_sample_rates: Dict[str, float] = Field(default_factory=dict)
+    log_route_sample_rates: Dict[str, float] = Field(default_factory=dict)
 
     policy_mode: str = "balanced"  # strict / balanced / relaxed
     blocklist: List[str] = ["hack", "breach", "exploit"]
     enable_pii_sanitize: bool = True
+    # replace PII with per-request tokens and return the values in `redactions`
+    pii_pseudonymize: bool = False
     default_policy_id: str = "policy_default_v1"
 
+    # second-stage prompt-injection model (directory with weights.npy + model.json); rules only when unset
+    injection_model_path: Optional[str] = None
+    # model score at or above which an uncertain input is blocked, per policy_mode
+    injection_thresholds: Dict[str, float] = Field(
+        default_factory=lambda: {"strict": 0.6, "balanced": 0.8, "relaxed": 0.9}
+    )
+    injection_latency_budget_ms: float = 5.0
+    injection_batch_window_ms: float = 1.0
+    injection_max_batch: int = 64
+    injection_model_max_chars: int = 4000
+    # verdict when the model misses its latency budget: allow (rules only) or block
+    injection_fallback_block: bool = False
+
+    # audit trail of verdicts (JSONL, rotated by size); disabled when unset
+    audit_path: Optional[str] = None
+    audit_buffer_size: int = 65536  # ring buffer; oldest unwritten records are dropped when full
+    audit_batch_size: int = 512
+    audit_flush_interval_ms: float = 200.0
+    audit_max_bytes: int = 64 << 20
+    audit_backup_count: int = 10
+    audit_fsync: str = "interval"  # always / interval / never
+    audit_fsync_interval_seconds: float = 1.0
+    audit_hash_salt: str = ""  # keys the user/tenant hashes
+
+    # /internal/safety/document-scan
+    document_scan_workers: int = 0  # process pool size, 0 = one per CPU
+    document_scan_window_chars: int = 1 << 20
+    document_scan_overlap_chars: int = 512  # longest match guaranteed to be found across a window edge
+    document_scan_max_in_flight: int = 4  # windows queued in the pool per request
+    document_scan_max_bytes: int = 1 << 30
+
+    profiler_enabled: bool = False
+    profiler_sample_rate: float = 0.05
+    profiler_top_n: int = 20
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -0,0 +1,261 @@
+"""Append-only audit trail of safety verdicts.
+
+``AuditLog.record`` only hashes the user/tenant ids and appends a tuple to an
+in-memory ring buffer; a background thread serializes batches to JSONL, rotates
+by size and fsyncs according to policy. If the writer falls behind, the oldest
+unwritten records are overwritten and counted in ``dropped``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Deque, Iterator, List, Optional, Tuple
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+_Entry = Tuple[float, str, Optional[str], Optional[str], str, Optional[str], Tuple[str, ...], str, str]
+
+
+@dataclass
+class AuditRecord:
+    ts: float
+    direction: str
+    trace_id: Optional[str]
+    policy_id: Optional[str]
+    status: str
+    reason: Optional[str]
+    risk_tags: List[str]
+    user: str
+    tenant: str
+
+
+class AuditLog:
+    def __init__(
+        self,
+        path: Path,
+        buffer_size: int = 65536,
+        batch_size: int = 512,
+        flush_interval: float = 0.2,
+        max_bytes: int = 64 << 20,
+        backup_count: int = 10,
+        fsync: str = "interval",
+        fsync_interval: float = 1.0,
+        hash_salt: str = "",
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"unknown fsync policy '{fsync}'")
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+        self._salt = hash_salt.encode()
+        self._buffer: Deque[_Entry] = deque(maxlen=buffer_size)
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._file = open(self.path, "ab")
+        self._size = self._file.tell()
+        self._last_fsync = time.monotonic()
+        self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._thread.start()
+
+    def _hash(self, value: str) -> str:
+        return hashlib.blake2b(value.encode(), key=self._salt[:64], digest_size=8).hexdigest()
+
+    def record(
+        self,
+        direction: str,
+        trace_id: Optional[str],
+        policy_id: Optional[str],
+        status: str,
+        reason: Optional[str],
+        risk_tags: List[str],
+        user_id: str,
+        tenant_id: str,
+    ) -> None:
+        buffer = self._buffer
+        self.recorded += 1
+        if len(buffer) == buffer.maxlen:
+            self.dropped += 1  # deque drops the oldest entry on append
+        buffer.append(
+            (time.time(), direction, trace_id, policy_id, status, reason, tuple(risk_tags), self._hash(user_id), self._hash(tenant_id))
+        )
+        if len(buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    def _drain(self) -> List[_Entry]:
+        batch = []
+        popleft = self._buffer.popleft
+        try:
+            while True:
+                batch.append(popleft())
+        except IndexError:
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            stopping = self._stop.is_set()
+            batch = self._drain()
+            try:
+                if batch:
+                    self._write(batch)
+                self._maybe_fsync(force=stopping)
+            except OSError:  # pragma: no cover - keep auditing best effort, never crash the writer
+                pass
+            if stopping:
+                return
+
+    def _write(self, batch: List[_Entry]) -> None:
+        data = b"".join(
+            json.dumps(asdict(AuditRecord(*entry[:6], list(entry[6]), *entry[7:])), separators=(",", ":")).encode() + b"\n"
+            for entry in batch
+        )
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        self.written += len(batch)
+        if self.fsync == "always":
+            os.fsync(self._file.fileno())
+            self._last_fsync = time.monotonic()
+
+    def _maybe_fsync(self, force: bool = False) -> None:
+        if self.fsync == "never" and not force:
+            return
+        now = time.monotonic()
+        if force or (self.fsync == "interval" and now - self._last_fsync >= self.fsync_interval):
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def _rotate(self) -> None:
+        os.fsync(self._file.fileno())
+        self._file.close()
+        for index in range(self.backup_count - 1, 0, -1):
+            source = self.path.with_name(f"{self.path.name}.{index}")
+            if source.exists():
+                os.replace(source, self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backup_count > 0:
+            os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
+        self._file = open(self.path, "ab")
+        self._size = 0
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything recorded so far is written (tests, shutdown)."""
+
+        deadline = time.monotonic() + timeout
+        target = self.recorded
+        while self.written + self.dropped < target and time.monotonic() < deadline:
+            self._wakeup.set()
+            time.sleep(0.001)
+
+    def close(self, timeout: float = 5.0) -> None:
+        if not self._thread.is_alive():
+            return
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout)
+        self._file.close()
+
+
+def audit_files(path: Path) -> List[Path]:
+    """Current and rotated files, oldest first."""
+
+    path = Path(path)
+    rotated = sorted(
+        (candidate for candidate in path.parent.glob(f"{path.name}.*") if candidate.suffix[1:].isdigit()),
+        key=lambda candidate: int(candidate.suffix[1:]),
+        reverse=True,
+    )
+    return [*rotated, path] if path.exists() else rotated
+
+
+def read_records(
+    path: Path,
+    trace_id: Optional[str] = None,
+    since: Optional[float] = None,
+    until: Optional[float] = None,
+) -> Iterator[AuditRecord]:
+    for file in audit_files(path):
+        with file.open("rb") as handle:
+            for line in handle:
+                if trace_id is not None and trace_id.encode() not in line:
+                    continue  # cheap pre-filter before parsing
+                try:
+                    record = AuditRecord(**json.loads(line))
+                except (ValueError, TypeError):
+                    continue  # torn last line after a crash
+                if trace_id is not None and record.trace_id != trace_id:
+                    continue
+                if since is not None and record.ts < since:
+                    continue
+                if until is not None and record.ts >= until:
+                    continue
+                yield record
+
+
+_audit_log: Optional[AuditLog] = None
+_audit_key: Optional[tuple] = None
+
+
+def get_audit_log(
+    path: Optional[str],
+    buffer_size: int = 65536,
+    batch_size: int = 512,
+    flush_interval_ms: float = 200.0,
+    max_bytes: int = 64 << 20,
+    backup_count: int = 10,
+    fsync: str = "interval",
+    fsync_interval: float = 1.0,
+    hash_salt: str = "",
+) -> Optional[AuditLog]:
+    """Process-wide audit log; reopened only when its configuration changes."""
+
+    global _audit_log, _audit_key
+    if not path:
+        return None
+    key = (path, buffer_size, batch_size, flush_interval_ms, max_bytes, backup_count, fsync, fsync_interval, hash_salt)
+    if _audit_log is None or _audit_key != key:
+        close_audit_log()
+        _audit_log = AuditLog(
+            Path(path),
+            buffer_size=buffer_size,
+            batch_size=batch_size,
+            flush_interval=flush_interval_ms / 1000.0,
+            max_bytes=max_bytes,
+            backup_count=backup_count,
+            fsync=fsync,
+            fsync_interval=fsync_interval,
+            hash_salt=hash_salt,
+        )
+        _audit_key = key
+    return _audit_log
+
+
+def close_audit_log() -> None:
+    global _audit_log, _audit_key
+    if _audit_log is not None:
+        _audit_log.close()
+        _audit_log = None
+        _audit_key = None
+
+
+atexit.register(close_audit_log)
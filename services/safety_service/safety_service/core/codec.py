@@ -0,0 +1,70 @@
+"""Optional msgpack wire format for internal callers (negotiated via Content-Type / Accept)."""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Coroutine
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+try:  # optional, see the `msgpack` extra
+    import msgpack
+except ImportError:  # pragma: no cover - depends on environment
+    msgpack = None
+
+MSGPACK_CONTENT_TYPE = "application/msgpack"
+
+
+def msgpack_available() -> bool:
+    return msgpack is not None
+
+
+class MsgpackRequest(Request):
+    """Request whose body is msgpack; ``json()`` returns the decoded payload."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = msgpack.unpackb(await self.body(), raw=False)
+        return self._json
+
+
+class MsgpackResponse(Response):
+    media_type = MSGPACK_CONTENT_TYPE
+
+    def render(self, content: Any) -> bytes:
+        return msgpack.packb(content, use_bin_type=True)
+
+
+class MsgpackRoute(APIRoute):
+    """APIRoute accepting ``application/msgpack`` bodies in addition to JSON.
+
+    FastAPI only hands bodies to pydantic when the content type is JSON, so msgpack
+    requests are re-labelled as JSON on a copied scope and decoded by
+    :class:`MsgpackRequest` instead.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            content_type = request.headers.get("content-type", "")
+            if not content_type.startswith(MSGPACK_CONTENT_TYPE):
+                return await handler(request)
+            if msgpack is None:
+                return Response(status_code=415, content=b"msgpack is not supported by this service")
+            scope = dict(request.scope)
+            scope["headers"] = [
+                (name, b"application/json" if name == b"content-type" else value) for name, value in request.scope["headers"]
+            ]
+            return await handler(MsgpackRequest(scope, request.receive))
+
+        return route_handler
+
+
+def negotiate(request: Request, model: BaseModel) -> Any:
+    """Return a msgpack response when the caller accepts it, otherwise the model for FastAPI to render."""
+
+    if msgpack is not None and MSGPACK_CONTENT_TYPE in request.headers.get("accept", ""):
+        return MsgpackResponse(content=model.model_dump(mode="json"))
+    return model
@@ -0,0 +1,211 @@
+"""Streaming PII / leak-keyword scan for whole documents.
+
+The document text is cut into fixed-size windows that overlap by ``overlap``
+characters on both sides. Each window only reports matches that *start* in the
+part it owns, and a match up to ``overlap`` characters long is always fully
+visible in the window that owns its start. Every document offset is therefore
+reported exactly once, including matches that straddle a window edge. Windows
+are scanned in a process pool with a bounded number in flight, so memory stays
+at roughly ``max_in_flight * window`` characters however large the input is.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import bisect
+import codecs
+import json
+import re
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import AsyncIterator, Deque, Iterator, List, Optional, Tuple
+
+from safety_service.core.evaluator import DATA_LEAK_KEYWORDS, PII_PATTERN_NAMES, PII_PATTERNS
+from safety_service.core.redaction import PatternSet, find_spans, merge_spans
+
+PAGE_BREAK = "\f"
+
+DATA_LEAK_PATTERN = re.compile("|".join(re.escape(keyword) for keyword in sorted(DATA_LEAK_KEYWORDS)), re.IGNORECASE)
+DOCUMENT_PATTERN_NAMES = (*PII_PATTERN_NAMES, "data_leak")
+DOCUMENT_PATTERN = PatternSet((*PII_PATTERNS, DATA_LEAK_PATTERN), DOCUMENT_PATTERN_NAMES)
+
+Window = Tuple[str, int, int, int]  # text, offset of text[0], owned start, owned end (document offsets)
+
+
+class DocumentFormatError(ValueError):
+    pass
+
+
+def scan_window(text: str, base: int, own_from: int, own_to: int) -> List[Tuple[int, int, str]]:
+    """Scan one window in a worker process; returns document offsets of owned matches."""
+
+    spans = merge_spans(find_spans(text, DOCUMENT_PATTERN))
+    return [
+        (base + span.start, base + span.end, span.category)
+        for span in spans
+        if own_from <= base + span.start < own_to
+    ]
+
+
+class Windower:
+    """Turn a stream of text pieces into overlapping windows without holding the whole document."""
+
+    def __init__(self, window: int, overlap: int) -> None:
+        if window <= 0 or overlap < 0:
+            raise ValueError("window must be positive and overlap non-negative")
+        self.window = window
+        self.overlap = overlap
+        self._buffer = ""
+        self._base = 0  # document offset of _buffer[0]
+        self._owned = 0  # index in _buffer where the next owned region starts
+
+    def feed(self, text: str) -> Iterator[Window]:
+        self._buffer += text
+        while len(self._buffer) - self._owned >= self.window + self.overlap:
+            yield self._cut(self._owned + self.window)
+
+    def finish(self) -> Iterator[Window]:
+        if len(self._buffer) > self._owned:
+            yield self._cut(len(self._buffer))
+
+    def _cut(self, own_to: int) -> Window:
+        end = min(len(self._buffer), own_to + self.overlap)
+        window = (self._buffer[:end], self._base, self._base + self._owned, self._base + own_to)
+        keep_from = max(0, own_to - self.overlap)  # left context for \b and the like
+        self._buffer = self._buffer[keep_from:]
+        self._base += keep_from
+        self._owned = own_to - keep_from
+        return window
+
+
+class PageIndex:
+    """Document offsets where pages start; pages are joined with a form feed."""
+
+    def __init__(self) -> None:
+        self.starts: List[int] = [0]
+        self.numbers: List[int] = [1]
+
+    @property
+    def count(self) -> int:
+        return len(self.starts)
+
+    def add(self, offset: int, number: Optional[int] = None) -> None:
+        self.starts.append(offset)
+        self.numbers.append(number if number is not None else self.numbers[-1] + 1)
+
+    def locate(self, offset: int) -> Tuple[int, int]:
+        index = bisect.bisect_right(self.starts, offset) - 1
+        return self.numbers[index], offset - self.starts[index]
+
+
+async def plain_text_pieces(chunks: AsyncIterator[bytes], pages: PageIndex) -> AsyncIterator[str]:
+    """Decode UTF-8 incrementally; every form feed starts a new page."""
+
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    offset = 0
+    async for chunk in chunks:
+        text = decoder.decode(chunk)
+        position = text.find(PAGE_BREAK)
+        while position != -1:
+            pages.add(offset + position + 1)
+            position = text.find(PAGE_BREAK, position + 1)
+        offset += len(text)
+        if text:
+            yield text
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+async def ndjson_pieces(chunks: AsyncIterator[bytes], pages: PageIndex) -> AsyncIterator[str]:
+    """One ``{"page": n, "text": "..."}`` object per line, as in the ingestion parse output."""
+
+    pending = b""
+    offset = 0
+    first = True
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            piece = _page_line(line, pages, offset, first)
+            if piece is not None:
+                first = False
+                offset += len(piece)
+                yield piece
+    piece = _page_line(pending, pages, offset, first)
+    if piece is not None:
+        yield piece
+
+
+def _page_line(line: bytes, pages: PageIndex, offset: int, first: bool) -> Optional[str]:
+    if not line.strip():
+        return None
+    try:
+        item = json.loads(line)
+        text = item["text"]
+        number = item.get("page")
+    except (ValueError, KeyError, TypeError, AttributeError) as exc:
+        raise DocumentFormatError(f"invalid page line: {exc}") from exc
+    if first:
+        if number is not None:
+            pages.numbers[0] = int(number)
+        return text
+    pages.add(offset + 1, int(number) if number is not None else None)
+    return PAGE_BREAK + text
+
+
+async def scan_document(
+    pieces: AsyncIterator[str],
+    pages: PageIndex,
+    executor: Optional[Executor],
+    window: int = 1 << 20,
+    overlap: int = 512,
+    max_in_flight: int = 4,
+) -> AsyncIterator[Tuple[int, int, str, int, int]]:
+    """Yield ``(start, end, category, page, page_offset)`` in document order.
+
+    Reading pauses while ``max_in_flight`` windows are being scanned, which also
+    applies TCP backpressure to the uploader.
+    """
+
+    loop = asyncio.get_running_loop()
+    windower = Windower(window, overlap)
+    pending: Deque[asyncio.Future] = deque()
+
+    def submit(item: Window) -> None:
+        pending.append(loop.run_in_executor(executor, scan_window, *item))
+
+    try:
+        async for piece in pieces:
+            for item in windower.feed(piece):
+                submit(item)
+                while len(pending) >= max_in_flight:
+                    for start, end, category in await pending.popleft():
+                        yield (start, end, category, *pages.locate(start))
+        for item in windower.finish():
+            submit(item)
+        while pending:
+            for start, end, category in await pending.popleft():
+                yield (start, end, category, *pages.locate(start))
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_scan_executor(workers: int) -> ProcessPoolExecutor:
+    """Shared process pool; ``workers <= 0`` means one per CPU."""
+
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=workers if workers > 0 else None)
+    return _executor
+
+
+def shutdown_scan_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
 import re
+import time
 import uuid
 from dataclasses import dataclass
-from typing import List, Sequence
+from typing import List, Optional, Sequence, Tuple
 
 from safety_service.config import Settings
-from safety_service.schemas import InputCheckRequest, OutputCheckRequest, SafetyResponse
+from safety_service.core.audit import AuditLog, get_audit_log
+from safety_service.core.injection import InjectionVerdict, get_detector
+from safety_service.core.metrics import CheckTimings, SlowInputProfiler, get_profiler
+from safety_service.core.redaction import PatternSet, find_spans, merge_spans, redact
+from safety_service.schemas import InputCheckRequest, OutputCheckRequest, Redaction, SafetyResponse
 
 PII_PATTERNS: Sequence[re.Pattern[str]] = (
     re.compile(r"\b\d{16}\b"),  # credit card like numbers
@@ -14,9 +19,11 @@ PII_PATTERNS: Sequence[re.Pattern[str]] = (
     re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", re.IGNORECASE),
     re.compile(r"\b\+?\d{11,14}\b"),
 )
+# Names for PII_PATTERNS entries, index-aligned; used as metric labels and categories.
+PII_PATTERN_NAMES: Sequence[str] = ("card_number", "ssn", "email", "phone")
+PII_COMBINED = PatternSet(PII_PATTERNS, PII_PATTERN_NAMES)
 
 DATA_LEAK_KEYWORDS = {"confidential", "internal use", "top secret", "password", "api key", "token"}
-PROMPT_INJECTION_MARKERS = {"ignore previous", "disregard", "override", "system prompt"}
 
 PII_REDACTION_TOKEN = "[REDACTED]"
 
@@ -43,20 +50,38 @@ def _contains_blocked_keyword(text: str, blocklist: Sequence[str]) -> str | None
     return None
 
 
-def _detect_prompt_injection(text: str) -> bool:
+def _detect_pii(text: str, timings: Optional[CheckTimings] = None) -> bool:
+    if timings is None:
+        return any(pattern.search(text) for pattern in PII_PATTERNS)
+    # every pattern runs when timed, so per-pattern hit rates share a denominator
+    found = False
+    for name, pattern in zip(PII_PATTERN_NAMES, PII_PATTERNS):
+        start = time.perf_counter()
+        hit = pattern.search(text) is not None
+        timings.record(f"pii_{name}", time.perf_counter() - start, hit)
+        found = found or hit
+    return found
+
+
+def _detect_data_leak(text: str) -> bool:
     lowered = text.lower()
-    return any(marker in lowered for marker in PROMPT_INJECTION_MARKERS)
+    return any(keyword in lowered for keyword in DATA_LEAK_KEYWORDS)
 
 
-def _detect_pii(text: str) -> bool:
-    return any(pattern.search(text) for pattern in PII_PATTERNS)
+def _timed(timings: CheckTimings, check: str, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    timings.record(check, time.perf_counter() - start, bool(result))
+    return result
 
 
-def _redact_pii(text: str) -> str:
-    redacted = text
-    for pattern in PII_PATTERNS:
-        redacted = pattern.sub(PII_REDACTION_TOKEN, redacted)
-    return redacted
+def _redact_pii(text: str, pseudonymize: bool = False) -> Tuple[str, List[Redaction]]:
+    spans = merge_spans(find_spans(text, PII_COMBINED))
+    redacted, records = redact(text, spans, PII_REDACTION_TOKEN, pseudonymize=pseudonymize)
+    return redacted, [
+        Redaction(start=r.start, end=r.end, category=r.category, replacement=r.replacement, value=r.value)
+        for r in records
+    ]
 
 
 def _pii_action(mode: str) -> str:
@@ -68,23 +93,107 @@ def _pii_action(mode: str) -> str:
     return mapping.get(mode, "transform")
 
 
+def profiler_for(settings: Settings) -> Optional[SlowInputProfiler]:
+    return get_profiler(settings.profiler_enabled, settings.profiler_sample_rate, settings.profiler_top_n)
+
+
+def audit_for(settings: Settings) -> Optional[AuditLog]:
+    return get_audit_log(
+        settings.audit_path,
+        buffer_size=settings.audit_buffer_size,
+        batch_size=settings.audit_batch_size,
+        flush_interval_ms=settings.audit_flush_interval_ms,
+        max_bytes=settings.audit_max_bytes,
+        backup_count=settings.audit_backup_count,
+        fsync=settings.audit_fsync,
+        fsync_interval=settings.audit_fsync_interval_seconds,
+        hash_salt=settings.audit_hash_salt,
+    )
+
+
+def _audit(settings: Settings, direction: str, request: InputCheckRequest | OutputCheckRequest, response: SafetyResponse) -> None:
+    log = audit_for(settings)
+    if log is not None:
+        log.record(
+            direction,
+            response.trace_id,
+            response.policy_id,
+            response.status,
+            response.reason,
+            response.risk_tags,
+            request.user.user_id,
+            request.user.tenant_id,
+        )
+
+
 def evaluate_input(request: InputCheckRequest, settings: Settings) -> SafetyResponse:
+    """Synchronous evaluation; an injection model, if configured, scores inline without a budget."""
+
+    timings = CheckTimings(direction="input")
+    response = _blocked_input(request, settings, timings) or _evaluate_input(request, settings, timings)
+    timings.flush(response.status, request.query, profiler_for(settings))
+    _audit(settings, "input", request, response)
+    return response
+
+
+async def evaluate_input_async(request: InputCheckRequest, settings: Settings) -> SafetyResponse:
+    """Evaluation for request handlers: the injection model is micro-batched and bounded by its latency budget.
+
+    Blocklisted input is rejected before it reaches the model.
+    """
+
+    timings = CheckTimings(direction="input")
+    response = _blocked_input(request, settings, timings)
+    if response is None:
+        start = time.perf_counter()
+        injection = await get_detector(settings).classify_async(request.query)
+        timings.record("prompt_injection", time.perf_counter() - start, injection.injection)
+        response = _evaluate_input(request, settings, timings, injection)
+    timings.flush(response.status, request.query, profiler_for(settings))
+    _audit(settings, "input", request, response)
+    return response
+
+
+def evaluate_output(request: OutputCheckRequest, settings: Settings) -> SafetyResponse:
+    timings = CheckTimings(direction="output")
+    response = _evaluate_output(request, settings, timings)
+    timings.flush(response.status, request.answer, profiler_for(settings))
+    _audit(settings, "output", request, response)
+    return response
+
+
+def _blocked_input(request: InputCheckRequest, settings: Settings, timings: CheckTimings) -> Optional[SafetyResponse]:
+    """The cheap keyword check, run before the injection model so blocked input never costs a classification."""
+
+    blocked_reason = _timed(timings, "blocklist", _contains_blocked_keyword, request.query, settings.blocklist)
+    if not blocked_reason:
+        return None
+    return SafetyResponse(
+        status="blocked",
+        reason="disallowed_content",
+        message=f"keyword '{blocked_reason}' is not permitted",
+        risk_tags=["security_exploit"],
+        policy_id=settings.default_policy_id,
+        trace_id=_default_trace_id(request.meta.trace_id if request.meta else None),
+    )
+
+
+def _evaluate_input(
+    request: InputCheckRequest,
+    settings: Settings,
+    timings: CheckTimings,
+    injection: Optional[InjectionVerdict] = None,
+) -> SafetyResponse:
+    """Checks after the blocklist; see :func:`_blocked_input`."""
+
     trace_id = _default_trace_id(request.meta.trace_id if request.meta else None)
     risk_tags: List[str] = []
 
-    blocked_reason = _contains_blocked_keyword(request.query, settings.blocklist)
-    if blocked_reason:
-        risk_tags.extend(["security_exploit"])
-        return SafetyResponse(
-            status="blocked",
-            reason="disallowed_content",
-            message=f"keyword '{blocked_reason}' is not permitted",
-            risk_tags=risk_tags,
-            policy_id=settings.default_policy_id,
-            trace_id=trace_id,
-        )
-
-    if _detect_prompt_injection(request.query):
+    if injection is None:
+        start = time.perf_counter()
+        injection = get_detector(settings).classify(request.query)
+        timings.record("prompt_injection", time.perf_counter() - start, injection.injection)
+    if injection.injection:
         risk_tags.append("prompt_injection")
         return SafetyResponse(
             status="blocked",
@@ -95,7 +204,7 @@ def evaluate_input(request: InputCheckRequest, settings: Settings) -> SafetyResp
             trace_id=trace_id,
         )
 
-    if _detect_pii(request.query):
+    if _detect_pii(request.query, timings):
         risk_tags.append("pii")
         action = _pii_action(settings.policy_mode)
         if action == "block":
@@ -108,12 +217,14 @@ def evaluate_input(request: InputCheckRequest, settings: Settings) -> SafetyResp
                 trace_id=trace_id,
             )
         if action == "transform" and settings.enable_pii_sanitize:
+            transformed_query, redactions = _redact_pii(request.query, settings.pii_pseudonymize)
             return SafetyResponse(
                 status="transformed",
                 reason="pii_sanitized",
                 message="Sensitive data removed from query.",
                 risk_tags=risk_tags,
-                transformed_query=_redact_pii(request.query),
+                transformed_query=transformed_query,
+                redactions=redactions,
                 policy_id=settings.default_policy_id,
                 trace_id=trace_id,
             )
@@ -128,11 +239,11 @@ def evaluate_input(request: InputCheckRequest, settings: Settings) -> SafetyResp
     )
 
 
-def evaluate_output(request: OutputCheckRequest, settings: Settings) -> SafetyResponse:
+def _evaluate_output(request: OutputCheckRequest, settings: Settings, timings: CheckTimings) -> SafetyResponse:
     trace_id = _default_trace_id(request.meta.trace_id if request.meta else None)
     risk_tags: List[str] = []
 
-    blocked_reason = _contains_blocked_keyword(request.answer, settings.blocklist)
+    blocked_reason = _timed(timings, "blocklist", _contains_blocked_keyword, request.answer, settings.blocklist)
     if blocked_reason:
         risk_tags.append("disallowed_content")
         return SafetyResponse(
@@ -144,30 +255,35 @@ def evaluate_output(request: OutputCheckRequest, settings: Settings) -> SafetyRe
             trace_id=trace_id,
         )
 
-    if any(keyword in request.answer.lower() for keyword in DATA_LEAK_KEYWORDS):
+    if _timed(timings, "data_leak", _detect_data_leak, request.answer):
         risk_tags.append("data_leak")
         sanitized = None
+        redactions = None
         if settings.enable_pii_sanitize:
-            sanitized = _redact_pii(request.answer)
+            sanitized, redactions = _redact_pii(request.answer, settings.pii_pseudonymize)
         return SafetyResponse(
             status="transformed" if sanitized else "blocked",
             reason="data_leak_suspected",
             message="Answer references internal or confidential data",
             risk_tags=risk_tags,
             transformed_answer=sanitized,
+            redactions=redactions or None,
             policy_id=settings.default_policy_id,
             trace_id=trace_id,
         )
 
-    if _detect_pii(request.answer):
+    if _detect_pii(request.answer, timings):
         risk_tags.append("pii")
-        sanitized = _redact_pii(request.answer) if settings.enable_pii_sanitize else None
+        sanitized, redactions = (
+            _redact_pii(request.answer, settings.pii_pseudonymize) if settings.enable_pii_sanitize else (None, None)
+        )
         return SafetyResponse(
             status="transformed" if sanitized else "blocked",
             reason="pii_sanitized" if sanitized else "pii_detected",
             message="Sensitive data removed from answer" if sanitized else "Answer contains PII",
             risk_tags=risk_tags,
             transformed_answer=sanitized,
+            redactions=redactions,
             policy_id=settings.default_policy_id,
             trace_id=trace_id,
         )
@@ -0,0 +1,288 @@
+"""Cascaded prompt-injection detection: compiled rules first, a small CPU model for the rest.
+
+Stage 1 normalizes the text and runs compiled patterns. Strong patterns block
+outright; text with none of the weak features is cleared. Only the remaining
+*uncertain* inputs reach stage 2, a hashed character n-gram logistic model whose
+weights are a NumPy array memory-mapped from disk and scored in micro-batches.
+If stage 2 cannot answer within the latency budget the verdict falls back to
+rules only.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import re
+import time
+import unicodedata
+import zlib
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence, Tuple
+
+from safety_service.core.metrics import CHECK_DURATION
+
+try:  # optional, see the `classifier` extra
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on environment
+    np = None
+
+if TYPE_CHECKING:  # pragma: no cover
+    from safety_service.config import Settings
+
+# Legacy substring markers; any of them is still an immediate block.
+PROMPT_INJECTION_MARKERS = {"ignore previous", "disregard", "override", "system prompt"}
+
+STRONG_PATTERNS: Sequence[re.Pattern[str]] = (
+    re.compile("|".join(re.escape(marker) for marker in sorted(PROMPT_INJECTION_MARKERS))),
+    re.compile(r"\b(?:ignore|forget|skip)\s+(?:all\s+|any\s+)?(?:the\s+|your\s+)?(?:previous|prior|above|earlier)\s+(?:instructions?|rules|prompts?|messages?)"),
+    re.compile(r"\b(?:reveal|show|print|repeat|leak)\s+(?:me\s+)?(?:your|the)\s+(?:hidden\s+|initial\s+)?(?:instructions|prompt|rules)"),
+    re.compile(r"\b(?:jailbreak|dan mode|developer mode|do anything now)\b"),
+    re.compile(r"(?:игнорируй|забудь|проигнорируй)\s+(?:все\s+)?(?:предыдущие|прошлые|свои|эти)?\s*(?:инструкции|правила|указания)"),
+    re.compile(r"системн\w*\s+(?:промпт|подсказк|инструкц)"),
+)
+
+WEAK_PATTERN = re.compile(
+    r"instruction|prompt|pretend|role-?play|act as|you are now|\brules\b|bypass|unfiltered|no restrictions"
+    r"|\b(?:system|assistant)\s*:|инструкц|промпт|притворись|представь,? что|обойди|без ограничений"
+    r"|[a-z0-9+/]{40,}={0,2}"
+)
+
+_ZERO_WIDTH = dict.fromkeys(map(ord, "​‌‍⁠﻿"))
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).translate(_ZERO_WIDTH).lower()
+    return _WHITESPACE.sub(" ", text)
+
+
+@dataclass(frozen=True)
+class InjectionVerdict:
+    injection: bool
+    stage: str  # rules / model / fallback
+    score: Optional[float] = None
+
+
+def rule_stage(normalized: str) -> str:
+    """Return ``injection``, ``clean`` or ``uncertain`` for already normalized text."""
+
+    for pattern in STRONG_PATTERNS:
+        if pattern.search(normalized):
+            return "injection"
+    if WEAK_PATTERN.search(normalized):
+        return "uncertain"
+    return "clean"
+
+
+class HashedNgramModel:
+    """Logistic model over hashed character n-grams.
+
+    Stored as ``weights.npy`` (float32, memory-mapped on load so worker processes
+    share pages) plus ``model.json`` with the bias and hashing parameters.
+    """
+
+    def __init__(self, weights, bias: float, ngram_range: Tuple[int, int] = (3, 5), max_chars: int = 4000) -> None:
+        if np is None:  # pragma: no cover - depends on environment
+            raise RuntimeError("the injection model requires numpy (install the `classifier` extra)")
+        self.weights = weights
+        self.bias = float(bias)
+        self.ngram_range = ngram_range
+        self.max_chars = max_chars
+        self._mask = len(weights) - 1
+        if len(weights) & self._mask:
+            raise ValueError("number of hashed features must be a power of two")
+
+    def indices(self, normalized: str):
+        text = f" {normalized[: self.max_chars]} ".encode("utf-8")
+        lo, hi = self.ngram_range
+        mask = self._mask
+        crc32 = zlib.crc32
+        return np.fromiter(
+            (crc32(text[i : i + n]) & mask for n in range(lo, hi + 1) for i in range(len(text) - n + 1)),
+            dtype=np.int64,
+        )
+
+    def score_batch(self, normalized_texts: Sequence[str]):
+        """Probability of injection for each text, vectorized over the whole batch."""
+
+        if not normalized_texts:
+            return np.zeros(0, dtype=np.float32)
+        parts = [self.indices(text) for text in normalized_texts]
+        lengths = np.fromiter((len(part) for part in parts), dtype=np.int64, count=len(parts))
+        flat = np.concatenate(parts) if lengths.sum() else np.zeros(0, dtype=np.int64)
+        contributions = np.asarray(self.weights[flat], dtype=np.float64)
+        # bincount by owning row sums contributions per text without a Python loop
+        owners = np.repeat(np.arange(len(parts)), lengths)
+        sums = np.bincount(owners, weights=contributions, minlength=len(parts))
+        logits = self.bias + sums / np.sqrt(np.maximum(lengths, 1))
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        np.save(path / "weights.npy", np.asarray(self.weights, dtype=np.float32))
+        meta = {"bias": self.bias, "ngram_range": list(self.ngram_range), "n_features": int(len(self.weights))}
+        (path / "model.json").write_text(json.dumps(meta))
+
+    @classmethod
+    def load(cls, path: Path, max_chars: int = 4000) -> "HashedNgramModel":
+        if np is None:  # pragma: no cover - depends on environment
+            raise RuntimeError("the injection model requires numpy (install the `classifier` extra)")
+        path = Path(path)
+        meta = json.loads((path / "model.json").read_text())
+        weights = np.load(path / "weights.npy", mmap_mode="r")
+        return cls(weights, meta["bias"], tuple(meta["ngram_range"]), max_chars=max_chars)
+
+
+def train_model(
+    texts: Iterable[str],
+    labels: Iterable[int],
+    n_features: int = 1 << 18,
+    ngram_range: Tuple[int, int] = (3, 5),
+    epochs: int = 10,
+    learning_rate: float = 0.5,
+    l2: float = 1e-6,
+) -> HashedNgramModel:
+    """Fit the hashed n-gram model with plain SGD; good enough for a cheap second stage."""
+
+    if np is None:  # pragma: no cover - depends on environment
+        raise RuntimeError("training requires numpy (install the `classifier` extra)")
+    model = HashedNgramModel(np.zeros(n_features, dtype=np.float32), 0.0, ngram_range)
+    samples = [(model.indices(normalize(text)), float(label)) for text, label in zip(texts, labels)]
+    rng = np.random.default_rng(0)
+    for _ in range(epochs):
+        for position in rng.permutation(len(samples)):
+            idx, label = samples[position]
+            scale = 1.0 / np.sqrt(max(len(idx), 1))
+            logit = model.bias + float(model.weights[idx].sum()) * scale
+            gradient = 1.0 / (1.0 + np.exp(-logit)) - label
+            np.add.at(model.weights, idx, -learning_rate * (gradient * scale + l2 * model.weights[idx]))
+            model.bias -= learning_rate * gradient
+    return model
+
+
+class _MicroBatcher:
+    """Collect concurrent uncertain inputs for a short window and score them together off the event loop."""
+
+    def __init__(self, model: HashedNgramModel, window: float, max_batch: int) -> None:
+        self.model = model
+        self.window = window
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def submit(self, normalized: str) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        fut: asyncio.Future = loop.create_future()
+        self._pending.append((normalized, fut))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+        return fut
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        task = loop.run_in_executor(None, self.model.score_batch, [text for text, _ in batch])
+
+        def _done(result: asyncio.Future) -> None:
+            CHECK_DURATION.labels("input", "prompt_injection_model").observe(time.perf_counter() - started)
+            error = result.exception()
+            for index, (_, fut) in enumerate(batch):
+                if fut.done():
+                    continue
+                if error is not None:
+                    fut.set_exception(error)
+                else:
+                    fut.set_result(float(result.result()[index]))
+
+        task.add_done_callback(_done)
+
+
+class PromptInjectionDetector:
+    def __init__(
+        self,
+        model: Optional[HashedNgramModel] = None,
+        threshold: float = 0.8,
+        latency_budget: float = 0.005,
+        batch_window: float = 0.001,
+        max_batch: int = 64,
+        fallback_block: bool = False,
+    ) -> None:
+        self.model = model
+        self.threshold = threshold
+        self.latency_budget = latency_budget
+        self.fallback_block = fallback_block
+        self._batcher = _MicroBatcher(model, batch_window, max_batch) if model is not None else None
+
+    def _from_rules(self, stage: str) -> Optional[InjectionVerdict]:
+        if stage == "injection":
+            return InjectionVerdict(True, "rules")
+        if stage == "clean" or self.model is None:
+            return InjectionVerdict(False, "rules")
+        return None
+
+    def classify(self, text: str) -> InjectionVerdict:
+        """Synchronous cascade; the model scores the single input inline."""
+
+        normalized = normalize(text)
+        verdict = self._from_rules(rule_stage(normalized))
+        if verdict is not None:
+            return verdict
+        score = float(self.model.score_batch([normalized])[0])
+        return InjectionVerdict(score >= self.threshold, "model", score)
+
+    async def classify_async(self, text: str) -> InjectionVerdict:
+        """Cascade with micro-batched model scoring bounded by ``latency_budget``."""
+
+        normalized = normalize(text)
+        verdict = self._from_rules(rule_stage(normalized))
+        if verdict is not None:
+            return verdict
+        try:
+            score = await asyncio.wait_for(asyncio.shield(self._batcher.submit(normalized)), self.latency_budget)
+        except asyncio.TimeoutError:
+            return InjectionVerdict(self.fallback_block, "fallback")
+        return InjectionVerdict(score >= self.threshold, "model", score)
+
+
+@lru_cache(maxsize=4)
+def _get_detector(
+    model_path: Optional[str],
+    threshold: float,
+    latency_budget_ms: float,
+    batch_window_ms: float,
+    max_batch: int,
+    max_chars: int,
+    fallback_block: bool,
+) -> PromptInjectionDetector:
+    model = HashedNgramModel.load(Path(model_path), max_chars=max_chars) if model_path else None
+    return PromptInjectionDetector(
+        model,
+        threshold=threshold,
+        latency_budget=latency_budget_ms / 1000.0,
+        batch_window=batch_window_ms / 1000.0,
+        max_batch=max_batch,
+        fallback_block=fallback_block,
+    )
+
+
+def get_detector(settings: "Settings") -> PromptInjectionDetector:
+    return _get_detector(
+        settings.injection_model_path,
+        settings.injection_thresholds.get(settings.policy_mode, 0.8),
+        settings.injection_latency_budget_ms,
+        settings.injection_batch_window_ms,
+        settings.injection_max_batch,
+        settings.injection_model_max_chars,
+        settings.injection_fallback_block,
+    )
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import hashlib
+import heapq
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, generate_latest
+
+REGISTRY = CollectorRegistry(auto_describe=True)
+
+# Rule checks are sub-millisecond when healthy; the upper buckets exist to catch
+# catastrophic regex backtracking.
+CHECK_BUCKETS = (0.00001, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01, 0.05, 0.25, 1.0)
+
+CHECK_DURATION = Histogram(
+    "safety_check_duration_seconds",
+    "Time spent in an individual safety rule.",
+    ("direction", "check"),
+    buckets=CHECK_BUCKETS,
+    registry=REGISTRY,
+)
+CHECK_HITS = Counter(
+    "safety_check_hits_total",
+    "Number of times a safety rule matched.",
+    ("direction", "check"),
+    registry=REGISTRY,
+)
+EVALUATION_DURATION = Histogram(
+    "safety_evaluation_duration_seconds",
+    "End-to-end evaluator time by direction and resulting status.",
+    ("direction", "status"),
+    buckets=CHECK_BUCKETS,
+    registry=REGISTRY,
+)
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+@dataclass
+class CheckTimings:
+    """Per-evaluation breakdown of rule timings, flushed once the verdict is known."""
+
+    direction: str
+    started: float = field(default_factory=time.perf_counter)
+    checks: List[Tuple[str, float, bool]] = field(default_factory=list)
+
+    def record(self, check: str, elapsed: float, hit: bool) -> None:
+        self.checks.append((check, elapsed, hit))
+
+    def flush(self, status: str, text: str, profiler: Optional["SlowInputProfiler"] = None) -> None:
+        total = time.perf_counter() - self.started
+        for check, elapsed, hit in self.checks:
+            CHECK_DURATION.labels(self.direction, check).observe(elapsed)
+            if hit:
+                CHECK_HITS.labels(self.direction, check).inc()
+        EVALUATION_DURATION.labels(self.direction, status).observe(total)
+        if profiler is not None:
+            profiler.offer(self, status, text, total)
+
+
+@dataclass(order=True)
+class SlowInput:
+    total_seconds: float
+    input_hash: str = field(compare=False)
+    length: int = field(compare=False)
+    direction: str = field(compare=False)
+    status: str = field(compare=False)
+    breakdown: Dict[str, float] = field(compare=False)
+
+
+class SlowInputProfiler:
+    """Keep the N slowest sampled evaluations; inputs are stored as hashes only."""
+
+    def __init__(self, sample_rate: float, top_n: int) -> None:
+        self.sample_rate = sample_rate
+        self.top_n = top_n
+        self._heap: List[SlowInput] = []
+        self._lock = threading.Lock()
+
+    def offer(self, timings: CheckTimings, status: str, text: str, total: float) -> None:
+        if self.top_n <= 0 or random.random() >= self.sample_rate:
+            return
+        if len(self._heap) >= self.top_n and total <= self._heap[0].total_seconds:
+            return
+        entry = SlowInput(
+            total_seconds=total,
+            input_hash=hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()[:16],
+            length=len(text),
+            direction=timings.direction,
+            status=status,
+            breakdown={check: elapsed for check, elapsed, _ in timings.checks},
+        )
+        with self._lock:
+            if len(self._heap) < self.top_n:
+                heapq.heappush(self._heap, entry)
+            elif total > self._heap[0].total_seconds:
+                heapq.heapreplace(self._heap, entry)
+
+    def snapshot(self) -> List[SlowInput]:
+        with self._lock:
+            return sorted(self._heap, reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._heap.clear()
+
+
+@lru_cache(maxsize=1)
+def _get_profiler(sample_rate: float, top_n: int) -> SlowInputProfiler:
+    return SlowInputProfiler(sample_rate, top_n)
+
+
+def get_profiler(enabled: bool, sample_rate: float, top_n: int) -> Optional[SlowInputProfiler]:
+    if not enabled:
+        return None
+    return _get_profiler(sample_rate, top_n)
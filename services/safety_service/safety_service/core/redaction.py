@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+import secrets
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Span:
+    start: int
+    end: int
+    category: str
+
+
+@dataclass
+class RedactionRecord:
+    start: int
+    end: int
+    category: str
+    replacement: str
+    value: Optional[str] = None
+
+
+class PatternSet:
+    """Category patterns scanned together, index-aligned with their ``names``.
+
+    Spans come from one ``finditer`` per pattern, so overlapping matches of
+    different categories are all found and :func:`merge_spans` unions them. A
+    single alternation cannot do that: it reports one match per position and
+    resumes after it, so ``123456789@x.com`` would yield only the SSN-shaped
+    digits and leave ``@x.com`` behind. The alternation is kept as a
+    pre-check instead. It matches exactly when some pattern does, so text
+    without any hit costs one pass.
+    """
+
+    def __init__(self, patterns: Sequence[re.Pattern[str]], names: Sequence[str]) -> None:
+        if len(patterns) != len(names):
+            raise ValueError("every pattern needs a category name")
+        self.patterns: Tuple[Tuple[str, re.Pattern[str]], ...] = tuple(zip(names, patterns))
+        parts = []
+        for pattern in patterns:
+            # per-pattern flags kept as scoped inline flags
+            flags = ""
+            if pattern.flags & re.IGNORECASE:
+                flags += "i"
+            if pattern.flags & re.MULTILINE:
+                flags += "m"
+            if pattern.flags & re.DOTALL:
+                flags += "s"
+            parts.append(f"(?{flags}:{pattern.pattern})" if flags else f"(?:{pattern.pattern})")
+        self.any_match = re.compile("|".join(parts))
+
+
+def find_spans(text: str, pattern_set: PatternSet) -> List[Span]:
+    """Every match of every pattern, unsorted and possibly overlapping; see :func:`merge_spans`."""
+
+    if pattern_set.any_match.search(text) is None:
+        return []
+    return [
+        Span(match.start(), match.end(), name)
+        for name, pattern in pattern_set.patterns
+        for match in pattern.finditer(text)
+    ]
+
+
+def merge_spans(spans: Iterable[Span]) -> List[Span]:
+    """Sort spans and merge overlapping ones; the longer span's category wins."""
+
+    merged: List[Span] = []
+    for span in sorted(spans, key=lambda item: (item.start, -item.end)):
+        if merged and span.start < merged[-1].end:
+            last = merged[-1]
+            if span.end > last.end:
+                category = span.category if span.end - span.start > last.end - last.start else last.category
+                merged[-1] = Span(last.start, span.end, category)
+            continue
+        merged.append(span)
+    return merged
+
+
+def redact(
+    text: str,
+    spans: Sequence[Span],
+    token: str,
+    pseudonymize: bool = False,
+    nonce: Optional[str] = None,
+) -> Tuple[str, List[RedactionRecord]]:
+    """Replace merged, sorted ``spans`` in one pass.
+
+    With ``pseudonymize`` every distinct value gets a per-request token such as
+    ``[EMAIL_3f9a_1]`` and the returned records carry the original value, so a
+    trusted downstream can restore the text with :func:`restore` without rescanning.
+    """
+
+    if not spans:
+        return text, []
+    nonce = nonce or secrets.token_hex(2)
+    pieces: List[str] = []
+    records: List[RedactionRecord] = []
+    assigned: Dict[Tuple[str, str], str] = {}
+    counters: Dict[str, int] = {}
+    cursor = 0
+    for span in spans:
+        pieces.append(text[cursor:span.start])
+        value = None
+        replacement = token
+        if pseudonymize:
+            value = text[span.start:span.end]
+            key = (span.category, value)
+            replacement = assigned.get(key)
+            if replacement is None:
+                counters[span.category] = counters.get(span.category, 0) + 1
+                replacement = f"[{span.category.upper()}_{nonce}_{counters[span.category]}]"
+                assigned[key] = replacement
+        pieces.append(replacement)
+        records.append(RedactionRecord(span.start, span.end, span.category, replacement, value))
+        cursor = span.end
+    pieces.append(text[cursor:])
+    return "".join(pieces), records
+
+
+def restore(text: str, records: Iterable[RedactionRecord]) -> str:
+    """Put pseudonymized values back; records without a value are left redacted."""
+
+    mapping = {record.replacement: record.value for record in records if record.value is not None}
+    if not mapping:
+        return text
+    pattern = re.compile("|".join(re.escape(replacement) for replacement in mapping))
+    return pattern.sub(lambda match: mapping[match.group(0)], text)
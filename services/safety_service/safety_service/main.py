@@ -1,14 +1,36 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from safety_service.config import get_settings
+from safety_service.core.audit import close_audit_log
+from safety_service.core.document_scan import shutdown_scan_executor
+from safety_service.core.middleware import LogContextMiddleware
 from safety_service.logging import configure_logging
-from safety_service.routers import safety
+from safety_service.routers import document_scan, metrics, safety
 
 settings = get_settings()
-configure_logging(settings.log_level)
+configure_logging(
+    settings.log_level,
+    fmt=settings.log_format,
+    queue_size=settings.log_queue_size,
+    level_sample_rates=settings.log_level_sample_rates,
+    route_sample_rates=settings.log_route_sample_rates,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_scan_executor()
+    close_audit_log()
+
 
-app = FastAPI(title=settings.app_name)
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
+app.add_middleware(LogContextMiddleware)
 app.include_router(safety.router)
+app.include_router(document_scan.router)
+app.include_router(metrics.router)
 
 
 @app.get("/health", tags=["health"])
@@ -1,3 +1,3 @@
-from . import safety
+from . import document_scan, metrics, safety
 
-__all__ = ["safety"]
+__all__ = ["document_scan", "metrics", "safety"]
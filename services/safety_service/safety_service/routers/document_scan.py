@@ -0,0 +1,128 @@
+import asyncio
+import tempfile
+from typing import IO, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from safety_service.config import Settings, get_settings
+from safety_service.core.document_scan import (
+    DocumentFormatError,
+    PageIndex,
+    get_scan_executor,
+    ndjson_pieces,
+    plain_text_pieces,
+    scan_document,
+)
+from safety_service.logging import get_logger
+from safety_service.schemas import DocumentFinding, DocumentScanSummary
+
+router = APIRouter(prefix="/internal/safety", tags=["safety"])
+logger = get_logger(__name__)
+
+NDJSON = "application/x-ndjson"
+SPOOL_MEMORY_BYTES = 8 << 20
+READ_CHUNK_BYTES = 1 << 20
+
+
+async def _spool_body(request: Request, max_bytes: int) -> IO[bytes]:
+    """Buffer the upload before responding, spilling to disk past ``SPOOL_MEMORY_BYTES``.
+
+    The body must be fully received before the StreamingResponse starts: Starlette
+    listens for disconnects on ``receive`` while streaming, which would race with
+    ``request.stream()`` for the remaining ``http.request`` messages.
+    """
+
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MEMORY_BYTES)
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_bytes:
+                raise HTTPException(status_code=413, detail="document_too_large")
+            if chunk:
+                await asyncio.to_thread(spool.write, chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+async def _read_spool(spool: IO[bytes]) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await asyncio.to_thread(spool.read, READ_CHUNK_BYTES)
+        if not chunk:
+            return
+        yield chunk
+
+
+@router.post(
+    "/document-scan",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON: {}}, "description": "finding lines followed by one summary line"}},
+)
+async def document_scan(
+    request: Request,
+    doc_id: Optional[str] = None,
+    settings: Settings = Depends(get_settings),
+) -> StreamingResponse:
+    """Scan a document streamed as ``text/plain`` (form feed between pages) or NDJSON pages."""
+
+    content_type = request.headers.get("content-type", "text/plain")
+    if content_type.startswith(NDJSON):
+        decode = ndjson_pieces
+    elif content_type.startswith("text/plain"):
+        decode = plain_text_pieces
+    else:
+        raise HTTPException(status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE, detail="expected text/plain or application/x-ndjson")
+    length = request.headers.get("content-length")
+    if length and length.isdigit() and int(length) > settings.document_scan_max_bytes:
+        raise HTTPException(status_code=413, detail="document_too_large")
+
+    spool = await _spool_body(request, settings.document_scan_max_bytes)
+    executor = get_scan_executor(settings.document_scan_workers)
+
+    async def lines() -> AsyncIterator[bytes]:
+        pages = PageIndex()
+        chars = 0
+        counts: Dict[str, int] = {}
+        error = None
+
+        async def pieces() -> AsyncIterator[str]:
+            nonlocal chars
+            async for piece in decode(_read_spool(spool), pages):
+                chars += len(piece)
+                yield piece
+
+        try:
+            async for start, end, category, page, page_offset in scan_document(
+                pieces(),
+                pages,
+                executor,
+                window=settings.document_scan_window_chars,
+                overlap=settings.document_scan_overlap_chars,
+                max_in_flight=settings.document_scan_max_in_flight,
+            ):
+                counts[category] = counts.get(category, 0) + 1
+                finding = DocumentFinding(category=category, start=start, end=end, page=page, page_offset=page_offset)
+                yield finding.model_dump_json().encode() + b"\n"
+        except DocumentFormatError as exc:
+            error = str(exc)
+        finally:
+            spool.close()
+        total = sum(counts.values())
+        if error:
+            logger.warning("document_scan_failed", doc_id=doc_id, error=error, chars=chars)
+        summary = DocumentScanSummary(
+            doc_id=doc_id,
+            status="error" if error else ("flagged" if total else "clean"),
+            chars=chars,
+            pages=pages.count,
+            findings=total,
+            counts=counts,
+            error=error,
+        )
+        yield summary.model_dump_json().encode() + b"\n"
+
+    return StreamingResponse(lines(), media_type=NDJSON)
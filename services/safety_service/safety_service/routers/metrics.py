@@ -0,0 +1,24 @@
+from dataclasses import asdict
+from typing import Any
+
+from fastapi import APIRouter, Depends, Response
+
+from safety_service.config import Settings, get_settings
+from safety_service.core.evaluator import profiler_for
+from safety_service.core.metrics import render_latest
+
+router = APIRouter(tags=["metrics"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
+
+
+@router.get("/metrics/slow-inputs")
+async def slow_inputs(settings: Settings = Depends(get_settings)) -> dict[str, Any]:
+    profiler = profiler_for(settings)
+    if profiler is None:
+        return {"enabled": False, "items": []}
+    return {"enabled": True, "items": [asdict(item) for item in profiler.snapshot()]}
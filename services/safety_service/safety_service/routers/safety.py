@@ -1,23 +1,26 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 
 from safety_service.config import Settings, get_settings
-from safety_service.core.evaluator import evaluate_input, evaluate_output
+from safety_service.core.codec import MsgpackRoute, negotiate
+from safety_service.core.evaluator import evaluate_input_async, evaluate_output
 from safety_service.schemas import InputCheckRequest, OutputCheckRequest, SafetyResponse
 
-router = APIRouter(prefix="/internal/safety", tags=["safety"])
+router = APIRouter(prefix="/internal/safety", tags=["safety"], route_class=MsgpackRoute)
 
 
 @router.post("/input-check", response_model=SafetyResponse)
 async def input_check(
     payload: InputCheckRequest,
+    request: Request,
     settings: Settings = Depends(get_settings),
 ) -> SafetyResponse:
-    return evaluate_input(payload, settings)
+    return negotiate(request, await evaluate_input_async(payload, settings))
 
 
 @router.post("/output-check", response_model=SafetyResponse)
 async def output_check(
     payload: OutputCheckRequest,
+    request: Request,
     settings: Settings = Depends(get_settings),
 ) -> SafetyResponse:
-    return evaluate_output(payload, settings)
+    return negotiate(request, evaluate_output(payload, settings))
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import List, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -31,6 +31,14 @@ class InputCheckRequest(BaseModel):
     meta: Optional[SafetyMeta] = None
 
 
+class Redaction(BaseModel):
+    start: int = Field(description="offset of the redacted span in the original text")
+    end: int
+    category: str
+    replacement: str
+    value: Optional[str] = Field(default=None, description="original value, only in pseudonymize mode")
+
+
 class SafetyResponse(BaseModel):
     status: str = Field(description="allowed/transformed/blocked")
     reason: Optional[str] = None
@@ -38,6 +46,7 @@ class SafetyResponse(BaseModel):
     risk_tags: List[str] = Field(default_factory=list)
     transformed_query: Optional[str] = None
     transformed_answer: Optional[str] = None
+    redactions: Optional[List[Redaction]] = None
     policy_id: Optional[str] = None
     trace_id: Optional[str] = None
 
@@ -56,3 +65,23 @@ class OutputCheckRequest(BaseModel):
     sources: Optional[List[SourceItem]] = None
     meta: Optional[SafetyMeta] = None
     context: Optional[SafetyContext] = None
+
+
+class DocumentFinding(BaseModel):
+    type: Literal["finding"] = "finding"
+    category: str = Field(description="PII pattern name or data_leak")
+    start: int = Field(description="offset in the document text, pages joined by a form feed")
+    end: int
+    page: int
+    page_offset: int = Field(description="offset of the match within its page")
+
+
+class DocumentScanSummary(BaseModel):
+    type: Literal["summary"] = "summary"
+    doc_id: Optional[str] = None
+    status: str = Field(description="clean/flagged/error")
+    chars: int
+    pages: int
+    findings: int
+    counts: Dict[str, int] = Field(default_factory=dict)
+    error: Optional[str] = None
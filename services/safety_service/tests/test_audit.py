@@ -0,0 +1,53 @@
+import time
+
+from safety_service.config import Settings
+from safety_service.core.audit import AuditLog, audit_files, close_audit_log, read_records
+from safety_service.core.evaluator import evaluate_input, evaluate_output
+from safety_service.schemas import InputCheckRequest, OutputCheckRequest, SafetyMeta, SafetyUser
+
+USER = SafetyUser(user_id="user-1", tenant_id="tenant-1")
+
+
+def test_evaluator_audits_every_verdict(tmp_path) -> None:
+    path = tmp_path / "audit.jsonl"
+    settings = Settings(audit_path=str(path), audit_hash_salt="s")
+    try:
+        evaluate_input(InputCheckRequest(user=USER, query="how to hack", meta=SafetyMeta(trace_id="t-1")), settings)
+        evaluate_output(OutputCheckRequest(user=USER, query="q", answer="fine", meta=SafetyMeta(trace_id="t-2")), settings)
+    finally:
+        close_audit_log()
+    records = list(read_records(path))
+    assert [(r.direction, r.trace_id, r.status) for r in records] == [("input", "t-1", "blocked"), ("output", "t-2", "allowed")]
+    assert records[0].risk_tags == ["security_exploit"] and records[0].policy_id == "policy_default_v1"
+    assert records[0].user == records[1].user and "user-1" not in path.read_text()
+    assert [r.trace_id for r in read_records(path, trace_id="t-2")] == ["t-2"]
+
+
+def test_rotation_and_time_filter(tmp_path) -> None:
+    path = tmp_path / "audit.jsonl"
+    log = AuditLog(path, batch_size=1, flush_interval=0.01, max_bytes=400, backup_count=3, fsync="always")
+    try:
+        for index in range(12):
+            log.record("input", f"trace-{index}", "p", "allowed", "clean", [], "u", "t")
+            log.flush()
+    finally:
+        log.close()
+    files = audit_files(path)
+    assert len(files) == 4 and files[-1] == path
+    kept = [r.trace_id for r in read_records(path)]
+    assert kept == sorted(kept, key=lambda trace: int(trace.split("-")[1]))
+    assert kept[-1] == "trace-11"
+    assert list(read_records(path, since=time.time() + 60)) == []
+
+
+def test_record_is_cheap_and_ring_buffer_drops_oldest(tmp_path) -> None:
+    log = AuditLog(tmp_path / "a.jsonl", buffer_size=4, batch_size=10**9, flush_interval=60, fsync="never")
+    try:
+        started = time.perf_counter()
+        for _ in range(2000):
+            log.record("input", "t", "p", "allowed", "clean", ["x"], "u", "t")
+        per_call = (time.perf_counter() - started) / 2000
+        assert per_call < 100e-6
+        assert log.dropped == 1996
+    finally:
+        log.close()
@@ -0,0 +1,48 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from safety_service.core import codec
+from safety_service.main import app
+
+msgpack = pytest.importorskip("msgpack")
+
+PAYLOAD = {"user": {"user_id": "u", "tenant_id": "t"}, "query": "how to hack it"}
+
+
+def test_msgpack_request_and_response() -> None:
+    with TestClient(app) as client:
+        resp = client.post(
+            "/internal/safety/input-check",
+            content=msgpack.packb(PAYLOAD),
+            headers={"Content-Type": "application/msgpack", "Accept": "application/msgpack"},
+        )
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/msgpack")
+    assert msgpack.unpackb(resp.content)["status"] == "blocked"
+
+
+def test_msgpack_request_json_response_and_validation() -> None:
+    with TestClient(app) as client:
+        ok = client.post(
+            "/internal/safety/input-check",
+            content=msgpack.packb(PAYLOAD),
+            headers={"Content-Type": "application/msgpack"},
+        )
+        invalid = client.post(
+            "/internal/safety/input-check",
+            content=msgpack.packb({"query": "no user"}),
+            headers={"Content-Type": "application/msgpack"},
+        )
+    assert ok.json()["reason"] == "disallowed_content"
+    assert invalid.status_code == 422
+
+
+def test_msgpack_rejected_when_library_missing(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(codec, "msgpack", None)
+    with TestClient(app) as client:
+        resp = client.post(
+            "/internal/safety/input-check",
+            content=b"\x80",
+            headers={"Content-Type": "application/msgpack"},
+        )
+    assert resp.status_code == 415
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from safety_service.config import Settings, get_settings
+from safety_service.core.document_scan import (
+    DOCUMENT_PATTERN,
+    PageIndex,
+    Windower,
+    plain_text_pieces,
+    scan_document,
+    scan_window,
+)
+from safety_service.core.redaction import find_spans, merge_spans
+from safety_service.main import app
+
+PAGE = "Contact ivan.petrov@example.com or +79161234567. Card 1234567812345678 is confidential. Filler text. "
+
+
+async def _chunks(data: bytes, size: int):
+    for index in range(0, len(data), size):
+        yield data[index:index + size]
+
+
+def test_window_scan_merges_overlapping_categories() -> None:
+    text = "mail 123456789@x.com, confidential-token@corp.example"
+    assert scan_window(text, 100, 100, 100 + len(text)) == [(105, 120, "email"), (122, 153, "email")]
+
+
+def test_windows_find_every_match_exactly_once() -> None:
+    text = "\f".join(PAGE * 3 for _ in range(5))
+    expected = [(s.start, s.end, s.category) for s in merge_spans(find_spans(text, DOCUMENT_PATTERN))]
+
+    async def scan():
+        pages = PageIndex()
+        pieces = plain_text_pieces(_chunks(text.encode(), 37), pages)
+        # windows much smaller than the page force matches across window edges
+        return [item async for item in scan_document(pieces, pages, None, window=50, overlap=40, max_in_flight=2)], pages
+
+    found, pages = asyncio.run(scan())
+    assert [item[:3] for item in found] == expected
+    assert pages.count == 5
+    first_on_page_two = next(item for item in found if item[3] == 2)
+    assert first_on_page_two[4] == PAGE.index("ivan")
+
+
+def test_windower_keeps_buffer_bounded() -> None:
+    windower = Windower(window=100, overlap=10)
+    for _ in range(1000):
+        list(windower.feed("x" * 64))
+        assert len(windower._buffer) < 100 + 10 + 64 + 10
+
+
+def _settings() -> Settings:
+    return Settings(document_scan_workers=1, document_scan_window_chars=64, document_scan_overlap_chars=48, document_scan_max_bytes=4096)
+
+
+def _lines(resp):
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_document_scan_endpoint_streams_findings_and_summary() -> None:
+    app.dependency_overrides[get_settings] = _settings
+    try:
+        with TestClient(app) as client:
+            pages = "\n".join(json.dumps({"page": n, "text": PAGE}) for n in (6, 7))
+            resp = client.post(
+                "/internal/safety/document-scan?doc_id=d1",
+                content=pages,
+                headers={"content-type": "application/x-ndjson"},
+            )
+            assert resp.status_code == 200
+            *findings, summary = _lines(resp)
+            assert summary["status"] == "flagged" and summary["pages"] == 2 and summary["doc_id"] == "d1"
+            assert summary["counts"] == {"email": 2, "phone": 2, "card_number": 2, "data_leak": 2}
+            assert [f["page"] for f in findings] == [6] * 4 + [7] * 4
+            assert findings[4]["page_offset"] == findings[0]["page_offset"]
+
+            clean = client.post("/internal/safety/document-scan", content="nothing here", headers={"content-type": "text/plain"})
+            assert _lines(clean) == [{"type": "summary", "doc_id": None, "status": "clean", "chars": 12, "pages": 1, "findings": 0, "counts": {}, "error": None}]
+
+            too_large = client.post("/internal/safety/document-scan", content="x" * 5000, headers={"content-type": "text/plain"})
+            assert too_large.status_code == 413
+            chunked = client.post(
+                "/internal/safety/document-scan",
+                content=(b"y" * 1024 for _ in range(5)),
+                headers={"content-type": "text/plain"},
+            )
+            assert chunked.status_code == 413
+            assert client.post("/internal/safety/document-scan", content=b"{}", headers={"content-type": "application/pdf"}).status_code == 415
+    finally:
+        app.dependency_overrides.clear()
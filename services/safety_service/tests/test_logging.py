@@ -0,0 +1,111 @@
+import io
+import json
+import logging
+import threading
+
+import structlog
+from fastapi.testclient import TestClient
+
+from safety_service.logging import LogSampler, QueueLogWriter, configure_logging, get_log_writer
+from safety_service.main import app
+
+
+def test_json_mode_writes_through_background_queue() -> None:
+    stream = io.StringIO()
+    configure_logging("info", fmt="json", stream=stream)
+    try:
+        structlog.contextvars.bind_contextvars(trace_id="trace-1")
+        structlog.get_logger("test").info("hello", answer=42)
+        get_log_writer().close()
+    finally:
+        structlog.contextvars.clear_contextvars()
+        configure_logging("info")
+    record = json.loads(stream.getvalue().splitlines()[0])
+    assert record["event"] == "hello"
+    assert record["answer"] == 42
+    assert record["trace_id"] == "trace-1"
+    assert record["level"] == "info"
+
+
+class _BlockingStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, data: str) -> int:
+        self.release.wait(5)
+        return super().write(data)
+
+
+def test_full_queue_drops_and_reports_trace_ids() -> None:
+    stream = _BlockingStream()
+    writer = QueueLogWriter(stream, maxsize=1, batch_size=1)
+    for i in range(20):
+        writer.write(f"line-{i}", trace_id="trace-drop")
+    stream.release.set()
+    writer.close()
+    assert writer.dropped > 0
+    summary = json.loads(stream.getvalue().splitlines()[-1])
+    assert summary["event"] == "log_records_dropped"
+    assert summary["trace_ids"] == ["trace-drop"]
+
+
+def test_sampler_keeps_whole_traces_and_spares_errors() -> None:
+    sampler = LogSampler(level_rates={"debug": 0.0}, route_rates={"/health": 0.0})
+
+    def passes(event: dict) -> bool:
+        try:
+            sampler(None, "", dict(event))
+        except structlog.DropEvent:
+            return False
+        return True
+
+    assert not passes({"level": "debug", "event": "x"})
+    assert not passes({"level": "info", "event": "x", "route": "/health"})
+    assert passes({"level": "error", "event": "x", "route": "/health"})
+    assert passes({"level": "info", "event": "x", "route": "/internal/safety/input-check"})
+
+    half = LogSampler(level_rates={"info": 0.5})
+    decisions = set()
+    for _ in range(5):
+        try:
+            half(None, "", {"level": "info", "event": "e", "trace_id": "same"})
+            decisions.add(True)
+        except structlog.DropEvent:
+            decisions.add(False)
+    assert len(decisions) == 1
+
+
+def test_sampler_samples_untraced_events_at_random() -> None:
+    half = LogSampler(level_rates={"info": 0.5})
+    kept = 0
+    for _ in range(2000):
+        try:
+            half(None, "", {"level": "info", "event": "startup_step"})
+            kept += 1
+        except structlog.DropEvent:
+            pass
+    # one event name is no longer kept all or nothing
+    assert 800 < kept < 1200
+
+
+def test_uvicorn_access_log_is_routed_and_sampled() -> None:
+    stream = io.StringIO()
+    configure_logging("info", fmt="json", stream=stream, route_sample_rates={"/health": 0.0})
+    try:
+        with TestClient(app) as client:
+            client.post(
+                "/internal/safety/input-check",
+                json={"user": {"user_id": "u", "tenant_id": "t"}, "query": "hi"},
+                headers={"X-Request-ID": "trace-safety"},
+            )
+        access = logging.getLogger("uvicorn.access")
+        access.info('%s - "%s %s HTTP/%s" %d', "10.0.0.1:1", "POST", "/internal/safety/input-check", "1.1", 200)
+        access.info('%s - "%s %s HTTP/%s" %d', "10.0.0.1:1", "GET", "/health", "1.1", 200)
+        get_log_writer().close()
+    finally:
+        configure_logging("info")
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    requests = [line for line in lines if line["event"] == "http_request"]
+    assert [line["route"] for line in requests] == ["/internal/safety/input-check"]
+    assert requests[0]["status_code"] == 200
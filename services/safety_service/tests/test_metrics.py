@@ -0,0 +1,66 @@
+from fastapi.testclient import TestClient
+
+from safety_service.config import Settings, get_settings
+from safety_service.core.evaluator import evaluate_input, evaluate_output, profiler_for
+from safety_service.core.metrics import REGISTRY
+from safety_service.main import app
+from safety_service.schemas import InputCheckRequest, OutputCheckRequest, SafetyUser
+
+USER = SafetyUser(user_id="u", tenant_id="t")
+
+
+def _sample(name: str, labels: dict) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_each_rule_is_timed_and_hits_counted() -> None:
+    settings = Settings()
+    email_hits = {"direction": "input", "check": "pii_email"}
+    phone_hits = {"direction": "input", "check": "pii_phone"}
+    before = _sample("safety_check_hits_total", email_hits)
+    before_phone = _sample("safety_check_duration_seconds_count", phone_hits)
+    before_card = _sample("safety_check_duration_seconds_count", {"direction": "input", "check": "pii_card_number"})
+
+    evaluate_input(InputCheckRequest(user=USER, query="write to me@example.com"), settings)
+
+    assert _sample("safety_check_hits_total", email_hits) == before + 1
+    assert _sample("safety_check_duration_seconds_count", {"direction": "input", "check": "pii_card_number"}) == before_card + 1
+    # later patterns still run after email matched, so hit rates are comparable
+    assert _sample("safety_check_duration_seconds_count", phone_hits) == before_phone + 1
+
+
+def test_data_leak_check_recorded_for_output() -> None:
+    labels = {"direction": "output", "check": "data_leak"}
+    before = _sample("safety_check_hits_total", labels)
+    evaluate_output(OutputCheckRequest(user=USER, query="", answer="the password is hunter2"), Settings())
+    assert _sample("safety_check_hits_total", labels) == before + 1
+
+
+def test_profiler_keeps_slowest_inputs_hashed() -> None:
+    settings = Settings(profiler_enabled=True, profiler_sample_rate=1.0, profiler_top_n=2)
+    profiler = profiler_for(settings)
+    profiler.reset()
+    for query in ("one", "two", "three secret@example.com"):
+        evaluate_input(InputCheckRequest(user=USER, query=query), settings)
+
+    items = profiler.snapshot()
+    assert len(items) == 2
+    assert items[0].total_seconds >= items[1].total_seconds
+    assert all(len(item.input_hash) == 16 for item in items)
+    assert all("secret" not in item.input_hash for item in items)
+    assert "blocklist" in items[0].breakdown
+
+
+def test_metrics_endpoints() -> None:
+    app.dependency_overrides[get_settings] = lambda: Settings(profiler_enabled=True, profiler_sample_rate=1.0)
+    try:
+        with TestClient(app) as client:
+            client.post("/internal/safety/input-check", json={"user": {"user_id": "u", "tenant_id": "t"}, "query": "hi"})
+            metrics = client.get("/metrics")
+            assert metrics.status_code == 200
+            assert "safety_check_duration_seconds_bucket" in metrics.text
+            slow = client.get("/metrics/slow-inputs").json()
+            assert slow["enabled"] is True
+            assert slow["items"]
+    finally:
+        app.dependency_overrides.clear()
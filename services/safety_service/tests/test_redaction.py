@@ -0,0 +1,66 @@
+from safety_service.config import Settings
+from safety_service.core.evaluator import PII_COMBINED, PII_PATTERNS, evaluate_input, evaluate_output
+from safety_service.core.redaction import RedactionRecord, Span, find_spans, merge_spans, redact, restore
+from safety_service.schemas import InputCheckRequest, OutputCheckRequest, SafetyUser
+
+USER = SafetyUser(user_id="u", tenant_id="t")
+
+
+def _sequential(text: str) -> str:
+    for pattern in PII_PATTERNS:
+        text = pattern.sub("[REDACTED]", text)
+    return text
+
+
+def test_merge_spans_unions_overlaps() -> None:
+    spans = [Span(10, 20, "b"), Span(0, 5, "a"), Span(3, 8, "c"), Span(15, 30, "d")]
+    assert merge_spans(spans) == [Span(0, 8, "a"), Span(10, 30, "d")]
+
+
+def test_single_pass_matches_sequential_output_and_reports_offsets() -> None:
+    text = "Card 1234567812345678, mail Ivan.Petrov@Example.COM, call +79161234567 or 123-45-6789."
+    redacted, records = redact(text, merge_spans(find_spans(text, PII_COMBINED)), "[REDACTED]")
+    assert redacted == _sequential(text)
+    assert [record.category for record in records] == ["card_number", "email", "phone", "ssn"]
+    assert all(text[r.start:r.end] for r in records)
+    assert text[records[1].start:records[1].end] == "Ivan.Petrov@Example.COM"
+
+
+def test_overlapping_matches_of_different_categories_are_merged() -> None:
+    text = "ids 123456789@x.com and 1234567812345678@bank.example, plain 123-45-6789"
+    redacted, records = redact(text, merge_spans(find_spans(text, PII_COMBINED)), "[REDACTED]")
+    assert redacted == "ids [REDACTED] and [REDACTED], plain [REDACTED]"
+    assert [record.category for record in records] == ["email", "email", "ssn"]
+    assert find_spans("nothing to see here", PII_COMBINED) == []
+
+
+def test_pseudonymize_round_trip_reuses_tokens() -> None:
+    text = "a@b.io wrote to c@d.io and again to a@b.io"
+    redacted, records = redact(text, find_spans(text, PII_COMBINED), "[REDACTED]", pseudonymize=True, nonce="ab12")
+    assert redacted == "[EMAIL_ab12_1] wrote to [EMAIL_ab12_2] and again to [EMAIL_ab12_1]"
+    assert restore(redacted, records) == text
+    assert restore("[REDACTED]", [RedactionRecord(0, 1, "email", "[REDACTED]")]) == "[REDACTED]"
+
+
+def test_evaluator_returns_redaction_map() -> None:
+    response = evaluate_input(InputCheckRequest(user=USER, query="my mail is x@y.org"), Settings(policy_mode="balanced"))
+    assert response.transformed_query == "my mail is [REDACTED]"
+    assert response.redactions[0].start == 11
+    assert response.redactions[0].category == "email"
+    assert response.redactions[0].value is None
+
+
+def test_evaluator_pseudonymize_mode() -> None:
+    settings = Settings(pii_pseudonymize=True)
+    response = evaluate_output(OutputCheckRequest(user=USER, query="", answer="reach x@y.org"), settings)
+    assert response.status == "transformed"
+    assert response.transformed_answer.startswith("reach [EMAIL_")
+    assert response.redactions[0].value == "x@y.org"
+
+
+def test_long_text_single_pass() -> None:
+    chunk = "lorem ipsum x@y.org dolor 1234567812345678 "
+    text = chunk * 20000
+    redacted, records = redact(text, merge_spans(find_spans(text, PII_COMBINED)), "[REDACTED]")
+    assert len(records) == 40000
+    assert "@" not in redacted
@@ -0,0 +1,42 @@
+"""Print audit records (current and rotated files) as JSONL, filtered by trace or time.
+
+    python tools/read_audit.py /var/lib/safety/audit.jsonl --trace-id 3f2c...
+    python tools/read_audit.py /var/lib/safety/audit.jsonl --since 2024-05-01T10:00 --until 2024-05-01T11:00
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from dataclasses import asdict
+from datetime import datetime, timezone
+from pathlib import Path
+
+from safety_service.core.audit import read_records
+
+
+def _timestamp(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=timezone.utc)
+        return parsed.timestamp()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path, help="audit file (rotated .1, .2, ... are read too)")
+    parser.add_argument("--trace-id")
+    parser.add_argument("--since", type=_timestamp, help="epoch seconds or ISO 8601 (UTC if no offset)")
+    parser.add_argument("--until", type=_timestamp)
+    args = parser.parse_args()
+
+    for record in read_records(args.path, trace_id=args.trace_id, since=args.since, until=args.until):
+        sys.stdout.write(json.dumps(asdict(record), ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Train the second-stage prompt-injection model from labelled JSONL.
+
+Each input line is ``{"text": "...", "label": 0 or 1}``. The model is written as
+``weights.npy`` + ``model.json`` into the output directory; point
+``SAFETY_SERVICE_INJECTION_MODEL_PATH`` at it::
+
+    python tools/train_injection_model.py data/injection.jsonl models/injection --epochs 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+
+from safety_service.core.injection import normalize, rule_stage, train_model
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dataset", type=Path)
+    parser.add_argument("output", type=Path)
+    parser.add_argument("--epochs", type=int, default=10)
+    parser.add_argument("--features-log2", type=int, default=18)
+    parser.add_argument("--learning-rate", type=float, default=0.5)
+    args = parser.parse_args()
+
+    texts, labels = [], []
+    with args.dataset.open(encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                row = json.loads(line)
+                texts.append(row["text"])
+                labels.append(int(row["label"]))
+
+    model = train_model(texts, labels, n_features=1 << args.features_log2, epochs=args.epochs, learning_rate=args.learning_rate)
+    model.save(args.output)
+
+    # report on the slice the model actually sees in production: rule-uncertain inputs
+    uncertain = [(text, label) for text, label in zip(texts, labels) if rule_stage(normalize(text)) == "uncertain"]
+    if uncertain:
+        scores = model.score_batch([normalize(text) for text, _ in uncertain])
+        correct = sum(int(score >= 0.5) == label for score, (_, label) in zip(scores, uncertain))
+        print(json.dumps({"samples": len(texts), "uncertain": len(uncertain), "train_accuracy_uncertain": correct / len(uncertain)}))
+    else:
+        print(json.dumps({"samples": len(texts), "uncertain": 0}))
+
+
+if __name__ == "__main__":
+    main()